@@ -8,11 +8,12 @@ from . import pq
 from . import types
 from .copy import Copy, AsyncCopy
 from .adapt import global_adapters
-from .cursor import AsyncCursor, Cursor
+from .cursor import AsyncCursor, AsyncNamedCursor, Cursor, NamedCursor
 from .errors import Warning, Error, InterfaceError, DatabaseError
 from .errors import DataError, OperationalError, IntegrityError
 from .errors import InternalError, ProgrammingError, NotSupportedError
 from ._column import Column
+from .pipeline import AsyncPipeline, Pipeline
 from .connection import AsyncConnection, Connection, Notify
 from .transaction import Rollback, Transaction, AsyncTransaction
 
@@ -40,12 +41,16 @@ __all__ = [
     "AsyncConnection",
     "AsyncCopy",
     "AsyncCursor",
+    "AsyncNamedCursor",
+    "AsyncPipeline",
     "AsyncTransaction",
     "Column",
     "Connection",
     "Copy",
     "Cursor",
+    "NamedCursor",
     "Notify",
+    "Pipeline",
     "Rollback",
     "Transaction",
 ]
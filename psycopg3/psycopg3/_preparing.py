@@ -5,8 +5,9 @@ Support for prepared statements
 # Copyright (C) 2020 The Psycopg Team
 
 from enum import IntEnum, auto
-from typing import Optional, Sequence, Tuple, TYPE_CHECKING, Union
-from collections import OrderedDict
+from typing import Deque, Dict, Iterator, List, NamedTuple, Optional
+from typing import Sequence, Tuple, Union, TYPE_CHECKING
+from collections import OrderedDict, deque
 
 from .pq import ExecStatus
 from ._queries import PostgresQuery
@@ -21,6 +22,38 @@ class Prepare(IntEnum):
     SHOULD = auto()
 
 
+Key = Tuple[bytes, Tuple[int, ...]]
+
+
+class PreparedCacheInfo(NamedTuple):
+    """Statistics about the usage of the prepared statements."""
+
+    hits: int
+    misses: int
+    preparations: int
+    evictions: int
+    threshold: Optional[int]
+    maxsize: int
+    currsize: int
+
+
+class PreparedStatementInfo(NamedTuple):
+    """Information about a statement prepared on the connection."""
+
+    name: bytes
+    query: bytes
+    types: Tuple[int, ...]
+    executions: int
+
+
+# Number of queries executed after which the adaptive policy is applied.
+_ADAPT_WINDOW = 100
+
+# Hit rate under which, if prepared statements are evicted, the cache is
+# considered thrashing.
+_ADAPT_HIT_RATE = 0.8
+
+
 class PrepareManager:
     # Number of times a query is executed before it is prepared.
     prepare_threshold: Optional[int] = 5
@@ -28,6 +61,9 @@ class PrepareManager:
     # Maximum number of prepared statements on the connection.
     prepared_max: int = 100
 
+    # Adapt the threshold and the cache size to the observed hit rate.
+    prepare_adaptive: bool = False
+
     def __init__(self) -> None:
         # Number of times each query was seen in order to prepare it.
         # Map (query, types) -> name or number of times seen
@@ -35,13 +71,27 @@ class PrepareManager:
         # Note: with this implementation we keep the tally of up to 100
         # queries, but most likely we will prepare way less than that. We might
         # change that if we think it would be better.
-        self._prepared: OrderedDict[
-            Tuple[bytes, Tuple[int, ...]], Union[int, bytes]
-        ] = OrderedDict()
+        self._prepared: OrderedDict[Key, Union[int, bytes]] = OrderedDict()
 
         # Counter to generate prepared statements names
         self._prepared_idx = 0
 
+        # Commands to deallocate the statements evicted from the cache, not
+        # sent yet: they are usually sent together with the next query.
+        self._maint_commands: Deque[bytes] = deque()
+
+        # Number of executions of each prepared statement, by name
+        self._executions: Dict[bytes, int] = {}
+
+        # Statistics
+        self._hits = self._misses = 0
+        self._preparations = self._evictions = 0
+
+        # Adjustments to the threshold and cache size by the adaptive policy,
+        # and counters of the current observation window.
+        self._threshold_adj = self._max_adj = 0
+        self._win_lookups = self._win_hits = self._win_evictions = 0
+
     def get(
         self, query: PostgresQuery, prepare: Optional[bool] = None
     ) -> Tuple[Prepare, bytes]:
@@ -52,13 +102,22 @@ class PrepareManager:
             # The user doesn't want this query to be prepared
             return Prepare.NO, b""
 
+        if self.prepare_adaptive:
+            self._win_lookups += 1
+            if self._win_lookups >= _ADAPT_WINDOW:
+                self._adapt()
+
         key = (query.query, query.types)
         value: Union[bytes, int] = self._prepared.get(key, 0)
         if isinstance(value, bytes):
             # The query was already prepared in this session
+            self._hits += 1
+            self._win_hits += 1
+            self._executions[value] += 1
             return Prepare.YES, value
 
-        if value >= self.prepare_threshold or prepare:
+        self._misses += 1
+        if value >= self.prepare_threshold + self._threshold_adj or prepare:
             # The query has been executed enough times and needs to be prepared
             name = f"_pg3_{self._prepared_idx}".encode("utf-8")
             self._prepared_idx += 1
@@ -73,12 +132,27 @@ class PrepareManager:
         results: Sequence["PGresult"],
         prep: Prepare,
         name: bytes,
-    ) -> Optional[bytes]:
-        """Maintain the cache of the prepared statements."""
+    ) -> None:
+        """
+        Maintain the cache of the prepared statements.
+
+        The statements evicted from the cache are not deallocated immediately:
+        the commands to do it are queued and returned by
+        `get_maintenance_commands()`.
+        """
         # don't do anything if prepared statements are disabled
         if self.prepare_threshold is None:
             return None
 
+        if (self._prepared or self._maint_commands) and self._is_discard(
+            results
+        ):
+            # The session was reset: the server doesn't know our statements
+            self._prepared.clear()
+            self._executions.clear()
+            self._maint_commands.clear()
+            return None
+
         key = (query.query, query.types)
 
         # If we know the query already the cache size won't change
@@ -87,6 +161,8 @@ class PrepareManager:
             if isinstance(self._prepared[key], int):
                 if prep is Prepare.SHOULD:
                     self._prepared[key] = name
+                    self._executions[name] = 1
+                    self._preparations += 1
                 else:
                     self._prepared[key] += 1  # type: ignore  # operator
             self._prepared.move_to_end(key)
@@ -106,15 +182,167 @@ class PrepareManager:
             return None
 
         # Ok, we got to the conclusion that this query is genuinely to prepare
-        self._prepared[key] = name if prep is Prepare.SHOULD else 1
+        if prep is Prepare.SHOULD:
+            self._add_statement(key, name)
+        else:
+            self._prepared[key] = 1
+            self._evict_maybe()
+
+    def add_statement(self, key: Key, name: bytes) -> None:
+        """
+        Record a statement prepared by other means than `maintain()`.
+
+        Used by `Cursor.executemany()`, which prepares a statement before
+        executing it.
+        """
+        if self.prepare_threshold is None:
+            return
+
+        if isinstance(self._prepared.get(key), bytes):
+            # Already prepared with another name: keep only that one
+            self._prepared.move_to_end(key)
+            self._maint_commands.append(b"DEALLOCATE " + name)
+            return
+
+        self._prepared.pop(key, None)
+        self._add_statement(key, name)
+
+    def _add_statement(self, key: Key, name: bytes) -> None:
+        self._prepared[key] = name
+        self._executions[name] = 1
+        self._preparations += 1
+        self._evict_maybe()
 
+    def _evict_maybe(self) -> None:
         # Evict an old value from the cache; if it was prepared, deallocate it
         # Do it only once: if the cache was resized, deallocate gradually
-        if len(self._prepared) <= self.prepared_max:
-            return None
+        if len(self._prepared) <= self.prepared_max + self._max_adj:
+            return
 
-        old_val = self._prepared.popitem(last=False)[1]
+        old_val = self._evict()
         if isinstance(old_val, bytes):
-            return b"DEALLOCATE " + old_val
-        else:
-            return None
+            del self._executions[old_val]
+            self._evictions += 1
+            self._win_evictions += 1
+            self._maint_commands.append(b"DEALLOCATE " + old_val)
+
+    def _evict(self) -> Union[int, bytes]:
+        """
+        Remove the least recently used value from the cache and return it.
+
+        With the adaptive policy, the queries not prepared are removed before
+        the prepared ones, so that queries executed only a few times don't
+        evict the statements executed often. The query just added is kept, in
+        order to give it the chance to be prepared.
+        """
+        if self.prepare_adaptive:
+            last = next(reversed(self._prepared))
+            for key, value in self._prepared.items():
+                if isinstance(value, int) and key != last:
+                    del self._prepared[key]
+                    return value
+
+        return self._prepared.popitem(last=False)[1]
+
+    def _adapt(self) -> None:
+        """
+        Adjust the threshold and the cache size to the last queries executed.
+
+        If prepared statements are evicted while the hit rate is low, raise
+        the threshold, so that fewer queries are prepared, and make room for
+        more statements. If the cache is stable, move back gradually to the
+        configured values.
+        """
+        assert self.prepare_threshold is not None
+        hit_rate = self._win_hits / self._win_lookups
+        if self._win_evictions and hit_rate < _ADAPT_HIT_RATE:
+            self._threshold_adj = min(
+                self._threshold_adj * 2 + 1,
+                max(self.prepare_threshold, 1) * 3,
+            )
+            self._max_adj = min(
+                self._max_adj + max(self.prepared_max // 2, 1),
+                self.prepared_max * 3,
+            )
+        elif not self._win_evictions:
+            self._threshold_adj //= 2
+            if len(self._executions) < self.prepared_max:
+                self._max_adj //= 2
+
+        self._win_lookups = self._win_hits = self._win_evictions = 0
+
+    def info(self) -> PreparedCacheInfo:
+        """Return statistics about the usage of the prepared statements."""
+        return PreparedCacheInfo(
+            self._hits,
+            self._misses,
+            self._preparations,
+            self._evictions,
+            None
+            if self.prepare_threshold is None
+            else self.prepare_threshold + self._threshold_adj,
+            self.prepared_max + self._max_adj,
+            len(self._executions),
+        )
+
+    def statements(self) -> List[PreparedStatementInfo]:
+        """Return the statements prepared, from the least recently used."""
+        return [
+            PreparedStatementInfo(
+                value, key[0], key[1], self._executions[value]
+            )
+            for key, value in self._prepared.items()
+            if isinstance(value, bytes)
+        ]
+
+    def clear(self) -> None:
+        """
+        Forget all the queries seen and deallocate the prepared ones.
+
+        The deallocation is performed by a single ``DEALLOCATE ALL`` command,
+        returned by `get_maintenance_commands()`.
+        """
+        prepared = bool(self._executions or self._maint_commands)
+        self._prepared.clear()
+        self._executions.clear()
+        self._maint_commands.clear()
+        if prepared:
+            self._maint_commands.append(b"DEALLOCATE ALL")
+
+    def get_maintenance_commands(self) -> Iterator[bytes]:
+        """Return the commands to send to the server, removing them."""
+        while self._maint_commands:
+            yield self._maint_commands.popleft()
+
+    def maintenance_due(self) -> bool:
+        """
+        Return `True` if the commands queued should be sent before the next
+        query, even if they cannot be sent in the same round trip.
+
+        It happens when more statements are waiting to be deallocated than
+        the ones allowed in the cache.
+        """
+        return len(self._maint_commands) > self.prepared_max + self._max_adj
+
+    def requeue_maintenance_command(self, command: bytes) -> None:
+        """
+        Queue again a command returned by `get_maintenance_commands()` which
+        was not executed.
+        """
+        if b"DEALLOCATE ALL" not in self._maint_commands:
+            self._maint_commands.append(command)
+
+    def _is_discard(self, results: Sequence["PGresult"]) -> bool:
+        """
+        Return `True` if the results show that the prepared statements were
+        dropped, for instance executing ``DISCARD ALL``.
+        """
+        for result in results:
+            if result.status == ExecStatus.COMMAND_OK and (
+                result.command_status in _DISCARD_STATUSES
+            ):
+                return True
+        return False
+
+
+_DISCARD_STATUSES = (b"DISCARD ALL", b"DEALLOCATE ALL")
@@ -8,7 +8,9 @@ import re
 from typing import Any, Dict, List, Mapping, Match, NamedTuple, Optional
 from typing import Sequence, Tuple, Union, TYPE_CHECKING
 from functools import lru_cache
+from collections import OrderedDict
 
+from . import pq
 from . import errors as e
 from .pq import Format
 from .sql import Composable
@@ -24,6 +26,85 @@ class QueryPart(NamedTuple):
     format: Format
 
 
+class QueryCacheInfo(NamedTuple):
+    """Statistics about the usage of a `QueryCache`."""
+
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+# The query converted to Postgres format, its params formats, names order
+# and parts, as returned by _query2pg()
+QueryTemplate = Tuple[
+    bytes, List[Format], Optional[List[str]], List[QueryPart]
+]
+
+
+class QueryCache:
+    """
+    A cache of the queries converted to Postgres format.
+
+    The cache is maintained per connection: the least recently used queries
+    are discarded when more than `maxsize` queries are stored. The dumpers of
+    the parameters are not stored in the cache: they are shared by the
+    Transformers of the connection, so they are found by type at every
+    execution.
+    """
+
+    def __init__(self, maxsize: int = 128):
+        self._maxsize = maxsize
+        self._templates: OrderedDict[
+            Tuple[Union[bytes, str], str], QueryTemplate
+        ] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def maxsize(self) -> int:
+        return self._maxsize
+
+    @maxsize.setter
+    def maxsize(self, value: int) -> None:
+        if value < 0:
+            raise ValueError("the cache size must be a non-negative number")
+        self._maxsize = value
+        while len(self._templates) > value:
+            self._templates.popitem(last=False)
+
+    def get(self, query: Union[bytes, str], encoding: str) -> QueryTemplate:
+        """Return the template of *query*, converting it if not in cache."""
+        key = (query, encoding)
+        try:
+            rv = self._templates[key]
+        except KeyError:
+            pass
+        else:
+            self.hits += 1
+            self._templates.move_to_end(key)
+            return rv
+
+        self.misses += 1
+        rv = _query2pg_nocache(query, encoding)
+        if self._maxsize:
+            self._templates[key] = rv
+            if len(self._templates) > self._maxsize:
+                self._templates.popitem(last=False)
+        return rv
+
+    def clear(self) -> None:
+        """Discard the queries in the cache and reset the statistics."""
+        self._templates.clear()
+        self.hits = self.misses = 0
+
+    def info(self) -> QueryCacheInfo:
+        """Return the statistics about the cache usage."""
+        return QueryCacheInfo(
+            self.hits, self.misses, self._maxsize, len(self._templates)
+        )
+
+
 class PostgresQuery:
     """
     Helper to convert a Python query and parameters into Postgres format.
@@ -31,7 +112,7 @@ class PostgresQuery:
 
     __slots__ = """
         params types formats
-        _tx _unknown_oid _parts query _encoding _order
+        _tx _unknown_oid _parts query _encoding _order _cache
         """.split()
 
     def __init__(self, transformer: "Transformer"):
@@ -48,8 +129,10 @@ class PostgresQuery:
         self._order: Optional[List[str]] = None
 
         conn = transformer.connection
+        self._cache: Optional[QueryCache] = None
         if conn:
             self._encoding = conn.client_encoding
+            self._cache = conn._query_cache
 
     def convert(self, query: Query, vars: Optional[Params]) -> None:
         """
@@ -62,9 +145,11 @@ class PostgresQuery:
             query = query.as_bytes(self._tx)
 
         if vars is not None:
-            self.query, self.formats, self._order, self._parts = _query2pg(
-                query, self._encoding
-            )
+            if self._cache:
+                tmpl = self._cache.get(query, self._encoding)
+            else:
+                tmpl = _query2pg(query, self._encoding)
+            self.query, self.formats, self._order, self._parts = tmpl
         else:
             if isinstance(query, str):
                 query = query.encode(self._encoding)
@@ -92,10 +177,7 @@ class PostgresQuery:
             self.types = ()
 
 
-@lru_cache()
-def _query2pg(
-    query: Union[bytes, str], encoding: str
-) -> Tuple[bytes, List[Format], Optional[List[str]], List[QueryPart]]:
+def _query2pg_python(query: Union[bytes, str], encoding: str) -> QueryTemplate:
     """
     Convert Python query and params into something Postgres understands.
 
@@ -218,7 +300,9 @@ _re_placeholder = re.compile(
 )
 
 
-def _split_query(query: bytes, encoding: str = "ascii") -> List[QueryPart]:
+def _split_query_python(
+    query: bytes, encoding: str = "ascii"
+) -> List[QueryPart]:
     parts: List[Tuple[bytes, Optional[Match[bytes]]]] = []
     cur = 0
 
@@ -288,3 +372,18 @@ def _split_query(query: bytes, encoding: str = "ascii") -> List[QueryPart]:
         i += 1
 
     return rv
+
+
+# Override functions with fast versions if available
+if pq.__impl__ == "c":
+    from psycopg3_c import _psycopg3
+
+    _query2pg_nocache = _psycopg3.query2pg
+    _split_query = _psycopg3.split_query
+
+else:
+    _query2pg_nocache = _query2pg_python
+    _split_query = _split_query_python
+
+# Used if there is no connection with its own cache
+_query2pg = lru_cache()(_query2pg_nocache)
@@ -0,0 +1,147 @@
+"""
+Cache of the session parameters affecting the adaptation
+"""
+
+# Copyright (C) 2021 The Psycopg Team
+
+import re
+import sys
+import logging
+from typing import Dict, Optional, Tuple, TYPE_CHECKING
+from datetime import timedelta, timezone, tzinfo
+
+from . import encodings
+
+if sys.version_info >= (3, 9):
+    from zoneinfo import ZoneInfo
+else:
+    from backports.zoneinfo import ZoneInfo
+
+if TYPE_CHECKING:
+    from .pq.proto import PGconn
+
+logger = logging.getLogger(__name__)
+
+StateKey = Tuple[
+    Optional[bytes], Optional[bytes], Optional[bytes], Optional[bytes]
+]
+
+
+class SessionState:
+    """
+    The session parameters the loaders and dumpers configuration depends on.
+
+    The server reports the change of these parameters by ParameterStatus
+    messages, which the libpq can only receive while the connection waits for
+    the server. The values are read again from the libpq only on the first
+    access after the connection is marked stale by `invalidate()`.
+    """
+
+    __slots__ = ("_pgconn", "_stale", "_key", "_encoding", "_timezone")
+
+    def __init__(self, pgconn: "PGconn"):
+        self._pgconn = pgconn
+        self._stale = True
+        self._key: StateKey = (None, None, None, None)
+        self._encoding = "utf-8"
+        self._timezone: tzinfo = timezone.utc
+
+    def invalidate(self) -> None:
+        """Mark the values as to be read again on the next access."""
+        self._stale = True
+
+    @property
+    def key(self) -> StateKey:
+        """The raw values of the parameters, usable to identify the state."""
+        if self._stale:
+            self._refresh()
+        return self._key
+
+    @property
+    def client_encoding(self) -> str:
+        """The Python codec name of the connection's client encoding."""
+        if self._stale:
+            self._refresh()
+        return self._encoding
+
+    @property
+    def datestyle(self) -> Optional[bytes]:
+        if self._stale:
+            self._refresh()
+        return self._key[1]
+
+    @property
+    def intervalstyle(self) -> Optional[bytes]:
+        if self._stale:
+            self._refresh()
+        return self._key[2]
+
+    @property
+    def timezone(self) -> tzinfo:
+        """The Python timezone of the connection's TimeZone."""
+        if self._stale:
+            self._refresh()
+        return self._timezone
+
+    def _refresh(self) -> None:
+        ps = self._pgconn.parameter_status
+        key = (
+            ps(b"client_encoding"),
+            ps(b"DateStyle"),
+            ps(b"IntervalStyle"),
+            ps(b"TimeZone"),
+        )
+        if key[0] != self._key[0]:
+            self._encoding = encodings.pg2py(key[0] or b"UTF8")
+        if key[3] != self._key[3]:
+            self._timezone = _get_timezone(key[3])
+        self._key = key
+        self._stale = False
+
+
+# Cache of the timezones by PostgreSQL name
+_timezones: Dict[Optional[bytes], tzinfo] = {
+    None: timezone.utc,
+    b"UTC": timezone.utc,
+}
+
+# A POSIX-style offset, e.g. '-3:30': positive values are west of Greenwich
+_re_offset = re.compile(
+    r"([-+])?(\d{1,2})(?::(\d{2}))?(?::(\d{2}))?", re.ASCII
+)
+
+
+def _get_timezone(name: Optional[bytes]) -> tzinfo:
+    """
+    Return the Python timezone matching a value of the TimeZone parameter.
+
+    Return UTC, and log a warning, if the timezone is unknown to Python.
+    """
+    try:
+        return _timezones[name]
+    except KeyError:
+        pass
+
+    assert name is not None
+    sname = name.decode("utf8", "replace")
+    m = _re_offset.fullmatch(sname)
+    if m:
+        sign, hh, mm, ss = m.groups()
+        secs = int(hh) * 3600 + int(mm or 0) * 60 + int(ss or 0)
+        if sys.version_info < (3, 7):
+            # Python 3.6 doesn't support seconds in the timezone offset
+            secs = secs // 60 * 60
+        tz: tzinfo = timezone(
+            timedelta(seconds=secs if sign == "-" else -secs)
+        )
+    else:
+        try:
+            tz = ZoneInfo(sname)
+        except Exception as ex:
+            logger.warning(
+                "unknown PostgreSQL timezone %r (%s): using UTC", sname, ex
+            )
+            tz = timezone.utc
+
+    _timezones[name] = tz
+    return tz
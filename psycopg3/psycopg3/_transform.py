@@ -4,19 +4,25 @@ Helper object to transform values between Python and PostgreSQL
 
 # Copyright (C) 2020 The Psycopg Team
 
+import sys
+from array import array
 from typing import Any, Dict, List, Optional, Sequence, Tuple
 from typing import TYPE_CHECKING
 
 from . import errors as e
 from .pq import Format
 from .oids import INVALID_OID, TEXT_OID
-from .proto import LoadFunc, AdaptContext
+from .rows import LazyRowMaker
+from .proto import LoadFunc, AdaptContext, Row, RowMaker
 
 if TYPE_CHECKING:
     from .pq.proto import PGresult
-    from .adapt import Dumper, Loader, AdaptersMap
+    from .adapt import Dumper, Loader, AdaptCache, AdaptersMap
     from .connection import BaseConnection
 
+# Max number of result signatures whose row loaders are cached
+_MAX_ROW_SIGNATURES = 256
+
 
 class Transformer(AdaptContext):
     """
@@ -25,10 +31,15 @@ class Transformer(AdaptContext):
     The life cycle of the object is the query, so it is assumed that stuff like
     the server version or connection encoding will not change. It can have its
     state so adapting several values of the same type can be optimised.
+
+    The adapters instances are shared with the other Transformers of the same
+    connection, as long as the adapters and the connection configuration don't
+    change.
     """
 
     __module__ = "psycopg3.adapt"
     _adapters: "AdaptersMap"
+    _adapt_cache: Optional["AdaptCache"]
     _pgresult: Optional["PGresult"] = None
 
     def __init__(self, context: Optional[AdaptContext] = None):
@@ -50,16 +61,38 @@ class Transformer(AdaptContext):
 
         # mapping class, fmt -> Dumper instance
         self._dumpers_cache: Tuple[Dict[type, "Dumper"], Dict[type, "Dumper"]]
-        self._dumpers_cache = ({}, {})
 
         # mapping oid, fmt -> Loader instance
         self._loaders_cache: Tuple[Dict[int, "Loader"], Dict[int, "Loader"]]
-        self._loaders_cache = ({}, {})
+
+        # mapping result signature -> sequence of load functions
+        self._row_loaders_cache: Dict[Tuple[int, ...], List[LoadFunc]]
+
+        # Share the adapters already created by the connection, if possible.
+        # Don't share them with the Transformers of the adapters themselves,
+        # which would create a loop.
+        cache = self._adapt_cache = None
+        if self._connection and not isinstance(context, Transformer):
+            cache = self._adapt_cache = self._connection._get_adapt_cache(
+                self._adapters
+            )
+        if cache:
+            self._dumpers_cache = cache.dumpers
+            self._loaders_cache = cache.loaders
+            self._row_loaders_cache = cache.row_loaders
+        else:
+            self._dumpers_cache = ({}, {})
+            self._loaders_cache = ({}, {})
+            self._row_loaders_cache = {}
 
         # sequence of load functions from value to python
         # the length of the result columns
         self._row_loaders: List[LoadFunc] = []
 
+        # function to build a row from the sequence of values loaded
+        self._make_row: RowMaker = tuple
+        self._lazy_maker: Optional[LazyRowMaker] = None
+
     @property
     def connection(self) -> Optional["BaseConnection"]:
         return self._connection
@@ -74,22 +107,56 @@ class Transformer(AdaptContext):
 
     @pgresult.setter
     def pgresult(self, result: Optional["PGresult"]) -> None:
+        self.set_pgresult(result)
+
+    @property
+    def make_row(self) -> RowMaker:
+        return self._make_row
+
+    @make_row.setter
+    def make_row(self, row_maker: RowMaker) -> None:
+        self._make_row = row_maker
+        # Lazy rows are created without loading the values
+        self._lazy_maker = (
+            row_maker if isinstance(row_maker, LazyRowMaker) else None
+        )
+
+    def set_pgresult(
+        self, result: Optional["PGresult"], *, set_loaders: bool = True
+    ) -> None:
         self._pgresult = result
-        rc = self._row_loaders = []
 
         self._ntuples: int
         self._nfields: int
         if not result:
             self._nfields = self._ntuples = 0
+            if set_loaders:
+                self._row_loaders = []
             return
 
         nf = self._nfields = result.nfields
         self._ntuples = result.ntuples
 
+        if not set_loaders:
+            return
+
+        # The oids of the columns followed by their formats
+        sig = tuple(map(result.ftype, range(nf))) + tuple(
+            map(result.fformat, range(nf))
+        )
+        try:
+            self._row_loaders = self._row_loaders_cache[sig]
+            return
+        except KeyError:
+            pass
+
+        rc = self._row_loaders = []
         for i in range(nf):
-            oid = result.ftype(i)
-            fmt = result.fformat(i)
-            rc.append(self.get_loader(oid, fmt).load)  # type: ignore
+            rc.append(self.get_loader(sig[i], sig[nf + i]).load)  # type: ignore
+
+        if len(self._row_loaders_cache) >= _MAX_ROW_SIGNATURES:
+            self._row_loaders_cache.clear()
+        self._row_loaders_cache[sig] = rc
 
     def set_row_types(
         self, types: Sequence[int], formats: Sequence[Format]
@@ -131,7 +198,7 @@ class Transformer(AdaptContext):
             f"cannot adapt type {cls.__name__} to format {Format(format).name}"
         )
 
-    def load_rows(self, row0: int, row1: int) -> List[Tuple[Any, ...]]:
+    def load_rows(self, row0: int, row1: int) -> List[Row]:
         res = self._pgresult
         if not res:
             raise e.InterfaceError("result not set")
@@ -141,19 +208,23 @@ class Transformer(AdaptContext):
                 f"rows must be included between 0 and {self._ntuples}"
             )
 
-        records: List[Tuple[Any, ...]]
-        records = [None] * (row1 - row0)  # type: ignore[list-item]
+        if self._lazy_maker:
+            make = self._lazy_maker.make
+            return [make(res, row) for row in range(row0, row1)]
+
+        make_row = self._make_row
+        records: List[Row] = [None] * (row1 - row0)
         for row in range(row0, row1):
             record: List[Any] = [None] * self._nfields
             for col in range(self._nfields):
                 val = res.get_value(row, col)
                 if val is not None:
                     record[col] = self._row_loaders[col](val)
-            records[row - row0] = tuple(record)
+            records[row - row0] = make_row(tuple(record))
 
         return records
 
-    def load_row(self, row: int) -> Optional[Tuple[Any, ...]]:
+    def load_row(self, row: int) -> Optional[Row]:
         res = self._pgresult
         if not res:
             return None
@@ -161,13 +232,111 @@ class Transformer(AdaptContext):
         if not 0 <= row < self._ntuples:
             return None
 
+        if self._lazy_maker:
+            return self._lazy_maker.make(res, row)
+
         record: List[Any] = [None] * self._nfields
         for col in range(self._nfields):
             val = res.get_value(row, col)
             if val is not None:
                 record[col] = self._row_loaders[col](val)
 
-        return tuple(record)
+        return self._make_row(tuple(record))
+
+    def load_columns(self, row0: int, row1: int) -> List[Sequence[Any]]:
+        res = self._pgresult
+        if not res:
+            raise e.InterfaceError("result not set")
+
+        if not (0 <= row0 <= self._ntuples and 0 <= row1 <= self._ntuples):
+            raise e.InterfaceError(
+                f"rows must be included between 0 and {self._ntuples}"
+            )
+
+        return [
+            self._load_column(res, col, row0, row1)
+            for col in range(self._nfields)
+        ]
+
+    def load_column(self, col: int, row0: int, row1: int) -> Sequence[Any]:
+        res = self._check_column_args(col, row0, row1)
+
+        return self._load_column(res, col, row0, row1)
+
+    def _check_column_args(self, col: int, row0: int, row1: int) -> "PGresult":
+        res = self._pgresult
+        if not res:
+            raise e.InterfaceError("result not set")
+
+        if not (0 <= row0 <= self._ntuples and 0 <= row1 <= self._ntuples):
+            raise e.InterfaceError(
+                f"rows must be included between 0 and {self._ntuples}"
+            )
+        if not 0 <= col < self._nfields:
+            raise e.InterfaceError(
+                f"column must be included between 0 and {self._nfields}"
+            )
+
+        return res
+
+    def _load_column(
+        self, res: "PGresult", col: int, row0: int, row1: int
+    ) -> Sequence[Any]:
+        values = [res.get_value(row, col) for row in range(row0, row1)]
+
+        typecode = None
+        if res.fformat(col) == Format.BINARY:
+            loader = self.get_loader(res.ftype(col), Format.BINARY)
+            typecode = _get_array_typecodes().get(type(loader))
+
+        if typecode and None not in values:
+            # The binary representation is the same as the C type's
+            arr = array(typecode)
+            arr.frombytes(b"".join(values))  # type: ignore[arg-type]
+            if sys.byteorder == "little":
+                arr.byteswap()
+            return arr
+        else:
+            load = self._row_loaders[col]
+            return [load(val) if val is not None else None for val in values]
+
+    def copy_column(
+        self, col: int, row0: int, row1: int, data: Any, nulls: Any
+    ) -> int:
+        res = self._check_column_args(col, row0, row1)
+
+        nrows = max(row1 - row0, 0)
+        dmv, size = _get_writable(data, nrows, "data")
+        nmv, nsize = _get_writable(nulls, nrows, "nulls")
+        if nsize != 1:
+            raise ValueError("nulls items must be 1 byte long")
+
+        zero = bytes(size)
+        values = []
+        nnulls = 0
+        for i, row in enumerate(range(row0, row1)):
+            val = res.get_value(row, col)
+            if val is None:
+                nnulls += 1
+                nmv[i] = 1
+                values.append(zero)
+            elif len(val) == size:
+                nmv[i] = 0
+                values.append(val)
+            else:
+                raise e.DataError(
+                    f"cannot copy a value of {len(val)} bytes"
+                    f" into items of {size} bytes"
+                )
+
+        if size in _swap_typecodes and sys.byteorder == "little":
+            arr = array(_swap_typecodes[size], b"".join(values))
+            arr.byteswap()
+            dmv[:] = memoryview(arr).cast("B")
+        else:
+            dmv[:] = b"".join(values)
+
+        return nnulls
 
     def load_sequence(
         self, record: Sequence[Optional[bytes]]
@@ -196,3 +365,54 @@ class Transformer(AdaptContext):
                 raise e.InterfaceError("unknown oid loader not found")
         loader = self._loaders_cache[format][oid] = loader_cls(oid, self)
         return loader
+
+
+_array_typecodes: Dict[type, str] = {}
+
+
+def _get_array_typecodes() -> Dict[type, str]:
+    """
+    Return the map from loader classes to `array` typecodes.
+
+    Only the binary loaders of fixed-size types are included: their data can
+    be copied into an `!array.array` without being parsed.
+    """
+    if _array_typecodes:
+        return _array_typecodes
+
+    from .types import numeric
+
+    for cls, typecode, size in [
+        (numeric.Int2BinaryLoader, "h", 2),
+        (numeric.Int4BinaryLoader, "i", 4),
+        (numeric.Int8BinaryLoader, "q", 8),
+        (numeric.OidBinaryLoader, "I", 4),
+        (numeric.Float4BinaryLoader, "f", 4),
+        (numeric.Float8BinaryLoader, "d", 8),
+    ]:
+        if array(typecode).itemsize == size:
+            _array_typecodes[cls] = typecode
+
+    return _array_typecodes
+
+
+# Typecode of an array able to byteswap items of each size
+_swap_typecodes: Dict[int, str] = {
+    array(tc).itemsize: tc for tc in reversed("HILQ")
+}
+
+
+def _get_writable(obj: Any, nitems: int, name: str) -> Tuple[memoryview, int]:
+    """
+    Return a memoryview of bytes on the writable buffer *obj* and its itemsize.
+
+    The buffer must be contiguous and contain exactly *nitems*.
+    """
+    mv = memoryview(obj)
+    if mv.readonly or not mv.c_contiguous:
+        raise ValueError(f"{name} must be a writable contiguous buffer")
+    if mv.nbytes != nitems * mv.itemsize:
+        raise ValueError(
+            f"{name} must contain {nitems} items, got {mv.nbytes // mv.itemsize}"
+        )
+    return mv.cast("B"), mv.itemsize
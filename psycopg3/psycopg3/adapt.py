@@ -5,7 +5,7 @@ Entry point into the adaptation system.
 # Copyright (C) 2020 The Psycopg Team
 
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Optional, Type, TypeVar, Union
+from typing import Any, Dict, List, Optional, Tuple, Type, TypeVar, Union
 from typing import cast, TYPE_CHECKING
 from . import pq
 from . import proto
@@ -123,6 +123,10 @@ class AdaptersMap(AdaptContext):
     # Record if a dumper or loader has an optimised version.
     _optimised: Dict[type, type] = {}
 
+    # Incremented every time an adapter is registered on any map, so that the
+    # adapters instances cached can be discarded.
+    _version = 0
+
     def __init__(self, extend: Optional["AdaptersMap"] = None):
         if extend:
             self._dumpers = extend._dumpers[:]
@@ -162,6 +166,7 @@ class AdaptersMap(AdaptContext):
             self._own_dumpers[fmt] = True
 
         self._dumpers[fmt][cls] = dumper
+        AdaptersMap._version += 1
 
     def register_loader(self, oid: int, loader: Type[Loader]) -> None:
         """
@@ -179,6 +184,7 @@ class AdaptersMap(AdaptContext):
             self._own_loaders[fmt] = True
 
         self._loaders[fmt][oid] = loader
+        AdaptersMap._version += 1
 
     def get_dumper(self, cls: type, format: Format) -> Optional[Type[Dumper]]:
         """
@@ -210,6 +216,19 @@ class AdaptersMap(AdaptContext):
         """
         return self._loaders[format].get(oid)
 
+    def _shares_maps(self, other: "AdaptersMap") -> bool:
+        """
+        Return `!True` if the object uses the same adapters of *other*.
+
+        This is the case of a map extending *other* without customising it.
+        """
+        return (
+            self._dumpers[0] is other._dumpers[0]
+            and self._dumpers[1] is other._dumpers[1]
+            and self._loaders[0] is other._loaders[0]
+            and self._loaders[1] is other._loaders[1]
+        )
+
     @classmethod
     def _get_optimised(self, cls: Type[RV]) -> Type[RV]:
         """Return the optimised version of a Dumper or Loader class.
@@ -240,6 +259,33 @@ class AdaptersMap(AdaptContext):
 global_adapters = AdaptersMap()
 
 
+class AdaptCache:
+    """
+    The adapters instances shared by the Transformers of a connection.
+
+    The object is valid as long as its `key` doesn't change: the key includes
+    the version of the adapters maps and the connection parameters affecting
+    the adapters configuration.
+    """
+
+    __slots__ = ("key", "dumpers", "loaders", "row_loaders", "__weakref__")
+
+    def __init__(self, key: Tuple[Any, ...]):
+        self.key = key
+
+        # mapping class -> Dumper instance (text, binary)
+        self.dumpers: Tuple[Dict[type, Dumper], Dict[type, Dumper]]
+        self.dumpers = ({}, {})
+
+        # mapping oid -> Loader instance (text, binary)
+        self.loaders: Tuple[Dict[int, Loader], Dict[int, Loader]]
+        self.loaders = ({}, {})
+
+        # mapping result signature (oids and formats of the columns) -> row
+        # loaders, in the form used by the Transformer implementation.
+        self.row_loaders: Dict[Tuple[int, ...], Any] = {}
+
+
 Transformer: Type[proto.Transformer]
 
 # Override it with fast object if available
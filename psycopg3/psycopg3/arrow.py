@@ -0,0 +1,361 @@
+"""
+Convert query results to Apache Arrow record batches
+
+The module requires PyArrow to be installed: it is not imported by the rest of
+the package, so that psycopg3 doesn't depend on it.
+"""
+
+# Copyright (C) 2020 The Psycopg Team
+
+import sys
+from array import array
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+from typing import Sequence, TYPE_CHECKING
+
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from . import errors as e
+from .pq import ExecStatus, Format
+from .oids import builtins
+from .copy import split_row_binary
+from .cursor import Cursor, NamedCursor, AsyncNamedCursor
+from .proto import PQGen, Transformer
+
+if TYPE_CHECKING:
+    from .copy import Copy, AsyncCopy
+    from .cursor import BaseCursor
+
+DEFAULT_BATCH_SIZE = 64 * 1024
+
+# The Arrow types with the same representation of PostgreSQL binary types,
+# and the typecode of the array to read them. The values of these types are
+# copied from the result into the Arrow buffers without creating Python
+# objects.
+_fixed_types: Dict[int, Any] = {
+    builtins[name].oid: (atype, typecode)
+    for name, atype, typecode in [
+        ("bool", pa.bool_(), "B"),
+        ("int2", pa.int16(), "h"),
+        ("int4", pa.int32(), "i"),
+        ("int8", pa.int64(), "q"),
+        ("oid", pa.uint32(), "I"),
+        ("float4", pa.float32(), "f"),
+        ("float8", pa.float64(), "d"),
+    ]
+}
+
+# The Arrow types to convert other PostgreSQL types, or the same types in
+# text format, into. The type of the columns is known before seeing the data,
+# so that all the batches have the same schema.
+_types: Dict[int, Any] = {
+    builtins[name].oid: atype
+    for name, atype in [
+        ("bool", pa.bool_()),
+        ("int2", pa.int16()),
+        ("int4", pa.int32()),
+        ("int8", pa.int64()),
+        ("oid", pa.uint32()),
+        ("float4", pa.float32()),
+        ("float8", pa.float64()),
+        ("text", pa.string()),
+        ("varchar", pa.string()),
+        ("bpchar", pa.string()),
+        ("name", pa.string()),
+        ("bytea", pa.binary()),
+        ("date", pa.date32()),
+        ("time", pa.time64("us")),
+        ("timestamp", pa.timestamp("us")),
+        ("timestamptz", pa.timestamp("us", tz="UTC")),
+        ("interval", pa.duration("us")),
+    ]
+}
+
+# The types converted to Arrow strings, because their Python objects are not
+# understood by Arrow. The numeric columns without a precision have no Arrow
+# decimal type able to represent all their values, so they are converted to
+# strings too. The types not mapped are inferred by Arrow from the values of
+# the first batch with non-null values.
+_str_types = {builtins["uuid"].oid, builtins["numeric"].oid}
+
+_numeric_oid = builtins["numeric"].oid
+
+
+def record_batches(
+    cursor: "BaseCursor[Any]", batch_size: int = DEFAULT_BATCH_SIZE
+) -> Iterator[pa.RecordBatch]:
+    """
+    Return the remaining records of the cursor as Arrow record batches.
+
+    Every batch contains at most *batch_size* records. If *cursor* is a
+    `~psycopg3.NamedCursor` the records are fetched from the server one batch
+    at a time; otherwise they are converted from the current result, already
+    in memory. The records returned are consumed from the cursor.
+    """
+    if isinstance(cursor, AsyncNamedCursor):
+        raise e.NotSupportedError(
+            "record_batches() not supported on async named cursors"
+        )
+
+    if batch_size < 1:
+        raise ValueError("batch_size must be a positive number")
+
+    if isinstance(cursor, NamedCursor):
+        with cursor.connection.lock:
+            res = cursor.connection.wait(cursor._fetch_result_gen(batch_size))
+        conv = _ResultConverter(cursor)
+        while res.ntuples:
+            cursor._pos += res.ntuples
+            yield conv.convert(0, res.ntuples)
+            if res.ntuples < batch_size:
+                break
+            with cursor.connection.lock:
+                res = cursor.connection.wait(
+                    cursor._fetch_result_gen(batch_size)
+                )
+        return
+
+    if isinstance(cursor, Cursor):
+        cursor._fetch_pipeline()
+    cursor._check_result()
+    conv = _ResultConverter(cursor)
+    ntuples = cursor._transformer.pgresult.ntuples  # type: ignore
+    while cursor._pos < ntuples:
+        row0 = cursor._pos
+        row1 = min(row0 + batch_size, ntuples)
+        cursor._pos = row1
+        yield conv.convert(row0, row1)
+
+
+def copy_record_batches(
+    copy: "Copy",
+    types: Sequence[int],
+    names: Optional[Sequence[str]] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> Iterator[pa.RecordBatch]:
+    """
+    Return the data of a :sql:`COPY TO` operation as Arrow record batches.
+
+    The operation must use the binary format. *types* are the oids of the
+    columns of the data, *names* the name of the columns in the batches.
+    """
+    conv = _CopyConverter(copy, types, names, batch_size)
+    while True:
+        more = copy.connection.wait(conv.read_batch_gen())
+        if conv.rows:
+            yield conv.convert()
+        if not more:
+            break
+
+
+async def acopy_record_batches(
+    copy: "AsyncCopy",
+    types: Sequence[int],
+    names: Optional[Sequence[str]] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> AsyncIterator[pa.RecordBatch]:
+    """
+    Return the data of an async :sql:`COPY TO` as Arrow record batches.
+
+    The function works as `copy_record_batches()` but on an `AsyncCopy`.
+    """
+    conv = _CopyConverter(copy, types, names, batch_size)
+    while True:
+        more = await copy.connection.wait(conv.read_batch_gen())
+        if conv.rows:
+            yield conv.convert()
+        if not more:
+            break
+
+
+class _Column:
+    """Convert the values of a column to Arrow arrays."""
+
+    def __init__(
+        self, tx: Transformer, oid: int, format: Format, fmod: int = -1
+    ):
+        self.tx = tx
+        self.type = _types.get(oid)
+        self.typecode = None
+        self.to_str = False
+        if format == Format.BINARY and oid in _fixed_types:
+            self.type, self.typecode = _fixed_types[oid]
+        elif oid == _numeric_oid:
+            self.type = _decimal_type(fmod)
+        if self.type is None and oid in _str_types:
+            self.type = pa.string()
+            self.to_str = True
+        self.load = tx.get_loader(oid, format).load
+
+    def from_result(self, col: int, row0: int, row1: int) -> pa.Array:
+        if not self.typecode:
+            return self._from_objects(self.tx.load_column(col, row0, row1))
+
+        nrows = row1 - row0
+        data = array(self.typecode, bytes(nrows * _itemsize(self.typecode)))
+        nulls = bytearray(nrows)
+        nnulls = self.tx.copy_column(col, row0, row1, data, nulls)
+        return self._from_fixed(data, nulls if nnulls else None)
+
+    def from_values(self, values: List[Optional[bytes]]) -> pa.Array:
+        if not self.typecode:
+            return self._from_objects(
+                [self.load(v) if v is not None else None for v in values]
+            )
+
+        size = _itemsize(self.typecode)
+        nulls = None
+        if None in values:
+            zero = bytes(size)
+            nulls = bytes(v is None for v in values)
+            values = [v if v is not None else zero for v in values]
+
+        buf = b"".join(values)  # type: ignore[arg-type]
+        if len(buf) != len(values) * size:
+            raise e.DataError(f"bad copy data: values must be {size} bytes")
+        data = array(self.typecode, buf)
+        if sys.byteorder == "little":
+            data.byteswap()
+        return self._from_fixed(data, nulls)
+
+    def _from_fixed(self, data: "array[Any]", nulls: Any) -> pa.Array:
+        nrows = len(data)
+        if self.type == pa.bool_():
+            arr = pa.Array.from_buffers(
+                pa.uint8(), nrows, [None, pa.py_buffer(data)]
+            ).cast(pa.bool_())
+        else:
+            arr = pa.Array.from_buffers(
+                self.type, nrows, [None, pa.py_buffer(data)]
+            )
+
+        if nulls is not None:
+            mask = pa.Array.from_buffers(
+                pa.uint8(), nrows, [None, pa.py_buffer(nulls)]
+            ).cast(pa.bool_())
+            arr = pc.if_else(mask, pa.scalar(None, arr.type), arr)
+
+        return arr
+
+    def _from_objects(self, values: Sequence[Any]) -> pa.Array:
+        if self.to_str:
+            values = [str(v) if v is not None else None for v in values]
+        try:
+            arr = pa.array(values, type=self.type)
+        except (pa.ArrowInvalid, pa.ArrowTypeError) as ex:
+            raise e.DataError(
+                f"can't convert values to Arrow {self.type or 'array'}: {ex}"
+            ) from None
+        # Keep the type inferred, so that the batches have the same schema
+        if self.type is None and arr.type != pa.null():
+            self.type = arr.type
+        return arr
+
+
+class _ResultConverter:
+    """Convert slices of the current result of a cursor to record batches."""
+
+    def __init__(self, cursor: "BaseCursor[Any]"):
+        res = cursor.pgresult
+        if not res or res.status != ExecStatus.TUPLES_OK:
+            raise e.ProgrammingError("no result available")
+
+        tx = cursor._transformer
+        self.tx = tx
+        self.names = [c.name for c in cursor.description or ()]
+        self.columns = [
+            _Column(tx, res.ftype(i), Format(res.fformat(i)), res.fmod(i))
+            for i in range(res.nfields)
+        ]
+
+    def convert(self, row0: int, row1: int) -> pa.RecordBatch:
+        arrays = [
+            c.from_result(i, row0, row1) for i, c in enumerate(self.columns)
+        ]
+        return pa.RecordBatch.from_arrays(arrays, names=self.names)
+
+
+class _CopyConverter:
+    """Accumulate the rows of a binary copy and convert them to batches."""
+
+    def __init__(
+        self,
+        copy: Any,
+        types: Sequence[int],
+        names: Optional[Sequence[str]],
+        batch_size: int,
+    ):
+        if copy.format != Format.BINARY:
+            raise e.ProgrammingError(
+                "copy_record_batches() requires a binary copy operation"
+            )
+        if names is None:
+            names = [f"f{i}" for i in range(len(types))]
+        elif len(names) != len(types):
+            raise ValueError("names and types must have the same length")
+        if batch_size < 1:
+            raise ValueError("batch_size must be a positive number")
+
+        self.copy = copy
+        self.names = list(names)
+        self.batch_size = batch_size
+        self.columns = [
+            _Column(copy.transformer, oid, Format.BINARY) for oid in types
+        ]
+        self.rows: List[List[Optional[bytes]]] = []
+
+    def read_batch_gen(self) -> PQGen[bool]:
+        """
+        Generator reading rows of copy data until a batch is complete.
+
+        Reading many rows in the same generator avoids to wait for every row.
+        Return `!False` if the copy data is finished.
+        """
+        rows = self.rows
+        ncols = len(self.columns)
+        while len(rows) < self.batch_size:
+            data = yield from self.copy._read_row_data_gen()
+            if data is None:
+                return False
+
+            row = split_row_binary(data)
+            if len(row) != ncols:
+                raise e.DataError(
+                    f"expected {ncols} values in copy data, got {len(row)}"
+                )
+            rows.append(row)
+
+        return True
+
+    def convert(self) -> pa.RecordBatch:
+        values = list(zip(*self.rows))
+        self.rows = []
+        arrays = [
+            c.from_values(list(vals)) for c, vals in zip(self.columns, values)
+        ]
+        return pa.RecordBatch.from_arrays(arrays, names=self.names)
+
+
+def _itemsize(typecode: str) -> int:
+    return array(typecode).itemsize
+
+
+def _decimal_type(fmod: int) -> Optional[pa.DataType]:
+    """
+    Return the Arrow decimal type for a numeric column with modifier *fmod*.
+
+    Return `!None` if the numeric has no precision or it cannot be represented
+    by an Arrow decimal.
+    """
+    if fmod < 4:
+        return None
+    # See the numeric typmod functions in the PostgreSQL source: the scale is
+    # an 11 bits signed number since PostgreSQL 15.
+    precision = ((fmod - 4) >> 16) & 0xFFFF
+    scale = (((fmod - 4) & 0x7FF) ^ 1024) - 1024
+    if scale < 0 or precision > 76:
+        return None
+    if precision <= 38:
+        return pa.decimal128(precision, scale)
+    else:
+        return pa.decimal256(precision, scale)
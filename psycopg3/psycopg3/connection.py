@@ -11,7 +11,7 @@ import warnings
 import threading
 from types import TracebackType
 from typing import Any, AsyncIterator, Callable, Iterator, List, NamedTuple
-from typing import Optional, Type, TYPE_CHECKING
+from typing import Optional, Type, TYPE_CHECKING, overload
 from weakref import ref, ReferenceType
 from functools import partial
 from contextlib import contextmanager
@@ -30,11 +30,16 @@ from . import encodings
 from .pq import ConnStatus, ExecStatus, TransactionStatus, Format
 from .sql import Composable
 from .proto import PQGen, PQGenConn, RV, Query, Params, AdaptContext
-from .proto import ConnectionType
+from .proto import ConnectionType, RowFactory
 from .conninfo import make_conninfo
 from .generators import notifies
+from .rows import tuple_row
+from .pipeline import BasePipeline, Pipeline, AsyncPipeline
 from .transaction import Transaction, AsyncTransaction
-from ._preparing import PrepareManager
+from ._queries import QueryCache, QueryCacheInfo
+from ._preparing import PrepareManager, PreparedCacheInfo
+from ._preparing import PreparedStatementInfo
+from ._session import SessionState
 
 logger = logging.getLogger(__name__)
 package_logger = logging.getLogger("psycopg3")
@@ -44,7 +49,9 @@ execute: Callable[["PGconn"], PQGen[List["PGresult"]]]
 
 if TYPE_CHECKING:
     from .cursor import AsyncCursor, BaseCursor, Cursor
+    from .cursor import AsyncNamedCursor, NamedCursor
     from .pq.proto import PGconn, PGresult
+    from .pool.base import BasePool
 
 if pq.__impl__ == "c":
     from psycopg3_c import _psycopg3
@@ -107,7 +114,13 @@ class BaseConnection(AdaptContext):
     def __init__(self, pgconn: "PGconn"):
         self.pgconn = pgconn  # TODO: document this
         self._autocommit = False
+        self.row_factory: RowFactory = tuple_row
         self._adapters = adapt.AdaptersMap(adapt.global_adapters)
+        # The adapters cache is kept alive by the Transformers using it: if
+        # the connection owned it there would be a loop with the adapters.
+        self._adapt_cache: Optional[ReferenceType[adapt.AdaptCache]] = None
+        # Parameters affecting the adaptation, refreshed after waiting
+        self._session = SessionState(pgconn)
         self._notice_handlers: List[NoticeHandler] = []
         self._notify_handlers: List[NotifyHandler] = []
 
@@ -116,7 +129,18 @@ class BaseConnection(AdaptContext):
         # only a begin/commit and not a savepoint.
         self._savepoints: List[str] = []
 
+        # Commands to start the transaction blocks entered, not sent yet:
+        # they are sent together with the next query.
+        self._tx_commands: List[bytes] = []
+
         self._prepared: PrepareManager = PrepareManager()
+        self._query_cache = QueryCache()
+
+        # The pool the connection belongs to, if any
+        self._pool: Optional["BasePool[Any]"] = None
+
+        # The pipeline handler, if the connection is in pipeline mode
+        self._pipeline: Optional[BasePipeline[Any]] = None
 
         wself = ref(self)
 
@@ -162,26 +186,24 @@ class BaseConnection(AdaptContext):
         # Base implementation, not thread safe
         # subclasses must call it holding a lock
         status = self.pgconn.transaction_status
-        if status != TransactionStatus.IDLE:
-            if self._savepoints:
-                raise e.ProgrammingError(
-                    "couldn't change autocommit state: "
-                    "connection.transaction() context in progress"
-                )
-            else:
-                raise e.ProgrammingError(
-                    "couldn't change autocommit state: "
-                    "connection in transaction status "
-                    f"{TransactionStatus(status).name}"
-                )
+        if self._savepoints:
+            raise e.ProgrammingError(
+                "couldn't change autocommit state: "
+                "connection.transaction() context in progress"
+            )
+        elif status != TransactionStatus.IDLE:
+            raise e.ProgrammingError(
+                "couldn't change autocommit state: "
+                "connection in transaction status "
+                f"{TransactionStatus(status).name}"
+            )
 
         self._autocommit = value
 
     @property
     def client_encoding(self) -> str:
         """The Python codec name of the connection's client encoding."""
-        pgenc = self.pgconn.parameter_status(b"client_encoding") or b"UTF8"
-        return encodings.pg2py(pgenc)
+        return self._session.client_encoding
 
     @client_encoding.setter
     def client_encoding(self, name: str) -> None:
@@ -191,6 +213,10 @@ class BaseConnection(AdaptContext):
         raise NotImplementedError
 
     def _set_client_encoding_gen(self, name: str) -> PQGen[None]:
+        if self._pipeline:
+            raise e.NotSupportedError(
+                "can't change client encoding in pipeline mode"
+            )
         self.pgconn.send_query_params(
             b"select set_config('client_encoding', $1, false)",
             [encodings.py2pg(name)],
@@ -208,6 +234,31 @@ class BaseConnection(AdaptContext):
         # implement the AdaptContext protocol
         return self
 
+    def _get_adapt_cache(
+        self, adapters: adapt.AdaptersMap
+    ) -> Optional[adapt.AdaptCache]:
+        """
+        Return the adapters instances cache usable by Transformers.
+
+        The cache can be used if *adapters* are the connection's ones, or a
+        copy not customised. Return `!None` if it cannot be used.
+        """
+        if adapters is not self._adapters and not adapters._shares_maps(
+            self._adapters
+        ):
+            return None
+
+        if self.pgconn.status != ConnStatus.OK:
+            return None
+
+        # The loaders and dumpers configuration depends on these parameters
+        key = (adapt.AdaptersMap._version,) + self._session.key
+        cache = self._adapt_cache() if self._adapt_cache else None
+        if not cache or cache.key != key:
+            cache = adapt.AdaptCache(key)
+            self._adapt_cache = ref(cache)
+        return cache
+
     def cancel(self) -> None:
         """Cancel the current operation on the connection."""
         c = self.pgconn.get_cancel()
@@ -275,7 +326,7 @@ class BaseConnection(AdaptContext):
         - If it is set to 0, every query is prepared the first time is
           executed.
         - If it is set to `!None`, prepared statements are disabled on the
-          connection.
+          connection, and the ones already prepared are deallocated.
 
         Default value: 5
         """
@@ -284,6 +335,8 @@ class BaseConnection(AdaptContext):
     @prepare_threshold.setter
     def prepare_threshold(self, value: Optional[int]) -> None:
         self._prepared.prepare_threshold = value
+        if value is None:
+            self._prepared.clear()
 
     @property
     def prepared_max(self) -> int:
@@ -298,6 +351,70 @@ class BaseConnection(AdaptContext):
     def prepared_max(self, value: int) -> None:
         self._prepared.prepared_max = value
 
+    @property
+    def prepare_adaptive(self) -> bool:
+        """
+        Adapt the preparation of the statements to the queries executed.
+
+        If `!True` the threshold and the maximum number of statements are
+        raised temporarily when prepared statements are evicted while few
+        queries use them, and the queries not prepared are evicted from the
+        cache before the prepared ones.
+
+        Default value: `!False`
+        """
+        return self._prepared.prepare_adaptive
+
+    @prepare_adaptive.setter
+    def prepare_adaptive(self, value: bool) -> None:
+        self._prepared.prepare_adaptive = value
+
+    def prepared_cache_info(self) -> PreparedCacheInfo:
+        """
+        Return statistics about the prepared statements of the connection.
+
+        Return a named tuple with fields *hits* (executions of prepared
+        statements), *misses* (executions of queries not prepared),
+        *preparations*, *evictions* (statements deallocated to make room for
+        others), *threshold* and *maxsize* (the values currently used, which
+        may differ from the configured ones if `prepare_adaptive` is set), and
+        *currsize* (the number of statements prepared).
+        """
+        return self._prepared.info()
+
+    def prepared_statements(self) -> List[PreparedStatementInfo]:
+        """
+        Return the statements prepared on the connection.
+
+        Return a list of named tuples with fields *name*, *query*, *types*
+        and *executions*, from the least recently used statement.
+        """
+        return self._prepared.statements()
+
+    @property
+    def query_cache_size(self) -> int:
+        """
+        Maximum number of queries whose conversion is cached.
+
+        Queries with parameters are converted to the PostgreSQL format when
+        executed: the conversion of the last used ones is kept to be reused.
+        If set to 0 the queries are converted every time.
+        """
+        return self._query_cache.maxsize
+
+    @query_cache_size.setter
+    def query_cache_size(self, value: int) -> None:
+        self._query_cache.maxsize = value
+
+    def query_cache_info(self) -> QueryCacheInfo:
+        """
+        Return statistics about the cache of the converted queries.
+
+        Return a named tuple with fields *hits*, *misses*, *maxsize* and
+        *currsize*, like the `functools.lru_cache` `!cache_info()`.
+        """
+        return self._query_cache.info()
+
     # Generators to perform high-level operations on the connection
     #
     # These operations are expressed in terms of non-blocking generators
@@ -314,6 +431,7 @@ class BaseConnection(AdaptContext):
         conninfo: str = "",
         *,
         autocommit: bool = False,
+        row_factory: Optional[RowFactory] = None,
         **kwargs: Any,
     ) -> PQGenConn[ConnectionType]:
         """Generator to connect to the database and create a new instance."""
@@ -321,6 +439,8 @@ class BaseConnection(AdaptContext):
         pgconn = yield from connect(conninfo)
         conn = cls(pgconn)
         conn._autocommit = autocommit
+        if row_factory:
+            conn.row_factory = row_factory
         return conn
 
     def _exec_command(self, command: Query) -> PQGen[None]:
@@ -343,6 +463,11 @@ class BaseConnection(AdaptContext):
         elif isinstance(command, Composable):
             command = command.as_bytes(self)
 
+        if self._pipeline:
+            # The result will be checked when the pipeline is synchronised
+            self._pipeline.send_command(command)
+            return
+
         self.pgconn.send_query(command)
         result = (yield from execute(self.pgconn))[-1]
         if result.status != ExecStatus.COMMAND_OK:
@@ -357,14 +482,50 @@ class BaseConnection(AdaptContext):
                 )
 
     def _start_query(self) -> PQGen[None]:
-        """Generator to start a transaction if necessary."""
-        if self._autocommit:
+        """
+        Generator to start a transaction if necessary.
+
+        Send the commands of the transaction blocks entered, if any, or a
+        begin if there is no transaction in progress. In pipeline mode the
+        commands are only queued, to be sent together with the query.
+        """
+        commands = self._start_query_commands()
+        if not commands:
             return
 
+        if self._pipeline:
+            # Multiple statements are not allowed in pipeline mode
+            for cmd in commands:
+                yield from self._exec_command(cmd)
+        else:
+            yield from self._exec_command(b"; ".join(commands))
+
+    def _start_query_commands(self) -> List[bytes]:
+        """
+        Return the commands `_start_query()` would send, if any.
+
+        The commands of the transaction blocks entered are consumed: the
+        caller is responsible to send them.
+        """
+        if self._tx_commands:
+            commands = self._tx_commands[:]
+            del self._tx_commands[:]
+            return commands
+
+        if self._autocommit:
+            return []
+
         if self.pgconn.transaction_status != TransactionStatus.IDLE:
-            return
+            return []
 
-        yield from self._exec_command(b"begin")
+        return [b"begin"]
+
+    def _start_query_needed(self) -> bool:
+        """Return `True` if `_start_query()` would send any command."""
+        return bool(self._tx_commands) or (
+            not self._autocommit
+            and self.pgconn.transaction_status == TransactionStatus.IDLE
+        )
 
     def _commit_gen(self) -> PQGen[None]:
         """Generator implementing `Connection.commit()`."""
@@ -409,7 +570,12 @@ class Connection(BaseConnection):
 
     @classmethod
     def connect(
-        cls, conninfo: str = "", *, autocommit: bool = False, **kwargs: Any
+        cls,
+        conninfo: str = "",
+        *,
+        autocommit: bool = False,
+        row_factory: Optional[RowFactory] = None,
+        **kwargs: Any,
     ) -> "Connection":
         """
         Connect to a database server and return a new `Connection` instance.
@@ -417,7 +583,12 @@ class Connection(BaseConnection):
         TODO: connection_timeout to be implemented.
         """
         return cls._wait_conn(
-            cls._connect_gen(conninfo, autocommit=autocommit, **kwargs)
+            cls._connect_gen(
+                conninfo,
+                autocommit=autocommit,
+                row_factory=row_factory,
+                **kwargs,
+            )
         )
 
     def __enter__(self) -> "Connection":
@@ -440,14 +611,52 @@ class Connection(BaseConnection):
         """Close the database connection."""
         self.pgconn.finish()
 
-    def cursor(self, name: str = "", format: Format = Format.TEXT) -> "Cursor":
+    @overload
+    def cursor(
+        self,
+        *,
+        format: Format = Format.TEXT,
+        row_factory: Optional[RowFactory] = None,
+    ) -> "Cursor":
+        ...
+
+    @overload
+    def cursor(
+        self,
+        name: str,
+        format: Format = Format.TEXT,
+        *,
+        withhold: bool = ...,
+        row_factory: Optional[RowFactory] = None,
+    ) -> "NamedCursor":
+        ...
+
+    def cursor(
+        self,
+        name: str = "",
+        format: Format = Format.TEXT,
+        *,
+        withhold: bool = False,
+        row_factory: Optional[RowFactory] = None,
+    ) -> "Cursor":
         """
-        Return a new `Cursor` to send commands and queries to the connection.
+        Return a new cursor to send commands and queries to the connection.
+
+        If *name* is specified, return a `NamedCursor`, fetching the records
+        from a server-side cursor, otherwise a `Cursor`.
         """
         if name:
-            raise NotImplementedError
+            return cursor.NamedCursor(
+                self,
+                name,
+                format=format,
+                withhold=withhold,
+                row_factory=row_factory,
+            )
 
-        return self.cursor_factory(self, format=format)
+        return self.cursor_factory(
+            self, format=format, row_factory=row_factory
+        )
 
     def execute(
         self,
@@ -456,7 +665,8 @@ class Connection(BaseConnection):
         prepare: Optional[bool] = None,
     ) -> "Cursor":
         """Execute a query and return a cursor to read its results."""
-        cur = self.cursor()
+        # Skip the arguments handling of cursor(): this is a hot path
+        cur = self.cursor_factory(self)
         return cur.execute(query, params, prepare=prepare)
 
     def commit(self) -> None:
@@ -486,6 +696,23 @@ class Connection(BaseConnection):
         with Transaction(self, savepoint_name, force_rollback) as tx:
             yield tx
 
+    @contextmanager
+    def pipeline(self) -> Iterator[Pipeline]:
+        """
+        Start a context block switching the connection to pipeline mode.
+
+        Queries executed in the block are sent to the server without waiting
+        for their results, which are received when the pipeline is synced.
+        """
+        with self.lock:
+            if self._pipeline is None:
+                self._pipeline = Pipeline(self)
+            pipeline = self._pipeline
+
+        assert isinstance(pipeline, Pipeline)
+        with pipeline:
+            yield pipeline
+
     def notifies(self) -> Iterator[Notify]:
         """
         Yield `Notify` objects as soon as they are received from the database.
@@ -507,7 +734,11 @@ class Connection(BaseConnection):
         The function must be used on generators that don't change connection
         fd (i.e. not on connect and reset).
         """
-        return waiting.wait(gen, self.pgconn.socket, timeout=timeout)
+        try:
+            return waiting.wait(gen, self.pgconn.socket, timeout=timeout)
+        finally:
+            # The server may have reported new parameters values
+            self._session.invalidate()
 
     @classmethod
     def _wait_conn(
@@ -541,10 +772,20 @@ class AsyncConnection(BaseConnection):
 
     @classmethod
     async def connect(
-        cls, conninfo: str = "", *, autocommit: bool = False, **kwargs: Any
+        cls,
+        conninfo: str = "",
+        *,
+        autocommit: bool = False,
+        row_factory: Optional[RowFactory] = None,
+        **kwargs: Any,
     ) -> "AsyncConnection":
         return await cls._wait_conn(
-            cls._connect_gen(conninfo, autocommit=autocommit, **kwargs)
+            cls._connect_gen(
+                conninfo,
+                autocommit=autocommit,
+                row_factory=row_factory,
+                **kwargs,
+            )
         )
 
     async def __aenter__(self) -> "AsyncConnection":
@@ -566,16 +807,55 @@ class AsyncConnection(BaseConnection):
     async def close(self) -> None:
         self.pgconn.finish()
 
+    @overload
     async def cursor(
-        self, name: str = "", format: Format = Format.TEXT
+        self,
+        *,
+        format: Format = Format.TEXT,
+        row_factory: Optional[RowFactory] = None,
+    ) -> "AsyncCursor":
+        ...
+
+    @overload
+    async def cursor(
+        self,
+        name: str,
+        format: Format = Format.TEXT,
+        *,
+        withhold: bool = ...,
+        prefetch: bool = ...,
+        row_factory: Optional[RowFactory] = None,
+    ) -> "AsyncNamedCursor":
+        ...
+
+    async def cursor(
+        self,
+        name: str = "",
+        format: Format = Format.TEXT,
+        *,
+        withhold: bool = False,
+        prefetch: bool = False,
+        row_factory: Optional[RowFactory] = None,
     ) -> "AsyncCursor":
         """
-        Return a new `AsyncCursor` to send commands and queries to the connection.
+        Return a new cursor to send commands and queries to the connection.
+
+        If *name* is specified, return an `AsyncNamedCursor`, fetching the
+        records from a server-side cursor, otherwise an `AsyncCursor`.
         """
         if name:
-            raise NotImplementedError
+            return cursor.AsyncNamedCursor(
+                self,
+                name,
+                format=format,
+                withhold=withhold,
+                prefetch=prefetch,
+                row_factory=row_factory,
+            )
 
-        return self.cursor_factory(self, format=format)
+        return self.cursor_factory(
+            self, format=format, row_factory=row_factory
+        )
 
     async def execute(
         self,
@@ -583,7 +863,7 @@ class AsyncConnection(BaseConnection):
         params: Optional[Params] = None,
         prepare: Optional[bool] = None,
     ) -> "AsyncCursor":
-        cur = await self.cursor()
+        cur = self.cursor_factory(self)
         return await cur.execute(query, params, prepare=prepare)
 
     async def commit(self) -> None:
@@ -607,6 +887,20 @@ class AsyncConnection(BaseConnection):
         async with tx:
             yield tx
 
+    @asynccontextmanager
+    async def pipeline(self) -> AsyncIterator[AsyncPipeline]:
+        """
+        Start a context block switching the connection to pipeline mode.
+        """
+        async with self.lock:
+            if self._pipeline is None:
+                self._pipeline = AsyncPipeline(self)
+            pipeline = self._pipeline
+
+        assert isinstance(pipeline, AsyncPipeline)
+        async with pipeline:
+            yield pipeline
+
     async def notifies(self) -> AsyncIterator[Notify]:
         while 1:
             async with self.lock:
@@ -619,7 +913,11 @@ class AsyncConnection(BaseConnection):
                 yield n
 
     async def wait(self, gen: PQGen[RV]) -> RV:
-        return await waiting.wait_async(gen, self.pgconn.socket)
+        try:
+            return await waiting.wait_async(gen, self.pgconn.socket)
+        finally:
+            # The server may have reported new parameters values
+            self._session.invalidate()
 
     @classmethod
     async def _wait_conn(cls, gen: PQGenConn[RV]) -> RV:
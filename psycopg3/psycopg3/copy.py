@@ -80,6 +80,19 @@ class BaseCopy(Generic[ConnectionType]):
         return memoryview(b"")
 
     def _read_row_gen(self) -> PQGen[Optional[Tuple[Any, ...]]]:
+        data = yield from self._read_row_data_gen()
+        if data is None:
+            return None
+
+        return self._parse_row(data, self.transformer)
+
+    def _read_row_data_gen(self) -> PQGen[Optional[memoryview]]:
+        """
+        Read the data of a row, without parsing it.
+
+        Discard the binary copy header and trailer. Return `!None` when the
+        data is finished.
+        """
         data = yield from self._read_gen()
         if not data:
             return None
@@ -98,7 +111,7 @@ class BaseCopy(Generic[ConnectionType]):
                 self._finished = True
                 return None
 
-        return self._parse_row(data, self.transformer)
+        return data
 
     def _write_gen(self, buffer: Union[str, bytes]) -> PQGen[None]:
         # if write() was called, assume the header was sent together with the
@@ -363,6 +376,10 @@ def _parse_row_text(data: bytes, tx: Transformer) -> Tuple[Any, ...]:
 
 
 def _parse_row_binary(data: bytes, tx: Transformer) -> Tuple[Any, ...]:
+    return tx.load_sequence(_split_row_binary(data))
+
+
+def _split_row_binary(data: bytes) -> List[Optional[bytes]]:
     row: List[Optional[bytes]] = []
     nfields = _unpack_int2(data, 0)[0]
     pos = 2
@@ -375,7 +392,7 @@ def _parse_row_binary(data: bytes, tx: Transformer) -> Tuple[Any, ...]:
         else:
             row.append(None)
 
-    return tx.load_sequence(row)
+    return row
 
 
 _pack_int2 = struct.Struct("!h").pack
@@ -428,9 +445,11 @@ if pq.__impl__ == "c":
     format_row_binary = _psycopg3.format_row_binary
     parse_row_text = _psycopg3.parse_row_text
     parse_row_binary = _psycopg3.parse_row_binary
+    split_row_binary = _psycopg3.split_row_binary
 
 else:
     format_row_text = _format_row_text
     format_row_binary = _format_row_binary
     parse_row_text = _parse_row_text
     parse_row_binary = _parse_row_binary
+    split_row_binary = _split_row_binary
@@ -5,20 +5,26 @@ psycopg3 cursor objects
 # Copyright (C) 2020 The Psycopg Team
 
 import sys
+import asyncio
+import logging
 from types import TracebackType
-from typing import Any, AsyncIterator, Callable, Generic, Iterator, List
-from typing import Optional, Sequence, Type, TYPE_CHECKING
+from typing import Any, AsyncIterator, Callable, Dict, Generic, Iterator
+from typing import List, Optional, Sequence, Tuple, Type, TYPE_CHECKING
+from functools import partial
 from contextlib import contextmanager
 
 from . import pq
 from . import adapt
 from . import errors as e
 
-from .pq import ExecStatus, Format
+from .pq import DiagnosticField, ExecStatus, Format, TransactionStatus
 from .copy import Copy, AsyncCopy
-from .proto import ConnectionType, Query, Params, PQGen
+from .proto import ConnectionType, Query, Params, PQGen, Row, RowFactory
 from ._column import Column
 from ._queries import PostgresQuery
+from .sql import Identifier
+from .pipeline import BasePipeline
+from .generators import send
 from ._preparing import Prepare
 
 if sys.version_info >= (3, 7):
@@ -31,17 +37,22 @@ if TYPE_CHECKING:
     from .pq.proto import PGconn, PGresult
     from .connection import Connection, AsyncConnection  # noqa: F401
 
+logger = logging.getLogger(__name__)
+
 execute: Callable[["PGconn"], PQGen[List["PGresult"]]]
+fetch: Callable[["PGconn"], PQGen[Optional["PGresult"]]]
 
 if pq.__impl__ == "c":
     from psycopg3_c import _psycopg3
 
     execute = _psycopg3.execute
+    fetch = _psycopg3.fetch
 
 else:
     from . import generators
 
     execute = generators.execute
+    fetch = generators.fetch
 
 
 class BaseCursor(Generic[ConnectionType]):
@@ -50,7 +61,7 @@ class BaseCursor(Generic[ConnectionType]):
     if sys.version_info >= (3, 7):
         __slots__ = """
             _conn format _adapters arraysize _closed _results _pgresult _pos
-            _iresult _rowcount _pgq _transformer
+            _iresult _rowcount _pgq _transformer _row_factory
             __weakref__
             """.split()
 
@@ -62,10 +73,13 @@ class BaseCursor(Generic[ConnectionType]):
         self,
         connection: ConnectionType,
         format: Format = Format.TEXT,
+        row_factory: Optional[RowFactory] = None,
     ):
         self._conn = connection
         self.format = format
-        self._adapters = adapt.AdaptersMap(connection.adapters)
+        # Use the connection adapters until the cursor is customised
+        self._adapters: Optional[adapt.AdaptersMap] = None
+        self._row_factory = row_factory or connection.row_factory
         self.arraysize = 1
         self._closed = False
         self._reset()
@@ -96,6 +110,10 @@ class BaseCursor(Generic[ConnectionType]):
 
     @property
     def adapters(self) -> adapt.AdaptersMap:
+        if not self._adapters:
+            # The connection adapters are shared by its cursors: make a copy
+            # in case the cursor is customised.
+            self._adapters = adapt.AdaptersMap(self._conn.adapters)
         return self._adapters
 
     @property
@@ -129,6 +147,18 @@ class BaseCursor(Generic[ConnectionType]):
         self._pgresult = result
         if result and self._transformer:
             self._transformer.pgresult = result
+            self._transformer.make_row = self._row_factory(self)
+
+    @property
+    def row_factory(self) -> RowFactory:
+        """The function used to create the records returned by the cursor."""
+        return self._row_factory
+
+    @row_factory.setter
+    def row_factory(self, row_factory: RowFactory) -> None:
+        self._row_factory = row_factory
+        if self._pgresult:
+            self._transformer.make_row = row_factory(self)
 
     @property
     def description(self) -> Optional[List[Column]]:
@@ -138,7 +168,10 @@ class BaseCursor(Generic[ConnectionType]):
         `!None` if the current resultset didn't return tuples.
         """
         res = self.pgresult
-        if not res or res.status != ExecStatus.TUPLES_OK:
+        if not res or res.status not in (
+            ExecStatus.TUPLES_OK,
+            ExecStatus.SINGLE_TUPLE,
+        ):
             return None
         return [Column(self, i) for i in range(res.nfields)]
 
@@ -187,15 +220,57 @@ class BaseCursor(Generic[ConnectionType]):
         prepare: Optional[bool] = None,
     ) -> PQGen[None]:
         """Generator implementing `Cursor.execute()`."""
-        yield from self._start_query()
+        # If the pipeline mode is available, the transaction is started in
+        # the same round trip of the query.
+        implicit = not self._conn._pipeline and BasePipeline.is_supported()
+        yield from self._start_query(begin=False)
+        if not implicit:
+            if not self._conn._pipeline:
+                # No pipeline available: send the statements to deallocate
+                # before starting the transaction.
+                yield from self._maintenance_gen(
+                    self._conn.pgconn.transaction_status
+                    == TransactionStatus.IDLE
+                )
+            yield from self._conn._start_query()
         pgq = self._convert_query(query, params)
 
+        if self._conn._pipeline:
+            self._execute_pipeline(pgq, prepare)
+            return
+
         # Check if the query is prepared or needs preparing
         prep, name = self._conn._prepared.get(pgq, prepare)
+        commands: List[bytes] = []
+        if implicit and not self._can_pipeline(pgq, prep):
+            # The query must be sent with the simple query protocol: start
+            # the transaction in the same query string and leave the
+            # statements to deallocate for a following query, unless too many
+            # of them are waiting.
+            implicit = False
+            yield from self._maintenance_gen()
+            commands = self._conn._start_query_commands()
+        maint = implicit and bool(self._conn._prepared._maint_commands)
+        begin = implicit and self._conn._start_query_needed()
+        if implicit and (begin or maint or prep is Prepare.SHOULD):
+            # Send the query in an implicit pipeline, together with the
+            # commands to start the transaction, to prepare the query, or to
+            # deallocate the statements evicted from the cache, to avoid
+            # waiting further round trips.
+            yield from self._implicit_pipeline_gen(
+                self._send_implicit_gen(pgq, prepare, prep, name, maint, begin)
+            )
+            return
+
         if prep is Prepare.YES:
             # The query is already prepared
             self._send_query_prepared(name, pgq)
 
+        elif commands:
+            # Send the commands to start the transaction before the query
+            self._pgq = pgq
+            self._conn.pgconn.send_query(b"; ".join(commands + [pgq.query]))
+
         elif prep is Prepare.NO:
             # The query must be executed without preparing
             self._execute_send(pgq)
@@ -212,55 +287,525 @@ class BaseCursor(Generic[ConnectionType]):
 
         # run the query
         results = yield from execute(self._conn.pgconn)
+        if commands:
+            results = yield from self._split_commands_results_gen(
+                pgq, commands, results
+            )
 
         # Update the prepare state of the query
         if prepare is not False:
-            cmd = self._conn._prepared.maintain(pgq, results, prep, name)
-            if cmd:
-                yield from self._conn._exec_command(cmd)
+            self._conn._prepared.maintain(pgq, results, prep, name)
 
         self._execute_results(results)
 
+    def _execute_pipeline(
+        self, pgq: PostgresQuery, prepare: Optional[bool] = None
+    ) -> None:
+        """
+        Send a query in pipeline mode, queueing the processing of its results.
+
+        This is not a generator, but a normal non-blocking function.
+        """
+        prep, name = self._conn._prepared.get(pgq, prepare)
+        if self._conn._prepared.maintenance_due():
+            self._send_maintenance_pipeline(sync=False)
+        self._send_pipeline(pgq, prepare, prep, name)
+
+    def _send_pipeline(
+        self,
+        pgq: PostgresQuery,
+        prepare: Optional[bool],
+        prep: Prepare,
+        name: bytes,
+    ) -> None:
+        pipeline = self._conn._pipeline
+        assert pipeline
+
+        if prep is Prepare.YES:
+            self._send_query_prepared(name, pgq)
+
+        elif prep is Prepare.NO:
+            # Sending more than one query in pipeline mode is not allowed
+            self._execute_send(pgq, no_pqexec=True)
+
+        else:
+            self._send_prepare(name, pgq)
+            pipeline.add_results_handler(self._check_prepare_results)
+            self._send_query_prepared(name, pgq)
+
+        pipeline.add_results_handler(
+            partial(self._set_results_from_pipeline, pgq, prepare, prep, name)
+        )
+
+    def _split_commands_results_gen(
+        self,
+        pgq: PostgresQuery,
+        commands: Sequence[bytes],
+        results: List["PGresult"],
+    ) -> PQGen[List["PGresult"]]:
+        """
+        Generator returning the results of a query sent in the same string
+        after *commands*.
+
+        If the commands were not executed, for instance because of a syntax
+        error in the query, execute them alone and then the query, so that
+        the outcome is the same as sending them separately.
+        """
+        ncmds = len(commands)
+        if len(results) < ncmds or any(
+            res.status != ExecStatus.COMMAND_OK for res in results[:ncmds]
+        ):
+            yield from self._conn._exec_command(b"; ".join(commands))
+        elif len(results) > ncmds:
+            return results[ncmds:]
+
+        # The commands failed, or the query has no statement (e.g. it only
+        # contains comments), so it got no result: execute it alone.
+        self._execute_send(pgq)
+        return (yield from execute(self._conn.pgconn))
+
+    def _can_pipeline(self, pgq: PostgresQuery, prep: Prepare) -> bool:
+        """
+        Return `True` if the query can be executed in pipeline mode.
+
+        Queries without parameters are executed using the simple query
+        protocol, which allows several statements in the same query, but is
+        not available in pipeline mode.
+        """
+        return (
+            prep is not Prepare.NO
+            or bool(pgq.params)
+            or self.format == Format.BINARY
+        )
+
+    def _maintenance_gen(self, force: bool = False) -> PQGen[None]:
+        """
+        Generator to deallocate the statements evicted from the prepared
+        statements cache in a round trip on its own.
+
+        Used when the commands cannot be sent together with the query: all
+        the pending commands are sent at once, if *force* is true or if too
+        many of them are waiting.
+        """
+        prepared = self._conn._prepared
+        if not prepared._maint_commands:
+            return
+        if not (force or prepared.maintenance_due()):
+            return
+
+        intrans = (
+            self._conn.pgconn.transaction_status != TransactionStatus.IDLE
+        )
+        cmds = list(prepared.get_maintenance_commands())
+        self._conn.pgconn.send_query(b"; ".join(cmds))
+        results = yield from execute(self._conn.pgconn)
+        self._check_maintenance_results(cmds, intrans, results)
+
+    def _send_maintenance_pipeline(self, sync: bool = True) -> None:
+        """
+        Send in the pipeline the commands to deallocate the statements evicted
+        from the prepared statements cache.
+
+        Unless *sync* is false, they are followed by a sync point so that,
+        outside a transaction, their failure cannot abort the user query sent
+        after them.
+        """
+        pipeline = self._conn._pipeline
+        assert pipeline
+        intrans = (
+            self._conn.pgconn.transaction_status != TransactionStatus.IDLE
+        )
+        for cmd in self._conn._prepared.get_maintenance_commands():
+            self._conn.pgconn.send_query_params(cmd, None)
+            pipeline.add_results_handler(
+                partial(self._check_maintenance_results, [cmd], intrans)
+            )
+        if sync:
+            pipeline.add_sync()
+
+    def _check_maintenance_results(
+        self,
+        cmds: Sequence[bytes],
+        intrans: bool,
+        results: Sequence["PGresult"],
+    ) -> None:
+        """
+        Check the results of the commands deallocating prepared statements.
+
+        The commands not executed, because a previous one failed, are queued
+        again. If the commands were executed outside a transaction their
+        errors are only logged, because they didn't affect any other query;
+        inside a transaction they are raised, as the transaction is aborted.
+        """
+        for i, cmd in enumerate(cmds):
+            if i >= len(results):
+                self._conn._prepared.requeue_maintenance_command(cmd)
+                continue
+
+            result = results[i]
+            if result.status == ExecStatus.PIPELINE_ABORTED:
+                self._conn._prepared.requeue_maintenance_command(cmd)
+            elif result.status == ExecStatus.FATAL_ERROR:
+                ex = e.error_from_result(
+                    result, encoding=self._conn.client_encoding
+                )
+                if intrans:
+                    raise ex
+                logger.warning("error running %r: %s", cmd.decode(), ex)
+
+    def _implicit_pipeline_gen(self, gen: PQGen[None]) -> PQGen[None]:
+        """
+        Generator to run *gen*, sending commands, in an implicit pipeline.
+
+        The pipeline is synchronised at the end, so that all the results are
+        received in the same round trip.
+        """
+        pipeline = self._conn._pipeline = BasePipeline(self._conn)
+        try:
+            pipeline._enter()
+            try:
+                yield from gen
+            except Exception as ex:
+                yield from pipeline._exit_gen(ex)
+                raise
+            else:
+                yield from pipeline._sync_gen()
+            finally:
+                pipeline._exit()
+        finally:
+            self._conn._pipeline = None
+
+    def _send_implicit_gen(
+        self,
+        pgq: PostgresQuery,
+        prepare: Optional[bool],
+        prep: Prepare,
+        name: bytes,
+        maint: bool,
+        begin: bool = False,
+    ) -> PQGen[None]:
+        """
+        Generator to send a query in an implicit pipeline.
+
+        If the query must be prepared, or the transaction started, an error
+        doing it is raised on sync, before the one of the execution aborted.
+        """
+        if maint:
+            self._send_maintenance_pipeline()
+        if begin:
+            yield from self._conn._start_query()
+        self._send_pipeline(pgq, prepare, prep, name)
+
+    def _set_results_from_pipeline(
+        self,
+        pgq: PostgresQuery,
+        prepare: Optional[bool],
+        prep: Prepare,
+        name: bytes,
+        results: Sequence["PGresult"],
+    ) -> None:
+        # The cursor might have been used for other queries in the same
+        # pipeline: only the results of the last one will be available.
+        self._reset()
+        self._pgq = pgq
+
+        # Update the prepare state of the query, unless preparing it failed
+        if prepare is not False and not (
+            prep is Prepare.SHOULD
+            and results
+            and results[-1].status not in self._status_ok
+        ):
+            self._conn._prepared.maintain(pgq, results, prep, name)
+
+        self._execute_results(results)
+
+    def _check_prepare_results(self, results: Sequence["PGresult"]) -> None:
+        if not results:
+            raise e.InternalError("got no result from the query")
+        if results[-1].status != ExecStatus.COMMAND_OK:
+            self._raise_from_results(results)
+
+    def _set_results_from_executemany(
+        self,
+        params: Optional[List[Optional[bytes]]],
+        results: Sequence["PGresult"],
+    ) -> None:
+        if results and results[-1].status == ExecStatus.FATAL_ERROR:
+            # Make the parameters which caused the error available as
+            # `cursor.params`, not the last ones sent.
+            if self._pgq:
+                self._pgq.params = params
+        self._execute_results(results)
+
+    def _fetch_pipeline_gen(self) -> PQGen[None]:
+        """
+        Generator to sync the pipeline if the cursor results are pending.
+        """
+        if self._pgresult is None and self._conn._pipeline:
+            yield from self._conn._pipeline._sync_gen()
+
     def _executemany_gen(
         self, query: Query, params_seq: Sequence[Params]
     ) -> PQGen[None]:
         """Generator implementing `Cursor.executemany()`."""
-        yield from self._start_query()
-        first = True
+        if self._conn._pipeline or not BasePipeline.is_supported():
+            yield from self._executemany_rows_gen(query, params_seq)
+            return
+
+        # Use an implicit pipeline to send all the queries without waiting
+        # for the results of each one; read all the results at the end.
+        # In pipeline mode the queries up to the sync are executed in a single
+        # implicit transaction: in autocommit add a sync after every query,
+        # so that each one is committed on its own.
+        yield from self._implicit_pipeline_gen(
+            self._executemany_rows_gen(
+                query, params_seq, maint=True, sync=self._conn.autocommit
+            )
+        )
+
+    def _executemany_rows_gen(
+        self,
+        query: Query,
+        params_seq: Sequence[Params],
+        maint: bool = False,
+        sync: bool = False,
+    ) -> PQGen[None]:
+        if self._conn._pipeline:
+            yield from self._start_query(begin=False)
+            if maint and self._conn._prepared._maint_commands:
+                # Send the statements to deallocate before the transaction
+                self._send_maintenance_pipeline()
+            elif self._conn._prepared.maintenance_due():
+                self._send_maintenance_pipeline(sync=False)
+            yield from self._conn._start_query()
+            self._executemany_pipeline(query, params_seq, sync)
+            return
+
+        yield from self._start_query(begin=False)
+        yield from self._maintenance_gen(
+            self._conn.pgconn.transaction_status == TransactionStatus.IDLE
+            and not BasePipeline.is_supported()
+        )
+        yield from self._conn._start_query()
+
+        pgq: Optional[PostgresQuery] = None
+        names: Dict[Tuple[int, ...], bytes] = {}
         for params in params_seq:
-            if first:
+            if pgq is None:
                 pgq = self._convert_query(query, params)
                 self._pgq = pgq
-                # TODO: prepare more statements if the types tuples change
-                self._send_prepare(b"", pgq)
-                (result,) = yield from execute(self._conn.pgconn)
-                if result.status == ExecStatus.FATAL_ERROR:
-                    raise e.error_from_result(
-                        result, encoding=self._conn.client_encoding
-                    )
-                first = False
             else:
                 pgq.dump(params)
 
-            self._send_query_prepared(b"", pgq)
+            name = names.get(pgq.types)
+            if name is None:
+                prep, name = self._get_executemany_statement(pgq, names)
+                if prep is not Prepare.YES:
+                    self._send_prepare(name, pgq)
+                    results = yield from execute(self._conn.pgconn)
+                    self._set_prepare_results(
+                        pgq.query, pgq.types, name, results
+                    )
+
+            self._send_query_prepared(name, pgq)
             (result,) = yield from execute(self._conn.pgconn)
             self._execute_results((result,))
 
-    def _start_query(self) -> PQGen[None]:
+    def _executemany_pipeline(
+        self, query: Query, params_seq: Sequence[Params], sync: bool = False
+    ) -> None:
+        """
+        Send the queries of `executemany()` in pipeline mode.
+
+        All the parameters are adapted before sending anything, so that an
+        adaptation error doesn't leave only part of the queries executed.
+
+        If *sync* is true, add a sync point after every query, so that each
+        one is executed in its own transaction and an error doesn't abort the
+        following ones.
+
+        This is not a generator, but a normal non-blocking function.
+        """
+        pipeline = self._conn._pipeline
+        assert pipeline
+
+        pgq: Optional[PostgresQuery] = None
+        all_params = []
+        for params in params_seq:
+            if pgq is None:
+                pgq = self._convert_query(query, params)
+            else:
+                pgq.dump(params)
+            all_params.append((pgq.params, pgq.types))
+
+        if pgq is None:
+            return
+
+        self._pgq = pgq
+        names: Dict[Tuple[int, ...], bytes] = {}
+        errors: List[Exception] = []
+        for dumped, types in all_params:
+            pgq.params = dumped
+            pgq.types = types
+            name = names.get(types)
+            if name is None:
+                prep, name = self._get_executemany_statement(pgq, names)
+                if prep is not Prepare.YES:
+                    self._send_prepare(name, pgq)
+                    pipeline.add_results_handler(
+                        partial(
+                            self._handle_executemany_results,
+                            errors,
+                            partial(
+                                self._set_prepare_results,
+                                pgq.query,
+                                types,
+                                name,
+                            ),
+                        )
+                    )
+
+            self._send_query_prepared(name, pgq)
+            pipeline.add_results_handler(
+                partial(
+                    self._handle_executemany_results,
+                    errors,
+                    partial(self._set_results_from_executemany, dumped),
+                )
+            )
+            if sync:
+                pipeline.add_sync()
+
+    def _handle_executemany_results(
+        self,
+        errors: List[Exception],
+        handler: Callable[[Sequence["PGresult"]], None],
+        results: Sequence["PGresult"],
+    ) -> None:
+        """
+        Process the results of a query of `executemany()` with *handler*.
+
+        After the first error the results of the following queries are
+        ignored, so that the cursor reports the first query failed.
+        """
+        if errors:
+            return
+        try:
+            handler(results)
+        except Exception as ex:
+            errors.append(ex)
+            raise
+
+    def _get_executemany_statement(
+        self, pgq: PostgresQuery, names: Dict[Tuple[int, ...], bytes]
+    ) -> Tuple[Prepare, bytes]:
+        """
+        Return the statement to execute the query of `executemany()`.
+
+        Use the statements prepared on the connection for the query and its
+        types, or prepare a new one. If prepared statements are disabled use
+        the unnamed statement, to prepare again if the types change.
+        """
+        prep, name = self._conn._prepared.get(pgq, prepare=True)
+        if prep is Prepare.NO:
+            # The unnamed statement replaces the previous one
+            names.clear()
+        names[pgq.types] = name
+        return prep, name
+
+    def _set_prepare_results(
+        self,
+        query: bytes,
+        types: Tuple[int, ...],
+        name: bytes,
+        results: Sequence["PGresult"],
+    ) -> None:
+        self._check_prepare_results(results)
+        if name:
+            self._conn._prepared.add_statement((query, types), name)
+
+    def _stream_send_gen(
+        self, query: Query, params: Optional[Params] = None
+    ) -> PQGen[None]:
+        """Generator to send the query for `Cursor.stream()`."""
+        if self._conn._pipeline:
+            raise e.NotSupportedError(
+                "stream() cannot be used in pipeline mode"
+            )
+
+        yield from self._start_query()
+        pgq = self._convert_query(query, params)
+        self._execute_send(pgq, no_pqexec=True)
+        self._conn.pgconn.set_single_row_mode()
+        yield from send(self._conn.pgconn)
+
+    def _stream_fetchone_gen(self, first: bool) -> PQGen[Optional["PGresult"]]:
+        """
+        Generator to fetch the next single-row result of `Cursor.stream()`.
+
+        Return the result if a row is available, `!None` once the stream is
+        finished. Set up the row loaders only on the *first* result: the
+        following ones are assumed to have the same structure.
+        """
+        pgconn = self._conn.pgconn
+        res = yield from fetch(pgconn)
+        if res is None:
+            return None
+
+        elif res.status == ExecStatus.SINGLE_TUPLE:
+            self._pgresult = res
+            self._transformer.set_pgresult(res, set_loaders=first)
+            if first:
+                self._transformer.make_row = self._row_factory(self)
+            return res
+
+        # Either the end of the stream or an error: consume the results
+        # until the end of the query, so the connection is left usable.
+        results = [res]
+        while res.status not in self._status_copy:
+            res = yield from fetch(pgconn)
+            if res is None:
+                break
+            results.append(res)
+
+        if results[-1].status == ExecStatus.TUPLES_OK:
+            self._pgresult = results[-1]
+            self._transformer.set_pgresult(results[-1], set_loaders=first)
+            nrows = results[-1].command_tuples
+            self._rowcount = nrows if nrows is not None else -1
+            return None
+
+        elif results[-1].status in self._status_ok:
+            raise e.ProgrammingError(
+                "the operation in stream() didn't produce a result"
+            )
+        else:
+            self._raise_from_results(results)
+            return None
+
+    def _start_query(self, begin: bool = True) -> PQGen[None]:
         """Generator to start the processing of a query.
 
         It is implemented as generator because it may send additional queries,
-        such as `begin`.
+        such as `begin`, unless *begin* is `!False`.
         """
         if self.closed:
             raise e.InterfaceError("the cursor is closed")
 
         self._reset()
-        self._transformer = adapt.Transformer(self)
-        yield from self._conn._start_query()
+        # If the adapters were not customised use the connection as context:
+        # it has the same adapters and it avoids copying them.
+        self._transformer = adapt.Transformer(
+            self if self._adapters else self._conn
+        )
+        if begin:
+            yield from self._conn._start_query()
 
     def _start_copy_gen(self, statement: Query) -> PQGen[None]:
         """Generator implementing sending a command for `Cursor.copy()."""
+        if self._conn._pipeline:
+            raise e.NotSupportedError("COPY cannot be used in pipeline mode")
+
         yield from self._start_query()
         query = self._convert_query(statement)
 
@@ -342,6 +887,8 @@ class BaseCursor(Generic[ConnectionType]):
             raise e.error_from_result(
                 results[-1], encoding=self._conn.client_encoding
             )
+        elif results[-1].status == ExecStatus.PIPELINE_ABORTED:
+            raise e.PipelineAborted("pipeline aborted")
         elif statuses.intersection(self._status_copy):
             raise e.ProgrammingError(
                 "COPY cannot be used with execute(); use copy() insead"
@@ -365,6 +912,9 @@ class BaseCursor(Generic[ConnectionType]):
             result_format=self.format,
         )
 
+    def _stream_active(self) -> bool:
+        return self._conn.pgconn.transaction_status == TransactionStatus.ACTIVE
+
     def _check_result(self) -> None:
         res = self.pgresult
         if not res:
@@ -374,6 +924,12 @@ class BaseCursor(Generic[ConnectionType]):
                 "the last operation didn't produce a result"
             )
 
+    def _load_ndarrays(self, row0: int, row1: int) -> List[Any]:
+        # Import lazily: NumPy is an optional dependency
+        from .numpy import load_ndarrays
+
+        return load_ndarrays(self._transformer, row0, row1)
+
     def _check_copy_result(self, result: "PGresult") -> None:
         """
         Check that the value returned in a copy() operation is a legit COPY.
@@ -438,24 +994,31 @@ class Cursor(BaseCursor["Connection"]):
         with self._conn.lock:
             self._conn.wait(self._executemany_gen(query, params_seq))
 
-    def fetchone(self) -> Optional[Sequence[Any]]:
+    def _fetch_pipeline(self) -> None:
+        if self._pgresult is None and self._conn._pipeline:
+            with self._conn.lock:
+                self._conn.wait(self._fetch_pipeline_gen())
+
+    def fetchone(self) -> Optional[Row]:
         """
         Return the next record from the current recordset.
 
         Return `!None` the recordset is finished.
         """
+        self._fetch_pipeline()
         self._check_result()
         record = self._transformer.load_row(self._pos)
         if record is not None:
             self._pos += 1
         return record
 
-    def fetchmany(self, size: int = 0) -> Sequence[Sequence[Any]]:
+    def fetchmany(self, size: int = 0) -> Sequence[Row]:
         """
         Return the next *size* records from the current recordset.
 
         *size* default to `!self.arraysize` if not specified.
         """
+        self._fetch_pipeline()
         self._check_result()
         assert self.pgresult
 
@@ -467,17 +1030,47 @@ class Cursor(BaseCursor["Connection"]):
         self._pos += len(records)
         return records
 
-    def fetchall(self) -> Sequence[Sequence[Any]]:
+    def fetchall(self) -> Sequence[Row]:
         """
         Return all the remaining records from the current recordset.
         """
+        self._fetch_pipeline()
         self._check_result()
         assert self.pgresult
         records = self._transformer.load_rows(self._pos, self.pgresult.ntuples)
-        self._pos += self.pgresult.ntuples
+        self._pos = self.pgresult.ntuples
         return records
 
-    def __iter__(self) -> Iterator[Sequence[Any]]:
+    def fetch_columns(self) -> List[Sequence[Any]]:
+        """
+        Return all the remaining records from the current recordset by column.
+
+        Return a sequence of values for every column: an `!array.array` for
+        binary numeric columns without nulls, otherwise a `!list`.
+        """
+        self._fetch_pipeline()
+        self._check_result()
+        assert self.pgresult
+        columns = self._transformer.load_columns(
+            self._pos, self.pgresult.ntuples
+        )
+        self._pos = self.pgresult.ntuples
+        return columns
+
+    def fetch_ndarrays(self) -> List[Any]:
+        """
+        Return all the remaining records from the current recordset as
+        NumPy arrays, one per column.
+        """
+        self._fetch_pipeline()
+        self._check_result()
+        assert self.pgresult
+        arrays = self._load_ndarrays(self._pos, self.pgresult.ntuples)
+        self._pos = self.pgresult.ntuples
+        return arrays
+
+    def __iter__(self) -> Iterator[Row]:
+        self._fetch_pipeline()
         self._check_result()
 
         load = self._transformer.load_row
@@ -489,6 +1082,34 @@ class Cursor(BaseCursor["Connection"]):
             self._pos += 1
             yield row
 
+    def stream(
+        self, query: Query, params: Optional[Params] = None
+    ) -> Iterator[Row]:
+        """
+        Iterate row-by-row on a result from the database.
+        """
+        with self._conn.lock:
+            self._conn.wait(self._stream_send_gen(query, params))
+            first = True
+            try:
+                while self._conn.wait(self._stream_fetchone_gen(first)):
+                    rec = self._transformer.load_row(0)
+                    assert rec is not None
+                    yield rec
+                    first = False
+            finally:
+                if self._stream_active():
+                    # The iteration was interrupted: stop the query and
+                    # consume what is left of the results.
+                    self._conn.cancel()
+                    try:
+                        while self._conn.wait(
+                            self._stream_fetchone_gen(False)
+                        ):
+                            pass
+                    except Exception:
+                        pass
+
     @contextmanager
     def copy(self, statement: Query) -> Iterator[Copy]:
         """
@@ -538,14 +1159,21 @@ class AsyncCursor(BaseCursor["AsyncConnection"]):
         async with self._conn.lock:
             await self._conn.wait(self._executemany_gen(query, params_seq))
 
-    async def fetchone(self) -> Optional[Sequence[Any]]:
+    async def _fetch_pipeline(self) -> None:
+        if self._pgresult is None and self._conn._pipeline:
+            async with self._conn.lock:
+                await self._conn.wait(self._fetch_pipeline_gen())
+
+    async def fetchone(self) -> Optional[Row]:
+        await self._fetch_pipeline()
         self._check_result()
         rv = self._transformer.load_row(self._pos)
         if rv is not None:
             self._pos += 1
         return rv
 
-    async def fetchmany(self, size: int = 0) -> Sequence[Sequence[Any]]:
+    async def fetchmany(self, size: int = 0) -> Sequence[Row]:
+        await self._fetch_pipeline()
         self._check_result()
         assert self.pgresult
 
@@ -557,14 +1185,34 @@ class AsyncCursor(BaseCursor["AsyncConnection"]):
         self._pos += len(records)
         return records
 
-    async def fetchall(self) -> Sequence[Sequence[Any]]:
+    async def fetchall(self) -> Sequence[Row]:
+        await self._fetch_pipeline()
         self._check_result()
         assert self.pgresult
         records = self._transformer.load_rows(self._pos, self.pgresult.ntuples)
-        self._pos += self.pgresult.ntuples
+        self._pos = self.pgresult.ntuples
         return records
 
-    async def __aiter__(self) -> AsyncIterator[Sequence[Any]]:
+    async def fetch_columns(self) -> List[Sequence[Any]]:
+        await self._fetch_pipeline()
+        self._check_result()
+        assert self.pgresult
+        columns = self._transformer.load_columns(
+            self._pos, self.pgresult.ntuples
+        )
+        self._pos = self.pgresult.ntuples
+        return columns
+
+    async def fetch_ndarrays(self) -> List[Any]:
+        await self._fetch_pipeline()
+        self._check_result()
+        assert self.pgresult
+        arrays = self._load_ndarrays(self._pos, self.pgresult.ntuples)
+        self._pos = self.pgresult.ntuples
+        return arrays
+
+    async def __aiter__(self) -> AsyncIterator[Row]:
+        await self._fetch_pipeline()
         self._check_result()
 
         load = self._transformer.load_row
@@ -576,6 +1224,29 @@ class AsyncCursor(BaseCursor["AsyncConnection"]):
             self._pos += 1
             yield row
 
+    async def stream(
+        self, query: Query, params: Optional[Params] = None
+    ) -> AsyncIterator[Row]:
+        async with self._conn.lock:
+            await self._conn.wait(self._stream_send_gen(query, params))
+            first = True
+            try:
+                while await self._conn.wait(self._stream_fetchone_gen(first)):
+                    rec = self._transformer.load_row(0)
+                    assert rec is not None
+                    yield rec
+                    first = False
+            finally:
+                if self._stream_active():
+                    self._conn.cancel()
+                    try:
+                        while await self._conn.wait(
+                            self._stream_fetchone_gen(False)
+                        ):
+                            pass
+                    except Exception:
+                        pass
+
     @asynccontextmanager
     async def copy(self, statement: Query) -> AsyncIterator[AsyncCopy]:
         async with self._conn.lock:
@@ -585,13 +1256,446 @@ class AsyncCursor(BaseCursor["AsyncConnection"]):
             yield copy
 
 
-class NamedCursorMixin:
-    pass
+DEFAULT_ITERSIZE = 100
+
+
+class NamedCursorMixin(BaseCursor[ConnectionType]):
+    """
+    Implementation of the operations common to sync and async named cursors.
+
+    A named cursor is a server-side cursor, created by :sql:`DECLARE`: the
+    result of the query is kept on the server and the records are retrieved
+    in batches using :sql:`FETCH`.
+    """
+
+    if sys.version_info >= (3, 7):
+        __slots__ = ("_name", "_withhold", "_declared", "itersize")
+
+    def __init__(
+        self,
+        connection: ConnectionType,
+        name: str,
+        format: Format = Format.TEXT,
+        *,
+        withhold: bool = False,
+        row_factory: Optional[RowFactory] = None,
+    ):
+        super().__init__(connection, format=format, row_factory=row_factory)
+        self._name = name
+        self._withhold = withhold
+        self._declared = False
+        self.itersize = DEFAULT_ITERSIZE
+
+    def __repr__(self) -> str:
+        rv = super().__repr__()
+        return rv.replace(" [", f" {self._name!r} [", 1)
+
+    @property
+    def name(self) -> str:
+        """The name of the cursor."""
+        return self._name
+
+    @property
+    def withhold(self) -> bool:
+        """`!True` if the cursor can be used after the transaction commits."""
+        return self._withhold
+
+    @property
+    def description(self) -> Optional[List[Column]]:
+        # Before the first fetch, the description comes from the result of
+        # describing the portal, which is a COMMAND_OK.
+        res = self.pgresult
+        if not res or res.status not in (
+            ExecStatus.TUPLES_OK,
+            ExecStatus.COMMAND_OK,
+        ):
+            return None
+        return [Column(self, i) for i in range(res.nfields)]
+
+    def _declare_gen(
+        self, query: Query, params: Optional[Params] = None
+    ) -> PQGen[None]:
+        """Generator implementing `NamedCursor.execute()`."""
+        if self._conn._pipeline:
+            raise e.NotSupportedError(
+                "named cursors cannot be used in pipeline mode"
+            )
+        if self._declared:
+            yield from self._close_gen()
+            self._declared = False
+
+        # If the pipeline mode is available, start the transaction, declare
+        # the cursor and describe it in the same round trip.
+        implicit = BasePipeline.is_supported()
+        yield from self._start_query(begin=not implicit)
+        pgq = self._convert_query(query, params)
+        pgq.query = b"".join(
+            (
+                b"declare ",
+                self._name_bytes(),
+                b" no scroll cursor",
+                b" with hold" if self._withhold else b"",
+                b" for ",
+                pgq.query,
+            )
+        )
+        # DECLARE is a single statement: use the extended protocol so that
+        # the query parameters can be bound.
+        if implicit:
+            yield from self._implicit_pipeline_gen(self._send_declare_gen(pgq))
+            return
+
+        self._execute_send(pgq, no_pqexec=True)
+        results = yield from execute(self._conn.pgconn)
+        self._set_results_from_declare(results)
+
+        # Describe the portal, to make the shape of the result available
+        # before fetching any record.
+        self._conn.pgconn.send_describe_portal(
+            self._name.encode(self._conn.client_encoding)
+        )
+        results = yield from execute(self._conn.pgconn)
+        self._execute_results(results)
+
+    def _send_declare_gen(self, pgq: PostgresQuery) -> PQGen[None]:
+        """
+        Generator to send in pipeline the declare statement, after the
+        commands to start the transaction, and the description of the portal.
+        """
+        pipeline = self._conn._pipeline
+        assert pipeline
+        yield from self._conn._start_query()
+        self._execute_send(pgq, no_pqexec=True)
+        pipeline.add_results_handler(self._set_results_from_declare)
+        self._conn.pgconn.send_describe_portal(
+            self._name.encode(self._conn.client_encoding)
+        )
+        pipeline.add_results_handler(self._execute_results)
+
+    def _set_results_from_declare(self, results: Sequence["PGresult"]) -> None:
+        self._execute_results(results)
+        self._declared = True
+
+    def _fetch_gen(self, num: Optional[int]) -> PQGen[List[Row]]:
+        """
+        Generator to fetch *num* records from the cursor (all if `!None`).
+
+        Return the list of records fetched, which may be shorter than *num*
+        if the cursor is exhausted.
+        """
+        res = yield from self._fetch_result_gen(num)
+        return self._transformer.load_rows(0, res.ntuples)
+
+    def _fetch_columns_gen(
+        self, ndarrays: bool = False
+    ) -> PQGen[List[Sequence[Any]]]:
+        """
+        Generator to fetch all the remaining records from the cursor.
+
+        Return the records by column, as `Cursor.fetch_columns()` does, or
+        as `Cursor.fetch_ndarrays()` does if *ndarrays* is true.
+        """
+        res = yield from self._fetch_result_gen(None)
+        if ndarrays:
+            return self._load_ndarrays(0, res.ntuples)
+        else:
+            return self._transformer.load_columns(0, res.ntuples)
+
+    def _fetch_result_gen(self, num: Optional[int]) -> PQGen["PGresult"]:
+        """
+        Generator to fetch *num* records from the cursor into a new result.
+
+        The result is set on the cursor and on its transformer.
+        """
+        if self.closed:
+            raise e.InterfaceError("the cursor is closed")
+        if not self._declared:
+            raise e.ProgrammingError("no result available")
+
+        howmuch = b"all" if num is None else str(num).encode()
+        query = b"fetch forward %s from %s" % (howmuch, self._name_bytes())
+        self._conn.pgconn.send_query_params(
+            query, None, result_format=self.format
+        )
+        results = yield from execute(self._conn.pgconn)
+        if results[-1].status != ExecStatus.TUPLES_OK:
+            self._raise_from_results(results)
+
+        # The loaders are created on the first fetch: the shape of the
+        # records doesn't change in the following ones. The portal
+        # description doesn't report the format of the columns, so it
+        # cannot be used to create them.
+        res = results[-1]
+        first = not (self._pgresult and self._pgresult.status == res.status)
+        self._pgresult = res
+        self._transformer.set_pgresult(res, set_loaders=first)
+        if first:
+            self._transformer.make_row = self._row_factory(self)
+        return res
+
+    def _close_gen(self) -> PQGen[None]:
+        """Generator to close the cursor on the server, if still open."""
+        conn = self._conn
+        if not self._declared or conn.pgconn.status != pq.ConnStatus.OK:
+            return
+
+        status = conn.pgconn.transaction_status
+        if status == TransactionStatus.INERROR or (
+            status == TransactionStatus.IDLE and not self._withhold
+        ):
+            # The cursor is gone with the transaction, or it cannot be
+            # closed anyway.
+            return
+
+        # Don't check for the cursor to exist before closing it, which would
+        # cost a round trip: the cursor was declared by us, so it exists
+        # unless the transaction it was declared in has terminated. Outside
+        # a transaction, failing to close it is harmless; inside one, close
+        # it in a savepoint, so that a failure doesn't abort the transaction.
+        close = b"close " + self._name_bytes()
+        if status == TransactionStatus.INTRANS:
+            query = b"savepoint _pg3_close; %s; release _pg3_close" % close
+        else:
+            query = close
+        conn.pgconn.send_query(query)
+        results = yield from execute(conn.pgconn)
+        if results[-1].status == ExecStatus.COMMAND_OK:
+            return
+
+        # 34000: invalid_cursor_name
+        sqlstate = results[-1].error_field(DiagnosticField.SQLSTATE)
+        if sqlstate != b"34000":
+            self._raise_from_results(results)
+        if status == TransactionStatus.INTRANS:
+            yield from conn._exec_command(
+                b"rollback to _pg3_close; release _pg3_close"
+            )
+
+    def _name_bytes(self) -> bytes:
+        return Identifier(self._name).as_bytes(self._conn)
+
+    def _check_no_prepare(self, prepare: Optional[bool]) -> None:
+        if prepare:
+            raise e.NotSupportedError(
+                "named cursors cannot use prepared statements"
+            )
+
+
+class NamedCursor(NamedCursorMixin["Connection"], Cursor):
+    """
+    A server-side cursor, fetching the records in batches.
+    """
+
+    __module__ = "psycopg3"
+    __slots__ = ()
+
+    def close(self) -> None:
+        """
+        Close the current cursor and the portal on the server.
+        """
+        if not self._closed:
+            with self._conn.lock:
+                self._conn.wait(self._close_gen())
+            self._declared = False
+        super().close()
+
+    def execute(
+        self,
+        query: Query,
+        params: Optional[Params] = None,
+        prepare: Optional[bool] = None,
+    ) -> "NamedCursor":
+        """
+        Declare the cursor on the server to return the results of a query.
+        """
+        self._check_no_prepare(prepare)
+        with self._conn.lock:
+            self._conn.wait(self._declare_gen(query, params))
+        return self
+
+    def executemany(self, query: Query, params_seq: Sequence[Params]) -> None:
+        raise e.NotSupportedError("executemany not supported on named cursors")
 
+    def stream(
+        self, query: Query, params: Optional[Params] = None
+    ) -> Iterator[Row]:
+        raise e.NotSupportedError("stream() not supported on named cursors")
+
+    def fetchone(self) -> Optional[Row]:
+        with self._conn.lock:
+            recs = self._conn.wait(self._fetch_gen(1))
+        if recs:
+            self._pos += 1
+            return recs[0]
+        else:
+            return None
+
+    def fetchmany(self, size: int = 0) -> Sequence[Row]:
+        if not size:
+            size = self.arraysize
+        with self._conn.lock:
+            recs = self._conn.wait(self._fetch_gen(size))
+        self._pos += len(recs)
+        return recs
+
+    def fetchall(self) -> Sequence[Row]:
+        with self._conn.lock:
+            recs = self._conn.wait(self._fetch_gen(None))
+        self._pos += len(recs)
+        return recs
+
+    def fetch_columns(self) -> List[Sequence[Any]]:
+        with self._conn.lock:
+            columns = self._conn.wait(self._fetch_columns_gen())
+        assert self.pgresult
+        self._pos += self.pgresult.ntuples
+        return columns
+
+    def fetch_ndarrays(self) -> List[Any]:
+        with self._conn.lock:
+            arrays = self._conn.wait(self._fetch_columns_gen(ndarrays=True))
+        assert self.pgresult
+        self._pos += self.pgresult.ntuples
+        return arrays
+
+    def __iter__(self) -> Iterator[Row]:
+        while 1:
+            with self._conn.lock:
+                recs = self._conn.wait(self._fetch_gen(self.itersize))
+            for rec in recs:
+                self._pos += 1
+                yield rec
+            if len(recs) < self.itersize:
+                break
 
-class NamedCursor(NamedCursorMixin, Cursor):
-    pass
 
+class AsyncNamedCursor(NamedCursorMixin["AsyncConnection"], AsyncCursor):
+    """
+    A server-side cursor, fetching the records in batches.
 
-class AsyncNamedCursor(NamedCursorMixin, AsyncCursor):
-    pass
+    If *prefetch* is `!True`, iterating on the cursor requests the next batch
+    of records from the server while the current one is being consumed.
+    """
+
+    __module__ = "psycopg3"
+    if sys.version_info >= (3, 7):
+        __slots__ = ("prefetch",)
+
+    def __init__(
+        self,
+        connection: "AsyncConnection",
+        name: str,
+        format: Format = Format.TEXT,
+        *,
+        withhold: bool = False,
+        prefetch: bool = False,
+        row_factory: Optional[RowFactory] = None,
+    ):
+        super().__init__(
+            connection,
+            name,
+            format=format,
+            withhold=withhold,
+            row_factory=row_factory,
+        )
+        self.prefetch = prefetch
+
+    async def close(self) -> None:
+        if not self._closed:
+            async with self._conn.lock:
+                await self._conn.wait(self._close_gen())
+            self._declared = False
+        await super().close()
+
+    async def execute(
+        self,
+        query: Query,
+        params: Optional[Params] = None,
+        prepare: Optional[bool] = None,
+    ) -> "AsyncNamedCursor":
+        self._check_no_prepare(prepare)
+        async with self._conn.lock:
+            await self._conn.wait(self._declare_gen(query, params))
+        return self
+
+    async def executemany(
+        self, query: Query, params_seq: Sequence[Params]
+    ) -> None:
+        raise e.NotSupportedError("executemany not supported on named cursors")
+
+    async def stream(
+        self, query: Query, params: Optional[Params] = None
+    ) -> AsyncIterator[Row]:
+        raise e.NotSupportedError("stream() not supported on named cursors")
+        yield ()  # pragma: no cover
+
+    async def _fetch(self, num: Optional[int]) -> List[Row]:
+        async with self._conn.lock:
+            return await self._conn.wait(self._fetch_gen(num))
+
+    async def fetchone(self) -> Optional[Row]:
+        recs = await self._fetch(1)
+        if recs:
+            self._pos += 1
+            return recs[0]
+        else:
+            return None
+
+    async def fetchmany(self, size: int = 0) -> Sequence[Row]:
+        if not size:
+            size = self.arraysize
+        recs = await self._fetch(size)
+        self._pos += len(recs)
+        return recs
+
+    async def fetchall(self) -> Sequence[Row]:
+        recs = await self._fetch(None)
+        self._pos += len(recs)
+        return recs
+
+    async def fetch_columns(self) -> List[Sequence[Any]]:
+        async with self._conn.lock:
+            columns = await self._conn.wait(self._fetch_columns_gen())
+        assert self.pgresult
+        self._pos += self.pgresult.ntuples
+        return columns
+
+    async def fetch_ndarrays(self) -> List[Any]:
+        async with self._conn.lock:
+            arrays = await self._conn.wait(
+                self._fetch_columns_gen(ndarrays=True)
+            )
+        assert self.pgresult
+        self._pos += self.pgresult.ntuples
+        return arrays
+
+    async def __aiter__(self) -> AsyncIterator[Row]:
+        nextrecs: "Optional[asyncio.Future[List[Row]]]" = None
+        try:
+            recs = await self._fetch(self.itersize)
+            while 1:
+                more = len(recs) >= self.itersize
+                if more and self.prefetch:
+                    # Ask for the next batch while the caller is busy with
+                    # the current one: all the records are already loaded.
+                    nextrecs = asyncio.ensure_future(
+                        self._fetch(self.itersize)
+                    )
+                for rec in recs:
+                    self._pos += 1
+                    yield rec
+                if not more:
+                    break
+                if nextrecs:
+                    recs = await nextrecs
+                    nextrecs = None
+                else:
+                    recs = await self._fetch(self.itersize)
+        finally:
+            if nextrecs:
+                # The iteration was interrupted: don't leave the fetch
+                # running on the connection.
+                try:
+                    await nextrecs
+                except Exception:
+                    pass
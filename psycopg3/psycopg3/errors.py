@@ -145,6 +145,15 @@ class NotSupportedError(DatabaseError):
     """
 
 
+class PipelineAborted(OperationalError):
+    """
+    The operation was not executed because the pipeline was in aborted state.
+
+    An operation in the same pipeline failed before this one: the error
+    reported by that operation is raised when the pipeline is synchronised.
+    """
+
+
 class Diagnostic:
     """Details from a database error report."""
 
@@ -114,20 +114,7 @@ def _fetch(pgconn: PGconn) -> PQGen[List[PGresult]]:
     """
     results: List[PGresult] = []
     while 1:
-        pgconn.consume_input()
-        if pgconn.is_busy():
-            yield Wait.R
-            continue
-
-        # Consume notifies
-        while 1:
-            n = pgconn.notifies()
-            if n is None:
-                break
-            if pgconn.notify_handler:
-                pgconn.notify_handler(n)
-
-        res = pgconn.get_result()
+        res = yield from fetch(pgconn)
         if res is None:
             break
         results.append(res)
@@ -135,10 +122,43 @@ def _fetch(pgconn: PGconn) -> PQGen[List[PGresult]]:
             # After entering copy mode the libpq will create a phony result
             # for every request so let's break the endless loop.
             break
+        if res.status == ExecStatus.PIPELINE_SYNC:
+            # In pipeline mode a sync result is not followed by a NULL: the
+            # results of the following queries might be already available.
+            break
 
     return results
 
 
+def fetch(pgconn: PGconn) -> PQGen[Optional[PGresult]]:
+    """
+    Generator retrieving a single result from the database without blocking.
+
+    The query must have already been sent to the server, so pgconn.flush() has
+    already returned 0.
+
+    Return a result from the database (whether success or error), or `!None`
+    if there are no more results for the current query.
+    """
+    # Use the data already received before reading more: in single row mode,
+    # reading at every result would shift the whole input buffer each time.
+    while pgconn.is_busy():
+        pgconn.consume_input()
+        if not pgconn.is_busy():
+            break
+        yield Wait.R
+
+    # Consume notifies
+    while 1:
+        n = pgconn.notifies()
+        if n is None:
+            break
+        if pgconn.notify_handler:
+            pgconn.notify_handler(n)
+
+    return pgconn.get_result()
+
+
 _copy_statuses = (
     ExecStatus.COPY_IN,
     ExecStatus.COPY_OUT,
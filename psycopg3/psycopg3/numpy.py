@@ -0,0 +1,71 @@
+"""
+Load query results into NumPy arrays
+
+The module requires NumPy to be installed: it is only imported on demand, so
+the rest of the package doesn't depend on it.
+"""
+
+# Copyright (C) 2020 The Psycopg Team
+
+from typing import Any, Dict, List
+
+import numpy
+
+from . import errors as e
+from .pq import Format
+from .oids import builtins
+from .proto import Transformer
+
+# The NumPy dtypes with the same representation of PostgreSQL binary types
+# (in native byte order). The values of columns of these types are copied
+# from the result into the arrays without creating Python objects.
+_dtypes: Dict[int, str] = {
+    builtins[name].oid: dtype
+    for name, dtype in [
+        ("bool", "?"),
+        ("int2", "i2"),
+        ("int4", "i4"),
+        ("int8", "i8"),
+        ("oid", "u4"),
+        ("float4", "f4"),
+        ("float8", "f8"),
+    ]
+}
+
+
+def load_ndarrays(tx: Transformer, row0: int, row1: int) -> List[Any]:
+    """
+    Return the values of the rows *row0*-*row1* of the result as arrays.
+
+    Return a `numpy.ndarray` for every column of the current result of *tx*.
+    Binary columns of fixed-size types are loaded in an array of the matching
+    dtype; if they contain NULLs they are returned as `numpy.ma.MaskedArray`
+    with the NULLs masked. Other columns are returned as arrays of objects.
+    """
+    res = tx.pgresult
+    if not res:
+        raise e.InterfaceError("result not set")
+
+    nrows = max(row1 - row0, 0)
+    rv = []
+    for col in range(res.nfields):
+        dtype = None
+        if res.fformat(col) == Format.BINARY:
+            dtype = _dtypes.get(res.ftype(col))
+
+        arr: Any
+        if dtype:
+            arr = numpy.empty(nrows, dtype=dtype)
+            mask = numpy.empty(nrows, dtype="?")
+            if tx.copy_column(col, row0, row1, arr, mask):
+                arr = numpy.ma.MaskedArray(arr, mask=mask)
+        else:
+            # Don't use numpy.array(values): it would create an array with
+            # more dimensions if the values are sequences.
+            arr = numpy.empty(nrows, dtype=object)
+            for i, value in enumerate(tx.load_column(col, row0, row1)):
+                arr[i] = value
+
+        rv.append(arr)
+
+    return rv
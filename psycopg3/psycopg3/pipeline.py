@@ -0,0 +1,255 @@
+"""
+Pipeline mode context managers returned by Connection.pipeline()
+"""
+
+# Copyright (C) 2020 The Psycopg Team
+
+import logging
+from types import TracebackType
+from typing import Callable, Deque, Generic, List, Optional, Type
+from typing import TYPE_CHECKING
+from functools import partial
+from collections import deque
+
+from . import pq
+from . import errors as e
+from .pq import ConnStatus, ExecStatus
+from .proto import ConnectionType, PQGen
+from .generators import send, _fetch
+
+if TYPE_CHECKING:
+    from .pq.proto import PGresult
+    from .connection import Connection, AsyncConnection  # noqa: F401
+
+logger = logging.getLogger(__name__)
+
+# An item in the pipeline results queue: None for a sync point, otherwise a
+# function to process the results of a query sent to the server.
+PendingResult = Optional[Callable[[List["PGresult"]], None]]
+
+
+class BasePipeline(Generic[ConnectionType]):
+    """
+    Handle the pipeline mode of a connection.
+
+    In pipeline mode the queries are sent to the server without waiting for
+    their results: the results are fetched when the pipeline is synchronised,
+    either explicitly, calling `sync()`, or implicitly, exiting the pipeline
+    block or fetching the results of a cursor.
+    """
+
+    def __init__(self, connection: ConnectionType):
+        self._conn = connection
+        self.pgconn = connection.pgconn
+        self.result_queue: Deque[PendingResult] = deque()
+        self.level = 0
+
+    def __repr__(self) -> str:
+        cls = f"{self.__class__.__module__}.{self.__class__.__qualname__}"
+        info = pq.misc.connection_summary(self.pgconn)
+        return f"<{cls} {info} at 0x{id(self):x}>"
+
+    @property
+    def connection(self) -> ConnectionType:
+        """The connection the object is managing."""
+        return self._conn
+
+    @property
+    def status(self) -> pq.PipelineStatus:
+        """The pipeline status of the connection."""
+        return pq.PipelineStatus(self.pgconn.pipeline_status)
+
+    @classmethod
+    def is_supported(cls) -> bool:
+        """Return `True` if the psycopg3 libpq wrapper supports pipeline mode."""
+        return pq.version() >= 140000
+
+    def _enter(self) -> None:
+        if self.level == 0:
+            if not self.is_supported():
+                raise e.NotSupportedError(
+                    "pipeline mode requires libpq from PostgreSQL 14,"
+                    f" {pq.version()} available instead"
+                )
+            self.pgconn.enter_pipeline_mode()
+        self.level += 1
+
+    def _exit(self) -> None:
+        self.level -= 1
+        if self.level == 0 and self.pgconn.status != ConnStatus.BAD:
+            self.pgconn.exit_pipeline_mode()
+
+    def _exit_gen(self, exc_val: Optional[BaseException]) -> PQGen[None]:
+        """Synchronise the pipeline on exit, without masking errors."""
+        if self.pgconn.status == ConnStatus.BAD:
+            return
+
+        try:
+            yield from self._sync_gen()
+        except Exception as ex:
+            if exc_val:
+                logger.warning("error ignored syncing %r: %s", self, ex)
+            else:
+                raise
+
+    def add_results_handler(
+        self, handler: Callable[[List["PGresult"]], None]
+    ) -> None:
+        """
+        Add a function to process the results of the last query sent.
+
+        The function will be called, when the pipeline is synchronised, with
+        the list of results received for the query.
+        """
+        self.result_queue.append(handler)
+
+    def send_command(self, command: bytes) -> None:
+        """Send an internal command and check its result on sync."""
+        self.pgconn.send_query_params(command, None)
+        self.add_results_handler(partial(self._check_command, command))
+
+    def add_sync(self) -> None:
+        """
+        Add a sync point after the last query sent, without waiting for it.
+
+        An error in the queries before the sync point doesn't abort the ones
+        sent after it.
+        """
+        self.pgconn.pipeline_sync()
+        self.result_queue.append(None)
+
+    def _sync_gen(self) -> PQGen[None]:
+        """
+        Generator to send a sync request and fetch all the pending results.
+
+        If some result is an error, raise the first error received after all
+        the results have been fetched.
+        """
+        first_error: Optional[Exception] = None
+        while 1:
+            if not self.result_queue or self.result_queue[-1] is not None:
+                self.add_sync()
+            yield from send(self.pgconn)
+            try:
+                yield from self._fetch_gen()
+            except Exception as ex:
+                if first_error is None:
+                    first_error = ex
+                if self.pgconn.status == ConnStatus.BAD:
+                    break
+
+            # Processing the results might have sent other commands: deal
+            # with them too before returning.
+            if not self.result_queue:
+                break
+
+        if first_error:
+            raise first_error
+
+    def _fetch_gen(self) -> PQGen[None]:
+        """
+        Fetch the results of the queued queries up to the next sync point.
+        """
+        first_error: Optional[Exception] = None
+        while self.result_queue:
+            queued = self.result_queue.popleft()
+            results = yield from _fetch(self.pgconn)
+            if queued is None:
+                # This is a sync point: the pipeline is not aborted anymore
+                if (
+                    not results
+                    or results[-1].status != ExecStatus.PIPELINE_SYNC
+                ):
+                    raise e.InternalError("sync point lost in the pipeline")
+                break
+
+            try:
+                queued(results)
+            except Exception as ex:
+                if first_error is None:
+                    first_error = ex
+
+        if first_error:
+            raise first_error
+
+    def _check_command(
+        self, command: bytes, results: List["PGresult"]
+    ) -> None:
+        if not results:
+            raise e.InternalError(f"no result from command {command!r}")
+        result = results[-1]
+        if result.status == ExecStatus.COMMAND_OK:
+            return
+        elif result.status == ExecStatus.FATAL_ERROR:
+            raise e.error_from_result(
+                result, encoding=self._conn.client_encoding
+            )
+        elif result.status == ExecStatus.PIPELINE_ABORTED:
+            raise e.PipelineAborted("pipeline aborted")
+        else:
+            raise e.InterfaceError(
+                f"unexpected result {ExecStatus(result.status).name}"
+                f" from command {command.decode('utf8')!r}"
+            )
+
+
+class Pipeline(BasePipeline["Connection"]):
+    """Handler for connection in pipeline mode."""
+
+    __module__ = "psycopg3"
+
+    def sync(self) -> None:
+        """
+        Sync the pipeline, send any pending command and receive and process
+        all the available results.
+        """
+        with self._conn.lock:
+            self._conn.wait(self._sync_gen())
+
+    def __enter__(self) -> "Pipeline":
+        with self._conn.lock:
+            self._enter()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_val: Optional[BaseException],
+        exc_tb: Optional[TracebackType],
+    ) -> None:
+        with self._conn.lock:
+            try:
+                self._conn.wait(self._exit_gen(exc_val))
+            finally:
+                self._exit()
+                if not self.level:
+                    self._conn._pipeline = None
+
+
+class AsyncPipeline(BasePipeline["AsyncConnection"]):
+    """Handler for async connection in pipeline mode."""
+
+    __module__ = "psycopg3"
+
+    async def sync(self) -> None:
+        async with self._conn.lock:
+            await self._conn.wait(self._sync_gen())
+
+    async def __aenter__(self) -> "AsyncPipeline":
+        async with self._conn.lock:
+            self._enter()
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_val: Optional[BaseException],
+        exc_tb: Optional[TracebackType],
+    ) -> None:
+        async with self._conn.lock:
+            try:
+                await self._conn.wait(self._exit_gen(exc_val))
+            finally:
+                self._exit()
+                if not self.level:
+                    self._conn._pipeline = None
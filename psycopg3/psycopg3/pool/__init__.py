@@ -0,0 +1,16 @@
+"""
+psycopg3 connection pool package
+"""
+
+# Copyright (C) 2020 The Psycopg Team
+
+from .pool import ConnectionPool
+from .async_pool import AsyncConnectionPool
+from .errors import PoolClosed, PoolTimeout
+
+__all__ = [
+    "AsyncConnectionPool",
+    "ConnectionPool",
+    "PoolClosed",
+    "PoolTimeout",
+]
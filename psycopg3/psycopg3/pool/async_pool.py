@@ -0,0 +1,570 @@
+"""
+psycopg3 asynchronous connection pool
+"""
+
+# Copyright (C) 2020 The Psycopg Team
+
+import sys
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from time import monotonic
+from types import TracebackType
+from typing import Any, AsyncIterator, Deque, Optional, Set, Type
+from weakref import ref
+from collections import deque
+
+from .. import errors as e
+from ..pq import TransactionStatus
+from ..connection import AsyncConnection
+
+from .base import BasePool, ConnectionAttempt
+from .errors import PoolClosed, PoolTimeout
+
+if sys.version_info >= (3, 7):
+    from contextlib import asynccontextmanager
+
+    current_task = asyncio.current_task
+else:
+    from ..utils.context import asynccontextmanager
+
+    current_task = asyncio.Task.current_task
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncConnectionPool(BasePool[AsyncConnection]):
+    """
+    A pool of `~psycopg3.AsyncConnection` objects.
+
+    The pool keeps between *minconn* and *maxconn* connections open. New
+    connections are opened concurrently in background tasks, so the clients
+    are served as soon as a connection is ready. Clients waiting for a
+    connection are served in the order they requested it.
+    """
+
+    __module__ = "psycopg3.pool"
+
+    def __init__(
+        self,
+        conninfo: str = "",
+        *,
+        connection_class: Type[AsyncConnection] = AsyncConnection,
+        **kwargs: Any,
+    ):
+        self.connection_class = connection_class
+
+        self._lock = asyncio.Lock()
+        self._waiting: Deque["AsyncClient"] = deque()
+        self._running: Set["asyncio.Future[None]"] = set()
+        self._pool_full_event = asyncio.Event()
+
+        super().__init__(conninfo, **kwargs)
+
+        # Populate the pool with the initial minconn connections
+        self._nconns = self._nopening = self._minconn
+        for i in range(self._minconn):
+            self.run_task(AddConnection(self))
+
+        if not self._minconn:
+            self._pool_full_event.set()
+
+        self.schedule_task(ShrinkPool(self), self.max_idle)
+
+    def __del__(self) -> None:
+        # If the pool was not closed explicitly, at least close the
+        # connections still in the pool, without warnings. Closing an async
+        # connection only needs to finish the libpq connection, which
+        # doesn't block, so it can be done outside the event loop.
+        if getattr(self, "_closed", True):
+            return
+
+        while self._pool:
+            # Keep a reference: the pool may hold the last one and the
+            # connection would be finalized (and warn) before finishing.
+            conn = self._pool.popleft()
+            conn.pgconn.finish()
+
+    async def __aenter__(self) -> "AsyncConnectionPool":
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_val: Optional[BaseException],
+        exc_tb: Optional[TracebackType],
+    ) -> None:
+        await self.close()
+
+    async def wait(self, timeout: float = 30.0) -> None:
+        """
+        Wait for the pool to be full after init.
+
+        Raise `PoolTimeout` if the pool couldn't open *minconn* connections
+        within *timeout* seconds. In this case the pool is closed.
+        """
+        try:
+            await asyncio.wait_for(self._pool_full_event.wait(), timeout)
+        except asyncio.TimeoutError:
+            await self.close()
+            raise PoolTimeout(
+                f"pool initialization incomplete after {timeout} sec"
+            ) from None
+
+    @asynccontextmanager
+    async def connection(
+        self, timeout: Optional[float] = None
+    ) -> AsyncIterator[AsyncConnection]:
+        """
+        Context manager to obtain a connection from the pool.
+
+        The connection is returned to the pool at the end of the block. If
+        the block terminates successfully the transaction is committed,
+        otherwise it is rolled back before the connection is used again.
+        """
+        conn = await self.getconn(timeout=timeout)
+        try:
+            yield conn
+            if not conn.closed:
+                await conn.commit()
+        finally:
+            await self.putconn(conn)
+
+    async def getconn(
+        self, timeout: Optional[float] = None
+    ) -> AsyncConnection:
+        """
+        Obtain a connection from the pool.
+
+        Clients waiting for a connection are served in FIFO order. Raise
+        `PoolTimeout` if a connection is not available in *timeout* seconds
+        (if `!None` use the pool *timeout*).
+        """
+        logger.info("connection requested to %r", self.name)
+        pos: Optional[AsyncClient] = None
+        async with self._lock:
+            if self._closed:
+                raise PoolClosed(f"the pool {self.name!r} is closed")
+
+            if self._pool:
+                conn = self._pool.pop()
+                conn._pool = self
+                if len(self._pool) < self._nconns_min:
+                    self._nconns_min = len(self._pool)
+            else:
+                pos = AsyncClient()
+                self._waiting.append(pos)
+
+            # Open new connections concurrently to meet the demand
+            for i in range(self._grow_count(len(self._waiting))):
+                self.run_task(AddConnection(self))
+
+        if pos:
+            if timeout is None:
+                timeout = self.timeout
+            try:
+                conn = await pos.wait(timeout=timeout)
+            except BaseException:
+                async with self._lock:
+                    try:
+                        self._waiting.remove(pos)
+                    except ValueError:
+                        pass
+                raise
+
+        logger.info("connection given by %r", self.name)
+        return conn
+
+    async def putconn(self, conn: AsyncConnection) -> None:
+        """
+        Return a connection to the pool.
+
+        The connection is reset before being used again: if a transaction is
+        in progress it is rolled back. Connections in a non recoverable state
+        are discarded and replaced by new ones.
+        """
+        self._check_returned_conn(conn)
+        logger.info("returning connection to %r", self.name)
+
+        if await self._maybe_close_connection(conn):
+            return
+
+        if self._needs_reset(conn):
+            self.run_task(ReturnConnection(self, conn))
+        else:
+            await self._return_connection(conn)
+
+    async def close(self, timeout: float = 1.0) -> None:
+        """
+        Close the pool and make it unavailable to new clients.
+
+        All the waiting and future clients will fail to acquire a connection
+        with a `PoolClosed` exception. Currently used connections will not be
+        closed until returned to the pool.
+
+        Wait *timeout* seconds for the background tasks to terminate.
+        """
+        async with self._lock:
+            if self._closed:
+                return
+
+            self._closed = True
+            logger.debug("pool %r closed", self.name)
+
+            pool = list(self._pool)
+            self._pool.clear()
+            waiting = list(self._waiting)
+            self._waiting.clear()
+
+        for pos in waiting:
+            await pos.fail(PoolClosed(f"the pool {self.name!r} is closed"))
+
+        for conn in pool:
+            await conn.close()
+
+        # Wait for the tasks in progress to terminate
+        running = self._running - {current_task()}
+        if running:
+            done, pending = await asyncio.wait(running, timeout=timeout)
+            if pending:
+                logger.warning(
+                    "couldn't stop %s tasks in pool %r within %s seconds",
+                    len(pending),
+                    self.name,
+                    timeout,
+                )
+
+    def run_task(self, task: "MaintenanceTask") -> None:
+        """Run a maintenance task in a background asyncio task."""
+        fut = asyncio.ensure_future(task.run())
+        self._running.add(fut)
+        fut.add_done_callback(self._running.discard)
+
+    def schedule_task(self, task: "MaintenanceTask", delay: float) -> None:
+        """Run a maintenance task in a background asyncio task in the future."""
+        # Don't keep a reference to the pool in the event loop
+        asyncio.get_event_loop().call_later(delay, task.run_soon)
+
+    async def _connect(self) -> AsyncConnection:
+        """Return a new connection configured for the pool."""
+        conn = await self.connection_class.connect(
+            self.conninfo, **self.kwargs
+        )
+        conn._pool = self
+
+        if self._configure:
+            await self._configure(conn)
+            status = conn.pgconn.transaction_status
+            if status != TransactionStatus.IDLE:
+                sname = TransactionStatus(status).name
+                await conn.close()
+                raise e.ProgrammingError(
+                    f"connection left in status {sname} by configure function"
+                    f" {self._configure}: discarded"
+                )
+
+        return conn
+
+    async def _add_connection(
+        self, attempt: Optional[ConnectionAttempt]
+    ) -> None:
+        """Try to connect and add the connection to the pool.
+
+        If failed, reschedule a new attempt in the future for a few times, then
+        give up, decrease the pool connections number.
+        """
+        now = monotonic()
+        if not attempt:
+            attempt = ConnectionAttempt(
+                reconnect_timeout=self.reconnect_timeout
+            )
+
+        try:
+            conn = await self._connect()
+        except Exception as ex:
+            logger.warning("error connecting in %r: %s", self.name, ex)
+            if attempt.time_to_give_up(now):
+                logger.warning(
+                    "reconnection attempt in pool %r failed after %s sec",
+                    self.name,
+                    self.reconnect_timeout,
+                )
+                async with self._lock:
+                    self._nconns -= 1
+                    self._nopening -= 1
+            else:
+                attempt.update_delay(now)
+                self.schedule_task(AddConnection(self, attempt), attempt.delay)
+            return
+
+        async with self._lock:
+            self._nopening -= 1
+        await self._add_to_pool(conn)
+
+    async def _return_connection(self, conn: AsyncConnection) -> None:
+        """
+        Reset a connection and put it back into the pool.
+
+        Replace it with a new one if it can't be reused anymore.
+        """
+        await self._reset_connection(conn)
+        if await self._maybe_close_connection(conn):
+            return
+        await self._add_to_pool(conn)
+
+    async def _maybe_close_connection(self, conn: AsyncConnection) -> bool:
+        """
+        Close a returned connection if the pool is closed or if it is broken.
+
+        Return `True` if the connection was discarded.
+        """
+        if self._closed:
+            conn._pool = None
+            await conn.close()
+            return True
+
+        if not conn.closed:
+            return False
+
+        logger.warning("discarding closed connection: %s", conn)
+        conn._pool = None
+        async with self._lock:
+            self._nconns -= 1
+            for i in range(self._grow_count(len(self._waiting))):
+                self.run_task(AddConnection(self))
+        return True
+
+    async def _add_to_pool(self, conn: AsyncConnection) -> None:
+        """
+        Add a connection to the pool.
+
+        If a client is already waiting for a connection pass it on, otherwise
+        put it in the pool.
+        """
+        async with self._lock:
+            if self._closed:
+                close = True
+            else:
+                close = False
+                while self._waiting:
+                    # If the client has timed out it won't take the connection
+                    if await self._waiting.popleft().set(conn):
+                        break
+                else:
+                    # Don't create a reference loop with the connections in
+                    # the pool, so that the pool can close them on del.
+                    conn._pool = None
+                    self._pool.append(conn)
+                    if len(self._pool) >= self._minconn:
+                        self._pool_full_event.set()
+
+        if close:
+            conn._pool = None
+            await conn.close()
+
+    async def _reset_connection(self, conn: AsyncConnection) -> None:
+        """
+        Bring a connection to IDLE state or close it.
+        """
+        status = conn.pgconn.transaction_status
+        if status == TransactionStatus.IDLE:
+            pass
+
+        elif status in (TransactionStatus.INTRANS, TransactionStatus.INERROR):
+            logger.info("rolling back returned connection: %s", conn)
+            try:
+                await conn.rollback()
+            except Exception as ex:
+                logger.warning(
+                    "rollback failed: %s: %s. Discarding connection %s",
+                    ex.__class__.__name__,
+                    ex,
+                    conn,
+                )
+                await conn.close()
+
+        elif status == TransactionStatus.ACTIVE:
+            logger.warning("closing returned connection: %s", conn)
+            await conn.close()
+
+        if not conn.closed and self._reset:
+            # The session is reset: deallocate the prepared statements too,
+            # together with the first command of the reset function.
+            conn._prepared.clear()
+            try:
+                await self._reset(conn)
+                status = conn.pgconn.transaction_status
+                if status != TransactionStatus.IDLE:
+                    sname = TransactionStatus(status).name
+                    raise e.ProgrammingError(
+                        f"connection left in status {sname} by reset function"
+                        f" {self._reset}: discarded"
+                    )
+            except Exception as ex:
+                logger.warning("error resetting connection: %s", ex)
+                await conn.close()
+
+    async def _shrink_pool(self) -> None:
+        """Close an idle connection if the pool had more than needed."""
+        async with self._lock:
+            conn = self._shrink_candidate()
+
+        if conn:
+            logger.info(
+                "shrinking pool %r to %s connections", self.name, self._nconns
+            )
+            conn._pool = None
+            await conn.close()
+
+
+class AsyncClient:
+    """A position in a queue for a client waiting for a connection."""
+
+    __slots__ = ("conn", "error", "_cond")
+
+    def __init__(self) -> None:
+        self.conn: Optional[AsyncConnection] = None
+        self.error: Optional[Exception] = None
+
+        # The AsyncClient behaves in a way similar to an Event, but we need
+        # to notify reliably the flagger that the waiter has "accepted" the
+        # message and it hasn't timed out yet, otherwise the pool may give a
+        # connection to a client that has already timed out getconn(), which
+        # will be lost.
+        self._cond = asyncio.Condition()
+
+    async def wait(self, timeout: float) -> AsyncConnection:
+        """Wait for a connection to be set and return it.
+
+        Raise an exception if the wait times out or if fail() is called.
+        """
+        async with self._cond:
+            if not (self.conn or self.error):
+                try:
+                    await asyncio.wait_for(self._cond.wait(), timeout)
+                except asyncio.TimeoutError:
+                    self.error = PoolTimeout(
+                        f"couldn't get a connection after {timeout} sec"
+                    )
+
+        if self.conn:
+            return self.conn
+        else:
+            assert self.error
+            raise self.error
+
+    async def set(self, conn: AsyncConnection) -> bool:
+        """Signal the client waiting that a connection is ready.
+
+        Return True if the client has "accepted" the connection, False
+        otherwise (typically because wait() has timed out).
+        """
+        async with self._cond:
+            if self.conn or self.error:
+                return False
+
+            self.conn = conn
+            self._cond.notify_all()
+            return True
+
+    async def fail(self, error: Exception) -> bool:
+        """Signal the client that, alas, they won't have a connection today.
+
+        Return True if the client has "accepted" the error, False otherwise
+        (typically because wait() has timed out).
+        """
+        async with self._cond:
+            if self.conn or self.error:
+                return False
+
+            self.error = error
+            self._cond.notify_all()
+            return True
+
+
+class MaintenanceTask(ABC):
+    """A task to run asynchronously to maintain the pool state."""
+
+    def __init__(self, pool: AsyncConnectionPool):
+        self.pool = ref(pool)
+
+    def __repr__(self) -> str:
+        pool = self.pool()
+        name = repr(pool.name) if pool else "<pool is gone>"
+        return f"<{self.__class__.__name__} {name} at 0x{id(self):x}>"
+
+    async def run(self) -> None:
+        """Run the task.
+
+        Do nothing if the pool has been deleted in the meantime. Make sure
+        not to die in the attempt.
+        """
+        pool = self.pool()
+        if not pool:
+            logger.debug(
+                "task %s skipped: pool has been deleted",
+                self.__class__.__name__,
+            )
+            return
+
+        logger.debug("task running: %s", self)
+        try:
+            await self._run(pool)
+        except Exception as ex:
+            logger.warning(
+                "task run %s failed: %s: %s",
+                self,
+                ex.__class__.__name__,
+                ex,
+            )
+
+    def run_soon(self) -> None:
+        """Run the task in the pool, if the pool still exists."""
+        pool = self.pool()
+        if pool:
+            pool.run_task(self)
+
+    @abstractmethod
+    async def _run(self, pool: AsyncConnectionPool) -> None:
+        ...
+
+
+class AddConnection(MaintenanceTask):
+    """Open a new connection and add it to the pool."""
+
+    def __init__(
+        self,
+        pool: AsyncConnectionPool,
+        attempt: Optional[ConnectionAttempt] = None,
+    ):
+        super().__init__(pool)
+        self.attempt = attempt
+
+    async def _run(self, pool: AsyncConnectionPool) -> None:
+        if pool.closed:
+            return
+        await pool._add_connection(self.attempt)
+
+
+class ReturnConnection(MaintenanceTask):
+    """Clean up and return a connection to the pool."""
+
+    def __init__(self, pool: AsyncConnectionPool, conn: AsyncConnection):
+        super().__init__(pool)
+        self.conn = conn
+
+    async def _run(self, pool: AsyncConnectionPool) -> None:
+        await pool._return_connection(self.conn)
+
+
+class ShrinkPool(MaintenanceTask):
+    """If the pool has idle connections for a while, close some of them."""
+
+    async def _run(self, pool: AsyncConnectionPool) -> None:
+        if pool.closed:
+            return
+
+        # Reschedule the task now so that in case of any error we don't lose
+        # the periodic run.
+        pool.schedule_task(self, pool.max_idle)
+        await pool._shrink_pool()
@@ -0,0 +1,194 @@
+"""
+psycopg3 connection pool base class and functionalities.
+"""
+
+# Copyright (C) 2020 The Psycopg Team
+
+import random
+import logging
+from typing import Any, Callable, Deque, Dict, Generic, Optional
+from collections import deque
+
+from ..pq import TransactionStatus
+from ..proto import ConnectionType
+
+logger = logging.getLogger(__name__)
+
+
+class BasePool(Generic[ConnectionType]):
+    """
+    Base class for the sync and async connection pools.
+
+    Keep the configuration and the bookkeeping of the connections, leaving
+    to the subclasses the task of running the background operations.
+    """
+
+    # Used to generate pool names
+    _num_pool = 0
+
+    def __init__(
+        self,
+        conninfo: str = "",
+        *,
+        kwargs: Optional[Dict[str, Any]] = None,
+        configure: Optional[Callable[[ConnectionType], Any]] = None,
+        reset: Optional[Callable[[ConnectionType], Any]] = None,
+        minconn: int = 4,
+        maxconn: Optional[int] = None,
+        name: Optional[str] = None,
+        timeout: float = 30.0,
+        max_idle: float = 10 * 60.0,
+        reconnect_timeout: float = 5 * 60.0,
+        num_workers: int = 3,
+    ):
+        if maxconn is None:
+            maxconn = minconn
+        if minconn < 0:
+            raise ValueError(f"minconn must be >= 0, got {minconn}")
+        if maxconn < minconn or maxconn < 1:
+            raise ValueError(
+                f"maxconn must be >= minconn and >= 1, got {maxconn}"
+            )
+        if num_workers < 1:
+            raise ValueError("num_workers must be at least 1")
+
+        if not name:
+            num = BasePool._num_pool = BasePool._num_pool + 1
+            name = f"pool-{num}"
+
+        self.conninfo = conninfo
+        self.kwargs: Dict[str, Any] = kwargs or {}
+        self._configure = configure
+        self._reset = reset
+        self._minconn = minconn
+        self._maxconn = maxconn
+        self.name = name
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.reconnect_timeout = reconnect_timeout
+        self.num_workers = num_workers
+
+        # Connections ready to be used. Connections are taken from the right
+        # and returned to the right, so the ones on the left are the ones
+        # idle for the longest time and the first ones to be closed.
+        self._pool: Deque[ConnectionType] = deque()
+
+        # Number of connections managed by the pool: in the pool, given to
+        # clients or being prepared.
+        self._nconns = 0
+
+        # Minimum number of idle connections seen since the last shrink
+        # check: if connections were always available, some can go.
+        self._nconns_min = 0
+
+        # Number of connections currently being opened
+        self._nopening = 0
+
+        self._closed = False
+
+    def __repr__(self) -> str:
+        return (
+            f"<{self.__class__.__module__}.{self.__class__.__name__}"
+            f" {self.name!r} at 0x{id(self):x}>"
+        )
+
+    @property
+    def minconn(self) -> int:
+        """The minimum number of connections kept in the pool."""
+        return self._minconn
+
+    @property
+    def maxconn(self) -> int:
+        """The maximum number of connections the pool can open."""
+        return self._maxconn
+
+    @property
+    def closed(self) -> bool:
+        """`True` if the pool is closed."""
+        return self._closed
+
+    def _check_returned_conn(self, conn: ConnectionType) -> None:
+        """Raise `ValueError` if a connection doesn't belong to the pool."""
+        pool = getattr(conn, "_pool", None)
+        if pool is not self:
+            if pool:
+                msg = f"it comes from pool {pool.name!r}"
+            else:
+                msg = "it doesn't come from any pool"
+            raise ValueError(
+                f"can't return connection to pool {self.name!r}, {msg}: {conn}"
+            )
+
+    def _needs_reset(self, conn: ConnectionType) -> bool:
+        """
+        Return `True` if a returned connection requires network operations.
+        """
+        return (
+            self._reset is not None
+            or conn.pgconn.transaction_status != TransactionStatus.IDLE
+        )
+
+    def _grow_count(self, nwaiting: int) -> int:
+        """
+        Return the number of new connections to open to meet the demand.
+
+        Account for the connections already being opened, the clients
+        waiting and the minimum size of the pool; open a spare connection if
+        the pool is empty, so that the next client won't have to wait for it.
+        Update the connections count: the caller must open the connections.
+        Must be called holding the pool lock.
+        """
+        if self._closed:
+            return 0
+        need = max(nwaiting - self._nopening, self._minconn - self._nconns)
+        if not self._pool and not self._nopening:
+            need = max(need, 1)
+        need = max(0, min(need, self._maxconn - self._nconns))
+        self._nconns += need
+        self._nopening += need
+        return need
+
+    def _shrink_candidate(self) -> Optional[ConnectionType]:
+        """
+        Pick an idle connection to close, if the pool has too many of them.
+
+        The number of idle connections is tracked between two calls of this
+        method: if no client needed them, the oldest one can be discarded.
+        Must be called holding the pool lock.
+        """
+        nconns_min = self._nconns_min
+        self._nconns_min = len(self._pool)
+        if nconns_min > 0 and self._nconns > self._minconn and self._pool:
+            self._nconns -= 1
+            return self._pool.popleft()
+        return None
+
+
+class ConnectionAttempt:
+    """Keep the state of a connection attempt with exponential backoff."""
+
+    INITIAL_DELAY = 1.0
+    DELAY_JITTER = 0.1
+    DELAY_BACKOFF = 2.0
+
+    def __init__(self, *, reconnect_timeout: float):
+        self.reconnect_timeout = reconnect_timeout
+        self.delay = 0.0
+        self.give_up_at = 0.0
+
+    def update_delay(self, now: float) -> None:
+        """Calculate how long to wait for a new connection attempt."""
+        if self.delay == 0.0:
+            self.give_up_at = now + self.reconnect_timeout
+            self.delay = self.INITIAL_DELAY * (
+                1.0 + (2.0 * random.random() - 1.0) * self.DELAY_JITTER
+            )
+        else:
+            self.delay *= self.DELAY_BACKOFF
+
+        if self.delay + now > self.give_up_at:
+            self.delay = max(0.0, self.give_up_at - now)
+
+    def time_to_give_up(self, now: float) -> bool:
+        """Return `True` if it's time to stop trying to connect."""
+        return self.give_up_at > 0.0 and now >= self.give_up_at
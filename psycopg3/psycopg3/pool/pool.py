@@ -0,0 +1,601 @@
+"""
+psycopg3 synchronous connection pool
+"""
+
+# Copyright (C) 2020 The Psycopg Team
+
+import queue
+import logging
+import threading
+from abc import ABC, abstractmethod
+from time import monotonic
+from types import TracebackType
+from typing import Any, Deque, Iterator, List, Optional, Type
+from weakref import ref
+from contextlib import contextmanager
+from collections import deque
+
+from .. import errors as e
+from ..pq import TransactionStatus
+from ..connection import Connection
+
+from .base import BasePool, ConnectionAttempt
+from .errors import PoolClosed, PoolTimeout
+
+logger = logging.getLogger(__name__)
+
+
+class ConnectionPool(BasePool[Connection]):
+    """
+    A pool of `~psycopg3.Connection` objects, safe to share between threads.
+
+    The pool keeps between *minconn* and *maxconn* connections open. New
+    connections are opened by background worker threads, either to fill the
+    pool on creation or when the demand grows, so clients get a connection as
+    soon as one is ready, without waiting for the connection handshake if the
+    pool has capacity.
+    """
+
+    __module__ = "psycopg3.pool"
+
+    def __init__(
+        self,
+        conninfo: str = "",
+        *,
+        connection_class: Type[Connection] = Connection,
+        **kwargs: Any,
+    ):
+        self.connection_class = connection_class
+
+        self._lock = threading.RLock()
+        self._waiting: Deque["WaitingClient"] = deque()
+        self._tasks: "queue.Queue[MaintenanceTask]" = queue.Queue()
+        self._workers: List[threading.Thread] = []
+        self._pool_full_event = threading.Event()
+
+        super().__init__(conninfo, **kwargs)
+
+        for i in range(self.num_workers):
+            t = threading.Thread(
+                target=self.worker,
+                args=(self._tasks,),
+                name=f"{self.name}-worker-{i}",
+                daemon=True,
+            )
+            self._workers.append(t)
+
+        for t in self._workers:
+            t.start()
+
+        # Populate the pool with the initial minconn connections
+        with self._lock:
+            self._nconns = self._nopening = self._minconn
+            for i in range(self._minconn):
+                self.run_task(AddConnection(self))
+
+        if not self._minconn:
+            self._pool_full_event.set()
+
+        self.schedule_task(ShrinkPool(self), self.max_idle)
+
+    def __del__(self) -> None:
+        # If the pool was not closed explicitly, at least stop the workers
+        if getattr(self, "_closed", True):
+            return
+
+        for t in self._workers:
+            self.run_task(StopWorker(self))
+
+        # Close the connections still in the pool, without warnings
+        while self._pool:
+            self._pool.popleft().close()
+
+    def __enter__(self) -> "ConnectionPool":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_val: Optional[BaseException],
+        exc_tb: Optional[TracebackType],
+    ) -> None:
+        self.close()
+
+    def wait(self, timeout: float = 30.0) -> None:
+        """
+        Wait for the pool to be full after init.
+
+        Raise `PoolTimeout` if the pool couldn't open *minconn* connections
+        within *timeout* seconds. In this case the pool is closed.
+        """
+        if not self._pool_full_event.wait(timeout):
+            self.close()
+            raise PoolTimeout(
+                f"pool initialization incomplete after {timeout} sec"
+            )
+
+    @contextmanager
+    def connection(
+        self, timeout: Optional[float] = None
+    ) -> Iterator[Connection]:
+        """
+        Context manager to obtain a connection from the pool.
+
+        The connection is returned to the pool at the end of the block. If
+        the block terminates successfully the transaction is committed,
+        otherwise it is rolled back before the connection is used again.
+
+        :param timeout: Maximum number of seconds to wait for a connection;
+            if `!None` use the pool *timeout*.
+        """
+        conn = self.getconn(timeout=timeout)
+        try:
+            yield conn
+            if not conn.closed:
+                conn.commit()
+        finally:
+            self.putconn(conn)
+
+    def getconn(self, timeout: Optional[float] = None) -> Connection:
+        """
+        Obtain a connection from the pool.
+
+        You should preferably use `connection()`. Use this method only if you
+        can't use a context manager and take care of returning the
+        connection with `putconn()`.
+
+        Raise `PoolTimeout` if a connection is not available in *timeout*
+        seconds (if `!None` use the pool *timeout*).
+        """
+        logger.info("connection requested to %r", self.name)
+        pos: Optional[WaitingClient] = None
+        with self._lock:
+            if self._closed:
+                raise PoolClosed(f"the pool {self.name!r} is closed")
+
+            if self._pool:
+                # Take the connection used most recently: it's likely warmer
+                # and leave the oldest ones to be shrunk.
+                conn = self._pool.pop()
+                conn._pool = self
+                if len(self._pool) < self._nconns_min:
+                    self._nconns_min = len(self._pool)
+            else:
+                pos = WaitingClient()
+                self._waiting.append(pos)
+
+            # Start opening new connections if the demand grows, ahead of
+            # the clients requiring them if the pool is left empty.
+            for i in range(self._grow_count(len(self._waiting))):
+                self.run_task(AddConnection(self))
+
+        # If we are in the waiting queue, wait to be assigned a connection
+        # (outside the critical section, so only the waiting client is locked)
+        if pos:
+            if timeout is None:
+                timeout = self.timeout
+            try:
+                conn = pos.wait(timeout=timeout)
+            except Exception:
+                with self._lock:
+                    try:
+                        self._waiting.remove(pos)
+                    except ValueError:
+                        pass
+                raise
+
+        logger.info("connection given by %r", self.name)
+        return conn
+
+    def putconn(self, conn: Connection) -> None:
+        """
+        Return a connection to the pool.
+
+        The connection is reset before being used again: if a transaction is
+        in progress it is rolled back. Connections in a non recoverable state
+        are discarded and replaced by new ones.
+        """
+        self._check_returned_conn(conn)
+        logger.info("returning connection to %r", self.name)
+
+        if self._maybe_close_connection(conn):
+            return
+
+        # Resetting the connection requires a network roundtrip: leave it to
+        # a worker and let the client go.
+        if self._needs_reset(conn):
+            self.run_task(ReturnConnection(self, conn))
+        else:
+            self._return_connection(conn)
+
+    def close(self, timeout: float = 1.0) -> None:
+        """
+        Close the pool and make it unavailable to new clients.
+
+        All the waiting and future clients will fail to acquire a connection
+        with a `PoolClosed` exception. Currently used connections will not be
+        closed until returned to the pool.
+
+        Wait *timeout* seconds for the worker threads to terminate their job.
+        """
+        with self._lock:
+            if self._closed:
+                return
+
+            self._closed = True
+            logger.debug("pool %r closed", self.name)
+
+            pool = list(self._pool)
+            self._pool.clear()
+            waiting = list(self._waiting)
+            self._waiting.clear()
+
+        # Now that the flag _closed is set, getconn will fail immediately
+        # and putconn will just close the returned connections.
+        for pos in waiting:
+            pos.fail(PoolClosed(f"the pool {self.name!r} is closed"))
+
+        for t in self._workers:
+            self.run_task(StopWorker(self))
+
+        for conn in pool:
+            conn.close()
+
+        # Wait for the worker threads to terminate
+        current = threading.current_thread()
+        for t in self._workers:
+            if t is not current and t.is_alive():
+                t.join(timeout)
+                if t.is_alive():
+                    logger.warning(
+                        "couldn't stop thread %s in pool %r within %s seconds",
+                        t,
+                        self.name,
+                        timeout,
+                    )
+
+    def run_task(self, task: "MaintenanceTask") -> None:
+        """Run a maintenance task in a worker thread."""
+        self._tasks.put_nowait(task)
+
+    def schedule_task(self, task: "MaintenanceTask", delay: float) -> None:
+        """Run a maintenance task in a worker thread in the future."""
+        # Don't keep a reference to the pool in the timer
+        timer = threading.Timer(delay, self._tasks.put_nowait, (task,))
+        timer.daemon = True
+        timer.start()
+
+    @staticmethod
+    def worker(q: "queue.Queue[MaintenanceTask]") -> None:
+        """Run maintenance tasks in a worker thread."""
+        while 1:
+            task = q.get()
+
+            if isinstance(task, StopWorker):
+                logger.debug("terminating working thread")
+                return
+
+            # Run the task. Make sure don't die in the attempt.
+            try:
+                task.run()
+            except Exception as ex:
+                logger.warning(
+                    "task run %s failed: %s: %s",
+                    task,
+                    ex.__class__.__name__,
+                    ex,
+                )
+
+    def _connect(self) -> Connection:
+        """Return a new connection configured for the pool."""
+        conn = self.connection_class.connect(self.conninfo, **self.kwargs)
+        conn._pool = self
+
+        if self._configure:
+            self._configure(conn)
+            status = conn.pgconn.transaction_status
+            if status != TransactionStatus.IDLE:
+                sname = TransactionStatus(status).name
+                conn.close()
+                raise e.ProgrammingError(
+                    f"connection left in status {sname} by configure function"
+                    f" {self._configure}: discarded"
+                )
+
+        return conn
+
+    def _add_connection(self, attempt: Optional[ConnectionAttempt]) -> None:
+        """Try to connect and add the connection to the pool.
+
+        If failed, reschedule a new attempt in the future for a few times, then
+        give up, decrease the pool connections number.
+        """
+        now = monotonic()
+        if not attempt:
+            attempt = ConnectionAttempt(
+                reconnect_timeout=self.reconnect_timeout
+            )
+
+        try:
+            conn = self._connect()
+        except Exception as ex:
+            logger.warning("error connecting in %r: %s", self.name, ex)
+            if attempt.time_to_give_up(now):
+                logger.warning(
+                    "reconnection attempt in pool %r failed after %s sec",
+                    self.name,
+                    self.reconnect_timeout,
+                )
+                with self._lock:
+                    self._nconns -= 1
+                    self._nopening -= 1
+            else:
+                attempt.update_delay(now)
+                self.schedule_task(AddConnection(self, attempt), attempt.delay)
+            return
+
+        with self._lock:
+            self._nopening -= 1
+        self._add_to_pool(conn)
+
+    def _return_connection(self, conn: Connection) -> None:
+        """
+        Reset a connection and put it back into the pool.
+
+        Replace it with a new one if it can't be reused anymore.
+        """
+        self._reset_connection(conn)
+        if self._maybe_close_connection(conn):
+            return
+        self._add_to_pool(conn)
+
+    def _maybe_close_connection(self, conn: Connection) -> bool:
+        """
+        Close a returned connection if the pool is closed or if it is broken.
+
+        Return `True` if the connection was discarded.
+        """
+        if self._closed:
+            conn._pool = None
+            conn.close()
+            return True
+
+        if not conn.closed:
+            return False
+
+        logger.warning("discarding closed connection: %s", conn)
+        conn._pool = None
+        with self._lock:
+            self._nconns -= 1
+            for i in range(self._grow_count(len(self._waiting))):
+                self.run_task(AddConnection(self))
+        return True
+
+    def _add_to_pool(self, conn: Connection) -> None:
+        """
+        Add a connection to the pool.
+
+        The connection can be a fresh one or one already used in the pool. If
+        a client is already waiting for a connection pass it on, otherwise
+        put it in the pool.
+        """
+        with self._lock:
+            if self._closed:
+                close = True
+            else:
+                close = False
+                while self._waiting:
+                    # If the client has timed out it won't take the connection
+                    if self._waiting.popleft().set(conn):
+                        break
+                else:
+                    # No client waiting for a connection: put it back in the
+                    # pool, notifying if the pool is now full. Don't create a
+                    # reference loop with the connections in the pool, so
+                    # that the pool can close them on del.
+                    conn._pool = None
+                    self._pool.append(conn)
+                    if len(self._pool) >= self._minconn:
+                        self._pool_full_event.set()
+
+        if close:
+            conn._pool = None
+            conn.close()
+
+    def _reset_connection(self, conn: Connection) -> None:
+        """
+        Bring a connection to IDLE state or close it.
+        """
+        status = conn.pgconn.transaction_status
+        if status == TransactionStatus.IDLE:
+            pass
+
+        elif status in (TransactionStatus.INTRANS, TransactionStatus.INERROR):
+            # Connection returned with an active transaction
+            logger.info("rolling back returned connection: %s", conn)
+            try:
+                conn.rollback()
+            except Exception as ex:
+                logger.warning(
+                    "rollback failed: %s: %s. Discarding connection %s",
+                    ex.__class__.__name__,
+                    ex,
+                    conn,
+                )
+                conn.close()
+
+        elif status == TransactionStatus.ACTIVE:
+            # Connection returned during an operation. Bad... just close it.
+            logger.warning("closing returned connection: %s", conn)
+            conn.close()
+
+        if not conn.closed and self._reset:
+            # The session is reset: deallocate the prepared statements too,
+            # together with the first command of the reset function.
+            conn._prepared.clear()
+            try:
+                self._reset(conn)
+                status = conn.pgconn.transaction_status
+                if status != TransactionStatus.IDLE:
+                    sname = TransactionStatus(status).name
+                    raise e.ProgrammingError(
+                        f"connection left in status {sname} by reset function"
+                        f" {self._reset}: discarded"
+                    )
+            except Exception as ex:
+                logger.warning("error resetting connection: %s", ex)
+                conn.close()
+
+    def _shrink_pool(self) -> None:
+        """Close an idle connection if the pool had more than needed."""
+        with self._lock:
+            conn = self._shrink_candidate()
+
+        if conn:
+            logger.info(
+                "shrinking pool %r to %s connections", self.name, self._nconns
+            )
+            conn._pool = None
+            conn.close()
+
+
+class WaitingClient:
+    """A position in a queue for a client waiting for a connection."""
+
+    __slots__ = ("conn", "error", "_cond")
+
+    def __init__(self) -> None:
+        self.conn: Optional[Connection] = None
+        self.error: Optional[Exception] = None
+
+        # The WaitingClient behaves in a way similar to an Event, but we need
+        # to notify reliably the flagger that the waiter has "accepted" the
+        # message and it hasn't timed out yet, otherwise the pool may give a
+        # connection to a client that has already timed out getconn(), which
+        # will be lost.
+        self._cond = threading.Condition()
+
+    def wait(self, timeout: float) -> Connection:
+        """Wait for a connection to be set and return it.
+
+        Raise an exception if the wait times out or if fail() is called.
+        """
+        with self._cond:
+            if not (self.conn or self.error):
+                if not self._cond.wait(timeout):
+                    self.error = PoolTimeout(
+                        f"couldn't get a connection after {timeout} sec"
+                    )
+
+        if self.conn:
+            return self.conn
+        else:
+            assert self.error
+            raise self.error
+
+    def set(self, conn: Connection) -> bool:
+        """Signal the client waiting that a connection is ready.
+
+        Return True if the client has "accepted" the connection, False
+        otherwise (typically because wait() has timed out).
+        """
+        with self._cond:
+            if self.conn or self.error:
+                return False
+
+            self.conn = conn
+            self._cond.notify_all()
+            return True
+
+    def fail(self, error: Exception) -> bool:
+        """Signal the client that, alas, they won't have a connection today.
+
+        Return True if the client has "accepted" the error, False otherwise
+        (typically because wait() has timed out).
+        """
+        with self._cond:
+            if self.conn or self.error:
+                return False
+
+            self.error = error
+            self._cond.notify_all()
+            return True
+
+
+class MaintenanceTask(ABC):
+    """A task to run asynchronously to maintain the pool state."""
+
+    def __init__(self, pool: ConnectionPool):
+        self.pool = ref(pool)
+
+    def __repr__(self) -> str:
+        pool = self.pool()
+        name = repr(pool.name) if pool else "<pool is gone>"
+        return f"<{self.__class__.__name__} {name} at 0x{id(self):x}>"
+
+    def run(self) -> None:
+        """Run the task.
+
+        This usually happens in a worker thread. Do nothing if the pool has
+        been deleted in the meantime.
+        """
+        pool = self.pool()
+        if not pool:
+            logger.debug(
+                "task %s skipped: pool has been deleted",
+                self.__class__.__name__,
+            )
+            return
+
+        logger.debug("task running: %s", self)
+        self._run(pool)
+
+    @abstractmethod
+    def _run(self, pool: ConnectionPool) -> None:
+        ...
+
+
+class StopWorker(MaintenanceTask):
+    """Signal the maintenance thread to terminate."""
+
+    def _run(self, pool: ConnectionPool) -> None:
+        pass
+
+
+class AddConnection(MaintenanceTask):
+    """Open a new connection and add it to the pool."""
+
+    def __init__(
+        self, pool: ConnectionPool, attempt: Optional[ConnectionAttempt] = None
+    ):
+        super().__init__(pool)
+        self.attempt = attempt
+
+    def _run(self, pool: ConnectionPool) -> None:
+        if pool.closed:
+            return
+        pool._add_connection(self.attempt)
+
+
+class ReturnConnection(MaintenanceTask):
+    """Clean up and return a connection to the pool."""
+
+    def __init__(self, pool: ConnectionPool, conn: Connection):
+        super().__init__(pool)
+        self.conn = conn
+
+    def _run(self, pool: ConnectionPool) -> None:
+        pool._return_connection(self.conn)
+
+
+class ShrinkPool(MaintenanceTask):
+    """If the pool has idle connections for a while, close some of them."""
+
+    def _run(self, pool: ConnectionPool) -> None:
+        if pool.closed:
+            return
+
+        # Reschedule the task now so that in case of any error we don't lose
+        # the periodic run.
+        pool.schedule_task(self, pool.max_idle)
+        pool._shrink_pool()
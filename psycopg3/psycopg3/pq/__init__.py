@@ -16,7 +16,7 @@ from typing import Callable, List, Type
 from .misc import ConninfoOption, PQerror, PGnotify, PGresAttDesc
 from .misc import error_message
 from ._enums import ConnStatus, DiagnosticField, ExecStatus, Format
-from ._enums import Ping, PollingStatus, TransactionStatus
+from ._enums import Ping, PipelineStatus, PollingStatus, TransactionStatus
 from . import proto
 
 logger = logging.getLogger(__name__)
@@ -108,6 +108,7 @@ __all__ = (
     "TransactionStatus",
     "ExecStatus",
     "Ping",
+    "PipelineStatus",
     "DiagnosticField",
     "Format",
     "PGconn",
@@ -102,6 +102,24 @@ class ExecStatus(IntEnum):
     query.
     """
 
+    PIPELINE_SYNC = auto()
+    """
+    The PGresult represents a synchronization point in pipeline mode,
+    requested by `~PGconn.pipeline_sync()`.
+
+    This status occurs only when pipeline mode has been selected.
+    """
+
+    PIPELINE_ABORTED = auto()
+    """
+    The PGresult represents a pipeline that has received an error from the
+    server.
+
+    `~PGconn.get_result()` must be called repeatedly, and each time it will
+    return this status code until the end of the current pipeline, at which
+    point it will return `PIPELINE_SYNC` and normal processing can resume.
+    """
+
 
 class TransactionStatus(IntEnum):
     """
@@ -126,6 +144,27 @@ class TransactionStatus(IntEnum):
     """Unknown connection state, broken connection."""
 
 
+class PipelineStatus(IntEnum):
+    """Pipeline mode status of the libpq connection."""
+
+    __module__ = "psycopg3.pq"
+
+    OFF = 0
+    """
+    The libpq connection is *not* in pipeline mode.
+    """
+    ON = auto()
+    """
+    The libpq connection is in pipeline mode.
+    """
+    ABORTED = auto()
+    """
+    The libpq connection is in pipeline mode and an error occurred while
+    processing the current pipeline. The aborted flag is cleared when
+    `~PGconn.get_result()` returns a result of type `ExecStatus.PIPELINE_SYNC`.
+    """
+
+
 class Ping(IntEnum):
     """Response from a ping attempt."""
 
@@ -472,7 +472,13 @@ PQsendQueryPrepared.argtypes = [
 ]
 PQsendQueryPrepared.restype = c_int
 
-# TODO: PQsendDescribePrepared PQsendDescribePortal
+PQsendDescribePrepared = pq.PQsendDescribePrepared
+PQsendDescribePrepared.argtypes = [PGconn_ptr, c_char_p]
+PQsendDescribePrepared.restype = c_int
+
+PQsendDescribePortal = pq.PQsendDescribePortal
+PQsendDescribePortal.argtypes = [PGconn_ptr, c_char_p]
+PQsendDescribePortal.restype = c_int
 
 PQgetResult = pq.PQgetResult
 PQgetResult.argtypes = [PGconn_ptr]
@@ -499,6 +505,79 @@ PQflush.argtypes = [PGconn_ptr]
 PQflush.restype = c_int
 
 
+# 33.5. Retrieving Query Results Row-by-Row
+PQsetSingleRowMode = pq.PQsetSingleRowMode
+PQsetSingleRowMode.argtypes = [PGconn_ptr]
+PQsetSingleRowMode.restype = c_int
+
+
+# 34.5. Pipeline Mode (from PostgreSQL 14 documentation)
+
+_PQpipelineStatus = None
+_PQenterPipelineMode = None
+_PQexitPipelineMode = None
+_PQpipelineSync = None
+_PQsendFlushRequest = None
+
+if libpq_version >= 140000:
+    _PQpipelineStatus = pq.PQpipelineStatus
+    _PQpipelineStatus.argtypes = [PGconn_ptr]
+    _PQpipelineStatus.restype = c_int
+
+    _PQenterPipelineMode = pq.PQenterPipelineMode
+    _PQenterPipelineMode.argtypes = [PGconn_ptr]
+    _PQenterPipelineMode.restype = c_int
+
+    _PQexitPipelineMode = pq.PQexitPipelineMode
+    _PQexitPipelineMode.argtypes = [PGconn_ptr]
+    _PQexitPipelineMode.restype = c_int
+
+    _PQpipelineSync = pq.PQpipelineSync
+    _PQpipelineSync.argtypes = [PGconn_ptr]
+    _PQpipelineSync.restype = c_int
+
+    _PQsendFlushRequest = pq.PQsendFlushRequest
+    _PQsendFlushRequest.argtypes = [PGconn_ptr]
+    _PQsendFlushRequest.restype = c_int
+
+
+def _pipeline_not_supported(fname: str) -> NotSupportedError:
+    return NotSupportedError(
+        f"{fname} requires libpq from PostgreSQL 14,"
+        f" {libpq_version} available instead"
+    )
+
+
+def PQpipelineStatus(pgconn: type) -> int:
+    if not _PQpipelineStatus:
+        raise _pipeline_not_supported("PQpipelineStatus")
+    return _PQpipelineStatus(pgconn)
+
+
+def PQenterPipelineMode(pgconn: type) -> int:
+    if not _PQenterPipelineMode:
+        raise _pipeline_not_supported("PQenterPipelineMode")
+    return _PQenterPipelineMode(pgconn)
+
+
+def PQexitPipelineMode(pgconn: type) -> int:
+    if not _PQexitPipelineMode:
+        raise _pipeline_not_supported("PQexitPipelineMode")
+    return _PQexitPipelineMode(pgconn)
+
+
+def PQpipelineSync(pgconn: type) -> int:
+    if not _PQpipelineSync:
+        raise _pipeline_not_supported("PQpipelineSync")
+    return _PQpipelineSync(pgconn)
+
+
+def PQsendFlushRequest(pgconn: type) -> int:
+    if not _PQsendFlushRequest:
+        raise _pipeline_not_supported("PQsendFlushRequest")
+    return _PQsendFlushRequest(pgconn)
+
+
 # 33.6. Canceling Queries in Progress
 
 PQgetCancel = pq.PQgetCancel
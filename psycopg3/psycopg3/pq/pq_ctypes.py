@@ -317,6 +317,24 @@ class PGconn:
                 f"sending prepared query failed: {error_message(self)}"
             )
 
+    def send_describe_prepared(self, name: bytes) -> None:
+        if not isinstance(name, bytes):
+            raise TypeError(f"bytes expected, got {type(name)} instead")
+        self._ensure_pgconn()
+        if not impl.PQsendDescribePrepared(self.pgconn_ptr, name):
+            raise PQerror(
+                f"sending describe prepared failed: {error_message(self)}"
+            )
+
+    def send_describe_portal(self, name: bytes) -> None:
+        if not isinstance(name, bytes):
+            raise TypeError(f"bytes expected, got {type(name)} instead")
+        self._ensure_pgconn()
+        if not impl.PQsendDescribePortal(self.pgconn_ptr, name):
+            raise PQerror(
+                f"sending describe portal failed: {error_message(self)}"
+            )
+
     def _query_params_args(
         self,
         command: bytes,
@@ -500,6 +518,59 @@ class PGconn:
             raise PQerror(f"flushing failed: {error_message(self)}")
         return rv
 
+    def set_single_row_mode(self) -> None:
+        if not impl.PQsetSingleRowMode(self.pgconn_ptr):
+            raise PQerror("setting single row mode failed")
+
+    @property
+    def pipeline_status(self) -> int:
+        if version() < 140000:
+            return 0
+        return impl.PQpipelineStatus(self.pgconn_ptr)
+
+    def enter_pipeline_mode(self) -> None:
+        """
+        Enter pipeline mode.
+
+        See :pq:`PQenterPipelineMode` for details.
+        """
+        if impl.PQenterPipelineMode(self.pgconn_ptr) != 1:
+            raise PQerror("failed to enter pipeline mode")
+
+    def exit_pipeline_mode(self) -> None:
+        """
+        Exit pipeline mode.
+
+        See :pq:`PQexitPipelineMode` for details.
+        """
+        if impl.PQexitPipelineMode(self.pgconn_ptr) != 1:
+            raise PQerror(
+                f"failed to exit pipeline mode: {error_message(self)}"
+            )
+
+    def pipeline_sync(self) -> None:
+        """
+        Mark a synchronization point in a pipeline.
+
+        See :pq:`PQpipelineSync` for details.
+        """
+        rv = impl.PQpipelineSync(self.pgconn_ptr)
+        if rv == 0:
+            raise PQerror("connection not in pipeline mode")
+        if rv != 1:
+            raise PQerror(f"failed to sync pipeline: {error_message(self)}")
+
+    def send_flush_request(self) -> None:
+        """
+        Send a request for the server to flush its output buffer.
+
+        See :pq:`PQsendFlushRequest` for details.
+        """
+        if impl.PQsendFlushRequest(self.pgconn_ptr) == 0:
+            raise PQerror(
+                f"failed to send flush request: {error_message(self)}"
+            )
+
     def get_cancel(self) -> "PGcancel":
         """
         Create an object with the information needed to cancel a command.
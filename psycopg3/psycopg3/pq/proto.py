@@ -171,6 +171,12 @@ class PGconn(Protocol):
     ) -> None:
         ...
 
+    def send_describe_prepared(self, name: bytes) -> None:
+        ...
+
+    def send_describe_portal(self, name: bytes) -> None:
+        ...
+
     def prepare(
         self,
         name: bytes,
@@ -214,6 +220,25 @@ class PGconn(Protocol):
     def flush(self) -> int:
         ...
 
+    def set_single_row_mode(self) -> None:
+        ...
+
+    @property
+    def pipeline_status(self) -> int:
+        ...
+
+    def enter_pipeline_mode(self) -> None:
+        ...
+
+    def exit_pipeline_mode(self) -> None:
+        ...
+
+    def pipeline_sync(self) -> None:
+        ...
+
+    def send_flush_request(self) -> None:
+        ...
+
     def get_cancel(self) -> "PGcancel":
         ...
 
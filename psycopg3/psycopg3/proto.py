@@ -14,6 +14,7 @@ from .pq import Format
 
 if TYPE_CHECKING:
     from .connection import BaseConnection
+    from .cursor import BaseCursor
     from .adapt import Dumper, Loader, AdaptersMap
     from .waiting import Wait, Ready
     from .sql import Composable
@@ -46,6 +47,20 @@ Wait states.
 DumpFunc = Callable[[Any], bytes]
 LoadFunc = Callable[[bytes], Any]
 
+# Row factories
+
+Row = Any
+"""A record returned by a cursor: a tuple unless a row factory is used."""
+
+RowMaker = Callable[[Sequence[Any]], Row]
+"""Callable returning a row from the sequence of the values in a record."""
+
+RowFactory = Callable[["BaseCursor[Any]"], RowMaker]
+"""Callable returning a `RowMaker` for the current result of a cursor.
+
+It is called once for each result the cursor produces.
+"""
+
 # TODO: Loader, Dumper should probably become protocols
 # as there are both C and a Python implementation
 
@@ -86,6 +101,14 @@ class Transformer(Protocol):
     def pgresult(self, result: Optional[pq.proto.PGresult]) -> None:
         ...
 
+    def set_pgresult(
+        self,
+        result: Optional[pq.proto.PGresult],
+        *,
+        set_loaders: bool = True,
+    ) -> None:
+        ...
+
     def set_row_types(
         self, types: Sequence[int], formats: Sequence[Format]
     ) -> None:
@@ -99,10 +122,29 @@ class Transformer(Protocol):
     def get_dumper(self, obj: Any, format: Format) -> "Dumper":
         ...
 
-    def load_rows(self, row0: int, row1: int) -> List[Tuple[Any, ...]]:
+    @property
+    def make_row(self) -> RowMaker:
+        ...
+
+    @make_row.setter
+    def make_row(self, row_maker: RowMaker) -> None:
+        ...
+
+    def load_rows(self, row0: int, row1: int) -> List[Row]:
+        ...
+
+    def load_row(self, row: int) -> Optional[Row]:
+        ...
+
+    def load_columns(self, row0: int, row1: int) -> List[Sequence[Any]]:
+        ...
+
+    def load_column(self, col: int, row0: int, row1: int) -> Sequence[Any]:
         ...
 
-    def load_row(self, row: int) -> Optional[Tuple[Any, ...]]:
+    def copy_column(
+        self, col: int, row0: int, row1: int, data: Any, nulls: Any
+    ) -> int:
         ...
 
     def load_sequence(
@@ -0,0 +1,290 @@
+"""
+psycopg3 row factories
+"""
+
+# Copyright (C) 2020 The Psycopg Team
+
+import functools
+from collections import namedtuple
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Sequence
+from typing import Optional, Tuple, Type, Union, TYPE_CHECKING
+
+from .pq import Format
+from .proto import Row, RowFactory, RowMaker
+
+if TYPE_CHECKING:
+    from .cursor import BaseCursor
+    from .pq.proto import PGresult
+
+
+# The row makers implemented by the classes in this module are recognised by
+# the C Transformer, which builds the rows directly, without calling them.
+
+
+class DictRowMaker:
+    """Row maker returning a `!dict` mapping column names to values."""
+
+    __slots__ = ("names",)
+
+    def __init__(self, names: Tuple[str, ...]):
+        self.names = names
+
+    def __call__(self, values: Sequence[Any]) -> Dict[str, Any]:
+        return dict(zip(self.names, values))
+
+
+class NamedTupleRowMaker:
+    """Row maker returning an instance of a `~collections.namedtuple`."""
+
+    __slots__ = ("cls",)
+
+    def __init__(self, cls: Type[NamedTuple]):
+        self.cls = cls
+
+    def __call__(self, values: Sequence[Any]) -> NamedTuple:
+        return self.cls._make(values)
+
+
+class ArgsRowMaker:
+    """Row maker calling a function with the values as positional args."""
+
+    __slots__ = ("func",)
+
+    def __init__(self, func: Callable[..., Any]):
+        self.func = func
+
+    def __call__(self, values: Sequence[Any]) -> Any:
+        return self.func(*values)
+
+
+class KwargsRowMaker:
+    """Row maker calling a function with the values as keyword args."""
+
+    __slots__ = ("func", "names")
+
+    def __init__(self, func: Callable[..., Any], names: Tuple[str, ...]):
+        self.func = func
+        self.names = names
+
+    def __call__(self, values: Sequence[Any]) -> Any:
+        return self.func(**dict(zip(self.names, values)))
+
+
+class LazyRowMaker:
+    """
+    Row maker returning `LazyRow` objects.
+
+    The Transformers recognise this row maker and create the rows without
+    loading their values.
+    """
+
+    __slots__ = ("loaders", "names", "index")
+
+    def __init__(
+        self, loaders: Sequence[Callable[[bytes], Any]], names: Tuple[str, ...]
+    ):
+        self.loaders = loaders
+        self.names = names
+        # If more columns have the same name, the first one is returned
+        self.index = {n: i for i, n in reversed(list(enumerate(names)))}
+
+    def __call__(self, values: Sequence[Any]) -> "LazyRow":
+        # Called with values already loaded: there's nothing left to defer
+        rv = LazyRow(self, None, -1)
+        rv._values = list(values)
+        return rv
+
+    def make(self, pgresult: "PGresult", row: int) -> "LazyRow":
+        return LazyRow(self, pgresult, row)
+
+
+_NOT_LOADED = object()
+
+
+class LazyRow(Sequence[Any]):
+    """
+    A record whose values are only loaded when accessed.
+
+    Values can be accessed by position (``row[0]``), by column name
+    (``row["name"]``) or as attributes (``row.name``). Every value is loaded
+    at most once.
+
+    The row keeps a reference to the result it comes from, so it can be used
+    after the cursor has moved to other results or is closed.
+    """
+
+    __module__ = "psycopg3.rows"
+    __slots__ = ("_maker", "_pgresult", "_row", "_values")
+
+    def __init__(
+        self, maker: LazyRowMaker, pgresult: Optional["PGresult"], row: int
+    ) -> None:
+        self._maker = maker
+        self._pgresult = pgresult
+        self._row = row
+        self._values: List[Any] = [_NOT_LOADED] * len(maker.names)
+
+    @property
+    def _fields(self) -> Tuple[str, ...]:
+        """The names of the columns of the record."""
+        return self._maker.names
+
+    def _asdict(self) -> Dict[str, Any]:
+        """Return the record as a dict mapping column names to values."""
+        return dict(zip(self._maker.names, self))
+
+    def _load(self, col: int) -> Any:
+        rv = self._values[col]
+        if rv is _NOT_LOADED:
+            assert self._pgresult
+            data = self._pgresult.get_value(self._row, col)
+            rv = self._maker.loaders[col](data) if data is not None else None
+            self._values[col] = rv
+        return rv
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __getitem__(self, key: Union[int, str, slice]) -> Any:
+        if isinstance(key, int):
+            if key < 0:
+                key += len(self._values)
+            if not 0 <= key < len(self._values):
+                raise IndexError("row index out of range")
+            return self._load(key)
+        elif isinstance(key, str):
+            try:
+                return self._load(self._maker.index[key])
+            except KeyError:
+                raise KeyError(key) from None
+        elif isinstance(key, slice):
+            return tuple(
+                self._load(i) for i in range(*key.indices(len(self._values)))
+            )
+        else:
+            raise TypeError(
+                f"row indices must be int, str or slice,"
+                f" not {type(key).__name__}"
+            )
+
+    def __getattr__(self, name: str) -> Any:
+        if name in LazyRow.__slots__:
+            # Attribute not set yet: avoid infinite recursion
+            raise AttributeError(name)
+        try:
+            col = self._maker.index[name]
+        except KeyError:
+            raise AttributeError(
+                f"'LazyRow' object has no attribute {name!r}"
+            ) from None
+        return self._load(col)
+
+    def __iter__(self) -> Iterator[Any]:
+        for i in range(len(self._values)):
+            yield self._load(i)
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, (LazyRow, tuple)):
+            return tuple(self) == tuple(other)
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(tuple(self))
+
+    def __repr__(self) -> str:
+        values = ", ".join(f"{n}={v!r}" for n, v in zip(self._fields, self))
+        return f"LazyRow({values})"
+
+    def __reduce__(self) -> Any:
+        # Pickle the values: the result and the loaders cannot be pickled
+        return (_unpickle_lazy_row, (self._fields, tuple(self)))
+
+
+def _unpickle_lazy_row(names: Tuple[str, ...], values: Tuple[Any]) -> LazyRow:
+    return LazyRowMaker((), names)(values)
+
+
+def tuple_row(cursor: "BaseCursor[Any]") -> RowMaker:
+    """Row factory to represent rows as simple tuples.
+
+    This is the default factory.
+    """
+    return tuple
+
+
+def dict_row(cursor: "BaseCursor[Any]") -> RowMaker:
+    """Row factory to represent rows as dicts.
+
+    The dicts keys are the names of the columns.
+    """
+    return DictRowMaker(_get_names(cursor))
+
+
+def namedtuple_row(cursor: "BaseCursor[Any]") -> RowMaker:
+    """Row factory to represent rows as `~collections.namedtuple`.
+
+    The field names are the names of the columns; names that are not valid
+    Python identifiers are replaced by positional names.
+    """
+    return NamedTupleRowMaker(_make_nt(_get_names(cursor)))
+
+
+def class_row(cls: Type[Any]) -> RowFactory:
+    """Generate a row factory to represent rows as instances of the class *cls*.
+
+    The class must support every output column name as a keyword parameter,
+    as dataclasses and most classes with an ``__init__()`` do.
+    """
+
+    def class_row_(cursor: "BaseCursor[Any]") -> RowMaker:
+        return KwargsRowMaker(cls, _get_names(cursor))
+
+    return class_row_
+
+
+def args_row(func: Callable[..., Row]) -> RowFactory:
+    """Generate a row factory calling *func* with positional parameters
+    for every row.
+    """
+
+    def args_row_(cursor: "BaseCursor[Any]") -> RowMaker:
+        return ArgsRowMaker(func)
+
+    return args_row_
+
+
+def kwargs_row(func: Callable[..., Row]) -> RowFactory:
+    """Generate a row factory calling *func* with keyword parameters for
+    every row.
+    """
+
+    def kwargs_row_(cursor: "BaseCursor[Any]") -> RowMaker:
+        return KwargsRowMaker(func, _get_names(cursor))
+
+    return kwargs_row_
+
+
+def lazy_row(cursor: "BaseCursor[Any]") -> RowMaker:
+    """Row factory to represent rows as `LazyRow` objects.
+
+    The values of the rows are only loaded when they are accessed, which
+    saves the cost of loading the columns that are not used.
+    """
+    res = cursor.pgresult
+    tx = cursor._transformer
+    loaders = []
+    if res:
+        for i in range(res.nfields):
+            fmt = Format(res.fformat(i))
+            loaders.append(tx.get_loader(res.ftype(i), fmt).load)
+    return LazyRowMaker(loaders, _get_names(cursor))
+
+
+def _get_names(cursor: "BaseCursor[Any]") -> Tuple[str, ...]:
+    desc = cursor.description
+    return tuple(c.name for c in desc) if desc else ()
+
+
+@functools.lru_cache(512)
+def _make_nt(names: Tuple[str, ...]) -> Type[NamedTuple]:
+    return namedtuple("Row", names, rename=True)  # type: ignore
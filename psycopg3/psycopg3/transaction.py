@@ -11,6 +11,7 @@ from typing import Generic, Optional, Type, Union, TYPE_CHECKING
 
 from . import pq
 from . import sql
+from . import errors as e
 from .pq import TransactionStatus
 from .proto import ConnectionType, PQGen
 
@@ -52,6 +53,8 @@ class BaseTransaction(Generic[ConnectionType]):
         self._savepoint_name = savepoint_name or ""
         self.force_rollback = force_rollback
         self._entered = self._exited = False
+        # Number of commands to start the block, if not sent yet.
+        self._ncommands = 0
 
     @property
     def connection(self) -> ConnectionType:
@@ -85,8 +88,15 @@ class BaseTransaction(Generic[ConnectionType]):
             raise TypeError("transaction blocks can be used only once")
         self._entered = True
 
+        if self._conn._pipeline:
+            raise e.NotSupportedError(
+                "transaction blocks can't be started in pipeline mode"
+            )
+
+        # The commands of an outer block might have not been sent yet.
+        status = self._conn.pgconn.transaction_status
         self._outer_transaction = (
-            self._conn.pgconn.transaction_status == TransactionStatus.IDLE
+            status == TransactionStatus.IDLE and not self._conn._savepoints
         )
         if self._outer_transaction:
             # outer transaction: if no name it's only a begin, else
@@ -112,7 +122,28 @@ class BaseTransaction(Generic[ConnectionType]):
             )
 
         self._conn._savepoints.append(self._savepoint_name)
-        return self._conn._exec_command(b"; ".join(commands))
+        if status == TransactionStatus.INERROR:
+            # The commands will fail: report the error right now.
+            yield from self._conn._exec_command(b"; ".join(commands))
+        else:
+            # Send the commands together with the first query of the block.
+            self._conn._tx_commands.extend(commands)
+            self._ncommands = len(commands)
+
+    def _drop_commands(self) -> bool:
+        """
+        Drop the commands to start the block if they were not sent yet.
+
+        Return `True` if they were dropped: no query was executed in the block
+        so there is nothing to terminate.
+        """
+        if not (self._ncommands and self._conn._tx_commands):
+            return False
+
+        # If some commands are still to send they are the ones of this block:
+        # the ones of the inner blocks were sent or dropped already.
+        del self._conn._tx_commands[-self._ncommands :]
+        return True
 
     def _exit_gen(
         self,
@@ -130,6 +161,8 @@ class BaseTransaction(Generic[ConnectionType]):
         assert self._conn._savepoints[-1] == self._savepoint_name
         self._conn._savepoints.pop()
         self._exited = True
+        if self._drop_commands():
+            return
 
         commands = []
         if self._savepoint_name and not self._outer_transaction:
@@ -143,7 +176,7 @@ class BaseTransaction(Generic[ConnectionType]):
             assert not self._conn._savepoints
             commands.append(b"commit")
 
-        return self._conn._exec_command(b"; ".join(commands))
+        yield from self._conn._exec_command(b"; ".join(commands))
 
     def _rollback_gen(self, exc_val: Optional[BaseException]) -> PQGen[bool]:
         if isinstance(exc_val, Rollback):
@@ -154,19 +187,20 @@ class BaseTransaction(Generic[ConnectionType]):
         assert self._conn._savepoints[-1] == self._savepoint_name
         self._conn._savepoints.pop()
 
-        commands = []
-        if self._savepoint_name and not self._outer_transaction:
-            commands.append(
-                sql.SQL("rollback to {n}; release {n}")
-                .format(n=sql.Identifier(self._savepoint_name))
-                .as_bytes(self._conn)
-            )
+        if not self._drop_commands():
+            commands = []
+            if self._savepoint_name and not self._outer_transaction:
+                commands.append(
+                    sql.SQL("rollback to {n}; release {n}")
+                    .format(n=sql.Identifier(self._savepoint_name))
+                    .as_bytes(self._conn)
+                )
 
-        if self._outer_transaction:
-            assert not self._conn._savepoints
-            commands.append(b"rollback")
+            if self._outer_transaction:
+                assert not self._conn._savepoints
+                commands.append(b"rollback")
 
-        yield from self._conn._exec_command(b"; ".join(commands))
+            yield from self._conn._exec_command(b"; ".join(commands))
 
         if isinstance(exc_val, Rollback):
             if not exc_val.transaction or exc_val.transaction is self:
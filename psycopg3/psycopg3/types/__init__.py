@@ -37,6 +37,7 @@ from .numeric import (
     FloatDumper,
     FloatBinaryDumper,
     DecimalDumper,
+    DecimalBinaryDumper,
     Int2Dumper,
     Int4Dumper,
     Int8Dumper,
@@ -54,6 +55,8 @@ from .numeric import (
     Float4BinaryLoader,
     Float8BinaryLoader,
     NumericLoader,
+    NumericBinaryLoader,
+    NumericFloatBinaryLoader,
 )
 from .singletons import (
     BoolDumper,
@@ -64,15 +67,25 @@ from .singletons import (
 )
 from .date import (
     DateDumper,
+    DateBinaryDumper,
     TimeDumper,
+    TimeBinaryDumper,
     DateTimeDumper,
+    DateTimeBinaryDumper,
     TimeDeltaDumper,
+    TimeDeltaBinaryDumper,
     DateLoader,
+    DateBinaryLoader,
     TimeLoader,
+    TimeBinaryLoader,
     TimeTzLoader,
+    TimeTzBinaryLoader,
     TimestampLoader,
+    TimestampBinaryLoader,
     TimestamptzLoader,
+    TimestamptzBinaryLoader,
     IntervalLoader,
+    IntervalBinaryLoader,
 )
 from .json import (
     JsonDumper,
@@ -114,6 +127,8 @@ from .range import (
 from .array import (
     ListDumper,
     ListBinaryDumper,
+    ArrayLoader,
+    ArrayBinaryLoader,
 )
 from .composite import (
     TupleDumper,
@@ -152,6 +167,7 @@ def register_default_globals(ctx: AdaptContext) -> None:
     Int8BinaryDumper.register(int, ctx)
     FloatBinaryDumper.register(float, ctx)
     DecimalDumper.register("decimal.Decimal", ctx)
+    DecimalBinaryDumper.register("decimal.Decimal", ctx)
     Int2Dumper.register(Int2, ctx)
     Int4Dumper.register(Int4, ctx)
     Int8Dumper.register(Int8, ctx)
@@ -173,6 +189,7 @@ def register_default_globals(ctx: AdaptContext) -> None:
     Float4BinaryLoader.register("float4", ctx)
     Float8BinaryLoader.register("float8", ctx)
     NumericLoader.register("numeric", ctx)
+    NumericBinaryLoader.register("numeric", ctx)
 
     BoolDumper.register(bool, ctx)
     BoolBinaryDumper.register(bool, ctx)
@@ -181,15 +198,25 @@ def register_default_globals(ctx: AdaptContext) -> None:
     BoolBinaryLoader.register("bool", ctx)
 
     DateDumper.register("datetime.date", ctx)
+    DateBinaryDumper.register("datetime.date", ctx)
     TimeDumper.register("datetime.time", ctx)
+    TimeBinaryDumper.register("datetime.time", ctx)
     DateTimeDumper.register("datetime.datetime", ctx)
+    DateTimeBinaryDumper.register("datetime.datetime", ctx)
     TimeDeltaDumper.register("datetime.timedelta", ctx)
+    TimeDeltaBinaryDumper.register("datetime.timedelta", ctx)
     DateLoader.register("date", ctx)
+    DateBinaryLoader.register("date", ctx)
     TimeLoader.register("time", ctx)
+    TimeBinaryLoader.register("time", ctx)
     TimeTzLoader.register("timetz", ctx)
+    TimeTzBinaryLoader.register("timetz", ctx)
     TimestampLoader.register("timestamp", ctx)
+    TimestampBinaryLoader.register("timestamp", ctx)
     TimestamptzLoader.register("timestamptz", ctx)
+    TimestamptzBinaryLoader.register("timestamptz", ctx)
     IntervalLoader.register("interval", ctx)
+    IntervalBinaryLoader.register("interval", ctx)
 
     JsonDumper.register(Json, ctx)
     JsonBinaryDumper.register(Json, ctx)
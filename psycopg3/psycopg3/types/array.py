@@ -6,11 +6,11 @@ Adapters for arrays
 
 import re
 import struct
-from typing import Any, Iterator, List, Optional, Type
+from typing import Any, Iterator, List, Optional, Tuple, Type
 
 from .. import errors as e
 from ..oids import builtins, TEXT_OID, TEXT_ARRAY_OID
-from ..adapt import Format, Dumper, Loader, Transformer
+from ..adapt import Format, Dumper, Loader, Transformer, AdaptersMap
 from ..proto import AdaptContext
 
 
@@ -95,8 +95,8 @@ class ListDumper(BaseListDumper):
 
         dump_list(obj)
 
-        if oid:
-            self.oid = self._get_array_oid(oid)
+        # The dumper can be reused: don't keep the oid of a previous dump
+        self.oid = self._get_array_oid(oid)
 
         return b"".join(tokens)
 
@@ -107,6 +107,7 @@ class ListBinaryDumper(BaseListDumper):
 
     def dump(self, obj: List[Any]) -> bytes:
         if not obj:
+            self.oid = TEXT_ARRAY_OID
             return _struct_head.pack(0, 0, TEXT_OID)
 
         data: List[bytes] = [b"", b""]  # placeholders to avoid a resize
@@ -137,6 +138,10 @@ class ListBinaryDumper(BaseListDumper):
                         data.append(ad)
                         if not oid:
                             oid = dumper.oid
+                        elif dumper.oid and dumper.oid != oid:
+                            raise e.DataError(
+                                _mixed_types_error(oid, dumper.oid)
+                            )
                     else:
                         hasnull = 1
                         data.append(b"\xff\xff\xff\xff")
@@ -160,6 +165,17 @@ class ListBinaryDumper(BaseListDumper):
         return b"".join(data)
 
 
+def _mixed_types_error(oid: int, oid2: int) -> str:
+    info = builtins.get(oid)
+    name = info.name if info else f"oid {oid}"
+    info = builtins.get(oid2)
+    name2 = info.name if info else f"oid {oid2}"
+    return (
+        f"binary lists cannot contain items of different types:"
+        f" {name} and {name2}"
+    )
+
+
 class BaseArrayLoader(Loader):
     base_oid: int
 
@@ -278,8 +294,14 @@ def register(
     if not name:
         name = f"oid{base_oid}"
 
-    for base in (ArrayLoader, ArrayBinaryLoader):
-        lname = f"{name.title()}Array{'Binary' if format else ''}Loader"
+    # Derive from the C implementation of the loaders, if available: the new
+    # classes wouldn't be recognised as optimisable by their name.
+    bases: Tuple[Type[BaseArrayLoader], ...] = (
+        AdaptersMap._get_optimised(ArrayLoader),
+        AdaptersMap._get_optimised(ArrayBinaryLoader),
+    )
+    for base in bases:
+        lname = f"{name.title()}Array{'Binary' if base.format else ''}Loader"
         loader: Type[Loader] = type(lname, (base,), {"base_oid": base_oid})
         loader.register(array_oid, context=context)
 
@@ -249,21 +249,26 @@ _struct_oidlen = struct.Struct("!Ii")
 class RecordBinaryLoader(Loader):
 
     format = Format.BINARY
-    _types_set = False
 
     def __init__(self, oid: int, context: Optional[AdaptContext] = None):
         super().__init__(oid, context)
         self._tx = Transformer(context)
+        self._oids: Tuple[int, ...] = ()
 
     def load(self, data: bytes) -> Tuple[Any, ...]:
-        if not self._types_set:
-            self._config_types(data)
-            self._types_set = True
+        fields = list(self._walk_record(data))
+
+        # The loader is shared by different queries and columns, which may
+        # contain records of different types.
+        oids = tuple(f[0] for f in fields)
+        if oids != self._oids:
+            self._tx.set_row_types(list(oids), [Format.BINARY] * len(oids))
+            self._oids = oids
 
         return self._tx.load_sequence(
             tuple(
                 data[offset : offset + length] if length != -1 else None
-                for _, offset, length in self._walk_record(data)
+                for _, offset, length in fields
             )
         )
 
@@ -278,10 +283,6 @@ class RecordBinaryLoader(Loader):
             yield oid, i + 8, length
             i += (8 + length) if length > 0 else 8
 
-    def _config_types(self, data: bytes) -> None:
-        oids = [r[0] for r in self._walk_record(data)]
-        self._tx.set_row_types(oids, [Format.BINARY] * len(oids))
-
 
 class CompositeLoader(RecordLoader):
 
@@ -6,14 +6,51 @@ Adapters for date/time types.
 
 import re
 import sys
-from datetime import date, datetime, time, timedelta
-from typing import cast, Optional
+import struct
+from datetime import date, datetime, time, timedelta, timezone, tzinfo
+from typing import Callable, cast, Optional, Tuple
 
 from ..oids import builtins
 from ..adapt import Dumper, Loader, Format
 from ..proto import AdaptContext
 from ..errors import InterfaceError, DataError
 
+_PackInt = Callable[[int], bytes]
+_UnpackInt = Callable[[bytes], Tuple[int]]
+
+_pack_int4 = cast(_PackInt, struct.Struct("!i").pack)
+_pack_int8 = cast(_PackInt, struct.Struct("!q").pack)
+_unpack_int4 = cast(_UnpackInt, struct.Struct("!i").unpack)
+_unpack_int8 = cast(_UnpackInt, struct.Struct("!q").unpack)
+
+_pack_timetz = cast(Callable[[int, int], bytes], struct.Struct("!qi").pack)
+_unpack_timetz = cast(
+    Callable[[bytes], Tuple[int, int]], struct.Struct("!qi").unpack
+)
+_pack_interval = cast(
+    Callable[[int, int, int], bytes], struct.Struct("!qii").pack
+)
+_unpack_interval = cast(
+    Callable[[bytes], Tuple[int, int, int]], struct.Struct("!qii").unpack
+)
+
+# The binary format represents dates as days since 2000-01-01 and
+# timestamps as microseconds since 2000-01-01 00:00 (UTC for timestamptz).
+_pg_date_epoch_days = date(2000, 1, 1).toordinal()
+_pg_datetime_epoch = datetime(2000, 1, 1)
+_pg_datetimetz_epoch = datetime(2000, 1, 1, tzinfo=timezone.utc)
+
+# Values representing 'infinity' and '-infinity' in the binary format
+_pg_date_infinity = 2 ** 31 - 1
+_pg_date_neg_infinity = -(2 ** 31)
+_pg_timestamp_infinity = 2 ** 63 - 1
+_pg_timestamp_neg_infinity = -(2 ** 63)
+
+_time_oid = builtins["time"].oid
+_timetz_oid = builtins["timetz"].oid
+_timestamp_oid = builtins["timestamp"].oid
+_timestamptz_oid = builtins["timestamptz"].oid
+
 
 class DateDumper(Dumper):
 
@@ -26,6 +63,15 @@ class DateDumper(Dumper):
         return str(obj).encode("utf8")
 
 
+class DateBinaryDumper(Dumper):
+
+    format = Format.BINARY
+    _oid = builtins["date"].oid
+
+    def dump(self, obj: date) -> bytes:
+        return _pack_int4(obj.toordinal() - _pg_date_epoch_days)
+
+
 class TimeDumper(Dumper):
 
     format = Format.TEXT
@@ -35,6 +81,26 @@ class TimeDumper(Dumper):
         return str(obj).encode("utf8")
 
 
+class TimeBinaryDumper(Dumper):
+
+    format = Format.BINARY
+    _oid = _timetz_oid
+
+    def dump(self, obj: time) -> bytes:
+        micros = obj.microsecond + 1_000_000 * (
+            obj.second + 60 * (obj.minute + 60 * obj.hour)
+        )
+        off = obj.utcoffset()
+
+        # The dumper can be reused: choose the oid according to the object
+        if off is None:
+            self.oid = _time_oid
+            return _pack_int8(micros)
+        else:
+            self.oid = _timetz_oid
+            return _pack_timetz(micros, -int(off.total_seconds()))
+
+
 class DateTimeDumper(Dumper):
 
     format = Format.TEXT
@@ -46,6 +112,26 @@ class DateTimeDumper(Dumper):
         return str(obj).encode("utf8")
 
 
+class DateTimeBinaryDumper(Dumper):
+
+    format = Format.BINARY
+    _oid = _timestamptz_oid
+
+    def dump(self, obj: datetime) -> bytes:
+        # Naive datetimes are dumped as timestamp, aware ones as timestamptz
+        if obj.tzinfo is None:
+            self.oid = _timestamp_oid
+            delta = obj - _pg_datetime_epoch
+        else:
+            self.oid = _timestamptz_oid
+            delta = obj - _pg_datetimetz_epoch
+
+        micros = delta.microseconds + 1_000_000 * (
+            86400 * delta.days + delta.seconds
+        )
+        return _pack_int8(micros)
+
+
 class TimeDeltaDumper(Dumper):
 
     format = Format.TEXT
@@ -54,10 +140,7 @@ class TimeDeltaDumper(Dumper):
     def __init__(self, cls: type, context: Optional[AdaptContext] = None):
         super().__init__(cls, context)
         if self.connection:
-            if (
-                self.connection.pgconn.parameter_status(b"IntervalStyle")
-                == b"sql_standard"
-            ):
+            if self.connection._session.intervalstyle == b"sql_standard":
                 setattr(self, "dump", self._dump_sql)
 
     def dump(self, obj: timedelta) -> bytes:
@@ -73,6 +156,16 @@ class TimeDeltaDumper(Dumper):
         )
 
 
+class TimeDeltaBinaryDumper(Dumper):
+
+    format = Format.BINARY
+    _oid = builtins["interval"].oid
+
+    def dump(self, obj: timedelta) -> bytes:
+        micros = 1_000_000 * obj.seconds + obj.microseconds
+        return _pack_interval(micros, obj.days, 0)
+
+
 class DateLoader(Loader):
 
     format = Format.TEXT
@@ -103,7 +196,7 @@ class DateLoader(Loader):
     def _get_datestyle(self) -> bytes:
         rv = b"ISO, DMY"
         if self.connection:
-            ds = self.connection.pgconn.parameter_status(b"DateStyle")
+            ds = self.connection._session.datestyle
             if ds:
                 rv = ds
 
@@ -133,6 +226,27 @@ class DateLoader(Loader):
         return max(map(len, parts))
 
 
+class DateBinaryLoader(Loader):
+
+    format = Format.BINARY
+
+    def load(self, data: bytes) -> date:
+        days = _unpack_int4(data)[0]
+        try:
+            return date.fromordinal(days + _pg_date_epoch_days)
+        except (ValueError, OverflowError):
+            pass
+
+        if days == _pg_date_infinity:
+            raise DataError("Python date doesn't support infinity")
+        elif days == _pg_date_neg_infinity:
+            raise DataError("Python date doesn't support -infinity")
+        elif days < 0:
+            raise DataError("Python doesn't support BC date")
+        else:
+            raise DataError("Python date doesn't support years after 9999")
+
+
 class TimeLoader(Loader):
 
     format = Format.TEXT
@@ -158,6 +272,14 @@ class TimeLoader(Loader):
         raise exc
 
 
+class TimeBinaryLoader(Loader):
+
+    format = Format.BINARY
+
+    def load(self, data: bytes) -> time:
+        return _time_from_micros(_unpack_int8(data)[0])
+
+
 class TimeTzLoader(TimeLoader):
 
     format = Format.TEXT
@@ -194,6 +316,31 @@ class TimeTzLoader(TimeLoader):
         return TimeTzLoader.load(self, data)
 
 
+class TimeTzBinaryLoader(Loader):
+
+    format = Format.BINARY
+
+    def load(self, data: bytes) -> time:
+        micros, off = _unpack_timetz(data)
+        if sys.version_info < (3, 7):
+            # Python 3.6 doesn't support seconds in the timezone offset
+            off = int(off / 60) * 60
+
+        tz = timezone(timedelta(seconds=-off))
+        return _time_from_micros(micros).replace(tzinfo=tz)
+
+
+def _time_from_micros(micros: int) -> time:
+    secs, us = divmod(micros, 1_000_000)
+    mins, s = divmod(secs, 60)
+    h, m = divmod(mins, 60)
+    try:
+        return time(h, m, s, us)
+    except ValueError:
+        # Most likely, time 24:00
+        raise DataError(f"time not supported by Python: hour={h}")
+
+
 class TimestampLoader(DateLoader):
 
     format = Format.TEXT
@@ -248,6 +395,18 @@ class TimestampLoader(DateLoader):
                 return 0
 
 
+class TimestampBinaryLoader(Loader):
+
+    format = Format.BINARY
+
+    def load(self, data: bytes) -> datetime:
+        micros = _unpack_int8(data)[0]
+        try:
+            return _pg_datetime_epoch + timedelta(microseconds=micros)
+        except OverflowError:
+            raise DataError(_timestamp_error(micros))
+
+
 class TimestamptzLoader(TimestampLoader):
 
     format = Format.TEXT
@@ -257,6 +416,13 @@ class TimestamptzLoader(TimestampLoader):
             setattr(self, "load", self._load_py36)
 
         super().__init__(oid, context)
+        # Return the values in the session timezone, as the binary format
+        # does, rather than in a timezone with the offset received.
+        self._timezone: tzinfo = (
+            self.connection._session.timezone
+            if self.connection
+            else timezone.utc
+        )
 
     def _format_from_context(self) -> str:
         ds = self._get_datestyle()
@@ -289,7 +455,7 @@ class TimestamptzLoader(TimestampLoader):
         if data[-3] in (43, 45):
             data += b"00"
 
-        return super().load(data)
+        return self._to_session_timezone(super().load(data))
 
     def _load_py36(self, data: bytes) -> datetime:
         # Drop seconds from timezone for Python 3.6
@@ -302,7 +468,16 @@ class TimestamptzLoader(TimestampLoader):
         elif data[-9] in tzsep:
             data = data[:-6] + data[-5:-3]
 
-        return super().load(data)
+        return self._to_session_timezone(super().load(data))
+
+    def _to_session_timezone(self, dt: datetime) -> datetime:
+        if dt.tzinfo is self._timezone:
+            return dt
+        try:
+            return dt.astimezone(self._timezone)
+        except OverflowError:
+            # Close to the datetime limits: keep the offset received
+            return dt
 
     def _load_notimpl(self, data: bytes) -> datetime:
         raise NotImplementedError(
@@ -311,6 +486,40 @@ class TimestamptzLoader(TimestampLoader):
         )
 
 
+class TimestamptzBinaryLoader(Loader):
+
+    format = Format.BINARY
+
+    def __init__(self, oid: int, context: Optional[AdaptContext] = None):
+        super().__init__(oid, context)
+        # The binary format doesn't carry the timezone: return the values in
+        # the session timezone, as the text format does.
+        self._timezone: tzinfo = (
+            self.connection._session.timezone
+            if self.connection
+            else timezone.utc
+        )
+
+    def load(self, data: bytes) -> datetime:
+        micros = _unpack_int8(data)[0]
+        try:
+            ts = _pg_datetimetz_epoch + timedelta(microseconds=micros)
+            return ts.astimezone(self._timezone)
+        except OverflowError:
+            raise DataError(_timestamp_error(micros))
+
+
+def _timestamp_error(micros: int) -> str:
+    if micros == _pg_timestamp_infinity:
+        return "Python datetime doesn't support infinity"
+    elif micros == _pg_timestamp_neg_infinity:
+        return "Python datetime doesn't support -infinity"
+    elif micros < 0:
+        return "Python doesn't support BC datetime"
+    else:
+        return "Python datetime doesn't support years after 9999"
+
+
 class IntervalLoader(Loader):
 
     format = Format.TEXT
@@ -332,7 +541,7 @@ class IntervalLoader(Loader):
     def __init__(self, oid: int, context: Optional[AdaptContext] = None):
         super().__init__(oid, context)
         if self.connection:
-            ints = self.connection.pgconn.parameter_status(b"IntervalStyle")
+            ints = self.connection._session.intervalstyle
             if ints != b"postgres":
                 setattr(self, "load", self._load_notimpl)
 
@@ -373,10 +582,31 @@ class IntervalLoader(Loader):
     def _load_notimpl(self, data: bytes) -> timedelta:
         ints = (
             self.connection
-            and self.connection.pgconn.parameter_status(b"IntervalStyle")
+            and self.connection._session.intervalstyle
             or b"unknown"
         )
         raise NotImplementedError(
             "can't parse interval with IntervalStyle"
             f" {ints.decode('ascii')}: {data.decode('ascii')}"
         )
+
+
+class IntervalBinaryLoader(Loader):
+
+    format = Format.BINARY
+
+    def load(self, data: bytes) -> timedelta:
+        micros, days, months = _unpack_interval(data)
+
+        # Convert months to days in the same way of the text loader
+        if months > 0:
+            years, months = divmod(months, 12)
+            days = days + 30 * months + 365 * years
+        elif months < 0:
+            years, months = divmod(-months, 12)
+            days = days - 30 * months - 365 * years
+
+        try:
+            return timedelta(days=days, microseconds=micros)
+        except OverflowError as e:
+            raise DataError(f"can't parse interval: {e}")
@@ -6,8 +6,9 @@ Adapers for numeric types.
 
 import struct
 from typing import Any, Callable, Dict, Tuple, cast
-from decimal import Decimal
+from decimal import Decimal, DecimalTuple
 
+from .. import errors as e
 from ..oids import builtins
 from ..adapt import Dumper, Loader, Format
 
@@ -28,6 +29,30 @@ _unpack_int8 = cast(_UnpackInt, struct.Struct("!q").unpack)
 _unpack_float4 = cast(_UnpackFloat, struct.Struct("!f").unpack)
 _unpack_float8 = cast(_UnpackFloat, struct.Struct("!d").unpack)
 
+_pack_numeric_head = cast(
+    Callable[[int, int, int, int], bytes], struct.Struct("!HhHH").pack
+)
+_unpack_numeric_head = cast(
+    Callable[[bytes], Tuple[int, int, int, int]],
+    struct.Struct("!HhHH").unpack_from,
+)
+
+# Values of the sign field of the numeric binary representation
+NUMERIC_POS = 0x0000
+NUMERIC_NEG = 0x4000
+NUMERIC_NAN = 0xC000
+NUMERIC_PINF = 0xD000
+NUMERIC_NINF = 0xF000
+
+# Number of decimal digits in a base 10000 digit of the binary format
+DEC_DIGITS = 4
+
+# Limits of the fields of the numeric binary representation
+NUMERIC_NDIGITS_MAX = 0xFFFF
+NUMERIC_WEIGHT_MIN = -0x8000
+NUMERIC_WEIGHT_MAX = 0x7FFF
+NUMERIC_DSCALE_MAX = 0x3FFF
+
 
 # Wrappers to force numbers to be cast as specific PostgreSQL types
 
@@ -113,6 +138,72 @@ class DecimalDumper(SpecialValuesDumper):
     }
 
 
+class DecimalBinaryDumper(Dumper):
+
+    format = Format.BINARY
+    _oid = builtins["numeric"].oid
+
+    def dump(self, obj: Decimal) -> bytes:
+        if obj.is_nan():
+            return _pack_numeric_head(0, 0, NUMERIC_NAN, 0)
+        elif obj.is_infinite():
+            return _pack_numeric_head(
+                0, 0, NUMERIC_NINF if obj.is_signed() else NUMERIC_PINF, 0
+            )
+
+        sign, digits, exp = obj.as_tuple()
+
+        # Check the limits before building the digits, which could be huge
+        if -exp > NUMERIC_DSCALE_MAX:
+            raise e.DataError(
+                f"numeric scale too large: {-exp}, max {NUMERIC_DSCALE_MAX}"
+            )
+        if obj and not (
+            NUMERIC_WEIGHT_MIN
+            <= obj.adjusted() // DEC_DIGITS
+            <= NUMERIC_WEIGHT_MAX
+        ):
+            raise e.DataError("value out of the numeric range")
+
+        # Pad the digits with zeros so that both the integer and the
+        # fractional part can be split in groups of DEC_DIGITS.
+        ds = list(digits)
+        if exp > 0:
+            ds.extend([0] * exp)
+            dscale = 0
+        else:
+            dscale = -exp
+
+        nfrac = -(-dscale // DEC_DIGITS) * DEC_DIGITS
+        ds.extend([0] * (nfrac - dscale))
+        nint = len(ds) - nfrac
+        npad = -nint if nint < 0 else -nint % DEC_DIGITS
+        ds[:0] = [0] * npad
+        nint += npad
+
+        pgdigits = [
+            ((ds[i] * 10 + ds[i + 1]) * 10 + ds[i + 2]) * 10 + ds[i + 3]
+            for i in range(0, len(ds), DEC_DIGITS)
+        ]
+
+        # Drop the zero groups: the leading ones decrease the weight
+        first = 0
+        while first < len(pgdigits) and not pgdigits[first]:
+            first += 1
+        last = len(pgdigits)
+        while last > first and not pgdigits[last - 1]:
+            last -= 1
+
+        ndigits = last - first
+        if ndigits > NUMERIC_NDIGITS_MAX:
+            raise e.DataError("too many digits for a numeric")
+        weight = nint // DEC_DIGITS - 1 - first if ndigits else 0
+        head = _pack_numeric_head(
+            ndigits, weight, NUMERIC_NEG if sign else NUMERIC_POS, dscale
+        )
+        return head + struct.pack(f"!{ndigits}H", *pgdigits[first:last])
+
+
 class Int2Dumper(NumberDumper):
     _oid = builtins["int2"].oid
 
@@ -233,3 +324,52 @@ class NumericLoader(Loader):
 
     def load(self, data: bytes) -> Decimal:
         return Decimal(data.decode("utf8"))
+
+
+class NumericBinaryLoader(Loader):
+
+    format = Format.BINARY
+
+    def load(self, data: bytes) -> Decimal:
+        return _load_numeric_binary(data)
+
+
+class NumericFloatBinaryLoader(Loader):
+    """
+    Load numeric values in binary format as `!float`, losing precision.
+    """
+
+    format = Format.BINARY
+
+    def load(self, data: bytes) -> float:
+        return float(_load_numeric_binary(data))
+
+
+_decimal_special = {
+    NUMERIC_NAN: Decimal("NaN"),
+    NUMERIC_PINF: Decimal("Infinity"),
+    NUMERIC_NINF: Decimal("-Infinity"),
+}
+
+
+def _load_numeric_binary(data: bytes) -> Decimal:
+    ndigits, weight, sign, dscale = _unpack_numeric_head(data)
+    if sign != NUMERIC_POS and sign != NUMERIC_NEG:
+        try:
+            return _decimal_special[sign]
+        except KeyError:
+            raise e.DataError(f"bad value for numeric sign: 0x{sign:X}")
+
+    val = 0
+    for d in struct.unpack_from(f"!{ndigits}H", data, 8):
+        val = val * 10000 + d
+
+    # Bring the value to the exponent -dscale: the digits dropped are zeros
+    shift = (weight + 1 - ndigits) * DEC_DIGITS + dscale
+    if shift >= 0:
+        val *= 10 ** shift
+    else:
+        val //= 10 ** -shift
+
+    digits = tuple(map(int, str(val)))
+    return Decimal(DecimalTuple(sign == NUMERIC_NEG, digits, -dscale))
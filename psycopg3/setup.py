@@ -31,6 +31,14 @@ extras_require = {
     "binary": [
         f"psycopg3-binary == {version}",
     ],
+    # Load query results into NumPy arrays
+    "numpy": [
+        "numpy",
+    ],
+    # Convert query results to Apache Arrow record batches
+    "arrow": [
+        "pyarrow",
+    ],
     "test": [
         "pytest >= 6, < 6.1",
         "pytest-asyncio >= 0.14.0, < 0.15",
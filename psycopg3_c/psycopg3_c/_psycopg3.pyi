@@ -7,13 +7,15 @@ information. Will submit a bug.
 
 # Copyright (C) 2020 The Psycopg Team
 
-from typing import Any, Iterable, List, Optional, Sequence, Tuple
+from typing import Any, Iterable, List, Optional, Sequence, Tuple, Union
 
 from psycopg3 import proto
 from psycopg3.adapt import Dumper, Loader, AdaptersMap
 from psycopg3.connection import BaseConnection
 from psycopg3.pq import Format
+from psycopg3._queries import QueryPart
 from psycopg3.pq.proto import PGconn, PGresult
+from psycopg3.proto import Row, RowMaker
 
 class Transformer(proto.AdaptContext):
     def __init__(self, context: Optional[proto.AdaptContext] = None): ...
@@ -25,6 +27,13 @@ class Transformer(proto.AdaptContext):
     def pgresult(self) -> Optional[PGresult]: ...
     @pgresult.setter
     def pgresult(self, result: Optional[PGresult]) -> None: ...
+    @property
+    def make_row(self) -> RowMaker: ...
+    @make_row.setter
+    def make_row(self, row_maker: RowMaker) -> None: ...
+    def set_pgresult(
+        self, result: Optional[PGresult], *, set_loaders: bool = True
+    ) -> None: ...
     def set_row_types(
         self, types: Sequence[int], formats: Sequence[Format]
     ) -> None: ...
@@ -32,8 +41,13 @@ class Transformer(proto.AdaptContext):
         self, params: Sequence[Any], formats: Sequence[Format]
     ) -> Tuple[List[Any], Tuple[int, ...]]: ...
     def get_dumper(self, obj: Any, format: Format) -> Dumper: ...
-    def load_rows(self, row0: int, row1: int) -> List[Tuple[Any, ...]]: ...
-    def load_row(self, row: int) -> Optional[Tuple[Any, ...]]: ...
+    def load_rows(self, row0: int, row1: int) -> List[Row]: ...
+    def load_row(self, row: int) -> Optional[Row]: ...
+    def load_columns(self, row0: int, row1: int) -> List[Sequence[Any]]: ...
+    def load_column(self, col: int, row0: int, row1: int) -> Sequence[Any]: ...
+    def copy_column(
+        self, col: int, row0: int, row1: int, data: Any, nulls: Any
+    ) -> int: ...
     def load_sequence(
         self, record: Sequence[Optional[bytes]]
     ) -> Tuple[Any, ...]: ...
@@ -42,6 +56,7 @@ class Transformer(proto.AdaptContext):
 # Generators
 def connect(conninfo: str) -> proto.PQGenConn[PGconn]: ...
 def execute(pgconn: PGconn) -> proto.PQGen[List[PGresult]]: ...
+def fetch(pgconn: PGconn) -> proto.PQGen[Optional[PGresult]]: ...
 
 # Copy support
 def format_row_text(
@@ -54,5 +69,12 @@ def parse_row_text(data: bytes, tx: proto.Transformer) -> Tuple[Any, ...]: ...
 def parse_row_binary(
     data: bytes, tx: proto.Transformer
 ) -> Tuple[Any, ...]: ...
+def split_row_binary(data: bytes) -> List[Optional[bytes]]: ...
+
+# Queries support
+def query2pg(
+    query: Union[bytes, str], encoding: str
+) -> Tuple[bytes, List[Format], Optional[List[str]], List[QueryPart]]: ...
+def split_query(query: bytes, encoding: str = "ascii") -> List[QueryPart]: ...
 
 # vim: set syntax=python:
@@ -20,8 +20,11 @@ FORMAT_BINARY = Format.BINARY
 include "_psycopg3/adapt.pyx"
 include "_psycopg3/copy.pyx"
 include "_psycopg3/generators.pyx"
+include "_psycopg3/queries.pyx"
 include "_psycopg3/transform.pyx"
 
 include "types/numeric.pyx"
+include "types/date.pyx"
 include "types/singletons.pyx"
 include "types/text.pyx"
+include "types/array.pyx"
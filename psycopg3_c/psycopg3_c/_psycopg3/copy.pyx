@@ -9,6 +9,7 @@ from libc.string cimport memcpy
 from libc.stdint cimport uint16_t, uint32_t, int32_t
 from cpython.bytearray cimport PyByteArray_FromStringAndSize, PyByteArray_Resize
 from cpython.bytearray cimport PyByteArray_AS_STRING, PyByteArray_GET_SIZE
+from cpython.bytes cimport PyBytes_FromStringAndSize
 from cpython.memoryview cimport PyMemoryView_FromObject
 
 from psycopg3_c._psycopg3 cimport endian
@@ -200,6 +201,45 @@ def parse_row_binary(data, tx: Transformer) -> Tuple[Any, ...]:
     return tx.load_sequence(row)
 
 
+def split_row_binary(data) -> List[Optional[bytes]]:
+    """
+    Split the data of a binary copy row into the data of its fields.
+
+    Unlike `parse_row_binary()` the fields are copied, so they can outlive
+    *data*.
+    """
+    cdef unsigned char *ptr
+    cdef Py_ssize_t bufsize
+    _buffer_as_string_and_size(data, <char **>&ptr, &bufsize)
+    cdef unsigned char *bufend = ptr + bufsize
+
+    cdef uint16_t benfields = (<uint16_t *>ptr)[0]
+    cdef int nfields = endian.be16toh(benfields)
+    ptr += sizeof(benfields)
+    cdef list row = PyList_New(nfields)
+
+    cdef int col
+    cdef int32_t belength
+    cdef Py_ssize_t length
+
+    for col in range(nfields):
+        memcpy(&belength, ptr, sizeof(belength))
+        ptr += sizeof(belength)
+        if belength == _binary_null:
+            field = None
+        else:
+            length = endian.be32toh(belength)
+            if ptr + length > bufend:
+                raise e.DataError("bad copy data: length exceeding data")
+            field = PyBytes_FromStringAndSize(<char *>ptr, length)
+            ptr += length
+
+        Py_INCREF(field)
+        PyList_SET_ITEM(row, col, field)
+
+    return row
+
+
 def parse_row_text(data, tx: Transformer) -> Tuple[Any, ...]:
     cdef unsigned char *fstart
     cdef Py_ssize_t size
@@ -7,7 +7,7 @@ C implementation of generators for the communication protocols with the libpq
 from cpython.object cimport PyObject_CallFunctionObjArgs
 
 import logging
-from typing import List
+from typing import List, Optional
 
 from psycopg3 import errors as e
 from psycopg3.pq import proto, error_message, PQerror
@@ -133,3 +133,56 @@ def execute(pq.PGconn pgconn) -> PQGen[List[proto.PGresult]]:
             break
 
     return results
+
+
+def fetch(pq.PGconn pgconn) -> PQGen[Optional[proto.PGresult]]:
+    """
+    Generator retrieving a single result from the database without blocking.
+
+    The query must have already been sent to the server, so pgconn.flush() has
+    already returned 0.
+
+    Return a result from the database (whether success or error), or `!None`
+    if there are no more results for the current query.
+    """
+    cdef libpq.PGconn *pgconn_ptr = pgconn.pgconn_ptr
+    cdef libpq.PGnotify *notify
+    cdef libpq.PGresult *pgres
+    cdef int cires, ibres
+
+    # Use the data already received before reading more: in single row mode,
+    # reading at every result would shift the whole input buffer each time.
+    while libpq.PQisBusy(pgconn_ptr):
+        with nogil:
+            cires = libpq.PQconsumeInput(pgconn_ptr)
+            if cires == 1:
+                ibres = libpq.PQisBusy(pgconn_ptr)
+
+        if 1 != cires:
+            raise PQerror(
+                f"consuming input failed: {error_message(pgconn)}")
+        if not ibres:
+            break
+        yield WAIT_R
+
+    # Consume notifies
+    cdef object notify_handler = pgconn.notify_handler
+    if notify_handler is not None:
+        while 1:
+            pynotify = pgconn.notifies()
+            if pynotify is None:
+                break
+            PyObject_CallFunctionObjArgs(
+                notify_handler, <PyObject *>pynotify, NULL
+            )
+    else:
+        while 1:
+            notify = libpq.PQnotifies(pgconn_ptr)
+            if notify is NULL:
+                break
+            libpq.PQfreemem(notify)
+
+    pgres = libpq.PQgetResult(pgconn_ptr)
+    if pgres is NULL:
+        return None
+    return pq.PGresult._from_ptr(pgres)
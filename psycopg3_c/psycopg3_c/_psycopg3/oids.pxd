@@ -99,3 +99,6 @@ cdef enum:
     XID8_OID = 5069
     XML_OID = 142
     # autogenerated: end
+
+    # A few array oids used in the adapters
+    TEXT_ARRAY_OID = 1009
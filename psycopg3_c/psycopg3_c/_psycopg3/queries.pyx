@@ -0,0 +1,189 @@
+"""
+C optimised functions to convert queries to the PostgreSQL format.
+
+"""
+
+# Copyright (C) 2020 The Psycopg Team
+
+from cpython.bytes cimport PyBytes_AS_STRING, PyBytes_GET_SIZE
+from cpython.bytes cimport PyBytes_FromStringAndSize, PyBytes_FromFormat
+
+from psycopg3 import errors as e
+
+# The QueryPart class, imported on first use: psycopg3._queries cannot be
+# imported while this module is being imported.
+cdef object QueryPart = None
+
+
+def query2pg(query, str encoding):
+    """
+    Convert Python query and params into something Postgres understands.
+
+    Return ``query`` (bytes), ``formats`` (list of formats), ``order``
+    (sequence of names used in the query, in the position they appear)
+    ``parts`` (splits of queries and placeholders).
+    """
+    if isinstance(query, str):
+        query = query.encode(encoding)
+    if not isinstance(query, bytes):
+        # encoding from str already happened
+        raise TypeError(
+            f"the query should be str or bytes,"
+            f" got {type(query).__name__} instead"
+        )
+
+    cdef list parts = split_query(query, encoding)
+    cdef object order = None
+    cdef list chunks = []
+    cdef list formats = []
+    cdef dict seen
+    cdef Py_ssize_t i, nparts = len(parts) - 1
+
+    if nparts and isinstance(parts[0].item, int):
+        for i in range(nparts):
+            pre, item, format = parts[i]
+            chunks.append(pre)
+            chunks.append(PyBytes_FromFormat("$%zd", i + 1))
+            formats.append(format)
+
+    elif nparts:
+        seen = {}
+        order = []
+        for i in range(nparts):
+            pre, item, format = parts[i]
+            chunks.append(pre)
+            if item not in seen:
+                ph = PyBytes_FromFormat("$%zd", len(seen) + 1)
+                seen[item] = (ph, format)
+                order.append(item)
+                chunks.append(ph)
+                formats.append(format)
+            else:
+                if seen[item][1] != format:
+                    raise e.ProgrammingError(
+                        f"placeholder '{item}' cannot have"
+                        f" different formats"
+                    )
+                chunks.append(seen[item][0])
+
+    # last part
+    chunks.append(parts[nparts].pre)
+
+    return b"".join(chunks), formats, order, parts
+
+
+def split_query(bytes query, str encoding = "ascii") -> list:
+    """
+    Split a query into the parts preceding each placeholder.
+
+    Parse the placeholders ``%s``, ``%b``, ``%(name)s``, ``%(name)b`` and the
+    escape ``%%`` in a single pass, with the same rules of the Python
+    implementation.
+    """
+    global QueryPart
+    if QueryPart is None:
+        from psycopg3._queries import QueryPart
+
+    cdef const char *buf = PyBytes_AS_STRING(query)
+    cdef Py_ssize_t size = PyBytes_GET_SIZE(query)
+    cdef Py_ssize_t i = 0  # position in the query
+    cdef Py_ssize_t start = 0  # start of the current part
+    cdef Py_ssize_t end  # end of the current placeholder
+    cdef Py_ssize_t j
+    cdef char c
+    cdef list rv = []
+    cdef list pre = []  # chunks of the current part, if split by '%%'
+    cdef object phtype = None
+    cdef object item
+    cdef bytes ph
+
+    while i < size:
+        if buf[i] != b'%':
+            i += 1
+            continue
+
+        # A '%' at the end of the string or of a line is not a placeholder
+        if i + 1 >= size or buf[i + 1] == b'\n':
+            i += 1
+            continue
+
+        c = buf[i + 1]
+        if c == b'%':
+            # unescape '%%' to '%' and merge the parts
+            pre.append(query[start:i + 1])
+            i = start = i + 2
+            continue
+
+        end = i + 2
+        item = None
+        if c == b'(':
+            # Look for a name in braces followed by a format
+            j = i + 2
+            while j < size and buf[j] != b')':
+                j += 1
+            if j > i + 2 and j + 1 < size and buf[j + 1] != b'\n':
+                item = query[i + 2:j].decode(encoding)
+                end = j + 2
+
+        ph = PyBytes_FromStringAndSize(buf + i, end - i)
+        if item is None and c == b'(':
+            raise e.ProgrammingError(
+                f"incomplete placeholder:"
+                f" '{query[i:].split()[0].decode(encoding)}'"
+            )
+        elif c == b' ':
+            # explicit messasge for a typical error
+            raise e.ProgrammingError(
+                "incomplete placeholder: '%'; if you want to use '%' as an"
+                " operator you can double it up, i.e. use '%%'"
+            )
+        elif buf[end - 1] != b's' and buf[end - 1] != b'b':
+            raise e.ProgrammingError(
+                f"only '%s' and '%b' placeholders allowed, got"
+                f" {ph.decode(encoding)}"
+            )
+
+        # Index or name
+        if item is None:
+            item = len(rv)
+
+        if phtype is None:
+            phtype = type(item)
+        elif phtype is not type(item):
+            raise e.ProgrammingError(
+                "positional and named placeholders cannot be mixed"
+            )
+
+        rv.append(_new_part(
+            _get_pre(query, pre, start, i), item,
+            FORMAT_BINARY if buf[end - 1] == b'b' else FORMAT_TEXT))
+        i = start = end
+
+    # last part
+    rv.append(_new_part(_get_pre(query, pre, start, size), 0, FORMAT_TEXT))
+    return rv
+
+
+cdef bytes _get_pre(bytes query, list pre, Py_ssize_t start, Py_ssize_t end):
+    """Return the part of the query before a placeholder."""
+    if not pre:
+        return query[start:end]
+
+    # The part was split by '%%' escapes
+    pre.append(query[start:end])
+    rv = b"".join(pre)
+    del pre[:]
+    return rv
+
+
+cdef object _new_part(bytes pre, object item, object format):
+    # Same as QueryPart(pre, item, format), without calling __new__
+    cdef object rv = (<_TypeAlloc *><PyObject *>QueryPart).tp_alloc(
+        <_TypeAlloc *><PyObject *>QueryPart, 3)
+    Py_INCREF(pre)
+    PyTuple_SET_ITEM(rv, 0, pre)
+    Py_INCREF(item)
+    PyTuple_SET_ITEM(rv, 1, item)
+    Py_INCREF(format)
+    PyTuple_SET_ITEM(rv, 2, format)
+    return rv
@@ -8,16 +8,29 @@ too many temporary Python objects and performing less memory copying.
 
 # Copyright (C) 2020 The Psycopg Team
 
+from libc.string cimport memcpy, memset
+from libc.stdint cimport uint16_t, uint32_t, uint64_t
+from cpython cimport array
 from cpython.ref cimport Py_INCREF
-from cpython.dict cimport PyDict_GetItem, PyDict_SetItem
+from cpython.buffer cimport (
+    PyObject_GetBuffer, PyBuffer_Release, PyBUF_CONTIG)
+from cpython.dict cimport PyDict_New, PyDict_GetItem, PyDict_SetItem
 from cpython.list cimport (
-    PyList_New, PyList_GET_ITEM, PyList_SET_ITEM, PyList_GET_SIZE)
-from cpython.tuple cimport PyTuple_New, PyTuple_SET_ITEM
-from cpython.object cimport PyObject, PyObject_CallFunctionObjArgs
+    PyList_New, PyList_GET_ITEM, PyList_SET_ITEM, PyList_SetItem,
+    PyList_GET_SIZE)
+from cpython.tuple cimport PyTuple_New, PyTuple_GET_ITEM, PyTuple_SET_ITEM
+from cpython.object cimport (
+    PyObject, PyObject_Call, PyObject_CallObject, PyObject_CallFunctionObjArgs)
 
 from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
 
+from psycopg3_c._psycopg3 cimport endian
+
 from psycopg3 import errors as e
+from psycopg3.proto import Row, RowMaker
+from psycopg3.rows import (
+    ArgsRowMaker, DictRowMaker, KwargsRowMaker, LazyRowMaker,
+    NamedTupleRowMaker)
 
 
 # internal structure: you are not supposed to know this. But it's worth some
@@ -36,6 +49,29 @@ ctypedef struct pg_result_int:
     # ...more members, which we ignore
 
 
+cdef extern from "Python.h":
+    # Allow to create instances of tuple subclasses without calling __new__
+    ctypedef struct _TypeAlloc "PyTypeObject":
+        object (*tp_alloc)(_TypeAlloc *type, Py_ssize_t nitems)
+
+
+# How the rows are built, according to the make_row function. The kinds
+# following _ROW_ARGS need to call a Python function on the record built.
+# _ROW_LAZY rows are created without loading any value.
+cdef enum:
+    _ROW_TUPLE = 0
+    _ROW_NAMEDTUPLE = 1
+    _ROW_DICT = 2
+    _ROW_ARGS = 3
+    _ROW_KWARGS = 4
+    _ROW_OTHER = 5
+    _ROW_LAZY = 6
+
+
+# Max number of result signatures whose row loaders are cached
+cdef Py_ssize_t _MAX_ROW_SIGNATURES = 256
+
+
 cdef class RowLoader:
     cdef object pyloader
     cdef CLoader cloader
@@ -48,6 +84,10 @@ cdef class Transformer:
     The life cycle of the object is the query, so it is assumed that stuff like
     the server version or connection encoding will not change. It can have its
     state so adapting several values of the same type can use optimisations.
+
+    The adapters instances are shared with the other Transformers of the same
+    connection, as long as the adapters and the connection configuration don't
+    change.
     """
 
     cdef readonly object connection
@@ -59,8 +99,16 @@ cdef class Transformer:
     cdef pq.PGresult _pgresult
     cdef int _nfields, _ntuples
     cdef list _row_loaders
+    cdef dict _row_loaders_cache
+    cdef object _adapt_cache
     cdef int _unknown_oid
 
+    cdef object _make_row
+    cdef int _row_kind
+    cdef int _row_nfields
+    cdef tuple _row_names
+    cdef object _row_func
+
     def __cinit__(self, context: Optional["AdaptContext"] = None):
         self._unknown_oid = oids.INVALID_OID
         if context is not None:
@@ -75,16 +123,33 @@ cdef class Transformer:
             self.adapters = global_adapters
             self.connection = None
 
-        # mapping class -> Dumper instance (text, binary)
-        self._text_dumpers = {}
-        self._binary_dumpers = {}
+        # Share the adapters already created by the connection, if possible.
+        # Don't share them with the Transformers of the adapters themselves,
+        # which would create a loop.
+        cache = None
+        if self.connection is not None and not isinstance(context, Transformer):
+            cache = self.connection._get_adapt_cache(self.adapters)
+        self._adapt_cache = cache
+
+        if cache is not None:
+            self._text_dumpers, self._binary_dumpers = cache.dumpers
+            self._text_loaders, self._binary_loaders = cache.loaders
+            self._row_loaders_cache = cache.row_loaders
+        else:
+            # mapping class -> Dumper instance (text, binary)
+            self._text_dumpers = {}
+            self._binary_dumpers = {}
+
+            # mapping oid -> Loader instance (text, binary)
+            self._text_loaders = {}
+            self._binary_loaders = {}
 
-        # mapping oid -> Loader instance (text, binary)
-        self._text_loaders = {}
-        self._binary_loaders = {}
+            # mapping result signature -> list of RowLoader
+            self._row_loaders_cache = {}
 
         self.pgresult = None
         self._row_loaders = []
+        self.make_row = tuple
 
     @property
     def pgresult(self) -> Optional[PGresult]:
@@ -94,7 +159,75 @@ cdef class Transformer:
     def pgresult(self, result: Optional[PGresult]) -> None:
         self.set_pgresult(result)
 
-    cdef void set_pgresult(self, pq.PGresult result):
+    @property
+    def make_row(self) -> RowMaker:
+        return self._make_row
+
+    @make_row.setter
+    def make_row(self, row_maker: RowMaker) -> None:
+        self._make_row = row_maker
+        self._row_names = None
+        self._row_func = None
+        self._row_nfields = -1
+
+        # Recognise the row makers whose rows can be built directly
+        cls = type(row_maker)
+        if row_maker is tuple:
+            self._row_kind = _ROW_TUPLE
+        elif cls is DictRowMaker:
+            self._row_kind = _ROW_DICT
+            self._row_names = tuple(row_maker.names)
+            self._row_nfields = len(self._row_names)
+        elif cls is NamedTupleRowMaker and issubclass(row_maker.cls, tuple):
+            self._row_kind = _ROW_NAMEDTUPLE
+            self._row_func = row_maker.cls
+            self._row_nfields = len(row_maker.cls._fields)
+        elif cls is ArgsRowMaker:
+            self._row_kind = _ROW_ARGS
+            self._row_func = row_maker.func
+        elif cls is KwargsRowMaker:
+            self._row_kind = _ROW_KWARGS
+            self._row_func = row_maker.func
+            self._row_names = tuple(row_maker.names)
+            self._row_nfields = len(self._row_names)
+        elif cls is LazyRowMaker:
+            self._row_kind = _ROW_LAZY
+            self._row_func = row_maker.make
+            self._row_nfields = len(row_maker.names)
+        else:
+            self._row_kind = _ROW_OTHER
+
+    cdef int _c_row_kind(self):
+        # If the row maker was created for a result of a different shape
+        # building the row directly is not safe: let it complain.
+        if self._row_nfields >= 0 and self._row_nfields != self._nfields:
+            return _ROW_OTHER
+        return self._row_kind
+
+    cdef object _new_record(self, int kind):
+        if kind == _ROW_DICT or kind == _ROW_KWARGS:
+            return PyDict_New()
+        elif kind == _ROW_NAMEDTUPLE:
+            # Same as tuple.__new__(cls, ...), without the intermediate tuple
+            return (<_TypeAlloc *><PyObject *>self._row_func).tp_alloc(
+                <_TypeAlloc *><PyObject *>self._row_func, self._nfields)
+        else:
+            return PyTuple_New(self._nfields)
+
+    cdef object _finish_record(self, int kind, object record):
+        if kind == _ROW_ARGS:
+            return PyObject_CallObject(self._row_func, record)
+        elif kind == _ROW_KWARGS:
+            return PyObject_Call(self._row_func, (), record)
+        elif kind == _ROW_OTHER:
+            return PyObject_CallFunctionObjArgs(
+                self._make_row, <PyObject *>record, NULL)
+        else:
+            return record
+
+    def set_pgresult(
+        self, pq.PGresult result, *, bint set_loaders = True
+    ) -> None:
         self._pgresult = result
 
         if result is None:
@@ -105,20 +238,33 @@ cdef class Transformer:
         self._nfields = libpq.PQnfields(res)
         self._ntuples = libpq.PQntuples(res)
 
+        if not set_loaders:
+            return
+
+        # The oids of the columns followed by their formats
         cdef int i
         cdef object tmp
-        cdef list types = PyList_New(self._nfields)
-        cdef list formats = PyList_New(self._nfields)
-        for i in range(self._nfields):
+        cdef int nf = self._nfields
+        cdef tuple sig = PyTuple_New(2 * nf)
+        for i in range(nf):
             tmp = libpq.PQftype(res, i)
             Py_INCREF(tmp)
-            PyList_SET_ITEM(types, i, tmp)
+            PyTuple_SET_ITEM(sig, i, tmp)
 
             tmp = libpq.PQfformat(res, i)
             Py_INCREF(tmp)
-            PyList_SET_ITEM(formats, i, tmp)
+            PyTuple_SET_ITEM(sig, nf + i, tmp)
 
-        self._c_set_row_types(self._nfields, types, formats)
+        cdef PyObject *ptr = PyDict_GetItem(self._row_loaders_cache, sig)
+        if ptr != NULL:
+            self._row_loaders = <list>ptr
+            return
+
+        self._c_set_row_types(nf, list(sig[:nf]), list(sig[nf:]))
+
+        if len(self._row_loaders_cache) >= _MAX_ROW_SIGNATURES:
+            self._row_loaders_cache.clear()
+        PyDict_SetItem(self._row_loaders_cache, sig, self._row_loaders)
 
     def set_row_types(self,
             types: Sequence[int], formats: Sequence[Format]) -> None:
@@ -219,7 +365,7 @@ cdef class Transformer:
 
         return ps, ts
 
-    def load_rows(self, int row0, int row1) -> List[Tuple[Any, ...]]:
+    def load_rows(self, int row0, int row1) -> List[Row]:
         if self._pgresult is None:
             raise e.InterfaceError("result not set")
 
@@ -238,51 +384,76 @@ cdef class Transformer:
         cdef const char *val
         cdef object record  # not 'tuple' as it would check on assignment
 
+        cdef int kind = self._c_row_kind()
+        cdef bint as_dict = kind == _ROW_DICT or kind == _ROW_KWARGS
+        cdef tuple names = self._row_names
+
         cdef object records = PyList_New(row1 - row0)
+        if kind == _ROW_LAZY:
+            for row in range(row0, row1):
+                record = self._row_func(self._pgresult, row)
+                Py_INCREF(record)
+                PyList_SET_ITEM(records, row - row0, record)
+            return records
+
         for row in range(row0, row1):
-            record = PyTuple_New(self._nfields)
+            record = self._new_record(kind)
             Py_INCREF(record)
             PyList_SET_ITEM(records, row - row0, record)
 
         cdef PyObject *loader  # borrowed RowLoader
         cdef PyObject *brecord  # borrowed
+        cdef PyObject *name  # borrowed
         row_loaders = self._row_loaders  # avoid an incref/decref per item
 
         for col in range(self._nfields):
             loader = PyList_GET_ITEM(row_loaders, col)
+            if as_dict:
+                name = PyTuple_GET_ITEM(names, col)
             if (<RowLoader>loader).cloader is not None:
                 for row in range(row0, row1):
                     brecord = PyList_GET_ITEM(records, row - row0)
                     attval = &(ires.tuples[row][col])
                     if attval.len == -1:  # NULL_LEN
-                        Py_INCREF(None)
-                        PyTuple_SET_ITEM(<object>brecord, col, None)
-                        continue
+                        pyval = None
+                    else:
+                        pyval = (<RowLoader>loader).cloader.cload(
+                            attval.value, attval.len)
 
-                    pyval = (<RowLoader>loader).cloader.cload(
-                        attval.value, attval.len)
-                    Py_INCREF(pyval)
-                    PyTuple_SET_ITEM(<object>brecord, col, pyval)
+                    if as_dict:
+                        PyDict_SetItem(<object>brecord, <object>name, pyval)
+                    else:
+                        Py_INCREF(pyval)
+                        PyTuple_SET_ITEM(<object>brecord, col, pyval)
 
             else:
                 for row in range(row0, row1):
                     brecord = PyList_GET_ITEM(records, row - row0)
                     attval = &(ires.tuples[row][col])
                     if attval.len == -1:  # NULL_LEN
-                        Py_INCREF(None)
-                        PyTuple_SET_ITEM(<object>brecord, col, None)
-                        continue
-
-                    # TODO: no copy
-                    b = attval.value[:attval.len]
-                    pyval = PyObject_CallFunctionObjArgs(
-                        (<RowLoader>loader).pyloader, <PyObject *>b, NULL)
-                    Py_INCREF(pyval)
-                    PyTuple_SET_ITEM(<object>brecord, col, pyval)
+                        pyval = None
+                    else:
+                        # TODO: no copy
+                        b = attval.value[:attval.len]
+                        pyval = PyObject_CallFunctionObjArgs(
+                            (<RowLoader>loader).pyloader, <PyObject *>b, NULL)
+
+                    if as_dict:
+                        PyDict_SetItem(<object>brecord, <object>name, pyval)
+                    else:
+                        Py_INCREF(pyval)
+                        PyTuple_SET_ITEM(<object>brecord, col, pyval)
+
+        if kind >= _ROW_ARGS:
+            for row in range(row1 - row0):
+                record = self._finish_record(
+                    kind, <object>PyList_GET_ITEM(records, row))
+                Py_INCREF(record)
+                PyList_SetItem(records, row, record)
 
         return records
 
-    def load_row(self, int row) -> Optional[Tuple[Any, ...]]:
+    def load_row(self, int row) -> Optional[Row]:
         if self._pgresult is None:
             return None
 
@@ -299,30 +470,182 @@ cdef class Transformer:
         cdef const char *val
         cdef object record  # not 'tuple' as it would check on assignment
 
-        record = PyTuple_New(self._nfields)
+        cdef int kind = self._c_row_kind()
+        if kind == _ROW_LAZY:
+            return self._row_func(self._pgresult, row)
+
+        cdef bint as_dict = kind == _ROW_DICT or kind == _ROW_KWARGS
+        cdef tuple names = self._row_names
+
+        record = self._new_record(kind)
         row_loaders = self._row_loaders  # avoid an incref/decref per item
 
         for col in range(self._nfields):
             attval = &(ires.tuples[row][col])
             if attval.len == -1:  # NULL_LEN
-                Py_INCREF(None)
-                PyTuple_SET_ITEM(record, col, None)
-                continue
+                pyval = None
+            else:
+                val = attval.value
+                loader = PyList_GET_ITEM(row_loaders, col)
+                if (<RowLoader>loader).cloader is not None:
+                    pyval = (<RowLoader>loader).cloader.cload(val, attval.len)
+                else:
+                    # TODO: no copy
+                    b = val[:attval.len]
+                    pyval = PyObject_CallFunctionObjArgs(
+                        (<RowLoader>loader).pyloader, <PyObject *>b, NULL)
 
-            val = attval.value
-            loader = PyList_GET_ITEM(row_loaders, col)
-            if (<RowLoader>loader).cloader is not None:
-                pyval = (<RowLoader>loader).cloader.cload(val, attval.len)
+            if as_dict:
+                PyDict_SetItem(
+                    record, <object>PyTuple_GET_ITEM(names, col), pyval)
+            else:
+                Py_INCREF(pyval)
+                PyTuple_SET_ITEM(record, col, pyval)
+
+        if kind >= _ROW_ARGS:
+            record = self._finish_record(kind, record)
+        return record
+
+    def load_columns(self, int row0, int row1) -> List[Sequence[Any]]:
+        if self._pgresult is None:
+            raise e.InterfaceError("result not set")
+
+        if not (0 <= row0 <= self._ntuples and 0 <= row1 <= self._ntuples):
+            raise e.InterfaceError(
+                f"rows must be included between 0 and {self._ntuples}"
+            )
+
+        cdef int col
+        cdef object columns = PyList_New(self._nfields)
+        for col in range(self._nfields):
+            column = self._load_column(col, row0, row1)
+            Py_INCREF(column)
+            PyList_SET_ITEM(columns, col, column)
+
+        return columns
+
+    def load_column(self, int col, int row0, int row1) -> Sequence[Any]:
+        self._check_column_args(col, row0, row1)
+        return self._load_column(col, row0, row1)
+
+    cdef int _check_column_args(self, int col, int row0, int row1) except -1:
+        if self._pgresult is None:
+            raise e.InterfaceError("result not set")
+
+        if not (0 <= row0 <= self._ntuples and 0 <= row1 <= self._ntuples):
+            raise e.InterfaceError(
+                f"rows must be included between 0 and {self._ntuples}"
+            )
+        if not 0 <= col < self._nfields:
+            raise e.InterfaceError(
+                f"column must be included between 0 and {self._nfields}"
+            )
+        return 0
+
+    cdef object _load_column(self, int col, int row0, int row1):
+        cdef libpq.PGresult *res = self._pgresult.pgresult_ptr
+        # cheeky access to the internal PGresult structure
+        cdef pg_result_int *ires = <pg_result_int*>res
+
+        cdef int row
+        cdef PGresAttValue *attval
+        cdef RowLoader loader = self._row_loaders[col]
+
+        if loader.cloader is not None:
+            typecode = _array_typecodes.get(type(loader.cloader))
+            if typecode is not None:
+                column = self._load_array_column(
+                    ires, col, row0, row1, typecode)
+                if column is not None:
+                    return column
+
+        column = PyList_New(row1 - row0)
+        for row in range(row0, row1):
+            attval = &(ires.tuples[row][col])
+            if attval.len == -1:  # NULL_LEN
+                pyval = None
+            elif loader.cloader is not None:
+                pyval = loader.cloader.cload(attval.value, attval.len)
             else:
                 # TODO: no copy
-                b = val[:attval.len]
+                b = attval.value[:attval.len]
                 pyval = PyObject_CallFunctionObjArgs(
-                    (<RowLoader>loader).pyloader, <PyObject *>b, NULL)
+                    loader.pyloader, <PyObject *>b, NULL)
 
             Py_INCREF(pyval)
-            PyTuple_SET_ITEM(record, col, pyval)
+            PyList_SET_ITEM(column, row - row0, pyval)
 
-        return record
+        return column
+
+    def copy_column(
+        self, int col, int row0, int row1, data: Any, nulls: Any
+    ) -> int:
+        self._check_column_args(col, row0, row1)
+
+        cdef libpq.PGresult *res = self._pgresult.pgresult_ptr
+        # cheeky access to the internal PGresult structure
+        cdef pg_result_int *ires = <pg_result_int*>res
+
+        cdef Py_ssize_t nrows = max(row1 - row0, 0)
+        cdef Py_buffer dview, nview
+        _get_writable(data, &dview, nrows, "data")
+        try:
+            _get_writable(nulls, &nview, nrows, "nulls")
+        except:
+            PyBuffer_Release(&dview)
+            raise
+
+        try:
+            if nview.itemsize != 1:
+                raise ValueError("nulls items must be 1 byte long")
+            return _copy_column(
+                ires, col, row0, row1,
+                <char *>dview.buf, dview.itemsize, <char *>nview.buf)
+        finally:
+            PyBuffer_Release(&nview)
+            PyBuffer_Release(&dview)
+
+    cdef object _load_array_column(
+        self, pg_result_int *ires, int col, int row0, int row1, str typecode
+    ):
+        """
+        Copy a column of fixed-size binary values into an `array.array`.
+
+        Return `!None` if the column contains nulls or unexpected values.
+        """
+        cdef array.array arr = array.clone(
+            array.array(typecode), row1 - row0, zero=False)
+        cdef int size = arr.ob_descr.itemsize
+        cdef char *buf = arr.data.as_chars
+        cdef PGresAttValue *attval
+        cdef uint16_t v16
+        cdef uint32_t v32
+        cdef uint64_t v64
+        cdef int row
+
+        for row in range(row0, row1):
+            attval = &(ires.tuples[row][col])
+            if attval.len != size:  # NULL_LEN included
+                return None
+
+            # Values in the result are not aligned: copy them to convert them
+            if size == 2:
+                memcpy(&v16, attval.value, 2)
+                v16 = endian.be16toh(v16)
+                memcpy(buf, &v16, 2)
+            elif size == 4:
+                memcpy(&v32, attval.value, 4)
+                v32 = endian.be32toh(v32)
+                memcpy(buf, &v32, 4)
+            elif size == 8:
+                memcpy(&v64, attval.value, 8)
+                v64 = endian.be64toh(v64)
+                memcpy(buf, &v64, 8)
+            else:
+                return None
+            buf += size
+
+        return arr
 
     cpdef object load_sequence(self, record: Sequence[Optional[bytes]]):
         cdef int nfields = len(record)
@@ -366,7 +689,7 @@ cdef class Transformer:
         cdef PyObject *cache
 
         cache = <PyObject *>(
-            self._binary_loaders if <object>fmt == 0 else self._text_loaders)
+            self._text_loaders if <object>fmt == 0 else self._binary_loaders)
         ptr = PyDict_GetItem(<object>cache, <object>oid)
         if ptr != NULL:
             return <object>ptr
@@ -381,3 +704,71 @@ cdef class Transformer:
             loader_cls, oid, <PyObject *>self, NULL)
         PyDict_SetItem(<object>cache, <object>oid, loader)
         return loader
+
+
+cdef int _get_writable(
+    obj, Py_buffer *view, Py_ssize_t nitems, str name
+) except -1:
+    try:
+        PyObject_GetBuffer(obj, view, PyBUF_CONTIG)
+    except (TypeError, BufferError):
+        raise ValueError(f"{name} must be a writable contiguous buffer")
+
+    if view.len != nitems * view.itemsize:
+        PyBuffer_Release(view)
+        raise ValueError(
+            f"{name} must contain {nitems} items,"
+            f" got {view.len // view.itemsize}"
+        )
+    return 0
+
+
+cdef int _copy_column(
+    pg_result_int *ires, int col, int row0, int row1,
+    char *buf, Py_ssize_t size, char *nulls
+) except -1:
+    """
+    Copy the binary values of a column into *buf*, in native byte order.
+
+    Set the items of *nulls* to 1 for the NULL values, 0 otherwise.
+    Return the number of NULLs.
+    """
+    cdef PGresAttValue *attval
+    cdef uint16_t v16
+    cdef uint32_t v32
+    cdef uint64_t v64
+    cdef int row
+    cdef int nnulls = 0
+
+    for row in range(row0, row1):
+        attval = &(ires.tuples[row][col])
+        if attval.len == -1:  # NULL_LEN
+            nnulls += 1
+            nulls[0] = 1
+            memset(buf, 0, size)
+        elif attval.len != size:
+            raise e.DataError(
+                f"cannot copy a value of {attval.len} bytes"
+                f" into items of {size} bytes"
+            )
+        else:
+            nulls[0] = 0
+            # Values in the result are not aligned: copy them to convert them
+            if size == 2:
+                memcpy(&v16, attval.value, 2)
+                v16 = endian.be16toh(v16)
+                memcpy(buf, &v16, 2)
+            elif size == 4:
+                memcpy(&v32, attval.value, 4)
+                v32 = endian.be32toh(v32)
+                memcpy(buf, &v32, 4)
+            elif size == 8:
+                memcpy(&v64, attval.value, 8)
+                v64 = endian.be64toh(v64)
+                memcpy(buf, &v64, 8)
+            else:
+                memcpy(buf, attval.value, size)
+        buf += size
+        nulls += 1
+
+    return nnulls
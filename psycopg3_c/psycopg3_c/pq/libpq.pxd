@@ -91,6 +91,13 @@ cdef extern from "libpq-fe.h":
         PGRES_FATAL_ERROR
         PGRES_COPY_BOTH
         PGRES_SINGLE_TUPLE
+        PGRES_PIPELINE_SYNC
+        PGRES_PIPELINE_ABORTED
+
+    ctypedef enum PGpipelineStatus:
+        PQ_PIPELINE_OFF
+        PQ_PIPELINE_ON
+        PQ_PIPELINE_ABORTED
 
     # 33.1. Database Connection Control Functions
     PGconn *PQconnectdb(const char *conninfo)
@@ -230,6 +237,16 @@ cdef extern from "libpq-fe.h":
     int PQisnonblocking(const PGconn *conn)
     int PQflush(PGconn *conn)
 
+    # 33.5. Retrieving Query Results Row-by-Row
+    int PQsetSingleRowMode(PGconn *conn)
+
+    # 34.5. Pipeline Mode (from PostgreSQL 14 documentation)
+    PGpipelineStatus PQpipelineStatus(const PGconn *conn)
+    int PQenterPipelineMode(PGconn *conn)
+    int PQexitPipelineMode(PGconn *conn)
+    int PQpipelineSync(PGconn *conn)
+    int PQsendFlushRequest(PGconn *conn)
+
     # 33.6. Canceling Queries in Progress
     PGcancel *PQgetCancel(PGconn *conn)
     void PQfreeCancel(PGcancel *cancel)
@@ -254,3 +271,23 @@ cdef extern from "libpq-fe.h":
     ctypedef void (*PQnoticeReceiver)(void *arg, const PGresult *res)
     PQnoticeReceiver PQsetNoticeReceiver(
         PGconn *conn, PQnoticeReceiver prog, void *arg)
+
+
+cdef extern from *:
+    """
+/* Allow building with a libpq older than 14: the functions will fail */
+#ifndef LIBPQ_HAS_PIPELINING
+#define PGRES_PIPELINE_SYNC 10
+#define PGRES_PIPELINE_ABORTED 11
+typedef enum {
+    PQ_PIPELINE_OFF,
+    PQ_PIPELINE_ON,
+    PQ_PIPELINE_ABORTED
+} PGpipelineStatus;
+#define PQpipelineStatus(conn) PQ_PIPELINE_OFF
+#define PQenterPipelineMode(conn) 0
+#define PQexitPipelineMode(conn) 1
+#define PQpipelineSync(conn) 0
+#define PQsendFlushRequest(conn) 0
+#endif
+    """
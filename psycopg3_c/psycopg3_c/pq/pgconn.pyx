@@ -11,6 +11,7 @@ from cpython.memoryview cimport PyMemoryView_FromObject
 
 import logging
 
+from psycopg3 import errors as e
 from psycopg3.pq.misc import PGnotify, connection_summary
 from psycopg3_c.pq cimport PQBuffer
 
@@ -307,6 +308,22 @@ cdef class PGconn:
                 f"sending prepared query failed: {error_message(self)}"
             )
 
+    def send_describe_prepared(self, const char *name) -> None:
+        _ensure_pgconn(self)
+        cdef int rv = libpq.PQsendDescribePrepared(self.pgconn_ptr, name)
+        if not rv:
+            raise PQerror(
+                f"sending describe prepared failed: {error_message(self)}"
+            )
+
+    def send_describe_portal(self, const char *name) -> None:
+        _ensure_pgconn(self)
+        cdef int rv = libpq.PQsendDescribePortal(self.pgconn_ptr, name)
+        if not rv:
+            raise PQerror(
+                f"sending describe portal failed: {error_message(self)}"
+            )
+
     def prepare(
         self,
         const char *name,
@@ -408,6 +425,41 @@ cdef class PGconn:
             raise PQerror(f"flushing failed: {error_message(self)}")
         return rv
 
+    def set_single_row_mode(self) -> None:
+        if not libpq.PQsetSingleRowMode(self.pgconn_ptr):
+            raise PQerror("setting single row mode failed")
+
+    @property
+    def pipeline_status(self) -> int:
+        if libpq.PQlibVersion() < 140000:
+            return libpq.PQ_PIPELINE_OFF
+        return libpq.PQpipelineStatus(self.pgconn_ptr)
+
+    def enter_pipeline_mode(self) -> None:
+        _check_supported("PQenterPipelineMode", 140000)
+        if libpq.PQenterPipelineMode(self.pgconn_ptr) != 1:
+            raise PQerror("failed to enter pipeline mode")
+
+    def exit_pipeline_mode(self) -> None:
+        _check_supported("PQexitPipelineMode", 140000)
+        if libpq.PQexitPipelineMode(self.pgconn_ptr) != 1:
+            raise PQerror(
+                f"failed to exit pipeline mode: {error_message(self)}")
+
+    def pipeline_sync(self) -> None:
+        _check_supported("PQpipelineSync", 140000)
+        cdef int rv = libpq.PQpipelineSync(self.pgconn_ptr)
+        if rv == 0:
+            raise PQerror("connection not in pipeline mode")
+        if rv != 1:
+            raise PQerror(f"failed to sync pipeline: {error_message(self)}")
+
+    def send_flush_request(self) -> None:
+        _check_supported("PQsendFlushRequest", 140000)
+        if libpq.PQsendFlushRequest(self.pgconn_ptr) == 0:
+            raise PQerror(
+                f"failed to send flush request: {error_message(self)}")
+
     def get_cancel(self) -> PGcancel:
         cdef libpq.PGcancel *ptr = libpq.PQgetCancel(self.pgconn_ptr)
         if not ptr:
@@ -474,6 +526,18 @@ cdef int _ensure_pgconn(PGconn pgconn) except 0:
     raise PQerror("the connection is closed")
 
 
+cdef int _check_supported(fname, int pgversion) except -1:
+    """
+    Verify if a function is supported by the libpq library version.
+    """
+    if libpq.PQlibVersion() < pgversion:
+        raise e.NotSupportedError(
+            f"{fname} requires libpq from PostgreSQL {pgversion // 10000},"
+            f" {libpq.PQlibVersion()} available instead"
+        )
+    return 0
+
+
 cdef char *_call_bytes(PGconn pgconn, conn_bytes_f func) except NULL:
     """
     Call one of the pgconn libpq functions returning a bytes pointer.
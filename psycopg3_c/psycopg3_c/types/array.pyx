@@ -0,0 +1,506 @@
+"""
+Cython adapters for arrays.
+"""
+
+# Copyright (C) 2021 The Psycopg Team
+
+cimport cython
+
+from libc.stdint cimport int32_t, uint32_t
+from libc.string cimport memcpy, memcmp
+from cpython.mem cimport PyMem_Malloc, PyMem_Free
+from cpython.ref cimport Py_INCREF
+from cpython.list cimport PyList_New, PyList_SET_ITEM, PyList_Append
+from cpython.bytes cimport PyBytes_FromStringAndSize
+from cpython.bytearray cimport PyByteArray_AS_STRING
+from cpython.object cimport PyObject, PyObject_CallFunctionObjArgs
+
+from psycopg3_c._psycopg3.endian cimport be32toh, htobe32
+from psycopg3_c.pq cimport _buffer_as_string_and_size
+
+from psycopg3 import errors as e
+from psycopg3.oids import builtins
+
+# Maximum number of dimensions of an array in PostgreSQL
+DEF MAXDIM = 6
+
+
+cdef class _BaseListDumper(CDumper):
+    cdef Transformer _tx
+
+    def __cinit__(self):
+        self.oid = oids.TEXT_ARRAY_OID
+
+    def __init__(self, cls: type, context: Optional[AdaptContext] = None):
+        super().__init__(cls, context)
+        self._tx = Transformer(context)
+
+
+cdef libpq.Oid _get_array_oid(libpq.Oid base_oid) except? 0:
+    """
+    Return the oid of the array from the oid of the base item.
+
+    Fall back on text[].
+    """
+    if base_oid:
+        info = builtins.get(base_oid)
+        if info is not None and info.array_oid:
+            return info.array_oid
+
+    return oids.TEXT_ARRAY_OID
+
+
+cdef Py_ssize_t _dump_item(
+    Transformer tx, obj, object fmt, bytearray rv, Py_ssize_t offset,
+    libpq.Oid *oid
+) except -1:
+    """
+    Dump *obj* into *rv* at *offset* using the dumper for *fmt*.
+
+    Return the number of bytes written. If *oid* points to 0, set it to the
+    oid of the dumper.
+    """
+    cdef char *buf
+    cdef char *target
+    cdef Py_ssize_t size
+
+    dumper = tx.get_dumper(obj, fmt)
+    if isinstance(dumper, CDumper):
+        size = (<CDumper>dumper).cdump(obj, rv, offset)
+        if not oid[0]:
+            oid[0] = (<CDumper>dumper).oid
+    else:
+        b = PyObject_CallFunctionObjArgs(dumper.dump, <PyObject *>obj, NULL)
+        _buffer_as_string_and_size(b, &buf, &size)
+        target = CDumper.ensure_size(rv, offset, size)
+        memcpy(target, buf, size)
+        if not oid[0]:
+            oid[0] = dumper.oid
+
+    return size
+
+
+cdef class ListDumper(_BaseListDumper):
+
+    format = Format.TEXT
+
+    cdef Py_ssize_t cdump(self, obj, bytearray rv, Py_ssize_t offset) except -1:
+        cdef libpq.Oid base_oid = 0
+        cdef Py_ssize_t pos = self._dump_list(obj, rv, offset, &base_oid)
+
+        # The dumper can be reused: don't keep the oid of a previous dump
+        self.oid = _get_array_oid(base_oid)
+
+        return pos - offset
+
+    cdef Py_ssize_t _dump_list(
+        self, obj, bytearray rv, Py_ssize_t pos, libpq.Oid *base_oid
+    ) except -1:
+        """Dump a list at *pos* of *rv*, return the position after it."""
+        cdef char *target
+        cdef Py_ssize_t size
+
+        if not obj:
+            target = CDumper.ensure_size(rv, pos, 2)
+            target[0] = b'{'
+            target[1] = b'}'
+            return pos + 2
+
+        target = CDumper.ensure_size(rv, pos, 1)
+        target[0] = b'{'
+        pos += 1
+
+        for item in obj:
+            if isinstance(item, list):
+                pos = self._dump_list(item, rv, pos, base_oid)
+            elif item is not None:
+                size = _dump_item(self._tx, item, FORMAT_TEXT, rv, pos, base_oid)
+                pos += _quote_array_item(rv, pos, size)
+            else:
+                target = CDumper.ensure_size(rv, pos, 4)
+                memcpy(target, b"NULL", 4)
+                pos += 4
+
+            target = CDumper.ensure_size(rv, pos, 1)
+            target[0] = b','
+            pos += 1
+
+        # Replace the last comma with the closing bracket
+        PyByteArray_AS_STRING(rv)[pos - 1] = b'}'
+        return pos
+
+
+cdef Py_ssize_t _quote_array_item(
+    bytearray rv, Py_ssize_t pos, Py_ssize_t size
+) except -1:
+    """
+    Quote and escape, if needed, the text array item of *size* bytes at *pos*.
+
+    Return the size of the item after quoting.
+    """
+    # from https://www.postgresql.org/docs/current/arrays.html#ARRAYS-IO
+    #
+    # The array output routine will put double quotes around element values if
+    # they are empty strings, contain curly braces, delimiter characters,
+    # double quotes, backslashes, or white space, or match the word NULL.
+    # TODO: recognise only , as delimiter. Should be configured
+    cdef char *target = PyByteArray_AS_STRING(rv) + pos
+    cdef int quote = size == 0
+    cdef Py_ssize_t nesc = 0
+    cdef Py_ssize_t i
+    cdef char c
+
+    for i in range(size):
+        c = target[i]
+        if c == b'"' or c == b'\\':
+            nesc += 1
+        elif (
+            c == b'{' or c == b'}' or c == b',' or c == b' '
+            or c == b'\t' or c == b'\n' or c == b'\r'
+            or c == b'\v' or c == b'\f'
+        ):
+            quote = 1
+
+    if nesc == 0 and not quote:
+        if size != 4 or not (
+            (target[0] == b'n' or target[0] == b'N')
+            and (target[1] == b'u' or target[1] == b'U')
+            and (target[2] == b'l' or target[2] == b'L')
+            and (target[3] == b'l' or target[3] == b'L')
+        ):
+            return size
+
+    # Double quotes and backslashes embedded in element values will be
+    # backslash-escaped. Walk backwards pushing the chars forward and
+    # interspersing backslashes.
+    cdef Py_ssize_t newsize = size + nesc + 2
+    target = CDumper.ensure_size(rv, pos, newsize)
+    target[newsize - 1] = b'"'
+    for i in range(size - 1, -1, -1):
+        target[i + nesc + 1] = target[i]
+        if target[i] == b'"' or target[i] == b'\\':
+            nesc -= 1
+            target[i + nesc + 1] = b'\\'
+    target[0] = b'"'
+
+    return newsize
+
+
+cdef class ListBinaryDumper(_BaseListDumper):
+
+    format = Format.BINARY
+
+    cdef Py_ssize_t cdump(self, obj, bytearray rv, Py_ssize_t offset) except -1:
+        cdef char *target
+        cdef uint32_t head[3]
+
+        if not obj:
+            self.oid = oids.TEXT_ARRAY_OID
+            head[0] = 0
+            head[1] = 0
+            head[2] = htobe32(oids.TEXT_OID)
+            target = CDumper.ensure_size(rv, offset, sizeof(head))
+            memcpy(target, head, sizeof(head))
+            return sizeof(head)
+
+        cdef list dims = []
+        L = obj
+        while isinstance(L, self.cls):
+            if not L:
+                raise e.DataError("lists cannot contain empty lists")
+            dims.append(len(L))
+            L = L[0]
+
+        cdef Py_ssize_t ndims = len(dims)
+        cdef Py_ssize_t headsize = sizeof(head) + 8 * ndims
+        CDumper.ensure_size(rv, offset, headsize)
+
+        cdef libpq.Oid base_oid = 0
+        cdef int hasnull = 0
+        cdef Py_ssize_t pos = self._dump_list(
+            obj, rv, offset + headsize, dims, 0, &base_oid, &hasnull)
+
+        if not base_oid:
+            base_oid = oids.TEXT_OID
+        self.oid = _get_array_oid(base_oid)
+
+        # Write the header now that the items are known
+        target = PyByteArray_AS_STRING(rv) + offset
+        head[0] = htobe32(ndims)
+        head[1] = htobe32(hasnull)
+        head[2] = htobe32(base_oid)
+        memcpy(target, head, sizeof(head))
+        target += sizeof(head)
+
+        cdef uint32_t dimhead[2]
+        cdef Py_ssize_t i
+        for i in range(ndims):
+            dimhead[0] = htobe32(dims[i])
+            dimhead[1] = htobe32(1)
+            memcpy(target, dimhead, sizeof(dimhead))
+            target += sizeof(dimhead)
+
+        return pos - offset
+
+    cdef Py_ssize_t _dump_list(
+        self, obj, bytearray rv, Py_ssize_t pos, list dims, Py_ssize_t dim,
+        libpq.Oid *base_oid, int *hasnull
+    ) except -1:
+        """Dump the items of a list at *pos* of *rv*, return the end position."""
+        if len(obj) != dims[dim]:
+            raise e.DataError("nested lists have inconsistent lengths")
+
+        cdef char *target
+        cdef Py_ssize_t size
+        cdef uint32_t besize
+        cdef libpq.Oid item_oid
+
+        if dim == len(dims) - 1:
+            for item in obj:
+                if item is not None:
+                    # Leave room for the size, to write after the item
+                    item_oid = 0
+                    size = _dump_item(
+                        self._tx, item, FORMAT_BINARY, rv, pos + sizeof(besize),
+                        &item_oid)
+                    if not base_oid[0]:
+                        base_oid[0] = item_oid
+                    elif item_oid and item_oid != base_oid[0]:
+                        raise e.DataError(
+                            _mixed_types_error(base_oid[0], item_oid))
+                    besize = htobe32(size)
+                    target = PyByteArray_AS_STRING(rv)
+                    memcpy(target + pos, &besize, sizeof(besize))
+                    pos += sizeof(besize) + size
+                else:
+                    hasnull[0] = 1
+                    target = CDumper.ensure_size(rv, pos, sizeof(_binary_null))
+                    memcpy(target, &_binary_null, sizeof(_binary_null))
+                    pos += sizeof(_binary_null)
+        else:
+            for item in obj:
+                if not isinstance(item, self.cls):
+                    raise e.DataError("nested lists have inconsistent depths")
+                pos = self._dump_list(
+                    item, rv, pos, dims, dim + 1, base_oid, hasnull)
+
+        return pos
+
+
+cdef str _mixed_types_error(libpq.Oid oid, libpq.Oid oid2):
+    info = builtins.get(oid)
+    name = info.name if info is not None else f"oid {oid}"
+    info = builtins.get(oid2)
+    name2 = info.name if info is not None else f"oid {oid2}"
+    return (
+        f"binary lists cannot contain items of different types:"
+        f" {name} and {name2}")
+
+
+cdef class _BaseArrayLoader(CLoader):
+    cdef Transformer _tx
+
+    def __init__(self, oid: int, context: Optional[AdaptContext] = None):
+        super().__init__(oid, context)
+        self._tx = Transformer(context)
+
+
+cdef class ArrayLoader(_BaseArrayLoader):
+
+    format = Format.TEXT
+
+    cdef object cload(self, const char *data, size_t length):
+        # Read the class attribute set by array.register()
+        base_oid = self.base_oid
+        loader = self._tx._c_get_loader(
+            <PyObject *>base_oid, <PyObject *>FORMAT_TEXT)
+
+        # A buffer to copy the items into, unescaped and zero-terminated,
+        # which some loaders require.
+        cdef char *scratch = <char *>PyMem_Malloc(length + 1)
+        if scratch == NULL:
+            raise MemoryError()
+
+        try:
+            return _parse_text_array(data, length, loader, scratch)
+        finally:
+            PyMem_Free(scratch)
+
+
+cdef object _parse_text_array(
+    const char *data, size_t length, object loader, char *scratch
+):
+    # TODO: currently recognise only , as delimiter. Should be configured
+    cdef CLoader cloader = None
+    cdef object pyload = None
+    if isinstance(loader, CLoader):
+        cloader = <CLoader>loader
+    else:
+        pyload = loader.load
+
+    cdef const char *ptr = data
+    cdef const char *end = data + length
+    cdef const char *start
+    cdef char *tgt
+    cdef list stack = []
+    cdef list a
+    rv = None
+
+    while ptr < end:
+        if ptr[0] == b'{':
+            a = []
+            if rv is None:
+                rv = a
+            if stack:
+                PyList_Append(stack[-1], a)
+            stack.append(a)
+            ptr += 1
+
+        elif ptr[0] == b'}':
+            if not stack:
+                raise e.DataError("malformed array, unexpected '}'")
+            rv = stack.pop()
+            ptr += 1
+
+        elif ptr[0] == b',':
+            ptr += 1
+
+        else:
+            start = ptr
+            tgt = scratch
+            if ptr[0] == b'"':
+                ptr += 1
+                while ptr < end and ptr[0] != b'"':
+                    if ptr[0] == b'\\':
+                        ptr += 1
+                        if ptr >= end:
+                            break
+                    tgt[0] = ptr[0]
+                    tgt += 1
+                    ptr += 1
+                if ptr >= end:
+                    raise e.DataError("malformed array, unterminated quote")
+                ptr += 1
+            else:
+                while ptr < end and not (
+                    ptr[0] == b'"' or ptr[0] == b'{' or ptr[0] == b'}'
+                    or ptr[0] == b',' or ptr[0] == b'\\'
+                ):
+                    ptr += 1
+                if ptr == start:
+                    # a backslash out of quotes: not part of any token
+                    ptr += 1
+                    continue
+                memcpy(scratch, start, ptr - start)
+                tgt = scratch + (ptr - start)
+
+            if not stack:
+                wat = start[:min(ptr - start, 10)].decode("utf8", "replace")
+                if ptr - start > 10:
+                    wat += "..."
+                raise e.DataError(f"malformed array, unexpected '{wat}'")
+
+            if start[0] != b'"' and ptr - start == 4 and memcmp(
+                start, b"NULL", 4) == 0:
+                v = None
+            else:
+                tgt[0] = b'\0'
+                if cloader is not None:
+                    v = cloader.cload(scratch, tgt - scratch)
+                else:
+                    b = PyBytes_FromStringAndSize(scratch, tgt - scratch)
+                    v = PyObject_CallFunctionObjArgs(
+                        pyload, <PyObject *>b, NULL)
+
+            PyList_Append(stack[-1], v)
+
+    if rv is None:
+        raise e.DataError("malformed array, no '{' found")
+    return rv
+
+
+cdef class ArrayBinaryLoader(_BaseArrayLoader):
+
+    format = Format.BINARY
+
+    cdef object cload(self, const char *data, size_t length):
+        if length < 12:
+            raise e.DataError("malformed array: header too short")
+
+        cdef uint32_t *buf32 = <uint32_t *>data
+        cdef uint32_t ndims = be32toh(buf32[0])
+        if not ndims:
+            return []
+
+        if ndims > MAXDIM:
+            raise e.DataError(
+                f"malformed array: {ndims} dimensions, max {MAXDIM} allowed")
+        if length < 12 + 8 * ndims:
+            raise e.DataError("malformed array: header too short")
+
+        cdef object oid = be32toh(buf32[2])
+        loader = self._tx._c_get_loader(<PyObject *>oid, <PyObject *>FORMAT_BINARY)
+
+        cdef uint32_t dims[MAXDIM]
+        cdef uint32_t i
+        for i in range(ndims):
+            # Every dimension is followed by a lower bound, which we ignore.
+            dims[i] = be32toh(buf32[3 + 2 * i])
+
+        cdef const char *ptr = data + 12 + 8 * ndims
+        return _parse_binary_array(
+            &ptr, data + length, dims, ndims, 0, loader)
+
+
+cdef object _parse_binary_array(
+    const char **pptr, const char *end, uint32_t *dims, uint32_t ndims,
+    uint32_t dim, object loader
+):
+    """
+    Load the items of a dimension of the array at **pptr*, up to *end*.
+
+    Advance **pptr* past the items consumed.
+    """
+    cdef uint32_t nitems = dims[dim]
+    cdef list out = PyList_New(nitems)
+    cdef uint32_t i
+    cdef int32_t besize, size
+
+    if dim < ndims - 1:
+        for i in range(nitems):
+            val = _parse_binary_array(pptr, end, dims, ndims, dim + 1, loader)
+            Py_INCREF(val)
+            PyList_SET_ITEM(out, i, val)
+        return out
+
+    cdef CLoader cloader = None
+    cdef object pyload = None
+    if isinstance(loader, CLoader):
+        cloader = <CLoader>loader
+    else:
+        pyload = loader.load
+
+    cdef const char *ptr = pptr[0]
+    for i in range(nitems):
+        if ptr + sizeof(besize) > end:
+            raise e.DataError("malformed array: data too short")
+        memcpy(&besize, ptr, sizeof(besize))
+        ptr += sizeof(besize)
+        if besize == _binary_null:
+            val = None
+        else:
+            size = be32toh(besize)
+            if size < 0 or ptr + size > end:
+                raise e.DataError("malformed array: data too short")
+            if cloader is not None:
+                val = cloader.cload(ptr, size)
+            else:
+                b = PyBytes_FromStringAndSize(ptr, size)
+                val = PyObject_CallFunctionObjArgs(pyload, <PyObject *>b, NULL)
+            ptr += size
+
+        Py_INCREF(val)
+        PyList_SET_ITEM(out, i, val)
+
+    pptr[0] = ptr
+    return out
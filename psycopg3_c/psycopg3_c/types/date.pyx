@@ -0,0 +1,679 @@
+"""
+Cython adapters for date/time types.
+"""
+
+# Copyright (C) 2021 The Psycopg Team
+
+cimport cython
+
+from libc.stdint cimport *
+from libc.string cimport memcpy
+from cpython.version cimport PY_VERSION_HEX
+from cpython.datetime cimport import_datetime
+from cpython.datetime cimport date_new, time_new, datetime_new, timedelta_new
+from cpython.datetime cimport date_year, date_month, date_day
+from cpython.datetime cimport time_hour, time_minute, time_second
+from cpython.datetime cimport time_microsecond
+from cpython.datetime cimport datetime_hour, datetime_minute, datetime_second
+from cpython.datetime cimport datetime_microsecond
+from cpython.datetime cimport timedelta_days, timedelta_seconds
+from cpython.datetime cimport timedelta_microseconds
+
+from psycopg3_c._psycopg3.endian cimport be32toh, be64toh, htobe32, htobe64
+
+from datetime import timedelta, timezone
+
+from psycopg3 import errors as e
+
+import_datetime()
+
+# Days between 1970-01-01 and 2000-01-01, the binary format epoch
+cdef int64_t PG_DATE_EPOCH_DAYS = 10957
+
+cdef int64_t USECS_PER_SEC = 1000000
+cdef int64_t USECS_PER_DAY = 86400000000
+cdef int64_t MAX_TIMEDELTA_DAYS = 999999999
+
+cdef object _utc = timezone.utc
+
+# Cache of the timezones by offset in seconds
+cdef dict _timezones = {}
+
+
+@cython.final
+cdef class DateBinaryDumper(CDumper):
+
+    format = Format.BINARY
+
+    def __cinit__(self):
+        self.oid = oids.DATE_OID
+
+    cdef Py_ssize_t cdump(self, obj, bytearray rv, Py_ssize_t offset) except -1:
+        cdef int64_t days = _days_from_civil(
+            date_year(obj), date_month(obj), date_day(obj))
+        cdef uint32_t beval = htobe32(<uint32_t>(days - PG_DATE_EPOCH_DAYS))
+        cdef char *buf = CDumper.ensure_size(rv, offset, sizeof(beval))
+        memcpy(buf, <void *>&beval, sizeof(beval))
+        return sizeof(beval)
+
+
+@cython.final
+cdef class TimeBinaryDumper(CDumper):
+
+    format = Format.BINARY
+
+    def __cinit__(self):
+        self.oid = oids.TIMETZ_OID
+
+    cdef Py_ssize_t cdump(self, obj, bytearray rv, Py_ssize_t offset) except -1:
+        cdef int64_t micros = time_microsecond(obj) + USECS_PER_SEC * (
+            time_second(obj)
+            + 60 * (time_minute(obj) + 60 * <int64_t>time_hour(obj)))
+        cdef uint64_t bemicros = htobe64(<uint64_t>micros)
+        cdef uint32_t beoff
+        cdef char *buf
+
+        # The dumper can be reused: choose the oid according to the object
+        off = obj.utcoffset()
+        if off is None:
+            self.oid = oids.TIME_OID
+            buf = CDumper.ensure_size(rv, offset, sizeof(bemicros))
+            memcpy(buf, <void *>&bemicros, sizeof(bemicros))
+            return sizeof(bemicros)
+
+        self.oid = oids.TIMETZ_OID
+        beoff = htobe32(<uint32_t>(
+            -(timedelta_days(off) * 86400 + timedelta_seconds(off))))
+        buf = CDumper.ensure_size(
+            rv, offset, sizeof(bemicros) + sizeof(beoff))
+        memcpy(buf, <void *>&bemicros, sizeof(bemicros))
+        memcpy(buf + sizeof(bemicros), <void *>&beoff, sizeof(beoff))
+        return sizeof(bemicros) + sizeof(beoff)
+
+
+@cython.final
+cdef class DateTimeBinaryDumper(CDumper):
+
+    format = Format.BINARY
+
+    def __cinit__(self):
+        self.oid = oids.TIMESTAMPTZ_OID
+
+    cdef Py_ssize_t cdump(self, obj, bytearray rv, Py_ssize_t offset) except -1:
+        cdef int64_t days = _days_from_civil(
+            date_year(obj), date_month(obj), date_day(obj))
+        cdef int64_t micros = (
+            (days - PG_DATE_EPOCH_DAYS) * USECS_PER_DAY
+            + datetime_microsecond(obj)
+            + USECS_PER_SEC * (
+                datetime_second(obj)
+                + 60 * (datetime_minute(obj)
+                    + 60 * <int64_t>datetime_hour(obj))))
+
+        # Naive datetimes are dumped as timestamp, aware ones as timestamptz
+        if obj.tzinfo is None:
+            self.oid = oids.TIMESTAMP_OID
+        else:
+            self.oid = oids.TIMESTAMPTZ_OID
+            off = obj.utcoffset()
+            micros -= timedelta_microseconds(off) + USECS_PER_SEC * (
+                timedelta_days(off) * <int64_t>86400 + timedelta_seconds(off))
+
+        cdef uint64_t beval = htobe64(<uint64_t>micros)
+        cdef char *buf = CDumper.ensure_size(rv, offset, sizeof(beval))
+        memcpy(buf, <void *>&beval, sizeof(beval))
+        return sizeof(beval)
+
+
+@cython.final
+cdef class TimeDeltaBinaryDumper(CDumper):
+
+    format = Format.BINARY
+
+    def __cinit__(self):
+        self.oid = oids.INTERVAL_OID
+
+    cdef Py_ssize_t cdump(self, obj, bytearray rv, Py_ssize_t offset) except -1:
+        cdef int64_t micros = (
+            USECS_PER_SEC * timedelta_seconds(obj) + timedelta_microseconds(obj))
+        cdef uint64_t bemicros = htobe64(<uint64_t>micros)
+        cdef uint32_t bedays = htobe32(<uint32_t>timedelta_days(obj))
+        cdef uint32_t bemonths = 0
+
+        cdef char *buf = CDumper.ensure_size(rv, offset, 16)
+        memcpy(buf, <void *>&bemicros, sizeof(bemicros))
+        memcpy(buf + 8, <void *>&bedays, sizeof(bedays))
+        memcpy(buf + 12, <void *>&bemonths, sizeof(bemonths))
+        return 16
+
+
+@cython.final
+cdef class DateBinaryLoader(CLoader):
+
+    format = Format.BINARY
+
+    cdef object cload(self, const char *data, size_t length):
+        cdef int32_t days = <int32_t>be32toh((<uint32_t *>data)[0])
+        cdef int y, m, d
+        _civil_from_days(days + PG_DATE_EPOCH_DAYS, &y, &m, &d)
+        if not 1 <= y <= 9999:
+            if days == INT32_MAX:
+                raise e.DataError("Python date doesn't support infinity")
+            elif days == INT32_MIN:
+                raise e.DataError("Python date doesn't support -infinity")
+            elif days < 0:
+                raise e.DataError("Python doesn't support BC date")
+            else:
+                raise e.DataError(
+                    "Python date doesn't support years after 9999")
+
+        return date_new(y, m, d)
+
+
+@cython.final
+cdef class TimeBinaryLoader(CLoader):
+
+    format = Format.BINARY
+
+    cdef object cload(self, const char *data, size_t length):
+        cdef int64_t val = <int64_t>be64toh((<uint64_t *>data)[0])
+        return _time_from_micros(val, None)
+
+
+@cython.final
+cdef class TimeTzBinaryLoader(CLoader):
+
+    format = Format.BINARY
+
+    cdef object cload(self, const char *data, size_t length):
+        cdef int64_t val = <int64_t>be64toh((<uint64_t *>data)[0])
+        # The offset is in seconds west of UTC
+        cdef int32_t off = <int32_t>be32toh((<uint32_t *>(data + 8))[0])
+        return _time_from_micros(val, _timezone_from_seconds(-off))
+
+
+@cython.final
+cdef class TimestampBinaryLoader(CLoader):
+
+    format = Format.BINARY
+
+    cdef object cload(self, const char *data, size_t length):
+        cdef int64_t val = <int64_t>be64toh((<uint64_t *>data)[0])
+        return _datetime_from_micros(val, None)
+
+
+@cython.final
+cdef class TimestamptzBinaryLoader(CLoader):
+
+    format = Format.BINARY
+
+    cdef object _timezone
+
+    def __init__(self, oid: int, context: Optional[AdaptContext] = None):
+        super().__init__(oid, context)
+        # The binary format doesn't carry the timezone: return the values in
+        # the session timezone, as the text format does.
+        conn = context.connection if context is not None else None
+        self._timezone = conn._session.timezone if conn is not None else _utc
+
+    cdef object cload(self, const char *data, size_t length):
+        cdef int64_t val = <int64_t>be64toh((<uint64_t *>data)[0])
+        rv = _datetime_from_micros(val, _utc)
+        if self._timezone is _utc:
+            return rv
+
+        try:
+            return rv.astimezone(self._timezone)
+        except OverflowError:
+            if val < 0:
+                raise e.DataError("Python doesn't support BC datetime")
+            else:
+                raise e.DataError(
+                    "Python datetime doesn't support years after 9999")
+
+
+@cython.final
+cdef class IntervalBinaryLoader(CLoader):
+
+    format = Format.BINARY
+
+    cdef object cload(self, const char *data, size_t length):
+        cdef int64_t val = <int64_t>be64toh((<uint64_t *>data)[0])
+        cdef int64_t days = <int32_t>be32toh((<uint32_t *>(data + 8))[0])
+        cdef int64_t months = <int32_t>be32toh((<uint32_t *>(data + 12))[0])
+        cdef int64_t years
+
+        # Convert months to days in the same way of the text loader
+        if months > 0:
+            years = months // 12
+            months = months % 12
+            days = days + 30 * months + 365 * years
+        elif months < 0:
+            months = -months
+            years = months // 12
+            months = months % 12
+            days = days - 30 * months - 365 * years
+
+        days += val // USECS_PER_DAY
+        val = val % USECS_PER_DAY
+        if not -MAX_TIMEDELTA_DAYS <= days <= MAX_TIMEDELTA_DAYS:
+            raise e.DataError(
+                f"can't parse interval: days={days};"
+                f" must have magnitude <= {MAX_TIMEDELTA_DAYS}"
+            )
+
+        return timedelta_new(
+            days, val // USECS_PER_SEC, val % USECS_PER_SEC)
+
+
+cdef class _TextTemporalLoader(CLoader):
+    """
+    Base class of the text loaders of the temporal types.
+
+    The data in the most common output formats is parsed in C. In all the
+    other cases, or if the data is unexpected, the Python loader is used.
+    """
+    cdef int _fast
+    cdef object _py_loader
+
+    cdef object _fallback(self, const char *data, size_t length):
+        return self._py_loader.load(data[:length])
+
+
+@cython.final
+cdef class DateLoader(_TextTemporalLoader):
+
+    format = Format.TEXT
+
+    def __init__(self, oid: int, context: Optional[AdaptContext] = None):
+        super().__init__(oid, context)
+        from psycopg3.types import date as pydate
+
+        self._py_loader = pydate.DateLoader(oid, context)
+        self._fast = _is_datestyle_iso(context)
+
+    cdef object cload(self, const char *data, size_t length):
+        cdef const char *end = data + length
+        cdef int64_t y, m, d
+        if self._fast:
+            if _parse_date(data, end, &y, &m, &d) == end and 1 <= y <= 9999:
+                return date_new(y, m, d)
+
+        return self._fallback(data, length)
+
+
+@cython.final
+cdef class TimeLoader(_TextTemporalLoader):
+
+    format = Format.TEXT
+
+    def __init__(self, oid: int, context: Optional[AdaptContext] = None):
+        super().__init__(oid, context)
+        from psycopg3.types import date as pydate
+
+        self._py_loader = pydate.TimeLoader(oid, context)
+        self._fast = 1  # the time output doesn't depend on the DateStyle
+
+    cdef object cload(self, const char *data, size_t length):
+        cdef const char *end = data + length
+        cdef int64_t h, m, s, us
+        if _parse_time(data, end, &h, &m, &s, &us) == end and h <= 23:
+            return time_new(h, m, s, us, None)
+
+        return self._fallback(data, length)
+
+
+@cython.final
+cdef class TimeTzLoader(_TextTemporalLoader):
+
+    format = Format.TEXT
+
+    def __init__(self, oid: int, context: Optional[AdaptContext] = None):
+        super().__init__(oid, context)
+        from psycopg3.types import date as pydate
+
+        self._py_loader = pydate.TimeTzLoader(oid, context)
+        self._fast = 1
+
+    cdef object cload(self, const char *data, size_t length):
+        cdef const char *end = data + length
+        cdef int64_t h, m, s, us, off
+        cdef const char *ptr = _parse_time(data, end, &h, &m, &s, &us)
+        if ptr != NULL and h <= 23:
+            if _parse_offset(ptr, end, &off) == end:
+                return time_new(h, m, s, us, _timezone_from_seconds(off))
+
+        return self._fallback(data, length)
+
+
+@cython.final
+cdef class TimestampLoader(_TextTemporalLoader):
+
+    format = Format.TEXT
+
+    def __init__(self, oid: int, context: Optional[AdaptContext] = None):
+        super().__init__(oid, context)
+        from psycopg3.types import date as pydate
+
+        self._py_loader = pydate.TimestampLoader(oid, context)
+        self._fast = _is_datestyle_iso(context)
+
+    cdef object cload(self, const char *data, size_t length):
+        cdef const char *end = data + length
+        cdef int64_t y, mo, d, h, m, s, us
+        cdef const char *ptr
+        if self._fast:
+            ptr = _parse_date(data, end, &y, &mo, &d)
+            if ptr != NULL and ptr < end and ptr[0] == b' ':
+                ptr = _parse_time(ptr + 1, end, &h, &m, &s, &us)
+                if ptr == end and 1 <= y <= 9999 and h <= 23:
+                    return datetime_new(y, mo, d, h, m, s, us, None)
+
+        return self._fallback(data, length)
+
+
+@cython.final
+cdef class TimestamptzLoader(_TextTemporalLoader):
+
+    format = Format.TEXT
+
+    cdef object _timezone
+
+    def __init__(self, oid: int, context: Optional[AdaptContext] = None):
+        super().__init__(oid, context)
+        from psycopg3.types import date as pydate
+
+        self._py_loader = pydate.TimestamptzLoader(oid, context)
+        self._fast = _is_datestyle_iso(context)
+        # Return the values in the session timezone, as the binary format
+        # does, rather than in a timezone with the offset received.
+        conn = context.connection if context is not None else None
+        self._timezone = conn._session.timezone if conn is not None else _utc
+
+    cdef object cload(self, const char *data, size_t length):
+        cdef const char *end = data + length
+        cdef int64_t y, mo, d, h, m, s, us, off
+        cdef const char *ptr
+        if self._fast:
+            ptr = _parse_date(data, end, &y, &mo, &d)
+            if ptr != NULL and ptr < end and ptr[0] == b' ':
+                ptr = _parse_time(ptr + 1, end, &h, &m, &s, &us)
+                if ptr != NULL and 1 <= y <= 9999 and h <= 23:
+                    if _parse_offset(ptr, end, &off) == end:
+                        tz = _timezone_from_seconds(off)
+                        rv = datetime_new(y, mo, d, h, m, s, us, tz)
+                        if tz is self._timezone:
+                            return rv
+                        try:
+                            return rv.astimezone(self._timezone)
+                        except OverflowError:
+                            # Close to the datetime limits: keep the offset
+                            return rv
+
+        return self._fallback(data, length)
+
+
+@cython.final
+cdef class IntervalLoader(_TextTemporalLoader):
+
+    format = Format.TEXT
+
+    def __init__(self, oid: int, context: Optional[AdaptContext] = None):
+        super().__init__(oid, context)
+        from psycopg3.types import date as pydate
+
+        self._py_loader = pydate.IntervalLoader(oid, context)
+        conn = context.connection if context is not None else None
+        self._fast = (
+            conn is None or conn._session.intervalstyle == b"postgres")
+
+    cdef object cload(self, const char *data, size_t length):
+        if not self._fast:
+            return self._fallback(data, length)
+
+        # Parse the 'postgres' IntervalStyle, e.g. '-1 years 2 mons
+        # 3 days -04:05:06.789': the same conversion of the Python loader.
+        cdef const char *ptr = data
+        cdef const char *end = data + length
+        cdef int64_t days = 0, micros = 0
+        cdef int64_t val, sign, m, s, us
+
+        while ptr < end:
+            sign = 1
+            if ptr[0] == b'-':
+                sign = -1
+                ptr += 1
+            elif ptr[0] == b'+':
+                ptr += 1
+
+            ptr = _parse_uint(ptr, end, &val, 10)
+            if ptr == NULL or ptr == end:
+                return self._fallback(data, length)
+
+            if ptr[0] == b':':
+                # The time part is the last one
+                ptr = _parse_uint(ptr + 1, end, &m, 2)
+                if ptr == NULL or ptr == end or ptr[0] != b':':
+                    return self._fallback(data, length)
+                ptr = _parse_seconds(ptr + 1, end, &s, &us)
+                if ptr != end:
+                    return self._fallback(data, length)
+                micros = sign * (
+                    USECS_PER_SEC * ((val * 60 + m) * 60 + s) + us)
+                break
+
+            if ptr[0] != b' ' or ptr + 1 == end:
+                return self._fallback(data, length)
+            ptr += 1
+            if ptr[0] == b'y':
+                days += sign * val * 365
+            elif ptr[0] == b'm':
+                days += sign * val * 30
+            elif ptr[0] == b'd':
+                days += sign * val
+            else:
+                return self._fallback(data, length)
+
+            # skip the rest of the unit and the space after it
+            while ptr < end and ptr[0] != b' ':
+                ptr += 1
+            if ptr < end:
+                ptr += 1
+
+        days += micros // USECS_PER_DAY
+        micros = micros % USECS_PER_DAY
+        if not -MAX_TIMEDELTA_DAYS <= days <= MAX_TIMEDELTA_DAYS:
+            # Let the Python loader raise the error
+            return self._fallback(data, length)
+
+        return timedelta_new(
+            days, micros // USECS_PER_SEC, micros % USECS_PER_SEC)
+
+
+cdef int _is_datestyle_iso(context):
+    conn = context.connection if context is not None else None
+    ds = conn._session.datestyle if conn is not None else None
+    # The Python loaders assume ISO if the DateStyle is unknown
+    return ds is None or ds.startswith(b"ISO")
+
+
+cdef object _timezone_from_seconds(int64_t sec):
+    if PY_VERSION_HEX < 0x03070000:
+        # Python 3.6 doesn't support seconds in the timezone offset
+        sec = sec // 60 * 60 if sec >= 0 else -(-sec // 60 * 60)
+
+    tz = _timezones.get(sec)
+    if tz is None:
+        tz = _timezones[sec] = timezone(timedelta(seconds=sec))
+    return tz
+
+
+cdef object _time_from_micros(int64_t val, object tz):
+    cdef int64_t secs = val // USECS_PER_SEC
+    cdef int us = val % USECS_PER_SEC
+    cdef int s = secs % 60
+    cdef int64_t mins = secs // 60
+    cdef int m = mins % 60
+    cdef int64_t h = mins // 60
+    if not 0 <= h <= 23:
+        # Most likely, time 24:00
+        raise e.DataError(f"time not supported by Python: hour={h}")
+
+    return time_new(h, m, s, us, tz)
+
+
+cdef object _datetime_from_micros(int64_t val, object tz):
+    # Check the infinity values before any arithmetic can overflow
+    if val == INT64_MAX:
+        raise e.DataError("Python datetime doesn't support infinity")
+    elif val == INT64_MIN:
+        raise e.DataError("Python datetime doesn't support -infinity")
+
+    cdef int64_t days = val // USECS_PER_DAY
+    cdef int64_t micros = val % USECS_PER_DAY
+    cdef int y, m, d
+    _civil_from_days(days + PG_DATE_EPOCH_DAYS, &y, &m, &d)
+    if not 1 <= y <= 9999:
+        if val < 0:
+            raise e.DataError("Python doesn't support BC datetime")
+        else:
+            raise e.DataError(
+                "Python datetime doesn't support years after 9999")
+
+    cdef int64_t secs = micros // USECS_PER_SEC
+    return datetime_new(
+        y, m, d, secs // 3600, secs // 60 % 60, secs % 60,
+        micros % USECS_PER_SEC, tz)
+
+
+# Parsers of the ISO format. Return the pointer to the first char not parsed,
+# or NULL if the data is not in the expected format.
+
+cdef const char *_parse_uint(
+    const char *ptr, const char *end, int64_t *val, int maxdigits
+):
+    cdef const char *start = ptr
+    cdef int64_t rv = 0
+    while ptr < end and c'0' <= ptr[0] <= c'9':
+        if ptr - start >= maxdigits:
+            return NULL
+        rv = rv * 10 + (ptr[0] - c'0')
+        ptr += 1
+
+    if ptr == start:
+        return NULL
+
+    val[0] = rv
+    return ptr
+
+
+cdef const char *_parse_date(
+    const char *ptr, const char *end, int64_t *y, int64_t *m, int64_t *d
+):
+    # YYYY-MM-DD, the year may have more digits
+    ptr = _parse_uint(ptr, end, y, 9)
+    if ptr == NULL or ptr == end or ptr[0] != b'-':
+        return NULL
+    ptr = _parse_uint(ptr + 1, end, m, 2)
+    if ptr == NULL or ptr == end or ptr[0] != b'-':
+        return NULL
+    return _parse_uint(ptr + 1, end, d, 2)
+
+
+cdef const char *_parse_time(
+    const char *ptr, const char *end,
+    int64_t *h, int64_t *m, int64_t *s, int64_t *us
+):
+    # HH:MM:SS[.ffffff]
+    ptr = _parse_uint(ptr, end, h, 2)
+    if ptr == NULL or ptr == end or ptr[0] != b':':
+        return NULL
+    ptr = _parse_uint(ptr + 1, end, m, 2)
+    if ptr == NULL or ptr == end or ptr[0] != b':':
+        return NULL
+    return _parse_seconds(ptr + 1, end, s, us)
+
+
+cdef const char *_parse_seconds(
+    const char *ptr, const char *end, int64_t *s, int64_t *us
+):
+    # SS[.ffffff]
+    ptr = _parse_uint(ptr, end, s, 2)
+    if ptr == NULL:
+        return NULL
+
+    us[0] = 0
+    if ptr == end or ptr[0] != b'.':
+        return ptr
+
+    cdef const char *start = ptr + 1
+    ptr = _parse_uint(start, end, us, 6)
+    if ptr == NULL:
+        return NULL
+
+    cdef int ndigits = ptr - start
+    while ndigits < 6:
+        us[0] *= 10
+        ndigits += 1
+
+    return ptr
+
+
+cdef const char *_parse_offset(const char *ptr, const char *end, int64_t *off):
+    # +HH[:MM[:SS]] or -HH[:MM[:SS]], returned in seconds east of UTC
+    cdef int64_t sign, val
+    if ptr == NULL or ptr == end:
+        return NULL
+    if ptr[0] == b'+':
+        sign = 1
+    elif ptr[0] == b'-':
+        sign = -1
+    else:
+        return NULL
+
+    ptr = _parse_uint(ptr + 1, end, &val, 2)
+    if ptr == NULL:
+        return NULL
+    off[0] = val * 3600
+
+    if ptr < end and ptr[0] == b':':
+        ptr = _parse_uint(ptr + 1, end, &val, 2)
+        if ptr == NULL:
+            return NULL
+        off[0] += val * 60
+
+        if ptr < end and ptr[0] == b':':
+            ptr = _parse_uint(ptr + 1, end, &val, 2)
+            if ptr == NULL:
+                return NULL
+            off[0] += val
+
+    off[0] *= sign
+    return ptr
+
+
+# Conversion between dates and days since 1970-01-01, from
+# http://howardhinnant.github.io/date_algorithms.html
+# (Cython uses Python semantics for division and modulo of negative numbers)
+
+cdef inline int64_t _days_from_civil(int64_t y, int64_t m, int64_t d):
+    if m <= 2:
+        y -= 1
+    cdef int64_t era = y // 400
+    cdef int64_t yoe = y - era * 400
+    cdef int64_t doy = (153 * (m - 3 if m > 2 else m + 9) + 2) // 5 + d - 1
+    cdef int64_t doe = yoe * 365 + yoe // 4 - yoe // 100 + doy
+    return era * 146097 + doe - 719468
+
+
+cdef inline void _civil_from_days(int64_t z, int *y, int *m, int *d):
+    z += 719468
+    cdef int64_t era = z // 146097
+    cdef int64_t doe = z - era * 146097
+    cdef int64_t yoe = (
+        doe - doe // 1460 + doe // 36524 - doe // 146096) // 365
+    cdef int64_t doy = doe - (365 * yoe + yoe // 4 - yoe // 100)
+    cdef int64_t mp = (5 * doy + 2) // 153
+    d[0] = doy - (153 * mp + 2) // 5 + 1
+    m[0] = mp + 3 if mp < 10 else mp - 9
+    y[0] = yoe + era * 400 + (m[0] <= 2)
@@ -7,14 +7,19 @@ Cython adapters for numeric types.
 cimport cython
 
 from libc.stdint cimport *
-from libc.string cimport memcpy, strlen
-from cpython.mem cimport PyMem_Free
+from libc.string cimport memcpy, memset, strlen
+from cpython.mem cimport PyMem_Malloc, PyMem_Free
+from cpython.unicode cimport PyUnicode_DecodeASCII
 from cpython.long cimport PyLong_FromString, PyLong_FromLong, PyLong_AsLongLong
 from cpython.long cimport PyLong_FromLongLong, PyLong_FromUnsignedLong
 from cpython.float cimport PyFloat_FromDouble, PyFloat_AsDouble
 
 from psycopg3_c._psycopg3.endian cimport (
-    be16toh, be32toh, be64toh, htobe32, htobe64)
+    be16toh, be32toh, be64toh, htobe16, htobe32, htobe64)
+
+from decimal import Decimal
+
+from psycopg3 import errors as e
 
 cdef extern from "Python.h":
     # work around https://github.com/cython/cython/issues/3909
@@ -242,3 +247,276 @@ cdef class Float8BinaryLoader(CLoader):
         cdef uint64_t asint = be64toh((<uint64_t *>data)[0])
         cdef char *swp = <char *>&asint
         return PyFloat_FromDouble((<double *>swp)[0])
+
+
+
+# Values of the sign field of the numeric binary representation
+DEF NUMERIC_POS = 0x0000
+DEF NUMERIC_NEG = 0x4000
+DEF NUMERIC_NAN = 0xC000
+DEF NUMERIC_PINF = 0xD000
+DEF NUMERIC_NINF = 0xF000
+
+# Number of decimal digits in a base 10000 digit of the binary format
+DEF DEC_DIGITS = 4
+
+# Limits of the fields of the numeric binary representation
+DEF NUMERIC_NDIGITS_MAX = 0xFFFF
+DEF NUMERIC_WEIGHT_MIN = -0x8000
+DEF NUMERIC_WEIGHT_MAX = 0x7FFF
+DEF NUMERIC_DSCALE_MAX = 0x3FFF
+
+cdef int64_t _pow10[4]
+_pow10[:] = [1, 10, 100, 1000]
+
+cdef object _decimal_nan = Decimal("NaN")
+cdef object _decimal_pinf = Decimal("Infinity")
+cdef object _decimal_ninf = Decimal("-Infinity")
+
+
+@cython.final
+cdef class DecimalBinaryDumper(CDumper):
+
+    format = Format.BINARY
+
+    def __cinit__(self):
+        self.oid = oids.NUMERIC_OID
+
+    cdef Py_ssize_t cdump(self, obj, bytearray rv, Py_ssize_t offset) except -1:
+        sign, digits, exp = obj.as_tuple()
+
+        cdef uint16_t pgsign
+        cdef char *buf
+        if not isinstance(exp, int):
+            if exp == "F":
+                pgsign = NUMERIC_NINF if sign else NUMERIC_PINF
+            else:
+                pgsign = NUMERIC_NAN
+            buf = CDumper.ensure_size(rv, offset, 8)
+            _write_numeric_head(buf, 0, 0, pgsign, 0)
+            return 8
+
+        # The decimal digit at index j has power p = e + n - 1 - j and it
+        # belongs to the base 10000 digit of weight floor(p / DEC_DIGITS).
+        cdef int64_t e = exp
+        cdef Py_ssize_t n = len(digits)
+        cdef Py_ssize_t j, first = -1, last = -1
+        for j in range(n):
+            if digits[j]:
+                if first < 0:
+                    first = j
+                last = j
+
+        cdef int64_t dscale = -e if e < 0 else 0
+        pgsign = NUMERIC_NEG if sign else NUMERIC_POS
+        if first < 0:
+            buf = CDumper.ensure_size(rv, offset, 8)
+            _write_numeric_head(buf, 0, 0, pgsign, dscale)
+            return 8
+
+        cdef int64_t wtop = (e + n - 1 - first) // DEC_DIGITS
+        cdef int64_t wbot = (e + n - 1 - last) // DEC_DIGITS
+        cdef Py_ssize_t ndigits = wtop - wbot + 1
+        cdef Py_ssize_t length = 8 + 2 * ndigits
+        buf = CDumper.ensure_size(rv, offset, length)
+        _write_numeric_head(buf, ndigits, wtop, pgsign, dscale)
+
+        cdef int64_t p, w, wcurr = wtop
+        cdef uint16_t val = 0, beval
+        for j in range(first, last + 1):
+            p = e + n - 1 - j
+            w = p // DEC_DIGITS
+            if w != wcurr:
+                beval = htobe16(val)
+                memcpy(buf + 8 + 2 * (wtop - wcurr), &beval, 2)
+                # Write the zero groups that may be skipped
+                while wcurr > w + 1:
+                    wcurr -= 1
+                    memset(buf + 8 + 2 * (wtop - wcurr), 0, 2)
+                wcurr = w
+                val = 0
+            val += digits[j] * _pow10[p - w * DEC_DIGITS]
+
+        beval = htobe16(val)
+        memcpy(buf + 8 + 2 * (wtop - wcurr), &beval, 2)
+        return length
+
+
+@cython.final
+cdef class NumericBinaryLoader(CLoader):
+
+    format = Format.BINARY
+
+    cdef object cload(self, const char *data, size_t length):
+        cdef uint16_t *data16 = <uint16_t *>data
+        cdef uint16_t ndigits = be16toh(data16[0])
+        cdef int16_t weight = <int16_t>be16toh(data16[1])
+        cdef uint16_t sign = be16toh(data16[2])
+        cdef uint16_t dscale = be16toh(data16[3])
+
+        if sign == NUMERIC_NAN:
+            return _decimal_nan
+        elif sign == NUMERIC_PINF:
+            return _decimal_pinf
+        elif sign == NUMERIC_NINF:
+            return _decimal_ninf
+        elif sign != NUMERIC_POS and sign != NUMERIC_NEG:
+            raise e.DataError(f"bad value for numeric sign: 0x{sign:X}")
+
+        # Write the number in the same format of the text representation, as
+        # PostgreSQL's get_str_from_var() does. The Decimal constructor from a
+        # string is faster than the one from a digits tuple, which converts
+        # it to a string internally anyway.
+        cdef char stackbuf[128]
+        cdef char *buf = stackbuf
+        cdef size_t bufsize = (
+            3 + DEC_DIGITS * (weight + 1 if weight >= 0 else 1)
+            + dscale + DEC_DIGITS
+        )
+        if bufsize > sizeof(stackbuf):
+            buf = <char *>PyMem_Malloc(bufsize)
+            if buf == NULL:
+                raise MemoryError()
+
+        cdef char *ptr = buf
+        cdef char *end
+        cdef int i
+        try:
+            if sign == NUMERIC_NEG:
+                ptr[0] = b'-'
+                ptr += 1
+
+            if weight < 0:
+                ptr[0] = b'0'
+                ptr += 1
+            else:
+                for i in range(weight + 1):
+                    ptr = _write_numeric_group(
+                        ptr, be16toh(data16[4 + i]) if i < ndigits else 0,
+                        i == 0)
+
+            if dscale > 0:
+                ptr[0] = b'.'
+                ptr += 1
+                end = ptr + dscale
+                i = weight + 1
+                while ptr < end:
+                    ptr = _write_numeric_group(
+                        ptr, be16toh(data16[4 + i]) if 0 <= i < ndigits else 0,
+                        False)
+                    i += 1
+                ptr = end
+
+            s = PyUnicode_DecodeASCII(buf, ptr - buf, NULL)
+        finally:
+            if buf != stackbuf:
+                PyMem_Free(buf)
+
+        return Decimal(s)
+
+
+@cython.final
+cdef class NumericFloatBinaryLoader(CLoader):
+
+    format = Format.BINARY
+
+    cdef object cload(self, const char *data, size_t length):
+        cdef uint16_t *data16 = <uint16_t *>data
+        cdef uint16_t ndigits = be16toh(data16[0])
+        cdef int16_t weight = <int16_t>be16toh(data16[1])
+        cdef uint16_t sign = be16toh(data16[2])
+
+        if sign == NUMERIC_NAN:
+            return float("nan")
+        elif sign == NUMERIC_PINF:
+            return float("inf")
+        elif sign == NUMERIC_NINF:
+            return float("-inf")
+        elif sign != NUMERIC_POS and sign != NUMERIC_NEG:
+            raise e.DataError(f"bad value for numeric sign: 0x{sign:X}")
+
+        # Write the digits as a string such as '-123456E-8' and let Python
+        # parse it, which rounds the value correctly.
+        cdef char stackbuf[128]
+        cdef char *buf = stackbuf
+        cdef size_t bufsize = 1 + DEC_DIGITS * ndigits + 16
+        if bufsize > sizeof(stackbuf):
+            buf = <char *>PyMem_Malloc(bufsize)
+            if buf == NULL:
+                raise MemoryError()
+
+        cdef char *ptr = buf
+        cdef uint16_t group
+        cdef int i, k
+        cdef double rv
+        try:
+            if sign == NUMERIC_NEG:
+                ptr[0] = b'-'
+                ptr += 1
+            ptr[0] = b'0'
+            ptr += 1
+            for i in range(ndigits):
+                group = be16toh(data16[4 + i])
+                for k in range(DEC_DIGITS - 1, -1, -1):
+                    ptr[k] = c'0' + group % 10
+                    group //= 10
+                ptr += DEC_DIGITS
+            PyOS_snprintf(
+                ptr, 16, "E%d", <int>((weight + 1 - ndigits) * DEC_DIGITS))
+            rv = PyOS_string_to_double(buf, NULL, NULL)
+        finally:
+            if buf != stackbuf:
+                PyMem_Free(buf)
+
+        return PyFloat_FromDouble(rv)
+
+
+cdef inline char *_write_numeric_group(
+    char *ptr, uint16_t group, int strip
+):
+    """
+    Write the DEC_DIGITS decimal digits of a numeric group into *ptr*.
+
+    If *strip* is true omit the leading zeros, leaving at least one digit.
+    Return the pointer after the last digit written.
+    """
+    cdef int k, ndigits = DEC_DIGITS
+    if strip:
+        while ndigits > 1 and group < _pow10[ndigits - 1]:
+            ndigits -= 1
+    for k in range(ndigits - 1, -1, -1):
+        ptr[k] = c'0' + group % 10
+        group //= 10
+    return ptr + ndigits
+
+
+cdef int _write_numeric_head(
+    char *buf, Py_ssize_t ndigits, int64_t weight, uint16_t sign,
+    int64_t dscale
+) except -1:
+    if dscale > NUMERIC_DSCALE_MAX:
+        raise e.DataError(
+            f"numeric scale too large: {dscale}, max {NUMERIC_DSCALE_MAX}")
+    if not NUMERIC_WEIGHT_MIN <= weight <= NUMERIC_WEIGHT_MAX:
+        raise e.DataError("value out of the numeric range")
+    if ndigits > NUMERIC_NDIGITS_MAX:
+        raise e.DataError("too many digits for a numeric")
+
+    cdef uint16_t head[4]
+    head[0] = htobe16(<uint16_t>ndigits)
+    head[1] = htobe16(<uint16_t><int16_t>weight)
+    head[2] = htobe16(sign)
+    head[3] = htobe16(<uint16_t>dscale)
+    memcpy(buf, head, sizeof(head))
+
+
+# Map from loaders of fixed-size binary values to the typecode of the
+# array.array able to contain them, used by Transformer.load_columns()
+_array_typecodes = {
+    Int2BinaryLoader: "h",
+    Int4BinaryLoader: "i",
+    Int8BinaryLoader: "q",
+    OidBinaryLoader: "I",
+    Float4BinaryLoader: "f",
+    Float8BinaryLoader: "d",
+}
@@ -0,0 +1,505 @@
+import gc
+import logging
+import weakref
+from time import sleep, time
+from threading import Thread
+
+import pytest
+
+import psycopg3
+from psycopg3 import pool
+from psycopg3.pq import TransactionStatus
+
+
+def test_defaults(dsn):
+    p = pool.ConnectionPool(dsn)
+    assert p.minconn == p.maxconn == 4
+    assert p.timeout == 30
+    assert p.max_idle == 600
+    assert p.num_workers == 3
+    p.close()
+
+
+def test_minconn_maxconn(dsn):
+    p = pool.ConnectionPool(dsn, minconn=2)
+    assert p.minconn == p.maxconn == 2
+    p.close()
+
+    p = pool.ConnectionPool(dsn, minconn=2, maxconn=4)
+    assert p.minconn == 2
+    assert p.maxconn == 4
+    p.close()
+
+    with pytest.raises(ValueError):
+        pool.ConnectionPool(dsn, minconn=4, maxconn=2)
+
+
+def test_connection_class(dsn):
+    class MyConn(psycopg3.Connection):
+        pass
+
+    with pool.ConnectionPool(dsn, connection_class=MyConn, minconn=1) as p:
+        with p.connection() as conn:
+            assert isinstance(conn, MyConn)
+
+
+def test_kwargs(dsn):
+    with pool.ConnectionPool(dsn, kwargs={"autocommit": True}, minconn=1) as p:
+        with p.connection() as conn:
+            assert conn.autocommit
+
+
+def test_its_really_a_pool(dsn):
+    with pool.ConnectionPool(dsn, minconn=2) as p:
+        with p.connection() as conn:
+            cur = conn.execute("select pg_backend_pid()")
+            (pid1,) = cur.fetchone()
+
+            with p.connection() as conn2:
+                cur = conn2.execute("select pg_backend_pid()")
+                (pid2,) = cur.fetchone()
+
+        with p.connection() as conn:
+            assert conn.pgconn.backend_pid in (pid1, pid2)
+
+
+def test_context(dsn):
+    with pool.ConnectionPool(dsn, minconn=1) as p:
+        assert not p.closed
+    assert p.closed
+
+
+def test_connection_not_lost(dsn):
+    with pool.ConnectionPool(dsn, minconn=1) as p:
+        with pytest.raises(ZeroDivisionError):
+            with p.connection() as conn:
+                pid = conn.pgconn.backend_pid
+                1 / 0
+
+        with p.connection() as conn2:
+            assert conn2.pgconn.backend_pid == pid
+
+
+def test_wait_ready(dsn):
+    with pool.ConnectionPool(dsn, minconn=4, num_workers=1) as p:
+        p.wait(2.0)
+        assert len(p._pool) == 4
+
+
+def test_wait_timeout(dsn, monkeypatch):
+    delay_connection(monkeypatch, 0.2)
+    with pytest.raises(pool.PoolTimeout):
+        with pool.ConnectionPool(dsn, minconn=4, num_workers=1) as p:
+            p.wait(0.3)
+
+    assert p.closed
+
+
+def test_configure(dsn):
+    inits = 0
+
+    def configure(conn):
+        nonlocal inits
+        inits += 1
+        with conn.transaction():
+            conn.execute("set default_transaction_read_only to on")
+
+    with pool.ConnectionPool(dsn, minconn=1, configure=configure) as p:
+        p.wait(timeout=1.0)
+        with p.connection() as conn:
+            assert inits == 1
+            cur = conn.execute("show default_transaction_read_only")
+            assert cur.fetchone()[0] == "on"
+
+        with p.connection() as conn:
+            assert inits == 1
+
+
+def test_configure_badstate(dsn, caplog):
+    caplog.set_level(logging.WARNING, logger="psycopg3.pool")
+
+    def configure(conn):
+        conn.execute("select 1")
+
+    with pool.ConnectionPool(dsn, minconn=1, configure=configure) as p:
+        with pytest.raises(pool.PoolTimeout):
+            p.wait(timeout=0.5)
+
+    assert caplog.records
+    assert "INTRANS" in caplog.records[0].message
+
+
+def test_reset(dsn):
+    resets = 0
+
+    def setup(conn):
+        with conn.transaction():
+            conn.execute("set timezone to '+1:00'")
+
+    def reset(conn):
+        nonlocal resets
+        resets += 1
+        with conn.transaction():
+            conn.execute("set timezone to utc")
+
+    with pool.ConnectionPool(dsn, minconn=1, reset=reset) as p:
+        with p.connection() as conn:
+            assert resets == 0
+            setup(conn)
+
+        sleep(0.1)
+        assert resets == 1
+
+        with p.connection() as conn:
+            assert resets == 1
+            cur = conn.execute("show timezone")
+            assert cur.fetchone() == ("UTC",)
+
+
+def test_reset_deallocate(dsn):
+    def reset(conn):
+        conn.execute("select 1", prepare=False)
+
+    with pool.ConnectionPool(dsn, minconn=1, reset=reset) as p:
+        with p.connection() as conn:
+            conn.prepare_threshold = 0
+            conn.execute("select %s", [1])
+            conn.execute("select %s::text", [1])
+
+        sleep(0.1)
+        with p.connection() as conn:
+            assert not conn._prepared._prepared
+            cur = conn.execute("select count(*) from pg_prepared_statements")
+            assert cur.fetchone() == (0,)
+
+
+def test_reset_badstate(dsn, caplog):
+    caplog.set_level(logging.WARNING, logger="psycopg3.pool")
+
+    def reset(conn):
+        conn.execute("reset all")
+
+    with pool.ConnectionPool(dsn, minconn=1, reset=reset) as p:
+        with p.connection() as conn:
+            conn.execute("select 1")
+            pid1 = conn.pgconn.backend_pid
+
+        with p.connection() as conn:
+            conn.execute("select 1")
+            pid2 = conn.pgconn.backend_pid
+
+    assert pid1 != pid2
+    assert caplog.records
+    assert "INTRANS" in caplog.records[0].message
+
+
+def test_queue(dsn):
+    def worker(n):
+        t0 = time()
+        with p.connection() as conn:
+            cur = conn.execute("select pg_backend_pid() from pg_sleep(0.2)")
+            (pid,) = cur.fetchone()
+        t1 = time()
+        results.append((n, t1 - t0, pid))
+
+    results = []
+    with pool.ConnectionPool(dsn, minconn=2) as p:
+        p.wait()
+        ts = [Thread(target=worker, args=(i,)) for i in range(6)]
+        [t.start() for t in ts]
+        [t.join() for t in ts]
+
+    times = [item[1] for item in results]
+    want_times = [0.2, 0.2, 0.4, 0.4, 0.6, 0.6]
+    for got, want in zip(times, want_times):
+        assert got == pytest.approx(want, 0.1), times
+
+    assert len(set(r[2] for r in results)) == 2, results
+
+
+def test_queue_timeout(dsn):
+    def worker(n):
+        t0 = time()
+        try:
+            with p.connection() as conn:
+                cur = conn.execute(
+                    "select pg_backend_pid() from pg_sleep(0.2)"
+                )
+                (pid,) = cur.fetchone()
+        except pool.PoolTimeout as e:
+            t1 = time()
+            errors.append((n, t1 - t0, e))
+        else:
+            t1 = time()
+            results.append((n, t1 - t0, pid))
+
+    results = []
+    errors = []
+
+    with pool.ConnectionPool(dsn, minconn=2, timeout=0.1) as p:
+        p.wait()
+        ts = [Thread(target=worker, args=(i,)) for i in range(4)]
+        [t.start() for t in ts]
+        [t.join() for t in ts]
+
+    assert len(results) == 2
+    assert len(errors) == 2
+    for e in errors:
+        assert 0.1 < e[1] < 0.15
+
+
+def test_queue_fifo(dsn):
+    def worker(n):
+        with p.connection() as conn:
+            order.append(n)
+            conn.execute("select pg_sleep(0.05)")
+
+    order = []
+    with pool.ConnectionPool(dsn, minconn=1) as p:
+        p.wait()
+        with p.connection():
+            ts = []
+            for i in range(5):
+                t = Thread(target=worker, args=(i,))
+                t.start()
+                ts.append(t)
+                sleep(0.02)
+
+        [t.join() for t in ts]
+
+    assert order == list(range(5))
+
+
+def test_putconn_no_pool(dsn):
+    with pool.ConnectionPool(dsn, minconn=1) as p:
+        conn = psycopg3.connect(dsn)
+        with pytest.raises(ValueError):
+            p.putconn(conn)
+
+    conn.close()
+
+
+def test_putconn_wrong_pool(dsn):
+    with pool.ConnectionPool(dsn, minconn=1) as p1:
+        with pool.ConnectionPool(dsn, minconn=1) as p2:
+            conn = p1.getconn()
+            with pytest.raises(ValueError):
+                p2.putconn(conn)
+
+            p1.putconn(conn)
+
+
+@pytest.mark.parametrize(
+    "status", [TransactionStatus.INTRANS, TransactionStatus.INERROR]
+)
+def test_putconn_rollback(dsn, status):
+    with pool.ConnectionPool(dsn, minconn=1) as p:
+        conn = p.getconn()
+        pid = conn.pgconn.backend_pid
+        conn.execute("create temp table test_pool (id int)")
+        if status == TransactionStatus.INERROR:
+            with pytest.raises(psycopg3.DataError):
+                conn.execute("select 1 / 0")
+
+        assert conn.pgconn.transaction_status == status
+        p.putconn(conn)
+
+        with p.connection() as conn2:
+            assert conn2.pgconn.backend_pid == pid
+            status = conn2.pgconn.transaction_status
+            assert status == TransactionStatus.IDLE
+            with pytest.raises(psycopg3.errors.UndefinedTable):
+                conn2.execute("select * from test_pool")
+
+
+def test_closed_putconn(dsn):
+    p = pool.ConnectionPool(dsn, minconn=1)
+
+    with p.connection() as conn:
+        pass
+    assert not conn.closed
+
+    with p.connection() as conn:
+        p.close()
+    assert conn.closed
+
+
+def test_closed_getconn(dsn):
+    p = pool.ConnectionPool(dsn, minconn=1)
+    assert not p.closed
+    with p.connection():
+        pass
+
+    p.close()
+    assert p.closed
+
+    with pytest.raises(pool.PoolClosed):
+        with p.connection():
+            pass
+
+
+def test_closed_queue(dsn):
+    p = pool.ConnectionPool(dsn, minconn=1)
+    success = []
+
+    def w1():
+        with p.connection() as conn:
+            conn.execute("select 1 from pg_sleep(0.2)")
+        success.append("w1")
+
+    def w2():
+        with pytest.raises(pool.PoolClosed):
+            with p.connection():
+                pass
+        success.append("w2")
+
+    t1 = Thread(target=w1)
+    t2 = Thread(target=w2)
+    t1.start()
+    sleep(0.1)
+    t2.start()
+    p.close()
+    t1.join()
+    t2.join()
+    assert len(success) == 2
+
+
+def test_broken_replaced(dsn):
+    with pool.ConnectionPool(dsn, minconn=1) as p:
+        conn = p.getconn()
+        pid = conn.pgconn.backend_pid
+        conn.close()
+        p.putconn(conn)
+
+        with p.connection(timeout=1.0) as conn2:
+            assert conn2.pgconn.backend_pid != pid
+
+        assert p._nconns == 1
+
+
+def test_grow(dsn, monkeypatch):
+    delay_connection(monkeypatch, 0.1)
+
+    def worker(n):
+        t0 = time()
+        with p.connection() as conn:
+            conn.execute("select 1 from pg_sleep(0.2)")
+        t1 = time()
+        results.append((n, t1 - t0))
+
+    with pool.ConnectionPool(dsn, minconn=2, maxconn=4, num_workers=3) as p:
+        p.wait(1.0)
+        results = []
+
+        ts = [Thread(target=worker, args=(i,)) for i in range(6)]
+        [t.start() for t in ts]
+        [t.join() for t in ts]
+
+        assert p._nconns == 4
+
+    want_times = [0.2, 0.2, 0.3, 0.3, 0.4, 0.4]
+    times = sorted(item[1] for item in results)
+    for got, want in zip(times, want_times):
+        assert got == pytest.approx(want, 0.15), times
+
+
+def test_spare_connection(dsn):
+    with pool.ConnectionPool(dsn, minconn=1, maxconn=2) as p:
+        p.wait(1.0)
+        with p.connection():
+            # The pool was left empty: a new connection is prepared
+            sleep(0.5)
+            assert len(p._pool) == 1
+            assert p._nconns == 2
+
+
+def test_shrink(dsn):
+    with pool.ConnectionPool(
+        dsn, minconn=2, maxconn=4, num_workers=3, max_idle=0.2
+    ) as p:
+        p.wait(1.0)
+        with p.connection():
+            with p.connection():
+                with p.connection():
+                    sleep(0.3)
+
+        assert p._nconns >= 3
+        sleep(1.0)
+        assert p._nconns == 2
+
+
+def test_reconnect(dsn, monkeypatch, caplog):
+    caplog.set_level(logging.WARNING, logger="psycopg3.pool")
+
+    from psycopg3.pool.base import ConnectionAttempt
+
+    monkeypatch.setattr(ConnectionAttempt, "INITIAL_DELAY", 0.1)
+    monkeypatch.setattr(ConnectionAttempt, "DELAY_JITTER", 0.0)
+
+    orig_connect = psycopg3.Connection.connect
+    attempts = []
+
+    def connect(*args, **kwargs):
+        attempts.append(time())
+        if len(attempts) < 3:
+            raise psycopg3.OperationalError("nah")
+        return orig_connect(*args, **kwargs)
+
+    monkeypatch.setattr(psycopg3.Connection, "connect", connect)
+
+    with pool.ConnectionPool(dsn, minconn=1) as p:
+        p.wait(1.0)
+        assert len(attempts) == 3
+
+    assert attempts[1] - attempts[0] == pytest.approx(0.1, 0.1)
+    assert attempts[2] - attempts[1] == pytest.approx(0.2, 0.1)
+    assert len(caplog.records) == 2
+
+
+def test_reconnect_failure(dsn, monkeypatch, caplog):
+    caplog.set_level(logging.WARNING, logger="psycopg3.pool")
+
+    from psycopg3.pool.base import ConnectionAttempt
+
+    monkeypatch.setattr(ConnectionAttempt, "INITIAL_DELAY", 0.1)
+    monkeypatch.setattr(ConnectionAttempt, "DELAY_JITTER", 0.0)
+
+    def connect(*args, **kwargs):
+        raise psycopg3.OperationalError("nah")
+
+    monkeypatch.setattr(psycopg3.Connection, "connect", connect)
+
+    with pool.ConnectionPool(dsn, minconn=1, reconnect_timeout=0.5) as p:
+        sleep(1.0)
+        assert p._nconns == 0
+
+    assert "failed after" in caplog.records[-1].message
+
+
+def test_del_no_warning(dsn, recwarn):
+    p = pool.ConnectionPool(dsn, minconn=2)
+    with p.connection() as conn:
+        conn.execute("select 1")
+
+    p.wait()
+    ref = weakref.ref(p)
+    del p, conn
+    gc.collect()
+    assert not ref()
+    assert not [w for w in recwarn if issubclass(w.category, ResourceWarning)]
+
+
+def delay_connection(monkeypatch, sec):
+    """
+    Return a _connect_gen function delayed by the amount of seconds
+    """
+    connect_orig = psycopg3.Connection.connect
+
+    def connect_delay(*args, **kwargs):
+        t0 = time()
+        rv = connect_orig(*args, **kwargs)
+        t1 = time()
+        sleep(sec - (t1 - t0))
+        return rv
+
+    monkeypatch.setattr(psycopg3.Connection, "connect", connect_delay)
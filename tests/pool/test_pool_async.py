@@ -0,0 +1,458 @@
+import gc
+import asyncio
+import logging
+import weakref
+from time import time
+
+import pytest
+
+import psycopg3
+from psycopg3 import pool
+from psycopg3.pq import TransactionStatus
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_defaults(dsn):
+    p = pool.AsyncConnectionPool(dsn)
+    assert p.minconn == p.maxconn == 4
+    assert p.timeout == 30
+    assert p.max_idle == 600
+    await p.close()
+
+
+async def test_minconn_maxconn(dsn):
+    p = pool.AsyncConnectionPool(dsn, minconn=2)
+    assert p.minconn == p.maxconn == 2
+    await p.close()
+
+    p = pool.AsyncConnectionPool(dsn, minconn=2, maxconn=4)
+    assert p.minconn == 2
+    assert p.maxconn == 4
+    await p.close()
+
+    with pytest.raises(ValueError):
+        pool.AsyncConnectionPool(dsn, minconn=4, maxconn=2)
+
+
+async def test_connection_class(dsn):
+    class MyConn(psycopg3.AsyncConnection):
+        pass
+
+    async with pool.AsyncConnectionPool(
+        dsn, connection_class=MyConn, minconn=1
+    ) as p:
+        async with p.connection() as conn:
+            assert isinstance(conn, MyConn)
+
+
+async def test_kwargs(dsn):
+    async with pool.AsyncConnectionPool(
+        dsn, kwargs={"autocommit": True}, minconn=1
+    ) as p:
+        async with p.connection() as conn:
+            assert conn.autocommit
+
+
+async def test_its_really_a_pool(dsn):
+    async with pool.AsyncConnectionPool(dsn, minconn=2) as p:
+        async with p.connection() as conn:
+            cur = await conn.execute("select pg_backend_pid()")
+            (pid1,) = await cur.fetchone()
+
+            async with p.connection() as conn2:
+                cur = await conn2.execute("select pg_backend_pid()")
+                (pid2,) = await cur.fetchone()
+
+        async with p.connection() as conn:
+            assert conn.pgconn.backend_pid in (pid1, pid2)
+
+
+async def test_context(dsn):
+    async with pool.AsyncConnectionPool(dsn, minconn=1) as p:
+        assert not p.closed
+    assert p.closed
+
+
+async def test_connection_not_lost(dsn):
+    async with pool.AsyncConnectionPool(dsn, minconn=1) as p:
+        with pytest.raises(ZeroDivisionError):
+            async with p.connection() as conn:
+                pid = conn.pgconn.backend_pid
+                1 / 0
+
+        async with p.connection() as conn2:
+            assert conn2.pgconn.backend_pid == pid
+
+
+async def test_wait_ready(dsn):
+    async with pool.AsyncConnectionPool(dsn, minconn=4) as p:
+        await p.wait(2.0)
+        assert len(p._pool) == 4
+
+
+async def test_wait_timeout(dsn, monkeypatch):
+    delay_connection(monkeypatch, 0.2)
+    with pytest.raises(pool.PoolTimeout):
+        async with pool.AsyncConnectionPool(dsn, minconn=4) as p:
+            await p.wait(0.1)
+
+    assert p.closed
+
+
+async def test_concurrent_connect(dsn, monkeypatch):
+    delay_connection(monkeypatch, 0.2)
+    async with pool.AsyncConnectionPool(dsn, minconn=4) as p:
+        t0 = time()
+        await p.wait(1.0)
+        t1 = time()
+
+    # Connections are opened concurrently, not one after the other
+    assert t1 - t0 == pytest.approx(0.2, 0.2)
+
+
+async def test_configure(dsn):
+    inits = 0
+
+    async def configure(conn):
+        nonlocal inits
+        inits += 1
+        async with conn.transaction():
+            await conn.execute("set default_transaction_read_only to on")
+
+    async with pool.AsyncConnectionPool(
+        dsn, minconn=1, configure=configure
+    ) as p:
+        await p.wait(timeout=1.0)
+        async with p.connection() as conn:
+            assert inits == 1
+            cur = await conn.execute("show default_transaction_read_only")
+            assert (await cur.fetchone())[0] == "on"
+
+        async with p.connection() as conn:
+            assert inits == 1
+
+
+async def test_configure_badstate(dsn, caplog):
+    caplog.set_level(logging.WARNING, logger="psycopg3.pool")
+
+    async def configure(conn):
+        await conn.execute("select 1")
+
+    async with pool.AsyncConnectionPool(
+        dsn, minconn=1, configure=configure
+    ) as p:
+        with pytest.raises(pool.PoolTimeout):
+            await p.wait(timeout=0.5)
+
+    assert caplog.records
+    assert "INTRANS" in caplog.records[0].message
+
+
+async def test_reset(dsn):
+    resets = 0
+
+    async def setup(conn):
+        async with conn.transaction():
+            await conn.execute("set timezone to '+1:00'")
+
+    async def reset(conn):
+        nonlocal resets
+        resets += 1
+        async with conn.transaction():
+            await conn.execute("set timezone to utc")
+
+    async with pool.AsyncConnectionPool(dsn, minconn=1, reset=reset) as p:
+        async with p.connection() as conn:
+            assert resets == 0
+            await setup(conn)
+
+        await asyncio.sleep(0.1)
+        assert resets == 1
+
+        async with p.connection() as conn:
+            assert resets == 1
+            cur = await conn.execute("show timezone")
+            assert (await cur.fetchone()) == ("UTC",)
+
+
+async def test_reset_deallocate(dsn):
+    async def reset(conn):
+        await conn.execute("select 1", prepare=False)
+
+    async with pool.AsyncConnectionPool(dsn, minconn=1, reset=reset) as p:
+        async with p.connection() as conn:
+            conn.prepare_threshold = 0
+            await conn.execute("select %s", [1])
+            await conn.execute("select %s::text", [1])
+
+        await asyncio.sleep(0.1)
+        async with p.connection() as conn:
+            assert not conn._prepared._prepared
+            cur = await conn.execute(
+                "select count(*) from pg_prepared_statements"
+            )
+            assert (await cur.fetchone()) == (0,)
+
+
+async def test_queue(dsn):
+    async def worker(n):
+        t0 = time()
+        async with p.connection() as conn:
+            cur = await conn.execute(
+                "select pg_backend_pid() from pg_sleep(0.2)"
+            )
+            (pid,) = await cur.fetchone()
+        t1 = time()
+        results.append((n, t1 - t0, pid))
+
+    results = []
+    async with pool.AsyncConnectionPool(dsn, minconn=2) as p:
+        await p.wait()
+        await asyncio.gather(*(worker(i) for i in range(6)))
+
+    times = [item[1] for item in results]
+    want_times = [0.2, 0.2, 0.4, 0.4, 0.6, 0.6]
+    for got, want in zip(times, want_times):
+        assert got == pytest.approx(want, 0.1), times
+
+    assert len(set(r[2] for r in results)) == 2, results
+
+
+async def test_queue_timeout(dsn):
+    async def worker(n):
+        t0 = time()
+        try:
+            async with p.connection() as conn:
+                cur = await conn.execute(
+                    "select pg_backend_pid() from pg_sleep(0.2)"
+                )
+                (pid,) = await cur.fetchone()
+        except pool.PoolTimeout as e:
+            t1 = time()
+            errors.append((n, t1 - t0, e))
+        else:
+            t1 = time()
+            results.append((n, t1 - t0, pid))
+
+    results = []
+    errors = []
+
+    async with pool.AsyncConnectionPool(dsn, minconn=2, timeout=0.1) as p:
+        await p.wait()
+        await asyncio.gather(*(worker(i) for i in range(4)))
+
+    assert len(results) == 2
+    assert len(errors) == 2
+    for e in errors:
+        assert 0.1 < e[1] < 0.15
+
+
+async def test_queue_fifo(dsn):
+    async def worker(n):
+        async with p.connection() as conn:
+            order.append(n)
+            await conn.execute("select pg_sleep(0.05)")
+
+    order = []
+    async with pool.AsyncConnectionPool(dsn, minconn=1) as p:
+        await p.wait()
+        async with p.connection():
+            ts = []
+            for i in range(5):
+                ts.append(asyncio.ensure_future(worker(i)))
+                await asyncio.sleep(0.02)
+
+        await asyncio.gather(*ts)
+
+    assert order == list(range(5))
+
+
+async def test_putconn_no_pool(dsn):
+    async with pool.AsyncConnectionPool(dsn, minconn=1) as p:
+        conn = await psycopg3.AsyncConnection.connect(dsn)
+        with pytest.raises(ValueError):
+            await p.putconn(conn)
+
+    await conn.close()
+
+
+@pytest.mark.parametrize(
+    "status", [TransactionStatus.INTRANS, TransactionStatus.INERROR]
+)
+async def test_putconn_rollback(dsn, status):
+    async with pool.AsyncConnectionPool(dsn, minconn=1) as p:
+        conn = await p.getconn()
+        pid = conn.pgconn.backend_pid
+        await conn.execute("create temp table test_pool (id int)")
+        if status == TransactionStatus.INERROR:
+            with pytest.raises(psycopg3.DataError):
+                await conn.execute("select 1 / 0")
+
+        assert conn.pgconn.transaction_status == status
+        await p.putconn(conn)
+
+        async with p.connection() as conn2:
+            assert conn2.pgconn.backend_pid == pid
+            status = conn2.pgconn.transaction_status
+            assert status == TransactionStatus.IDLE
+            with pytest.raises(psycopg3.errors.UndefinedTable):
+                await conn2.execute("select * from test_pool")
+
+
+async def test_closed_putconn(dsn):
+    p = pool.AsyncConnectionPool(dsn, minconn=1)
+
+    async with p.connection() as conn:
+        pass
+    assert not conn.closed
+
+    async with p.connection() as conn:
+        await p.close()
+    assert conn.closed
+
+
+async def test_closed_getconn(dsn):
+    p = pool.AsyncConnectionPool(dsn, minconn=1)
+    assert not p.closed
+    async with p.connection():
+        pass
+
+    await p.close()
+    assert p.closed
+
+    with pytest.raises(pool.PoolClosed):
+        async with p.connection():
+            pass
+
+
+async def test_closed_queue(dsn):
+    p = pool.AsyncConnectionPool(dsn, minconn=1)
+    success = []
+
+    async def w1():
+        async with p.connection() as conn:
+            await conn.execute("select 1 from pg_sleep(0.2)")
+        success.append("w1")
+
+    async def w2():
+        with pytest.raises(pool.PoolClosed):
+            async with p.connection():
+                pass
+        success.append("w2")
+
+    t1 = asyncio.ensure_future(w1())
+    await asyncio.sleep(0.1)
+    t2 = asyncio.ensure_future(w2())
+    await asyncio.sleep(0.01)
+    await p.close()
+    await asyncio.gather(t1, t2)
+    assert len(success) == 2
+
+
+async def test_del_no_warning(dsn, recwarn):
+    p = pool.AsyncConnectionPool(dsn, minconn=2)
+    async with p.connection() as conn:
+        await conn.execute("select 1")
+
+    await p.wait()
+    ref = weakref.ref(p)
+    del p, conn
+    gc.collect()
+    assert not ref()
+    assert not [w for w in recwarn if issubclass(w.category, ResourceWarning)]
+
+
+async def test_broken_replaced(dsn):
+    async with pool.AsyncConnectionPool(dsn, minconn=1) as p:
+        conn = await p.getconn()
+        pid = conn.pgconn.backend_pid
+        await conn.close()
+        await p.putconn(conn)
+
+        async with p.connection(timeout=1.0) as conn2:
+            assert conn2.pgconn.backend_pid != pid
+
+        assert p._nconns == 1
+
+
+async def test_grow(dsn, monkeypatch):
+    delay_connection(monkeypatch, 0.1)
+
+    async def worker(n):
+        t0 = time()
+        async with p.connection() as conn:
+            await conn.execute("select 1 from pg_sleep(0.2)")
+        t1 = time()
+        results.append((n, t1 - t0))
+
+    async with pool.AsyncConnectionPool(dsn, minconn=2, maxconn=4) as p:
+        await p.wait(1.0)
+        results = []
+
+        await asyncio.gather(*(worker(i) for i in range(6)))
+        assert p._nconns == 4
+
+    want_times = [0.2, 0.2, 0.3, 0.3, 0.4, 0.4]
+    times = sorted(item[1] for item in results)
+    for got, want in zip(times, want_times):
+        assert got == pytest.approx(want, 0.15), times
+
+
+async def test_shrink(dsn):
+    async with pool.AsyncConnectionPool(
+        dsn, minconn=2, maxconn=4, max_idle=0.2
+    ) as p:
+        await p.wait(1.0)
+        async with p.connection():
+            async with p.connection():
+                async with p.connection():
+                    await asyncio.sleep(0.3)
+
+        assert p._nconns >= 3
+        await asyncio.sleep(1.0)
+        assert p._nconns == 2
+
+
+async def test_reconnect(dsn, monkeypatch, caplog):
+    caplog.set_level(logging.WARNING, logger="psycopg3.pool")
+
+    from psycopg3.pool.base import ConnectionAttempt
+
+    monkeypatch.setattr(ConnectionAttempt, "INITIAL_DELAY", 0.1)
+    monkeypatch.setattr(ConnectionAttempt, "DELAY_JITTER", 0.0)
+
+    orig_connect = psycopg3.AsyncConnection.connect
+    attempts = []
+
+    async def connect(*args, **kwargs):
+        attempts.append(time())
+        if len(attempts) < 3:
+            raise psycopg3.OperationalError("nah")
+        return await orig_connect(*args, **kwargs)
+
+    monkeypatch.setattr(psycopg3.AsyncConnection, "connect", connect)
+
+    async with pool.AsyncConnectionPool(dsn, minconn=1) as p:
+        await p.wait(1.0)
+        assert len(attempts) == 3
+
+    assert attempts[1] - attempts[0] == pytest.approx(0.1, 0.1)
+    assert attempts[2] - attempts[1] == pytest.approx(0.2, 0.1)
+    assert len(caplog.records) == 2
+
+
+def delay_connection(monkeypatch, sec):
+    """
+    Make the connection to the database take *sec* seconds
+    """
+    connect_orig = psycopg3.AsyncConnection.connect
+
+    async def connect_delay(*args, **kwargs):
+        t0 = time()
+        rv = await connect_orig(*args, **kwargs)
+        t1 = time()
+        await asyncio.sleep(sec - (t1 - t0))
+        return rv
+
+    monkeypatch.setattr(psycopg3.AsyncConnection, "connect", connect_delay)
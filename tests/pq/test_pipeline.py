@@ -0,0 +1,89 @@
+import pytest
+
+import psycopg3
+from psycopg3 import pq
+
+
+@pytest.mark.libpq("< 14")
+def test_old_libpq(pgconn):
+    assert pgconn.pipeline_status == 0
+    with pytest.raises(psycopg3.NotSupportedError):
+        pgconn.enter_pipeline_mode()
+    with pytest.raises(psycopg3.NotSupportedError):
+        pgconn.exit_pipeline_mode()
+    with pytest.raises(psycopg3.NotSupportedError):
+        pgconn.pipeline_sync()
+
+
+@pytest.mark.libpq(">= 14")
+def test_work_in_progress(pgconn):
+    assert pgconn.pipeline_status == pq.PipelineStatus.OFF
+    pgconn.enter_pipeline_mode()
+    assert pgconn.pipeline_status == pq.PipelineStatus.ON
+    pgconn.send_query_params(b"select $1", [b"1"])
+    with pytest.raises(psycopg3.OperationalError, match="cannot exit"):
+        pgconn.exit_pipeline_mode()
+
+
+@pytest.mark.libpq(">= 14")
+def test_multi_pipelines(pgconn):
+    pgconn.enter_pipeline_mode()
+    pgconn.send_query_params(b"select $1", [b"1"], param_types=[25])
+    pgconn.pipeline_sync()
+    pgconn.send_query_params(b"select $1", [b"2"], param_types=[25])
+    pgconn.pipeline_sync()
+    pgconn.flush()
+
+    # result from first query
+    res = pgconn.get_result()
+    assert res.status == pq.ExecStatus.TUPLES_OK
+    assert res.get_value(0, 0) == b"1"
+    assert pgconn.get_result() is None
+
+    # first sync result
+    res = pgconn.get_result()
+    assert res.status == pq.ExecStatus.PIPELINE_SYNC
+
+    # result from second query
+    res = pgconn.get_result()
+    assert res.status == pq.ExecStatus.TUPLES_OK
+    assert res.get_value(0, 0) == b"2"
+    assert pgconn.get_result() is None
+
+    # second sync result
+    res = pgconn.get_result()
+    assert res.status == pq.ExecStatus.PIPELINE_SYNC
+
+    # pipeline still ON
+    assert pgconn.pipeline_status == pq.PipelineStatus.ON
+    pgconn.exit_pipeline_mode()
+    assert pgconn.pipeline_status == pq.PipelineStatus.OFF
+
+
+@pytest.mark.libpq(">= 14")
+def test_aborted(pgconn):
+    pgconn.enter_pipeline_mode()
+    pgconn.send_query_params(b"select 1/0", None)
+    pgconn.send_query_params(b"select 1", None)
+    pgconn.pipeline_sync()
+    pgconn.flush()
+
+    res = pgconn.get_result()
+    assert res.status == pq.ExecStatus.FATAL_ERROR
+    assert pgconn.get_result() is None
+    assert pgconn.pipeline_status == pq.PipelineStatus.ABORTED
+
+    res = pgconn.get_result()
+    assert res.status == pq.ExecStatus.PIPELINE_ABORTED
+    assert pgconn.get_result() is None
+
+    res = pgconn.get_result()
+    assert res.status == pq.ExecStatus.PIPELINE_SYNC
+    assert pgconn.pipeline_status == pq.PipelineStatus.ON
+    pgconn.exit_pipeline_mode()
+
+
+@pytest.mark.libpq(">= 14")
+def test_pipeline_sync_off(pgconn):
+    with pytest.raises(psycopg3.OperationalError):
+        pgconn.pipeline_sync()
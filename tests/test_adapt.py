@@ -160,6 +160,92 @@ def test_load_cursor_ctx_nested(conn, sql, obj, fmt_out):
     assert res == obj
 
 
+def test_adapters_shared(conn):
+    cur1 = conn.execute("select 'hello'::text, 1")
+    cur2 = conn.execute("select 'world'::text, 2")
+    assert cur2.fetchone() == ("world", 2)
+    tx1, tx2 = cur1._transformer, cur2._transformer
+    assert tx1 is not tx2
+    assert tx1.get_loader(TEXT_OID, Format.TEXT) is tx2.get_loader(
+        TEXT_OID, Format.TEXT
+    )
+    assert tx1.get_dumper("x", Format.TEXT) is tx2.get_dumper("x", Format.TEXT)
+
+    # Customised cursors don't use the adapters of the connection
+    cur3 = conn.cursor()
+    make_loader("c").register(TEXT_OID, cur3)
+    cur3.execute("select 'hello'::text")
+    assert cur3.fetchone() == ("helloc",)
+    loader = cur3._transformer.get_loader(TEXT_OID, Format.TEXT)
+    assert loader is not tx1.get_loader(TEXT_OID, Format.TEXT)
+
+
+def test_adapters_shared_reexecute(conn):
+    cur = conn.cursor()
+    cur.execute("select 'hello'::text")
+    loader = cur._transformer.get_loader(TEXT_OID, Format.TEXT)
+    assert cur._transformer.connection is conn
+    cur.execute("select 'world'::text")
+    assert cur.fetchone() == ("world",)
+    assert cur._transformer.get_loader(TEXT_OID, Format.TEXT) is loader
+
+
+def test_cursor_adapters_copy(conn):
+    cur = conn.cursor()
+    cur.execute("select 1")
+    assert cur._adapters is None
+    assert cur._transformer.adapters is conn.adapters
+
+    make_loader("c").register(TEXT_OID, cur)
+    assert cur._adapters is not None
+    assert cur.execute("select 'hello'::text").fetchone() == ("helloc",)
+    assert conn.execute("select 'hello'::text").fetchone() == ("hello",)
+    assert conn.adapters.get_loader(TEXT_OID, Format.TEXT) is not (
+        cur.adapters.get_loader(TEXT_OID, Format.TEXT)
+    )
+
+
+def test_adapters_shared_register(conn):
+    assert conn.execute("select 'hello'::text").fetchone() == ("hello",)
+    make_loader("t").register(TEXT_OID, conn)
+    assert conn.execute("select 'hello'::text").fetchone() == ("hellot",)
+    make_loader("g").register(TEXT_OID, psycopg3.adapt.global_adapters)
+    try:
+        assert conn.execute("select 'hello'::text").fetchone() == ("hellot",)
+        make_loader("t2").register(TEXT_OID, conn)
+        assert conn.execute("select 'hello'::text").fetchone() == ("hellot2",)
+    finally:
+        psycopg3.adapt.global_adapters.register_loader(
+            TEXT_OID, psycopg3.types.text.TextLoader
+        )
+
+
+def test_adapters_shared_encoding(conn):
+    conn.client_encoding = "utf8"
+    cur = conn.execute("select 'x'::text")
+    enc = cur._transformer.get_loader(TEXT_OID, Format.TEXT)
+    conn.client_encoding = "latin1"
+    cur = conn.execute("select chr(233)::text")
+    assert cur.fetchone() == ("\xe9",)
+    assert cur._transformer.get_loader(TEXT_OID, Format.TEXT) is not enc
+
+
+def test_adapters_shared_records(conn):
+    cur = conn.cursor(format=Format.BINARY)
+    cur.execute("select row(1, 'a'::text)")
+    assert cur.fetchone()[0] == (1, "a")
+    cur.execute("select row('b'::text, 2), row(3)")
+    assert cur.fetchone() == (("b", 2), (3,))
+
+
+def test_adapters_shared_lists(conn):
+    cur = conn.cursor()
+    cur.execute("select %s, pg_typeof(%s)::text", (["a"], [1]))
+    assert cur.fetchone() == (["a"], "bigint[]")
+    cur.execute("select %s, pg_typeof(%s)::text", ([], []))
+    assert cur.fetchone() == ([], "text[]")
+
+
 @pytest.mark.parametrize("fmt_in", [Format.TEXT, Format.BINARY])
 def test_none_type_argument(conn, fmt_in):
     cur = conn.cursor()
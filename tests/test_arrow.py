@@ -0,0 +1,202 @@
+import datetime as dt
+from decimal import Decimal
+
+import pytest
+
+import psycopg3
+from psycopg3.pq import Format
+from psycopg3.oids import builtins
+
+pa = pytest.importorskip("pyarrow")
+arrow = pytest.importorskip("psycopg3.arrow")
+
+query = """
+select i::int2 as a, i::int4 as b, i::int8 as c, i::oid as d,
+    i::float4 as e, nullif(i, 2)::float8 as f, i % 2 = 0 as g,
+    i::text as h, nullif(i, 3)::text::bytea as i
+from generate_series(1, 5) i
+"""
+
+
+@pytest.mark.parametrize("fmt", [Format.TEXT, Format.BINARY])
+def test_record_batches(conn, fmt):
+    cur = conn.cursor(format=fmt)
+    cur.execute(query)
+    assert cur.fetchone()[0] == 1
+    batches = list(arrow.record_batches(cur, batch_size=3))
+    assert [b.num_rows for b in batches] == [3, 1]
+    assert cur._pos == 5
+    assert list(arrow.record_batches(cur)) == []
+
+    table = pa.Table.from_batches(batches)
+    assert table.column_names == list("abcdefghi")
+    assert table.to_pydict() == {
+        "a": [2, 3, 4, 5],
+        "b": [2, 3, 4, 5],
+        "c": [2, 3, 4, 5],
+        "d": [2, 3, 4, 5],
+        "e": [2.0, 3.0, 4.0, 5.0],
+        "f": [None, 3.0, 4.0, 5.0],
+        "g": [True, False, True, False],
+        "h": ["2", "3", "4", "5"],
+        "i": [b"2", None, b"4", b"5"],
+    }
+    types = [pa.int16(), pa.int32(), pa.int64(), pa.uint32()]
+    types += [pa.float32(), pa.float64(), pa.bool_()]
+    assert table.schema.types[:7] == types
+    assert table.schema.field("h").type == pa.string()
+    assert table.schema.field("i").type == pa.binary()
+
+
+@pytest.mark.parametrize("fmt", [Format.TEXT, Format.BINARY])
+def test_record_batches_types(conn, fmt):
+    cur = conn.cursor(format=fmt)
+    cur.execute(
+        """
+        select
+            case when i > 1 then 123.456 else 1 end::numeric(10, 3) as a,
+            case when i > 1 then 123.456 else 1 end::numeric as b,
+            case when i > 2 then 12.5 end::numeric(60, 1) as c,
+            case when i > 2 then '2021-01-02'::date end as d,
+            case when i > 2 then '12:34:56.1'::time end as e,
+            case when i > 2 then '2021-01-02 12:34'::timestamp end as f,
+            case when i > 2 then '2021-01-02 12:34Z'::timestamptz end as g,
+            case when i > 2 then '1 day 1 microsecond'::interval end as h,
+            case when i > 2 then
+                'c5d6b6e6-b0f1-4b3c-a9cb-1c8d8e3f2a6d'::uuid end as i
+        from generate_series(1, 3) i
+        """
+    )
+    batches = list(arrow.record_batches(cur, batch_size=1))
+    schemas = {b.schema for b in batches}
+    assert len(schemas) == 1
+    table = pa.Table.from_batches(batches)
+    assert table.schema.types == [
+        pa.decimal128(10, 3),
+        pa.string(),
+        pa.decimal256(60, 1),
+        pa.date32(),
+        pa.time64("us"),
+        pa.timestamp("us"),
+        pa.timestamp("us", tz="UTC"),
+        pa.duration("us"),
+        pa.string(),
+    ]
+    data = table.to_pydict()
+    assert data["a"] == [Decimal("1"), Decimal("123.456"), Decimal("123.456")]
+    assert data["b"] == ["1", "123.456", "123.456"]
+    assert data["c"] == [None, None, Decimal("12.5")]
+    assert data["d"] == [None, None, dt.date(2021, 1, 2)]
+    assert data["e"] == [None, None, dt.time(12, 34, 56, 100000)]
+    assert data["f"] == [None, None, dt.datetime(2021, 1, 2, 12, 34)]
+    assert data["g"] == [
+        None,
+        None,
+        dt.datetime(2021, 1, 2, 12, 34, tzinfo=dt.timezone.utc),
+    ]
+    assert data["h"] == [None, None, dt.timedelta(days=1, microseconds=1)]
+    assert data["i"] == [None, None, "c5d6b6e6-b0f1-4b3c-a9cb-1c8d8e3f2a6d"]
+
+
+def test_record_batches_bad_value(conn):
+    cur = conn.execute("select 'NaN'::numeric(10, 3)")
+    with pytest.raises(psycopg3.DataError):
+        list(arrow.record_batches(cur))
+
+
+def test_record_batches_no_result(conn):
+    cur = conn.cursor()
+    with pytest.raises(psycopg3.ProgrammingError):
+        list(arrow.record_batches(cur))
+    cur.execute("create temp table ab ()")
+    with pytest.raises(psycopg3.ProgrammingError):
+        list(arrow.record_batches(cur))
+    cur.execute("select 1")
+    with pytest.raises(ValueError):
+        list(arrow.record_batches(cur, batch_size=0))
+
+
+@pytest.mark.parametrize("nrecs", [0, 4, 5])
+def test_record_batches_named(conn, nrecs):
+    with conn.cursor("foo", format=Format.BINARY) as cur:
+        cur.execute(
+            "select i, nullif(i, 2)::float8 as f from generate_series(1, %s) i",
+            (nrecs,),
+        )
+        batches = list(arrow.record_batches(cur, batch_size=2))
+        sizes = [2] * (nrecs // 2) + [nrecs % 2] * (nrecs % 2)
+        assert [b.num_rows for b in batches] == sizes
+        assert cur._pos == nrecs
+        if nrecs:
+            table = pa.Table.from_batches(batches)
+            assert table.column("i").to_pylist() == list(range(1, nrecs + 1))
+            assert table.column("f").null_count == 1
+
+
+def test_copy_record_batches(conn):
+    cur = conn.cursor()
+    types = [builtins[name].oid for name in ["int4", "float8", "text", "bool"]]
+    with cur.copy(
+        """copy (
+            select i, nullif(i, 2)::float8, nullif(i, 3)::text, i % 2 = 0
+            from generate_series(1, 5) i
+        ) to stdout (format binary)"""
+    ) as copy:
+        batches = list(
+            arrow.copy_record_batches(
+                copy, types, ["a", "b", "c", "d"], batch_size=2
+            )
+        )
+
+    assert [b.num_rows for b in batches] == [2, 2, 1]
+    table = pa.Table.from_batches(batches)
+    assert table.schema.types == [
+        pa.int32(),
+        pa.float64(),
+        pa.string(),
+        pa.bool_(),
+    ]
+    assert table.to_pydict() == {
+        "a": [1, 2, 3, 4, 5],
+        "b": [1.0, None, 3.0, 4.0, 5.0],
+        "c": ["1", "2", None, "4", "5"],
+        "d": [False, True, False, True, False],
+    }
+    assert cur.rowcount == 5
+
+
+def test_copy_record_batches_errors(conn):
+    cur = conn.cursor()
+    int4 = builtins["int4"].oid
+    with cur.copy("copy (select 1) to stdout") as copy:
+        with pytest.raises(psycopg3.ProgrammingError):
+            list(arrow.copy_record_batches(copy, [int4]))
+        list(copy)
+
+    with cur.copy("copy (select 1, 2) to stdout (format binary)") as copy:
+        with pytest.raises(psycopg3.DataError):
+            list(arrow.copy_record_batches(copy, [int4]))
+        list(copy)
+
+    with cur.copy("copy (select 1::int8) to stdout (format binary)") as copy:
+        with pytest.raises(psycopg3.DataError):
+            list(arrow.copy_record_batches(copy, [int4]))
+
+    assert conn.execute("select 1").fetchone() == (1,)
+
+
+@pytest.mark.asyncio
+async def test_copy_record_batches_async(aconn):
+    cur = await aconn.cursor()
+    async with cur.copy(
+        "copy (select generate_series(1, 3)) to stdout (format binary)"
+    ) as copy:
+        batches = [
+            b
+            async for b in arrow.acopy_record_batches(
+                copy, [builtins["int4"].oid]
+            )
+        ]
+
+    assert len(batches) == 1
+    assert batches[0].to_pydict() == {"f0": [1, 2, 3]}
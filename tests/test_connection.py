@@ -5,6 +5,7 @@ import socket
 import pytest
 import logging
 import weakref
+import datetime as dt
 from threading import Thread
 
 import psycopg3
@@ -319,6 +320,45 @@ def test_set_encoding_bad(conn):
         conn.client_encoding = "WAT"
 
 
+def test_session_state_changed(conn):
+    conn.execute("set datestyle to 'German'")
+    assert conn._session.datestyle == b"German, DMY"
+    conn.execute("select set_config('IntervalStyle', 'iso_8601', false)")
+    assert conn._session.intervalstyle == b"iso_8601"
+    conn.execute("set client_encoding to latin9")
+    assert conn.client_encoding == "iso8859-15"
+    conn.execute("set timezone to 'Europe/Rome'")
+    assert conn._session.timezone.key == "Europe/Rome"
+    conn.execute("set timezone to '-02:30'")
+    assert conn._session.timezone.utcoffset(None) == dt.timedelta(
+        hours=2, minutes=30
+    )
+
+
+def test_session_state_cached(conn):
+    calls = []
+
+    class PGconnSpy:
+        def parameter_status(self, name):
+            calls.append(name)
+            return conn.pgconn.parameter_status(name)
+
+    conn._session._pgconn = PGconnSpy()
+    conn._session.invalidate()
+    for i in range(3):
+        conn.client_encoding
+        conn._session.datestyle
+    assert len(calls) == 4
+
+    # Values are read again, once, only after waiting for the server
+    conn.execute("select 1")
+    assert len(calls) == 4
+    for i in range(3):
+        conn.client_encoding
+        conn._session.datestyle
+    assert len(calls) == 8
+
+
 @pytest.mark.parametrize(
     "args, kwargs, want",
     [
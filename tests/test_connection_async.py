@@ -5,6 +5,7 @@ import pytest
 import asyncio
 import logging
 import weakref
+import datetime as dt
 
 import psycopg3
 from psycopg3 import encodings
@@ -338,6 +339,23 @@ async def test_set_encoding_bad(aconn):
         await aconn.set_client_encoding("WAT")
 
 
+async def test_session_state_changed(aconn):
+    await aconn.execute("set datestyle to 'German'")
+    assert aconn._session.datestyle == b"German, DMY"
+    await aconn.execute(
+        "select set_config('IntervalStyle', 'iso_8601', false)"
+    )
+    assert aconn._session.intervalstyle == b"iso_8601"
+    await aconn.execute("set client_encoding to latin9")
+    assert aconn.client_encoding == "iso8859-15"
+    await aconn.execute("set timezone to 'Europe/Rome'")
+    assert aconn._session.timezone.key == "Europe/Rome"
+    await aconn.execute("set timezone to '-02:30'")
+    assert aconn._session.timezone.utcoffset(None) == dt.timedelta(
+        hours=2, minutes=30
+    )
+
+
 @pytest.mark.parametrize(
     "args, kwargs, want",
     [
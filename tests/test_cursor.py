@@ -1,10 +1,13 @@
 import gc
 import pickle
 import weakref
+import datetime as dt
+from array import array
 
 import pytest
 
 import psycopg3
+from psycopg3.pq import Format
 from psycopg3.oids import builtins
 
 
@@ -203,6 +206,53 @@ def test_executemany_badquery(conn, query):
         cur.executemany(query, [(10, "hello"), (20, "world")])
 
 
+def test_executemany_many(conn, execmany):
+    cur = conn.cursor()
+    cur.executemany(
+        "insert into execmany(num, data) values (%s, %s)",
+        [(i, str(i)) for i in range(1000)],
+    )
+    assert cur.rowcount == 1000
+    cur.execute("select count(*), sum(num) from execmany")
+    assert cur.fetchone() == (1000, sum(range(1000)))
+
+
+def test_executemany_error_params(conn, execmany):
+    cur = conn.cursor()
+    with pytest.raises(psycopg3.errors.DivisionByZero):
+        cur.executemany(
+            "insert into execmany(num) values (10 / %s)", [[1], [0], [2]]
+        )
+    assert cur.params == [b"0"]
+
+
+def test_executemany_autocommit_error(conn, execmany):
+    conn.autocommit = True
+    cur = conn.cursor()
+    with pytest.raises(psycopg3.errors.DivisionByZero):
+        cur.executemany(
+            "insert into execmany(num) values (10 / %s)",
+            [[1], [0], [2], ["x"]],
+        )
+    assert cur.params == [b"0"]
+    cur.execute("select num from execmany order by num")
+    if psycopg3.Pipeline.is_supported():
+        # The queries are all sent before receiving the error
+        assert cur.fetchall() == [(5,), (10,)]
+    else:
+        assert cur.fetchall() == [(10,)]
+
+
+def test_executemany_adapt_error(conn, execmany):
+    cur = conn.cursor()
+    with pytest.raises(psycopg3.ProgrammingError):
+        cur.executemany(
+            "insert into execmany(num) values (%s)", [[1], [object()], [2]]
+        )
+    cur.execute("select count(*) from execmany")
+    assert cur.fetchone() == (0,)
+
+
 def test_rowcount(conn):
     cur = conn.cursor()
 
@@ -224,6 +274,61 @@ def test_rowcount(conn):
     assert cur.rowcount == -1
 
 
+COLUMNS_QUERY = """
+select i::int2, i::int4, i::int8, i::oid, i::float4, i::float8,
+    i::text, nullif(i, 2) as n
+from generate_series(1, 3) i
+"""
+
+
+@pytest.mark.parametrize("fmt", [Format.TEXT, Format.BINARY])
+def test_fetch_columns(conn, fmt):
+    cur = conn.cursor(format=fmt)
+    cur.execute(COLUMNS_QUERY)
+    assert cur.fetchone() == (1, 1, 1, 1, 1.0, 1.0, "1", 1)
+    cols = cur.fetch_columns()
+    assert [list(col) for col in cols] == [
+        [2, 3],
+        [2, 3],
+        [2, 3],
+        [2, 3],
+        [2.0, 3.0],
+        [2.0, 3.0],
+        ["2", "3"],
+        [None, 3],
+    ]
+    if fmt == Format.BINARY:
+        assert [col.typecode for col in cols[:6]] == list("hiqIfd")
+    else:
+        assert all(type(col) is list for col in cols[:6])
+    assert type(cols[6]) is list
+    assert type(cols[7]) is list
+
+    assert cur.fetchall() == []
+    assert [list(col) for col in cur.fetch_columns()] == [[]] * 8
+
+
+def test_fetch_columns_values(conn):
+    cur = conn.cursor(format=Format.BINARY)
+    cur.execute(
+        "select x::int2, x::int8, x::float8 from unnest(%s::int[]) x",
+        ([-32768, -1, 0, 32767],),
+    )
+    cols = cur.fetch_columns()
+    assert cols[0] == array("h", [-32768, -1, 0, 32767])
+    assert cols[1] == array("q", [-32768, -1, 0, 32767])
+    assert cols[2] == array("d", [-32768, -1, 0, 32767])
+
+    cur.execute("select 1 from generate_series(1, 0)")
+    assert cur.fetch_columns() == [array("i")]
+
+
+def test_fetch_columns_no_result(conn):
+    cur = conn.cursor()
+    with pytest.raises(psycopg3.ProgrammingError):
+        cur.fetch_columns()
+
+
 def test_iter(conn):
     cur = conn.cursor()
     cur.execute("select generate_series(1, 3)")
@@ -245,6 +350,90 @@ def test_iter_stop(conn):
     assert list(cur) == []
 
 
+def test_stream(conn):
+    cur = conn.cursor()
+    recs = []
+    for rec in cur.stream(
+        "select i, '2021-01-01'::date + i from generate_series(1, %s::int) as i",
+        [2],
+    ):
+        recs.append(rec)
+
+    assert recs == [(1, dt.date(2021, 1, 2)), (2, dt.date(2021, 1, 3))]
+    assert cur.rowcount == 2
+    assert len(cur.description) == 2
+
+
+def test_stream_no_row(conn):
+    cur = conn.cursor()
+    recs = list(cur.stream("select generate_series(2,1) as a"))
+    assert recs == []
+    assert cur.rowcount == 0
+    assert cur.description[0].name == "a"
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "create table test_stream_badq ()",
+        "copy (select 1) to stdout",
+        "wat?",
+    ],
+)
+def test_stream_badquery(conn, query):
+    cur = conn.cursor()
+    with pytest.raises(psycopg3.ProgrammingError):
+        for rec in cur.stream(query):
+            pass
+
+
+def test_stream_error(conn):
+    conn.autocommit = True
+    cur = conn.cursor()
+    recs = []
+    with pytest.raises(psycopg3.errors.DivisionByZero):
+        for rec in cur.stream("select 1 / (2 - generate_series(1, 3))"):
+            recs.append(rec)
+
+    assert recs == [(1,)]
+    assert conn.pgconn.transaction_status == conn.TransactionStatus.IDLE
+    assert conn.execute("select 1").fetchone() == (1,)
+
+
+def test_stream_break(conn):
+    conn.autocommit = True
+    cur = conn.cursor()
+    for rec in cur.stream("select generate_series(1, 1000000)"):
+        if rec[0] >= 3:
+            break
+
+    assert conn.pgconn.transaction_status == conn.TransactionStatus.IDLE
+    assert conn.execute("select 1").fetchone() == (1,)
+
+
+def test_stream_loader(conn):
+    from psycopg3.types import TextLoader
+
+    class MyLoader(TextLoader):
+        def load(self, data):
+            return int(data.decode("ascii")) * 10
+
+    cur = conn.cursor()
+    MyLoader.register("int4", cur)
+    recs = list(cur.stream("select generate_series(1, 3)::int4"))
+    assert recs == [(10,), (20,), (30,)]
+
+
+def test_stream_in_pipeline(conn):
+    if not psycopg3.Pipeline.is_supported():
+        pytest.skip("pipeline mode not supported")
+
+    with conn.pipeline():
+        with pytest.raises(psycopg3.NotSupportedError):
+            for rec in conn.cursor().stream("select 1"):
+                pass
+
+
 def test_query_params_execute(conn):
     cur = conn.cursor()
     assert cur.query is None
@@ -383,3 +572,9 @@ def test_str(conn):
     cur.close()
     assert "[closed]" in str(cur)
     assert "[INTRANS]" in str(cur)
+
+
+def test_stream_description(conn):
+    cur = conn.cursor()
+    for rec in cur.stream("select generate_series(1, 2) as foo"):
+        assert cur.description[0].name == "foo"
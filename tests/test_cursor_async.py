@@ -1,8 +1,12 @@
 import gc
 import pytest
 import weakref
+import datetime as dt
+from array import array
 
 import psycopg3
+from psycopg3 import rows
+from psycopg3.pq import Format
 
 pytestmark = pytest.mark.asyncio
 
@@ -202,6 +206,43 @@ async def test_executemany_badquery(aconn, query):
         await cur.executemany(query, [(10, "hello"), (20, "world")])
 
 
+async def test_executemany_many(aconn, execmany):
+    cur = await aconn.cursor()
+    await cur.executemany(
+        "insert into execmany(num, data) values (%s, %s)",
+        [(i, str(i)) for i in range(1000)],
+    )
+    assert cur.rowcount == 1000
+    await cur.execute("select count(*), sum(num) from execmany")
+    assert await cur.fetchone() == (1000, sum(range(1000)))
+
+
+async def test_executemany_error_params(aconn, execmany):
+    cur = await aconn.cursor()
+    with pytest.raises(psycopg3.errors.DivisionByZero):
+        await cur.executemany(
+            "insert into execmany(num) values (10 / %s)", [[1], [0], [2]]
+        )
+    assert cur.params == [b"0"]
+
+
+async def test_executemany_autocommit_error(aconn, execmany):
+    await aconn.set_autocommit(True)
+    cur = await aconn.cursor()
+    with pytest.raises(psycopg3.errors.DivisionByZero):
+        await cur.executemany(
+            "insert into execmany(num) values (10 / %s)",
+            [[1], [0], [2], ["x"]],
+        )
+    assert cur.params == [b"0"]
+    await cur.execute("select num from execmany order by num")
+    if psycopg3.Pipeline.is_supported():
+        # The queries are all sent before receiving the error
+        assert await cur.fetchall() == [(5,), (10,)]
+    else:
+        assert await cur.fetchall() == [(10,)]
+
+
 async def test_rowcount(aconn):
     cur = await aconn.cursor()
 
@@ -222,6 +263,24 @@ async def test_rowcount(aconn):
     assert cur.rowcount == -1
 
 
+@pytest.mark.parametrize("fmt", [Format.TEXT, Format.BINARY])
+async def test_fetch_columns(aconn, fmt):
+    cur = await aconn.cursor(format=fmt)
+    await cur.execute(
+        "select i, i::float8, nullif(i, 2) as n from generate_series(1, 3) i"
+    )
+    assert await cur.fetchone() == (1, 1.0, 1)
+    cols = await cur.fetch_columns()
+    assert [list(col) for col in cols] == [[2, 3], [2.0, 3.0], [None, 3]]
+    if fmt == Format.BINARY:
+        assert cols[0] == array("i", [2, 3])
+        assert cols[1] == array("d", [2.0, 3.0])
+    else:
+        assert type(cols[0]) is list
+    assert type(cols[2]) is list
+    assert await cur.fetchall() == []
+
+
 async def test_iter(aconn):
     cur = await aconn.cursor()
     await cur.execute("select generate_series(1, 3)")
@@ -231,6 +290,68 @@ async def test_iter(aconn):
     assert res == [(1,), (2,), (3,)]
 
 
+async def test_stream(aconn):
+    cur = await aconn.cursor()
+    recs = []
+    async for rec in cur.stream(
+        "select i, '2021-01-01'::date + i from generate_series(1, %s::int) as i",
+        [2],
+    ):
+        recs.append(rec)
+
+    assert recs == [(1, dt.date(2021, 1, 2)), (2, dt.date(2021, 1, 3))]
+    assert cur.rowcount == 2
+
+
+async def test_stream_no_row(aconn):
+    cur = await aconn.cursor()
+    recs = [rec async for rec in cur.stream("select generate_series(2,1)")]
+    assert recs == []
+    assert cur.rowcount == 0
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "create table test_stream_badq ()",
+        "copy (select 1) to stdout",
+        "wat?",
+    ],
+)
+async def test_stream_badquery(aconn, query):
+    cur = await aconn.cursor()
+    with pytest.raises(psycopg3.ProgrammingError):
+        async for rec in cur.stream(query):
+            pass
+
+
+async def test_stream_error(aconn):
+    await aconn.set_autocommit(True)
+    cur = await aconn.cursor()
+    recs = []
+    with pytest.raises(psycopg3.errors.DivisionByZero):
+        async for rec in cur.stream("select 1 / (2 - generate_series(1, 3))"):
+            recs.append(rec)
+
+    assert recs == [(1,)]
+    assert aconn.pgconn.transaction_status == aconn.TransactionStatus.IDLE
+
+
+async def test_stream_break(aconn):
+    await aconn.set_autocommit(True)
+    cur = await aconn.cursor()
+    stream = cur.stream("select generate_series(1, 1000000)")
+    async for rec in stream:
+        if rec[0] >= 3:
+            break
+
+    # Async generators are not closed deterministically on break
+    await stream.aclose()
+    assert aconn.pgconn.transaction_status == aconn.TransactionStatus.IDLE
+    cur = await aconn.execute("select 1")
+    assert await cur.fetchone() == (1,)
+
+
 async def test_query_params_execute(aconn):
     cur = await aconn.cursor()
     assert cur.query is None
@@ -293,3 +414,24 @@ async def test_str(aconn):
     await cur.close()
     assert "[closed]" in str(cur)
     assert "[INTRANS]" in str(cur)
+
+
+async def test_row_factory(aconn):
+    cur = await aconn.cursor(row_factory=rows.dict_row)
+    await cur.execute("select generate_series(1, 3) as a")
+    assert await cur.fetchone() == {"a": 1}
+    assert await cur.fetchmany(1) == [{"a": 2}]
+    assert [rec async for rec in cur] == [{"a": 3}]
+
+    aconn.row_factory = rows.namedtuple_row
+    cur = await aconn.execute("select 1 as a")
+    assert (await cur.fetchone()).a == 1
+
+
+async def test_connect_row_factory(dsn):
+    aconn = await psycopg3.AsyncConnection.connect(
+        dsn, row_factory=rows.dict_row
+    )
+    cur = await aconn.execute("select 1 as a")
+    assert await cur.fetchall() == [{"a": 1}]
+    await aconn.close()
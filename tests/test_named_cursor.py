@@ -0,0 +1,349 @@
+from array import array
+
+import pytest
+
+import psycopg3
+from psycopg3 import sql
+from psycopg3.pq import Format
+from psycopg3.oids import builtins
+
+
+def test_funny_name(conn):
+    cur = conn.cursor("1-2-3")
+    cur.execute("select generate_series(1, 3) as bar")
+    assert cur.fetchall() == [(1,), (2,), (3,)]
+    assert cur.name == "1-2-3"
+
+
+def test_repr(conn):
+    cur = conn.cursor("my-name")
+    assert "NamedCursor" in repr(cur)
+    assert "my-name" in repr(cur)
+
+
+def test_connection(conn):
+    cur = conn.cursor("foo")
+    assert cur.connection is conn
+    assert isinstance(cur, psycopg3.NamedCursor)
+    assert isinstance(cur, psycopg3.Cursor)
+
+
+def test_description(conn):
+    cur = conn.cursor("foo")
+    assert cur.description is None
+    cur.execute("select generate_series(1, 10) as bar")
+    assert len(cur.description) == 1
+    assert cur.description[0].name == "bar"
+    assert cur.description[0].type_code == builtins["int4"].oid
+    assert cur.pgresult.ntuples == 0
+
+
+@pytest.mark.libpq(">= 14")
+def test_describe_same_round_trip(conn, monkeypatch):
+    calls = []
+    _orig_execute = psycopg3.cursor.execute
+
+    def execute(pgconn):
+        calls.append(pgconn)
+        return _orig_execute(pgconn)
+
+    monkeypatch.setattr(psycopg3.cursor, "execute", execute)
+    cur = conn.cursor("foo")
+    cur.execute("select generate_series(1, %s) as bar", (10,))
+    assert not calls
+    assert cur.description[0].name == "bar"
+    assert cur.pgresult.ntuples == 0
+
+
+def test_declare_error(conn):
+    cur = conn.cursor("foo")
+    with pytest.raises(psycopg3.errors.UndefinedColumn):
+        cur.execute("select wat")
+    assert cur.description is None
+    conn.rollback()
+    cur.execute("select generate_series(1, 3) as bar")
+    assert cur.fetchall() == [(1,), (2,), (3,)]
+
+
+def test_close(conn, recwarn):
+    cur = conn.cursor("foo")
+    cur.execute("select generate_series(1, 10) as bar")
+    cur.close()
+    assert cur.closed
+
+    assert not conn.execute(
+        "select * from pg_cursors where name = 'foo'"
+    ).fetchone()
+    del cur
+    assert not recwarn
+
+
+def test_close_noop(conn, recwarn):
+    cur = conn.cursor("foo")
+    cur.close()
+    assert not recwarn
+
+
+def test_close_on_commit(conn):
+    cur = conn.cursor("foo")
+    cur.execute("select generate_series(1, 10) as bar")
+    conn.commit()
+    cur.close()
+    assert conn.pgconn.transaction_status == conn.TransactionStatus.IDLE
+
+
+def test_close_other_transaction(conn):
+    cur = conn.cursor("foo")
+    cur.execute("select generate_series(1, 10) as bar")
+    conn.commit()
+    conn.execute("select 1")
+    cur.close()
+    assert conn.pgconn.transaction_status == conn.TransactionStatus.INTRANS
+    assert conn.execute("select 1").fetchone() == (1,)
+
+
+def test_close_withhold_rolled_back(conn):
+    cur = conn.cursor("foo", withhold=True)
+    cur.execute("select generate_series(1, 10) as bar")
+    conn.rollback()
+    cur.close()
+    assert cur.closed
+    assert conn.pgconn.transaction_status == conn.TransactionStatus.IDLE
+
+
+def test_close_error(conn):
+    cur = conn.cursor("foo")
+    cur.execute("select generate_series(1, 10) as bar")
+    with pytest.raises(psycopg3.DataError):
+        conn.execute("select 1 / 0")
+    cur.close()
+    assert cur.closed
+
+
+def test_context(conn):
+    with conn.cursor("foo") as cur:
+        cur.execute("select generate_series(1, 10) as bar")
+
+    assert cur.closed
+    assert not conn.execute(
+        "select * from pg_cursors where name = 'foo'"
+    ).fetchone()
+
+
+def test_execute_reuse(conn):
+    with conn.cursor("foo") as cur:
+        cur.execute("select generate_series(1, %s) as foo", (3,))
+        assert cur.fetchone() == (1,)
+
+        cur.execute("select %s::text as bar, %s::text as baz", ("foo", "bar"))
+        assert cur.fetchone() == ("foo", "bar")
+        assert cur.description[0].name == "bar"
+        assert cur.description[1].name == "baz"
+
+
+@pytest.mark.parametrize(
+    "stmt", ["", "wat", "create table ssc ()", "select 1; select 2"]
+)
+def test_execute_error(conn, stmt):
+    cur = conn.cursor("foo")
+    with pytest.raises(psycopg3.ProgrammingError):
+        cur.execute(stmt)
+    cur.close()
+
+
+def test_execute_composed(conn):
+    cur = conn.cursor("foo")
+    cur.execute(sql.SQL("select {} as bar").format(sql.Literal("{x}")))
+    assert cur.fetchone() == ("{x}",)
+
+
+def test_executemany(conn):
+    cur = conn.cursor("foo")
+    with pytest.raises(psycopg3.NotSupportedError):
+        cur.executemany("select generate_series(1, %s)", [(1,), (2,)])
+
+
+def test_prepare(conn):
+    cur = conn.cursor("foo")
+    with pytest.raises(psycopg3.NotSupportedError):
+        cur.execute("select 1", prepare=True)
+
+
+def test_stream(conn):
+    cur = conn.cursor("foo")
+    with pytest.raises(psycopg3.NotSupportedError):
+        for rec in cur.stream("select generate_series(1, 3)"):
+            pass
+
+
+def test_fetchone(conn):
+    with conn.cursor("foo") as cur:
+        cur.execute("select generate_series(1, %s) as bar", (2,))
+        assert cur.fetchone() == (1,)
+        assert cur.fetchone() == (2,)
+        assert cur.fetchone() is None
+
+
+def test_fetchmany(conn):
+    with conn.cursor("foo") as cur:
+        cur.execute("select generate_series(1, %s) as bar", (5,))
+        assert cur.fetchmany(3) == [(1,), (2,), (3,)]
+        assert cur.fetchone() == (4,)
+        assert cur.fetchmany(3) == [(5,)]
+        assert cur.fetchmany(3) == []
+
+
+def test_fetchall(conn):
+    with conn.cursor("foo") as cur:
+        cur.execute("select generate_series(1, %s) as bar", (3,))
+        assert cur.fetchall() == [(1,), (2,), (3,)]
+        assert cur.fetchall() == []
+
+    with conn.cursor("foo") as cur:
+        cur.execute("select generate_series(1, %s) as bar", (3,))
+        assert cur.fetchone() == (1,)
+        assert cur.fetchall() == [(2,), (3,)]
+        assert cur.fetchall() == []
+
+
+@pytest.mark.parametrize("fmt", [Format.TEXT, Format.BINARY])
+def test_fetch_columns(conn, fmt):
+    with conn.cursor("foo", format=fmt) as cur:
+        cur.execute("select generate_series(1, 4) as n, 'x'::text as s")
+        assert cur.fetchone() == (1, "x")
+        cols = cur.fetch_columns()
+        assert [list(col) for col in cols] == [[2, 3, 4], ["x"] * 3]
+        assert type(cols[0]) is (array if fmt == Format.BINARY else list)
+        assert cur._pos == 4
+        assert [list(col) for col in cur.fetch_columns()] == [[], []]
+
+
+def test_fetch_no_result(conn):
+    cur = conn.cursor("foo")
+    with pytest.raises(psycopg3.ProgrammingError):
+        cur.fetchone()
+
+
+def test_fetch_closed(conn):
+    cur = conn.cursor("foo")
+    cur.execute("select 1")
+    cur.close()
+    with pytest.raises(psycopg3.InterfaceError):
+        cur.fetchone()
+
+
+@pytest.mark.parametrize("fmt", [Format.TEXT, Format.BINARY])
+def test_format(conn, fmt):
+    with conn.cursor("foo", format=fmt) as cur:
+        cur.execute(
+            "select generate_series(1, 3) as n, 'x'::text as s, %s as d",
+            (1.5,),
+        )
+        assert cur.fetchone() == (1, "x", 1.5)
+        assert cur.pgresult.fformat(0) == fmt
+        assert cur.fetchall() == [(2, "x", 1.5), (3, "x", 1.5)]
+
+
+def test_rownumber(conn):
+    cur = conn.cursor("foo")
+    cur.execute("select generate_series(1, 10)")
+    cur.fetchone()
+    cur.fetchmany(3)
+    assert cur._pos == 4
+    cur.fetchall()
+    assert cur._pos == 10
+
+
+def test_iter(conn):
+    with conn.cursor("foo") as cur:
+        cur.execute("select generate_series(1, %s) as bar", (3,))
+        recs = list(cur)
+    assert recs == [(1,), (2,), (3,)]
+
+    with conn.cursor("foo") as cur:
+        cur.execute("select generate_series(1, %s) as bar", (3,))
+        assert cur.fetchone() == (1,)
+        recs = list(cur)
+    assert recs == [(2,), (3,)]
+
+
+@pytest.mark.parametrize("nrecs", [0, 2, 5, 6])
+def test_itersize(conn, monkeypatch, nrecs):
+    fetches = []
+    orig_fetch = psycopg3.NamedCursor._fetch_gen
+
+    def fetch_gen(self, num):
+        fetches.append(num)
+        return orig_fetch(self, num)
+
+    monkeypatch.setattr(psycopg3.NamedCursor, "_fetch_gen", fetch_gen)
+
+    with conn.cursor("foo") as cur:
+        assert cur.itersize == 100
+        cur.itersize = 2
+        cur.execute("select generate_series(1, %s) as bar", (nrecs,))
+        assert list(cur) == [(i,) for i in range(1, nrecs + 1)]
+
+    assert fetches == [2] * (nrecs // 2 + 1)
+
+
+def test_withhold(conn):
+    with conn.cursor("foo") as cur:
+        assert not cur.withhold
+        cur.execute("select generate_series(1, %s)", (3,))
+        conn.commit()
+        with pytest.raises(psycopg3.errors.InvalidCursorName):
+            cur.fetchone()
+        conn.rollback()
+
+    with conn.cursor("foo", withhold=True) as cur:
+        assert cur.withhold
+        cur.execute("select generate_series(1, %s)", (3,))
+        conn.commit()
+        assert cur.fetchall() == [(1,), (2,), (3,)]
+
+    assert conn.pgconn.transaction_status == conn.TransactionStatus.IDLE
+    assert not conn.execute(
+        "select * from pg_cursors where name = 'foo'"
+    ).fetchone()
+
+
+def test_withhold_autocommit(conn):
+    conn.autocommit = True
+    with conn.cursor("foo", withhold=True) as cur:
+        cur.execute("select generate_series(1, %s)", (3,))
+        assert cur.fetchall() == [(1,), (2,), (3,)]
+
+    assert not conn.execute(
+        "select * from pg_cursors where name = 'foo'"
+    ).fetchone()
+
+
+def test_no_withhold_autocommit(conn):
+    conn.autocommit = True
+    with conn.cursor("foo") as cur:
+        with pytest.raises(psycopg3.errors.NoActiveSqlTransaction):
+            cur.execute("select generate_series(1, %s)", (3,))
+
+
+@pytest.mark.libpq(">= 14")
+def test_begin_with_declare(conn, monkeypatch):
+    _orig_exec_command = conn._exec_command
+
+    def _exec_command(command):
+        assert conn._pipeline, f"{command!r} sent in its own round trip"
+        return _orig_exec_command(command)
+
+    monkeypatch.setattr(conn, "_exec_command", _exec_command)
+    cur = conn.cursor("foo")
+    cur.execute("select generate_series(1, %s)", (3,))
+    assert conn.pgconn.transaction_status == conn.TransactionStatus.INTRANS
+    assert cur.fetchall() == [(1,), (2,), (3,)]
+
+
+@pytest.mark.libpq(">= 14")
+def test_pipeline(conn):
+    with conn.pipeline():
+        cur = conn.cursor("foo")
+        with pytest.raises(psycopg3.NotSupportedError):
+            cur.execute("select 1")
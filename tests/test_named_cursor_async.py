@@ -0,0 +1,333 @@
+import asyncio
+from array import array
+
+import pytest
+
+import psycopg3
+from psycopg3 import sql
+from psycopg3.pq import Format
+from psycopg3.oids import builtins
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_funny_name(aconn):
+    cur = await aconn.cursor("1-2-3")
+    await cur.execute("select generate_series(1, 3) as bar")
+    assert await cur.fetchall() == [(1,), (2,), (3,)]
+    assert cur.name == "1-2-3"
+
+
+async def test_repr(aconn):
+    cur = await aconn.cursor("my-name")
+    assert "AsyncNamedCursor" in repr(cur)
+    assert "my-name" in repr(cur)
+
+
+async def test_connection(aconn):
+    cur = await aconn.cursor("foo")
+    assert cur.connection is aconn
+    assert isinstance(cur, psycopg3.AsyncNamedCursor)
+    assert isinstance(cur, psycopg3.AsyncCursor)
+    assert not cur.prefetch
+
+
+async def test_description(aconn):
+    cur = await aconn.cursor("foo")
+    assert cur.description is None
+    await cur.execute("select generate_series(1, 10) as bar")
+    assert len(cur.description) == 1
+    assert cur.description[0].name == "bar"
+    assert cur.description[0].type_code == builtins["int4"].oid
+    assert cur.pgresult.ntuples == 0
+
+
+@pytest.mark.libpq(">= 14")
+async def test_describe_same_round_trip(aconn, monkeypatch):
+    calls = []
+    _orig_execute = psycopg3.cursor.execute
+
+    def execute(pgconn):
+        calls.append(pgconn)
+        return _orig_execute(pgconn)
+
+    monkeypatch.setattr(psycopg3.cursor, "execute", execute)
+    cur = await aconn.cursor("foo")
+    await cur.execute("select generate_series(1, %s) as bar", (10,))
+    assert not calls
+    assert cur.description[0].name == "bar"
+    assert cur.pgresult.ntuples == 0
+
+
+async def test_declare_error(aconn):
+    cur = await aconn.cursor("foo")
+    with pytest.raises(psycopg3.errors.UndefinedColumn):
+        await cur.execute("select wat")
+    assert cur.description is None
+    await aconn.rollback()
+    await cur.execute("select generate_series(1, 3) as bar")
+    assert await cur.fetchall() == [(1,), (2,), (3,)]
+
+
+async def test_close(aconn, recwarn):
+    cur = await aconn.cursor("foo")
+    await cur.execute("select generate_series(1, 10) as bar")
+    await cur.close()
+    assert cur.closed
+
+    cur = await aconn.execute("select * from pg_cursors where name = 'foo'")
+    assert not await cur.fetchone()
+    assert not recwarn
+
+
+async def test_close_other_transaction(aconn):
+    cur = await aconn.cursor("foo")
+    await cur.execute("select generate_series(1, 10) as bar")
+    await aconn.commit()
+    await aconn.execute("select 1")
+    await cur.close()
+    assert aconn.pgconn.transaction_status == aconn.TransactionStatus.INTRANS
+    cur = await aconn.execute("select 1")
+    assert await cur.fetchone() == (1,)
+
+
+async def test_close_withhold_rolled_back(aconn):
+    cur = await aconn.cursor("foo", withhold=True)
+    await cur.execute("select generate_series(1, 10) as bar")
+    await aconn.rollback()
+    await cur.close()
+    assert cur.closed
+    assert aconn.pgconn.transaction_status == aconn.TransactionStatus.IDLE
+
+
+async def test_close_error(aconn):
+    cur = await aconn.cursor("foo")
+    await cur.execute("select generate_series(1, 10) as bar")
+    with pytest.raises(psycopg3.DataError):
+        await aconn.execute("select 1 / 0")
+    await cur.close()
+    assert cur.closed
+
+
+async def test_context(aconn):
+    async with await aconn.cursor("foo") as cur:
+        await cur.execute("select generate_series(1, 10) as bar")
+
+    assert cur.closed
+    cur = await aconn.execute("select * from pg_cursors where name = 'foo'")
+    assert not await cur.fetchone()
+
+
+async def test_execute_reuse(aconn):
+    async with await aconn.cursor("foo") as cur:
+        await cur.execute("select generate_series(1, %s) as foo", (3,))
+        assert await cur.fetchone() == (1,)
+
+        await cur.execute(
+            "select %s::text as bar, %s::text as baz", ("foo", "bar")
+        )
+        assert await cur.fetchone() == ("foo", "bar")
+        assert cur.description[0].name == "bar"
+        assert cur.description[1].name == "baz"
+
+
+@pytest.mark.parametrize(
+    "stmt", ["", "wat", "create table ssc ()", "select 1; select 2"]
+)
+async def test_execute_error(aconn, stmt):
+    cur = await aconn.cursor("foo")
+    with pytest.raises(psycopg3.ProgrammingError):
+        await cur.execute(stmt)
+    await cur.close()
+
+
+async def test_execute_composed(aconn):
+    cur = await aconn.cursor("foo")
+    await cur.execute(sql.SQL("select {} as bar").format(sql.Literal("{x}")))
+    assert await cur.fetchone() == ("{x}",)
+
+
+async def test_executemany(aconn):
+    cur = await aconn.cursor("foo")
+    with pytest.raises(psycopg3.NotSupportedError):
+        await cur.executemany("select generate_series(1, %s)", [(1,), (2,)])
+
+
+async def test_stream(aconn):
+    cur = await aconn.cursor("foo")
+    with pytest.raises(psycopg3.NotSupportedError):
+        async for rec in cur.stream("select generate_series(1, 3)"):
+            pass
+
+
+async def test_fetchone(aconn):
+    async with await aconn.cursor("foo") as cur:
+        await cur.execute("select generate_series(1, %s) as bar", (2,))
+        assert await cur.fetchone() == (1,)
+        assert await cur.fetchone() == (2,)
+        assert await cur.fetchone() is None
+
+
+async def test_fetchmany(aconn):
+    async with await aconn.cursor("foo") as cur:
+        await cur.execute("select generate_series(1, %s) as bar", (5,))
+        assert await cur.fetchmany(3) == [(1,), (2,), (3,)]
+        assert await cur.fetchone() == (4,)
+        assert await cur.fetchmany(3) == [(5,)]
+        assert await cur.fetchmany(3) == []
+
+
+async def test_fetchall(aconn):
+    async with await aconn.cursor("foo") as cur:
+        await cur.execute("select generate_series(1, %s) as bar", (3,))
+        assert await cur.fetchall() == [(1,), (2,), (3,)]
+        assert await cur.fetchall() == []
+
+    async with await aconn.cursor("foo") as cur:
+        await cur.execute("select generate_series(1, %s) as bar", (3,))
+        assert await cur.fetchone() == (1,)
+        assert await cur.fetchall() == [(2,), (3,)]
+        assert await cur.fetchall() == []
+
+
+async def test_fetch_columns(aconn):
+    async with await aconn.cursor("foo", format=Format.BINARY) as cur:
+        await cur.execute("select generate_series(1, 4) as n, 'x'::text as s")
+        assert await cur.fetchone() == (1, "x")
+        cols = await cur.fetch_columns()
+        assert cols == [array("i", [2, 3, 4]), ["x"] * 3]
+        assert await cur.fetch_columns() == [array("i"), []]
+
+
+@pytest.mark.parametrize("fmt", [Format.TEXT, Format.BINARY])
+async def test_format(aconn, fmt):
+    async with await aconn.cursor("foo", format=fmt) as cur:
+        await cur.execute(
+            "select generate_series(1, 3) as n, 'x'::text as s, %s as d",
+            (1.5,),
+        )
+        assert await cur.fetchone() == (1, "x", 1.5)
+        assert cur.pgresult.fformat(0) == fmt
+        assert await cur.fetchall() == [(2, "x", 1.5), (3, "x", 1.5)]
+
+
+async def test_iter(aconn):
+    async with await aconn.cursor("foo") as cur:
+        await cur.execute("select generate_series(1, %s) as bar", (3,))
+        recs = [rec async for rec in cur]
+    assert recs == [(1,), (2,), (3,)]
+
+    async with await aconn.cursor("foo") as cur:
+        await cur.execute("select generate_series(1, %s) as bar", (3,))
+        assert await cur.fetchone() == (1,)
+        recs = [rec async for rec in cur]
+    assert recs == [(2,), (3,)]
+
+
+@pytest.mark.parametrize("prefetch", [False, True])
+@pytest.mark.parametrize("nrecs", [0, 2, 5, 6])
+async def test_itersize(aconn, monkeypatch, nrecs, prefetch):
+    fetches = []
+    orig_fetch = psycopg3.AsyncNamedCursor._fetch_gen
+
+    def fetch_gen(self, num):
+        fetches.append(num)
+        return orig_fetch(self, num)
+
+    monkeypatch.setattr(psycopg3.AsyncNamedCursor, "_fetch_gen", fetch_gen)
+
+    async with await aconn.cursor("foo", prefetch=prefetch) as cur:
+        assert cur.itersize == 100
+        cur.itersize = 2
+        await cur.execute("select generate_series(1, %s) as bar", (nrecs,))
+        recs = [rec async for rec in cur]
+        assert recs == [(i,) for i in range(1, nrecs + 1)]
+
+    assert fetches == [2] * (nrecs // 2 + 1)
+
+
+async def test_prefetch(aconn):
+    async with await aconn.cursor("foo", prefetch=True) as cur:
+        assert cur.prefetch
+        cur.itersize = 3
+        await cur.execute(
+            "select x, pg_sleep(case when x % 3 = 1 then 0.1 else 0 end)"
+            " from generate_series(1, 9) x"
+        )
+        recs = []
+        t0 = asyncio.get_event_loop().time()
+        async for rec in cur:
+            recs.append(rec[0])
+            if rec[0] % 3 == 1:
+                # The time spent here overlaps with the next fetch
+                await asyncio.sleep(0.1)
+        t1 = asyncio.get_event_loop().time()
+
+    assert recs == list(range(1, 10))
+    # Three fetches and three waits of 0.1 sec: without prefetch it would
+    # take 0.6 sec
+    assert t1 - t0 < 0.5
+
+
+@pytest.mark.parametrize("prefetch", [False, True])
+async def test_iter_break(aconn, prefetch):
+    async with await aconn.cursor("foo", prefetch=prefetch) as cur:
+        cur.itersize = 2
+        await cur.execute("select generate_series(1, 10) as bar")
+        recs = []
+        ait = cur.__aiter__()
+        async for rec in ait:
+            recs.append(rec[0])
+            if len(recs) == 3:
+                break
+        await ait.aclose()
+        assert recs == [1, 2, 3]
+        if prefetch:
+            assert await cur.fetchone() == (7,)
+        else:
+            assert await cur.fetchone() == (5,)
+
+
+async def test_withhold(aconn):
+    async with await aconn.cursor("foo") as cur:
+        assert not cur.withhold
+        await cur.execute("select generate_series(1, %s)", (3,))
+        await aconn.commit()
+        with pytest.raises(psycopg3.errors.InvalidCursorName):
+            await cur.fetchone()
+        await aconn.rollback()
+
+    async with await aconn.cursor("foo", withhold=True) as cur:
+        assert cur.withhold
+        await cur.execute("select generate_series(1, %s)", (3,))
+        await aconn.commit()
+        assert await cur.fetchall() == [(1,), (2,), (3,)]
+
+    assert aconn.pgconn.transaction_status == aconn.TransactionStatus.IDLE
+    cur = await aconn.execute("select * from pg_cursors where name = 'foo'")
+    assert not await cur.fetchone()
+
+
+async def test_withhold_autocommit(aconn):
+    await aconn.set_autocommit(True)
+    async with await aconn.cursor("foo", withhold=True) as cur:
+        await cur.execute("select generate_series(1, %s)", (3,))
+        assert await cur.fetchall() == [(1,), (2,), (3,)]
+
+    cur = await aconn.execute("select * from pg_cursors where name = 'foo'")
+    assert not await cur.fetchone()
+
+
+@pytest.mark.libpq(">= 14")
+async def test_begin_with_declare(aconn, monkeypatch):
+    _orig_exec_command = aconn._exec_command
+
+    def _exec_command(command):
+        assert aconn._pipeline, f"{command!r} sent in its own round trip"
+        return _orig_exec_command(command)
+
+    monkeypatch.setattr(aconn, "_exec_command", _exec_command)
+    cur = await aconn.cursor("foo")
+    await cur.execute("select generate_series(1, %s)", (3,))
+    assert aconn.pgconn.transaction_status == aconn.TransactionStatus.INTRANS
+    assert await cur.fetchall() == [(1,), (2,), (3,)]
@@ -0,0 +1,115 @@
+import pytest
+
+import psycopg3
+from psycopg3.pq import Format
+from psycopg3.adapt import Transformer
+
+np = pytest.importorskip("numpy")
+
+
+def test_fetch_ndarrays(conn):
+    cur = conn.cursor(format=Format.BINARY)
+    cur.execute(
+        """
+        select i::int2, i::int4, i::int8, i::oid, i::float4, i::float8,
+            i % 2 = 0, i::text
+        from generate_series(1, 3) i
+        """
+    )
+    assert cur.fetchone() == (1, 1, 1, 1, 1.0, 1.0, False, "1")
+    arrays = cur.fetch_ndarrays()
+    dtypes = ["int16", "int32", "int64", "uint32", "float32", "float64"]
+    for arr, dtype in zip(arrays, dtypes):
+        assert arr.dtype == np.dtype(dtype)
+        assert not isinstance(arr, np.ma.MaskedArray)
+        assert arr.tolist() == [2, 3]
+
+    assert arrays[6].dtype == np.dtype(bool)
+    assert arrays[6].tolist() == [True, False]
+    assert arrays[7].dtype == np.dtype(object)
+    assert arrays[7].tolist() == ["2", "3"]
+
+    assert cur.fetchall() == []
+    assert [arr.tolist() for arr in cur.fetch_ndarrays()] == [[]] * 8
+
+
+def test_fetch_ndarrays_nulls(conn):
+    cur = conn.cursor(format=Format.BINARY)
+    cur.execute(
+        "select nullif(i, 2)::float8, nullif(i, 2)::text"
+        " from generate_series(1, 3) i"
+    )
+    farr, tarr = cur.fetch_ndarrays()
+    assert isinstance(farr, np.ma.MaskedArray)
+    assert farr.dtype == np.dtype("float64")
+    assert farr.mask.tolist() == [False, True, False]
+    assert farr.tolist() == [1.0, None, 3.0]
+    assert tarr.tolist() == ["1", None, "3"]
+
+
+def test_fetch_ndarrays_text(conn):
+    cur = conn.cursor()
+    cur.execute("select 1, array[1, 2]")
+    iarr, aarr = cur.fetch_ndarrays()
+    assert iarr.dtype == np.dtype(object)
+    assert iarr.tolist() == [1]
+    assert aarr.shape == (1,)
+    assert aarr[0] == [1, 2]
+
+
+def test_fetch_ndarrays_named(conn):
+    with conn.cursor("foo", format=Format.BINARY) as cur:
+        cur.execute("select generate_series(1, 4)::float8")
+        assert cur.fetchone() == (1.0,)
+        (arr,) = cur.fetch_ndarrays()
+        assert arr.tolist() == [2.0, 3.0, 4.0]
+        assert cur._pos == 4
+
+
+@pytest.mark.asyncio
+async def test_fetch_ndarrays_async(aconn):
+    cur = await aconn.cursor(format=Format.BINARY)
+    await cur.execute("select generate_series(1, 3)::int8")
+    (arr,) = await cur.fetch_ndarrays()
+    assert arr.dtype == np.dtype("int64")
+    assert arr.tolist() == [1, 2, 3]
+
+
+def test_copy_column(conn):
+    cur = conn.cursor(format=Format.BINARY)
+    cur.execute("select (array[1, null, -3])[i] from generate_series(1, 3) i")
+    tx = Transformer(cur)
+    tx.set_pgresult(cur.pgresult)
+
+    data = np.full(2, 42, dtype="i4")
+    nulls = np.ones(2, dtype="?")
+    assert tx.copy_column(0, 0, 2, data, nulls) == 1
+    assert data.tolist() == [1, 0]
+    assert nulls.tolist() == [False, True]
+
+    assert tx.copy_column(0, 2, 3, data[:1], nulls[:1]) == 0
+    assert data.tolist() == [-3, 0]
+    assert nulls.tolist() == [False, True]
+
+
+def test_copy_column_bad_buffers(conn):
+    cur = conn.cursor(format=Format.BINARY)
+    cur.execute("select generate_series(1, 3)")
+    tx = Transformer(cur)
+    tx.set_pgresult(cur.pgresult)
+
+    nulls = np.empty(3, dtype="?")
+    with pytest.raises(ValueError):
+        tx.copy_column(0, 0, 3, np.empty(2, dtype="i4"), nulls)
+    with pytest.raises(ValueError):
+        tx.copy_column(0, 0, 3, np.empty(3, dtype="i4"), nulls[:2])
+    with pytest.raises(ValueError):
+        tx.copy_column(0, 0, 3, np.empty(3, dtype="i4"), np.empty(3, "i4"))
+    with pytest.raises(ValueError):
+        tx.copy_column(0, 0, 3, b"x" * 12, nulls)
+    with pytest.raises(ValueError):
+        tx.copy_column(0, 0, 3, np.empty(6, dtype="i4")[::2], nulls)
+    with pytest.raises(psycopg3.DataError):
+        tx.copy_column(0, 0, 3, np.empty(3, dtype="i8"), nulls)
+    with pytest.raises(psycopg3.InterfaceError):
+        tx.copy_column(1, 0, 3, np.empty(3, dtype="i4"), nulls)
@@ -0,0 +1,283 @@
+import pytest
+
+import psycopg3
+from psycopg3 import pq
+
+pytestmark = pytest.mark.libpq(">= 14")
+
+
+def test_repr(conn):
+    with conn.pipeline() as p:
+        assert "psycopg3.Pipeline" in repr(p)
+        assert "[IDLE]" in repr(p) or "[ACTIVE]" in repr(p)
+
+
+def test_status(conn):
+    assert conn._pipeline is None
+    with conn.pipeline() as p:
+        assert conn._pipeline is p
+        assert p.status == pq.PipelineStatus.ON
+    assert p.status == pq.PipelineStatus.OFF
+    assert conn._pipeline is None
+
+
+def test_nested(conn):
+    with conn.pipeline() as p1:
+        with conn.pipeline() as p2:
+            assert p1 is p2
+            assert p2.status == pq.PipelineStatus.ON
+        assert p1.status == pq.PipelineStatus.ON
+    assert p1.status == pq.PipelineStatus.OFF
+
+
+def test_execute_results(conn):
+    with conn.pipeline():
+        c1 = conn.execute("select 1")
+        c2 = conn.execute("select %s::int", [2])
+        c3 = conn.execute("select 3")
+        assert c1.pgresult is None
+
+    assert c1.fetchone() == (1,)
+    assert c2.fetchall() == [(2,)]
+    assert c3.fetchmany(10) == [(3,)]
+
+
+def test_fetch_syncs(conn):
+    with conn.pipeline():
+        cur = conn.execute("select generate_series(1, 3)")
+        assert conn.pgconn.transaction_status == pq.TransactionStatus.ACTIVE
+        assert list(cur) == [(1,), (2,), (3,)]
+        assert cur.rowcount == 3
+
+        # The pipeline is still on after fetching
+        cur = conn.execute("select 4")
+        assert cur.fetchone() == (4,)
+
+
+def test_sync(conn):
+    with conn.pipeline() as p:
+        cur = conn.execute("select 1")
+        assert cur.pgresult is None
+        p.sync()
+        assert cur.pgresult
+        assert cur.fetchone() == (1,)
+
+
+def test_cursor_reused(conn):
+    cur = conn.cursor()
+    with conn.pipeline():
+        cur.execute("select 1")
+        cur.execute("select 2")
+    assert cur.fetchall() == [(2,)]
+    assert cur.rowcount == 1
+
+
+def test_transaction(conn):
+    with conn.pipeline():
+        conn.execute("create table pipeline_test (id int)")
+        conn.execute("insert into pipeline_test values (1)")
+    assert conn.pgconn.transaction_status == pq.TransactionStatus.INTRANS
+    conn.rollback()
+    cur = conn.execute("select to_regclass('pipeline_test')")
+    assert cur.fetchone() == (None,)
+
+
+def test_commit_in_pipeline(conn):
+    conn.execute("create temp table pipeline_test (id int)")
+    conn.commit()
+    with conn.pipeline():
+        conn.execute("insert into pipeline_test values (1)")
+        conn.commit()
+    assert conn.pgconn.transaction_status == pq.TransactionStatus.IDLE
+    cur = conn.execute("select id from pipeline_test")
+    assert cur.fetchall() == [(1,)]
+
+
+def test_error(conn):
+    conn.autocommit = True
+    with pytest.raises(psycopg3.errors.DivisionByZero):
+        with conn.pipeline():
+            c1 = conn.execute("select 1")
+            c2 = conn.execute("select 1 / 0")
+            c3 = conn.execute("select 3")
+
+    assert c1.fetchone() == (1,)
+    with pytest.raises(psycopg3.ProgrammingError):
+        c2.fetchone()
+    with pytest.raises(psycopg3.ProgrammingError):
+        c3.fetchone()
+
+    assert conn.execute("select 4").fetchone() == (4,)
+
+
+def test_error_on_fetch(conn):
+    conn.autocommit = True
+    with conn.pipeline():
+        conn.execute("select 1 / 0")
+        cur = conn.execute("select 2")
+        with pytest.raises(psycopg3.errors.DivisionByZero):
+            cur.fetchone()
+
+        # The pipeline recovers after the sync
+        cur = conn.execute("select 3")
+        assert cur.fetchone() == (3,)
+
+
+def test_error_pipeline_aborted(conn):
+    conn.autocommit = True
+    with conn.pipeline() as p:
+        conn.execute("select 1 / 0")
+        with pytest.raises(psycopg3.errors.DivisionByZero):
+            p.sync()
+
+    with conn.pipeline() as p:
+        cur = conn.execute("select 1")
+        errs = []
+
+        # The error of a query is not masked by the following one
+        conn.execute("select 1 / 0")
+        conn.execute("select 2")
+        try:
+            p.sync()
+        except psycopg3.Error as ex:
+            errs.append(ex)
+
+    assert cur.fetchone() == (1,)
+    assert len(errs) == 1
+    assert isinstance(errs[0], psycopg3.errors.DivisionByZero)
+
+
+def test_exception_in_block(conn):
+    conn.autocommit = True
+    with pytest.raises(ZeroDivisionError):
+        with conn.pipeline():
+            cur = conn.execute("select 1")
+            1 / 0
+
+    assert conn._pipeline is None
+    assert cur.fetchone() == (1,)
+
+
+def test_executemany(conn):
+    conn.execute("create temp table pipeline_test (id int, data text)")
+    with conn.pipeline():
+        cur = conn.cursor()
+        cur.executemany(
+            "insert into pipeline_test values (%s, %s)",
+            [(10, "hello"), (20, "world")],
+        )
+    assert cur.rowcount == 2
+    cur = conn.execute("select * from pipeline_test order by id")
+    assert cur.fetchall() == [(10, "hello"), (20, "world")]
+
+
+def test_executemany_implicit_pipeline(conn):
+    conn.execute("create temp table pipeline_test (id int)")
+    assert conn._pipeline is None
+
+    cur = conn.cursor()
+    cur.executemany("insert into pipeline_test values (%s)", [[1], [2]])
+    assert conn._pipeline is None
+    assert conn.pgconn.pipeline_status == pq.PipelineStatus.OFF
+    assert cur.rowcount == 2
+    cur = conn.execute("select id from pipeline_test order by id")
+    assert cur.fetchall() == [(1,), (2,)]
+
+
+def test_executemany_autocommit_error(conn):
+    conn.autocommit = True
+    conn.execute("create temp table pipeline_test (id int)")
+
+    # In autocommit every query is committed on its own: the ones after the
+    # failing one are executed too. The first error is reported.
+    cur = conn.cursor()
+    with pytest.raises(psycopg3.errors.DivisionByZero):
+        cur.executemany(
+            "insert into pipeline_test values (10 / %s)",
+            [[1], [0], [2], ["x"]],
+        )
+    assert cur.params == [b"0"]
+    assert conn.pgconn.pipeline_status == pq.PipelineStatus.OFF
+    cur = conn.execute("select id from pipeline_test order by id")
+    assert cur.fetchall() == [(5,), (10,)]
+    conn.execute("delete from pipeline_test where id = 5")
+
+    # In a pipeline block the queries are executed in a transaction
+    with pytest.raises(psycopg3.errors.DivisionByZero):
+        with conn.pipeline():
+            cur.executemany(
+                "insert into pipeline_test values (10 / %s)", [[2], [0]]
+            )
+    cur = conn.execute("select id from pipeline_test order by id")
+    assert cur.fetchall() == [(10,)]
+
+
+def test_prepared(conn):
+    conn.autocommit = True
+    with conn.pipeline():
+        c1 = conn.execute("select %s::int", [10], prepare=True)
+        c2 = conn.execute("select count(*) from pg_prepared_statements")
+
+    assert c1.fetchone() == (10,)
+    assert c2.fetchone() == (1,)
+
+    with conn.pipeline():
+        c1 = conn.execute("select %s::int", [20], prepare=True)
+    assert c1.fetchone() == (20,)
+    cur = conn.execute("select count(*) from pg_prepared_statements")
+    assert cur.fetchone() == (1,)
+
+
+def test_prepare_error(conn):
+    conn.autocommit = True
+    with pytest.raises(psycopg3.errors.UndefinedColumn):
+        with conn.pipeline():
+            conn.execute("select nosuchcol", prepare=True)
+
+    assert not conn._prepared._prepared
+    cur = conn.execute("select count(*) from pg_prepared_statements")
+    assert cur.fetchone() == (0,)
+
+
+def test_prepared_deallocate(conn):
+    conn.autocommit = True
+    conn.prepared_max = 2
+    with conn.pipeline():
+        for i in range(5):
+            conn.execute(f"select {i}", prepare=True)
+
+    # The evicted statements are deallocated with the next query
+    assert len(conn._prepared._maint_commands) == 3
+    conn.execute("select %s", [1], prepare=False)
+    cur = conn.execute("select count(*) from pg_prepared_statements")
+    assert cur.fetchone() == (2,)
+
+
+def test_copy_not_supported(conn):
+    with conn.pipeline():
+        with pytest.raises(psycopg3.NotSupportedError):
+            with conn.cursor().copy("copy (select 1) to stdout"):
+                pass
+
+
+def test_transaction_block_not_supported(conn):
+    with conn.pipeline():
+        with pytest.raises(psycopg3.NotSupportedError):
+            with conn.transaction():
+                pass
+
+
+def test_pipeline_in_transaction_block(conn):
+    with conn.transaction():
+        with conn.pipeline():
+            conn.execute("create temp table pipeline_test (id int)")
+            cur = conn.execute("select count(*) from pipeline_test")
+        assert cur.fetchone() == (0,)
+
+    assert conn.pgconn.transaction_status == pq.TransactionStatus.IDLE
+
+
+def test_client_encoding_not_supported(conn):
+    with conn.pipeline():
+        with pytest.raises(psycopg3.NotSupportedError):
+            conn.client_encoding = "latin1"
@@ -0,0 +1,120 @@
+import pytest
+
+import psycopg3
+from psycopg3 import pq
+
+pytestmark = [pytest.mark.asyncio, pytest.mark.libpq(">= 14")]
+
+
+async def test_repr(aconn):
+    async with aconn.pipeline() as p:
+        assert "psycopg3.AsyncPipeline" in repr(p)
+
+
+async def test_status(aconn):
+    assert aconn._pipeline is None
+    async with aconn.pipeline() as p:
+        assert aconn._pipeline is p
+        assert p.status == pq.PipelineStatus.ON
+    assert p.status == pq.PipelineStatus.OFF
+    assert aconn._pipeline is None
+
+
+async def test_nested(aconn):
+    async with aconn.pipeline() as p1:
+        async with aconn.pipeline() as p2:
+            assert p1 is p2
+            assert p2.status == pq.PipelineStatus.ON
+        assert p1.status == pq.PipelineStatus.ON
+    assert p1.status == pq.PipelineStatus.OFF
+
+
+async def test_execute_results(aconn):
+    async with aconn.pipeline():
+        c1 = await aconn.execute("select 1")
+        c2 = await aconn.execute("select %s::int", [2])
+        c3 = await aconn.execute("select 3")
+        assert c1.pgresult is None
+
+    assert await c1.fetchone() == (1,)
+    assert await c2.fetchall() == [(2,)]
+    assert await c3.fetchmany(10) == [(3,)]
+
+
+async def test_fetch_syncs(aconn):
+    async with aconn.pipeline():
+        cur = await aconn.execute("select generate_series(1, 3)")
+        assert [row async for row in cur] == [(1,), (2,), (3,)]
+
+        cur = await aconn.execute("select 4")
+        assert await cur.fetchone() == (4,)
+
+
+async def test_sync(aconn):
+    async with aconn.pipeline() as p:
+        cur = await aconn.execute("select 1")
+        assert cur.pgresult is None
+        await p.sync()
+        assert await cur.fetchone() == (1,)
+
+
+async def test_error(aconn):
+    await aconn.set_autocommit(True)
+    with pytest.raises(psycopg3.errors.DivisionByZero):
+        async with aconn.pipeline():
+            c1 = await aconn.execute("select 1")
+            await aconn.execute("select 1 / 0")
+            c3 = await aconn.execute("select 3")
+
+    assert await c1.fetchone() == (1,)
+    with pytest.raises(psycopg3.ProgrammingError):
+        await c3.fetchone()
+
+    cur = await aconn.execute("select 4")
+    assert await cur.fetchone() == (4,)
+
+
+async def test_exception_in_block(aconn):
+    await aconn.set_autocommit(True)
+    with pytest.raises(ZeroDivisionError):
+        async with aconn.pipeline():
+            cur = await aconn.execute("select 1")
+            1 / 0
+
+    assert aconn._pipeline is None
+    assert await cur.fetchone() == (1,)
+
+
+async def test_executemany(aconn):
+    await aconn.execute("create temp table pipeline_test (id int, data text)")
+    async with aconn.pipeline():
+        cur = await aconn.cursor()
+        await cur.executemany(
+            "insert into pipeline_test values (%s, %s)",
+            [(10, "hello"), (20, "world")],
+        )
+    assert cur.rowcount == 2
+    cur = await aconn.execute("select * from pipeline_test order by id")
+    assert await cur.fetchall() == [(10, "hello"), (20, "world")]
+
+
+async def test_prepared_deallocate(aconn):
+    await aconn.set_autocommit(True)
+    aconn.prepared_max = 2
+    async with aconn.pipeline():
+        for i in range(5):
+            await aconn.execute(f"select {i}", prepare=True)
+
+    # The evicted statements are deallocated with the next query
+    assert len(aconn._prepared._maint_commands) == 3
+    await aconn.execute("select %s", [1], prepare=False)
+    cur = await aconn.execute("select count(*) from pg_prepared_statements")
+    assert await cur.fetchone() == (2,)
+
+
+async def test_copy_not_supported(aconn):
+    async with aconn.pipeline():
+        with pytest.raises(psycopg3.NotSupportedError):
+            cur = await aconn.cursor()
+            async with cur.copy("copy (select 1) to stdout"):
+                pass
@@ -2,11 +2,14 @@
 Prepared statements tests
 """
 
+import logging
 import datetime as dt
 from decimal import Decimal
 
 import pytest
 
+import psycopg3
+
 
 def test_connection_attributes(conn, monkeypatch):
     assert conn.prepare_threshold == 5
@@ -80,6 +83,33 @@ def test_prepare_disable(conn):
     assert not conn._prepared._prepared
 
 
+def test_prepare_disable_deallocate(conn):
+    conn.autocommit = True
+    for i in range(3):
+        conn.execute("select %s::int", [i], prepare=True)
+        conn.execute(f"select {i}", prepare=False)
+
+    conn.prepare_threshold = None
+    assert not conn._prepared._prepared
+    assert list(conn._prepared._maint_commands) == [b"DEALLOCATE ALL"]
+    cur = conn.execute(
+        "select count(*) from pg_prepared_statements where %s", [True]
+    )
+    assert cur.fetchone() == (0,)
+
+
+def test_discard(conn):
+    conn.autocommit = True
+    for i in range(3):
+        conn.execute("select %s::int", [i], prepare=True)
+
+    conn.execute("discard all")
+    assert not conn._prepared._prepared
+    conn.execute("select %s::int", [10], prepare=True)
+    cur = conn.execute("select count(*) from pg_prepared_statements")
+    assert cur.fetchone() == (1,)
+
+
 def test_no_prepare_multi(conn):
     res = []
     for i in range(10):
@@ -101,6 +131,32 @@ def test_no_prepare_error(conn):
     assert cur.fetchone() == (0,)
 
 
+def test_prepare_results(conn):
+    conn.execute("create table prepared_test (num int)", prepare=False)
+    cur = conn.execute(
+        "insert into prepared_test values (%s), (%s) returning num",
+        [10, 20],
+        prepare=True,
+    )
+    assert cur.rowcount == 2
+    assert cur.fetchall() == [(10,), (20,)]
+    cur.execute("select count(*) from prepared_test", prepare=False)
+    assert cur.fetchone() == (2,)
+
+
+def test_prepare_error(conn):
+    with pytest.raises(conn.ProgrammingError, match="wat"):
+        conn.execute("select wat", prepare=True)
+    assert conn.pgconn.transaction_status == conn.TransactionStatus.INERROR
+    conn.rollback()
+
+    cur = conn.execute("select count(*) from pg_prepared_statements")
+    assert cur.fetchone() == (0,)
+
+    with pytest.raises(conn.DataError):
+        conn.execute("select 1 / %s::int", [0], prepare=True)
+
+
 @pytest.mark.parametrize(
     "query",
     [
@@ -150,6 +206,7 @@ def test_evict_lru(conn):
 
 
 def test_evict_lru_deallocate(conn):
+    conn.autocommit = True
     conn.prepared_max = 5
     conn.prepare_threshold = 0
     for i in range(10):
@@ -162,6 +219,10 @@ def test_evict_lru_deallocate(conn):
             f"select {i}".encode("utf8"), ()
         ].startswith(b"_pg3_")
 
+    # The evicted statements are deallocated with the next query
+    assert len(conn._prepared._maint_commands) == 1
+    conn.execute("select %s", [1], prepare=False)
+    assert not conn._prepared._maint_commands
     cur = conn.execute(
         "select statement from pg_prepared_statements order by prepare_time",
         prepare=False,
@@ -169,6 +230,232 @@ def test_evict_lru_deallocate(conn):
     assert cur.fetchall() == [(f"select {i}",) for i in ["'a'", 6, 7, 8, 9]]
 
 
+def test_evict_deallocate_no_pipeline(conn, monkeypatch):
+    monkeypatch.setattr(
+        psycopg3.pipeline.BasePipeline, "is_supported", lambda: False
+    )
+    conn.autocommit = True
+    conn.prepared_max = 2
+    conn.prepare_threshold = 0
+    for i in range(5):
+        conn.execute(f"select {i}")
+
+    assert list(conn._prepared._maint_commands) == [b"DEALLOCATE _pg3_2"]
+    conn.execute("select %s", [1], prepare=False)
+    cur = conn.execute(
+        "select count(*) from pg_prepared_statements", prepare=False
+    )
+    assert cur.fetchone() == (2,)
+
+
+def test_prepared_cache_info(conn):
+    conn.prepare_threshold = 1
+    for i in range(4):
+        conn.execute("select %s::int", [i])
+    conn.execute("select %s", [1], prepare=False)
+    assert conn.prepared_cache_info() == (2, 2, 1, 0, 1, 100, 1)
+
+    (stmt,) = conn.prepared_statements()
+    assert stmt.name == b"_pg3_0"
+    assert stmt.query == b"select $1::int"
+    assert stmt.executions == 3
+
+
+def test_prepared_cache_info_evict(conn):
+    conn.prepared_max = 2
+    conn.prepare_threshold = 0
+    for i in range(5):
+        conn.execute(f"select {i}")
+    info = conn.prepared_cache_info()
+    assert (info.preparations, info.evictions, info.currsize) == (5, 3, 2)
+    assert [s.query for s in conn.prepared_statements()] == [
+        b"select 3",
+        b"select 4",
+    ]
+
+
+@pytest.mark.parametrize("adaptive", [False, True])
+def test_prepare_adaptive_evict(conn, adaptive):
+    conn.prepare_adaptive = adaptive
+    conn.prepare_threshold = 1
+    conn.prepared_max = 10
+    for i in range(3):
+        for j in range(5):
+            conn.execute(f"select {j} + %s::int", [i])
+
+    for i in range(50):
+        conn.execute(f"select {i}")
+
+    stmts = conn.prepared_statements()
+    if adaptive:
+        assert len(stmts) == 5
+        assert all(s.executions == 2 for s in stmts)
+    else:
+        assert not stmts
+
+
+def test_prepare_adaptive_threshold(conn):
+    conn.prepare_adaptive = True
+    conn.prepare_threshold = 0
+    conn.prepared_max = 2
+    for i in range(100):
+        conn.execute(f"select {i}")
+
+    info = conn.prepared_cache_info()
+    assert info.threshold == 1
+    assert info.maxsize == 3
+    assert conn.prepare_threshold == 0
+    assert conn.prepared_max == 2
+
+    for i in range(200):
+        conn.execute("select 0")
+    assert conn.prepared_cache_info().threshold == 0
+
+
+@pytest.mark.parametrize("pipeline", [True, False])
+def test_executemany_prepared(conn, monkeypatch, pipeline):
+    if not pipeline:
+        monkeypatch.setattr(
+            psycopg3.pipeline.BasePipeline, "is_supported", lambda: False
+        )
+    conn.execute("create table prepared_test (data text)", prepare=False)
+    cur = conn.cursor()
+    for i in range(3):
+        cur.executemany(
+            "insert into prepared_test values (%s::text)",
+            [[1], ["a"], [2], [None], ["b"]],
+        )
+    assert cur.rowcount == 5
+
+    cur.execute(
+        "select parameter_types from pg_prepared_statements"
+        " order by prepare_time",
+        prepare=False,
+    )
+    assert cur.fetchall() == [(["bigint"],), (["text"],)]
+    assert conn.prepared_cache_info().preparations == 2
+
+    cur.execute("select data, count(*) from prepared_test group by 1")
+    assert sorted(cur.fetchall(), key=str) == [
+        ("1", 3),
+        ("2", 3),
+        ("a", 3),
+        ("b", 3),
+        (None, 3),
+    ]
+
+
+@pytest.mark.parametrize("pipeline", [True, False])
+def test_executemany_prepare_disabled(conn, monkeypatch, pipeline):
+    if not pipeline:
+        monkeypatch.setattr(
+            psycopg3.pipeline.BasePipeline, "is_supported", lambda: False
+        )
+    conn.prepare_threshold = None
+    conn.execute("create table prepared_test (data text)")
+    cur = conn.cursor()
+    cur.executemany(
+        "insert into prepared_test values (%s::text)", [[1], ["a"], [2]]
+    )
+    cur.execute("select data from prepared_test order by 1")
+    assert cur.fetchall() == [("1",), ("2",), ("a",)]
+    cur.execute("select count(*) from pg_prepared_statements")
+    assert cur.fetchone() == (0,)
+
+
+@pytest.mark.parametrize("pipeline", [True, False])
+def test_evict_deallocate_in_transaction(conn, monkeypatch, pipeline):
+    if not pipeline:
+        monkeypatch.setattr(
+            psycopg3.pipeline.BasePipeline, "is_supported", lambda: False
+        )
+    conn.prepared_max = 5
+    conn.prepare_threshold = 0
+    for i in range(50):
+        for j in range(3):
+            conn.execute(f"select {i}")
+
+    # The statements are deallocated in a long transaction too
+    assert conn.pgconn.transaction_status == conn.TransactionStatus.INTRANS
+    cur = conn.execute(
+        "select count(*) from pg_prepared_statements", prepare=False
+    )
+    (count,) = cur.fetchone()
+    if pipeline:
+        assert count == 5
+    else:
+        # Deallocated in their own round trip once too many are waiting
+        assert count <= 11
+
+
+@pytest.mark.parametrize("pipeline", [True, False])
+def test_evict_deallocate_error(conn, monkeypatch, caplog, pipeline):
+    if not pipeline:
+        monkeypatch.setattr(
+            psycopg3.pipeline.BasePipeline, "is_supported", lambda: False
+        )
+    caplog.set_level(logging.WARNING, logger="psycopg3")
+    conn.prepared_max = 2
+    conn.prepare_threshold = 1
+    for i in range(2):
+        conn.execute(f"select {i}")
+        conn.execute(f"select {i}")
+
+    # Queries not prepared cannot send the commands in the same round trip
+    conn.execute("select 'a'")
+    conn.execute("select 'b'")
+    assert list(conn._prepared._maint_commands) == [
+        b"DEALLOCATE _pg3_0",
+        b"DEALLOCATE _pg3_1",
+    ]
+    conn.execute("deallocate _pg3_0", prepare=False)
+    conn.commit()
+
+    # The error doesn't affect the query; the command aborted is queued again
+    cur = conn.execute("select %s", [10], prepare=False)
+    assert cur.fetchone() == (10,)
+    assert "_pg3_0" in caplog.records[0].message
+    assert list(conn._prepared._maint_commands) == [b"DEALLOCATE _pg3_1"]
+
+    conn.commit()
+    conn.execute("select %s", [10], prepare=False)
+    assert not conn._prepared._maint_commands
+    cur = conn.execute(
+        "select count(*) from pg_prepared_statements", prepare=False
+    )
+    assert cur.fetchone() == (0,)
+
+
+@pytest.mark.libpq(">= 14")
+def test_evict_deallocate_error_in_transaction(conn):
+    conn.prepared_max = 2
+    conn.prepare_threshold = 1
+    for i in range(2):
+        conn.execute(f"select {i}")
+        conn.execute(f"select {i}")
+    conn.execute("select 'a'")
+    conn.execute("deallocate _pg3_0", prepare=False)
+
+    # The error aborts the transaction: it is raised instead of the query one
+    with pytest.raises(psycopg3.errors.InvalidSqlStatementName):
+        conn.execute("select %s", [10], prepare=False)
+    assert conn.pgconn.transaction_status == conn.TransactionStatus.INERROR
+
+
+def test_evict_deallocate_discard(conn):
+    conn.autocommit = True
+    conn.prepared_max = 1
+    conn.prepare_threshold = 0
+    conn.execute("select 1")
+    conn.execute("select 2")
+    assert conn._prepared._maint_commands
+
+    # The statements are deallocated before running the query
+    conn.execute("discard all")
+    assert not conn._prepared._prepared
+    assert not conn._prepared._maint_commands
+
+
 def test_different_types(conn):
     conn.prepare_threshold = 0
     conn.execute("select %s", [None])
@@ -2,11 +2,14 @@
 Prepared statements tests on async connections
 """
 
+import logging
 import datetime as dt
 from decimal import Decimal
 
 import pytest
 
+import psycopg3
+
 pytestmark = pytest.mark.asyncio
 
 
@@ -86,6 +89,33 @@ async def test_prepare_disable(aconn):
     assert not aconn._prepared._prepared
 
 
+async def test_prepare_disable_deallocate(aconn):
+    await aconn.set_autocommit(True)
+    for i in range(3):
+        await aconn.execute("select %s::int", [i], prepare=True)
+        await aconn.execute(f"select {i}", prepare=False)
+
+    aconn.prepare_threshold = None
+    assert not aconn._prepared._prepared
+    assert list(aconn._prepared._maint_commands) == [b"DEALLOCATE ALL"]
+    cur = await aconn.execute(
+        "select count(*) from pg_prepared_statements where %s", [True]
+    )
+    assert (await cur.fetchone()) == (0,)
+
+
+async def test_discard(aconn):
+    await aconn.set_autocommit(True)
+    for i in range(3):
+        await aconn.execute("select %s::int", [i], prepare=True)
+
+    await aconn.execute("discard all")
+    assert not aconn._prepared._prepared
+    await aconn.execute("select %s::int", [10], prepare=True)
+    cur = await aconn.execute("select count(*) from pg_prepared_statements")
+    assert (await cur.fetchone()) == (1,)
+
+
 async def test_no_prepare_multi(aconn):
     res = []
     for i in range(10):
@@ -107,6 +137,32 @@ async def test_no_prepare_error(aconn):
     assert await cur.fetchone() == (0,)
 
 
+async def test_prepare_results(aconn):
+    await aconn.execute("create table prepared_test (num int)", prepare=False)
+    cur = await aconn.execute(
+        "insert into prepared_test values (%s), (%s) returning num",
+        [10, 20],
+        prepare=True,
+    )
+    assert cur.rowcount == 2
+    assert await cur.fetchall() == [(10,), (20,)]
+    await cur.execute("select count(*) from prepared_test", prepare=False)
+    assert await cur.fetchone() == (2,)
+
+
+async def test_prepare_error(aconn):
+    with pytest.raises(aconn.ProgrammingError, match="wat"):
+        await aconn.execute("select wat", prepare=True)
+    assert aconn.pgconn.transaction_status == aconn.TransactionStatus.INERROR
+    await aconn.rollback()
+
+    cur = await aconn.execute("select count(*) from pg_prepared_statements")
+    assert await cur.fetchone() == (0,)
+
+    with pytest.raises(aconn.DataError):
+        await aconn.execute("select 1 / %s::int", [0], prepare=True)
+
+
 @pytest.mark.parametrize(
     "query",
     [
@@ -158,6 +214,7 @@ async def test_evict_lru(aconn):
 
 
 async def test_evict_lru_deallocate(aconn):
+    await aconn.set_autocommit(True)
     aconn.prepared_max = 5
     aconn.prepare_threshold = 0
     for i in range(10):
@@ -170,6 +227,10 @@ async def test_evict_lru_deallocate(aconn):
             f"select {i}".encode("utf8"), ()
         ].startswith(b"_pg3_")
 
+    # The evicted statements are deallocated with the next query
+    assert len(aconn._prepared._maint_commands) == 1
+    await aconn.execute("select %s", [1], prepare=False)
+    assert not aconn._prepared._maint_commands
     cur = await aconn.execute(
         "select statement from pg_prepared_statements order by prepare_time",
         prepare=False,
@@ -179,6 +240,85 @@ async def test_evict_lru_deallocate(aconn):
     ]
 
 
+async def test_prepared_cache_info(aconn):
+    aconn.prepare_threshold = 1
+    for i in range(4):
+        await aconn.execute("select %s::int", [i])
+    await aconn.execute("select %s", [1], prepare=False)
+    assert aconn.prepared_cache_info() == (2, 2, 1, 0, 1, 100, 1)
+
+    (stmt,) = aconn.prepared_statements()
+    assert stmt.name == b"_pg3_0"
+    assert stmt.query == b"select $1::int"
+    assert stmt.executions == 3
+
+
+async def test_evict_deallocate_in_transaction(aconn):
+    aconn.prepared_max = 5
+    aconn.prepare_threshold = 0
+    for i in range(50):
+        for j in range(3):
+            await aconn.execute(f"select {i}")
+
+    # The statements are deallocated in a long transaction too
+    assert aconn.pgconn.transaction_status == aconn.TransactionStatus.INTRANS
+    cur = await aconn.execute(
+        "select count(*) from pg_prepared_statements where %s",
+        [True],
+        prepare=False,
+    )
+    assert (await cur.fetchone()) == (5,)
+
+
+async def test_evict_deallocate_error(aconn, caplog):
+    caplog.set_level(logging.WARNING, logger="psycopg3")
+    aconn.prepared_max = 2
+    aconn.prepare_threshold = 1
+    for i in range(2):
+        await aconn.execute(f"select {i}")
+        await aconn.execute(f"select {i}")
+
+    # Queries not prepared cannot send the commands in the same round trip
+    await aconn.execute("select 'a'")
+    await aconn.execute("select 'b'")
+    assert list(aconn._prepared._maint_commands) == [
+        b"DEALLOCATE _pg3_0",
+        b"DEALLOCATE _pg3_1",
+    ]
+    await aconn.execute("deallocate _pg3_0", prepare=False)
+    await aconn.commit()
+
+    # The error doesn't affect the query; the command aborted is queued again
+    cur = await aconn.execute("select %s", [10], prepare=False)
+    assert (await cur.fetchone()) == (10,)
+    assert "_pg3_0" in caplog.records[0].message
+    assert list(aconn._prepared._maint_commands) == [b"DEALLOCATE _pg3_1"]
+
+    await aconn.commit()
+    await aconn.execute("select %s", [10], prepare=False)
+    assert not aconn._prepared._maint_commands
+    cur = await aconn.execute(
+        "select count(*) from pg_prepared_statements", prepare=False
+    )
+    assert (await cur.fetchone()) == (0,)
+
+
+@pytest.mark.libpq(">= 14")
+async def test_evict_deallocate_error_in_transaction(aconn):
+    aconn.prepared_max = 2
+    aconn.prepare_threshold = 1
+    for i in range(2):
+        await aconn.execute(f"select {i}")
+        await aconn.execute(f"select {i}")
+    await aconn.execute("select 'a'")
+    await aconn.execute("deallocate _pg3_0", prepare=False)
+
+    # The error aborts the transaction: it is raised instead of the query one
+    with pytest.raises(psycopg3.errors.InvalidSqlStatementName):
+        await aconn.execute("select %s", [10], prepare=False)
+    assert aconn.pgconn.transaction_status == aconn.TransactionStatus.INERROR
+
+
 async def test_different_types(aconn):
     aconn.prepare_threshold = 0
     await aconn.execute("select %s", [None])
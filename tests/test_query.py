@@ -1,7 +1,9 @@
 import pytest
 
 import psycopg3
+from psycopg3.pq import Format
 from psycopg3.adapt import Transformer
+from psycopg3 import _queries
 from psycopg3._queries import PostgresQuery, _split_query
 
 
@@ -49,6 +51,48 @@ def test_split_query_bad(input):
         _split_query(input)
 
 
+@pytest.mark.parametrize(
+    "input",
+    [
+        b"",
+        b"%",
+        b"foo %",
+        b"foo %\n%s",
+        b"%%%%",
+        b"%%%s%%",
+        b"%s%b %s",
+        b"%(a)s %(b)b %(a)s",
+        b"%(a\nb)s %%",
+        b"%(a)s%%%(b)s",
+        b"%(a)s %s",
+        b"%s %(a)s",
+        b"%(a)b %(a)s",
+        b"%(a)",
+        b"%(a)\ns",
+        b"%()s",
+        b"%(a bc",
+        b"%(foo)d",
+        b"% x",
+        b"%d",
+        b"%\xe8",
+        "%(\xe8)s %%".encode("utf8"),
+    ],
+)
+def test_split_query_impl(input):
+    # The C implementation must behave as the Python one
+    def run(f, *args):
+        try:
+            return f(*args)
+        except Exception as ex:
+            return (type(ex), str(ex))
+
+    for f, g in [
+        (_queries._split_query, _queries._split_query_python),
+        (_queries._query2pg_nocache, _queries._query2pg_python),
+    ]:
+        assert run(f, input, "utf8") == run(g, input, "utf8")
+
+
 @pytest.mark.parametrize(
     "query, params, want, wformats, wparams",
     [
@@ -132,3 +176,53 @@ def test_pq_query_badprog(query, params):
     pq = PostgresQuery(Transformer())
     with pytest.raises(psycopg3.ProgrammingError):
         pq.convert(query, params)
+
+
+def test_query_cache(conn):
+    assert conn.query_cache_size == 128
+    assert conn.query_cache_info() == (0, 0, 128, 0)
+    conn.query_cache_size = 2
+
+    for i in range(3):
+        conn.execute("select %s", [i])
+    conn.execute("select %s, %s", [1, 2])
+    conn.execute("select 1")
+    info = conn.query_cache_info()
+    assert info == (2, 2, 2, 2)
+
+    for q in ["select %s + 1", "select %s + 2", "select %s"]:
+        conn.execute(q, [1])
+    assert conn.query_cache_info() == (2, 5, 2, 2)
+
+    conn.query_cache_size = 1
+    assert conn.query_cache_info() == (2, 5, 1, 1)
+    assert conn.execute("select %s", ["a"]).fetchone() == ("a",)
+    assert conn.query_cache_info() == (3, 5, 1, 1)
+
+    with pytest.raises(ValueError):
+        conn.query_cache_size = -1
+
+
+def test_query_cache_disabled(conn):
+    conn.query_cache_size = 0
+    for i in range(3):
+        assert conn.execute("select %s", [i]).fetchone() == (i,)
+    assert conn.query_cache_info() == (0, 3, 0, 0)
+
+
+def test_query_cache_error(conn):
+    for i in range(2):
+        with pytest.raises(psycopg3.ProgrammingError):
+            conn.execute("select %s %(a)s", [i])
+    assert conn.query_cache_info() == (0, 2, 128, 0)
+
+
+def test_query_cache_dumpers(conn):
+    # The adapters cache is kept alive by the cursors using it
+    cur = conn.execute("select %s, %s", [1, "a"])
+    dumpers = [cur._transformer.get_dumper(v, Format.TEXT) for v in [1, "a"]]
+    cur = conn.execute("select %s, %s", [2, "b"])
+    assert cur.fetchone() == (2, "b")
+    assert conn.query_cache_info().hits == 1
+    for dumper, v in zip(dumpers, [2, "b"]):
+        assert cur._transformer.get_dumper(v, Format.TEXT) is dumper
@@ -0,0 +1,305 @@
+import gc
+import pickle
+from collections import namedtuple
+from dataclasses import dataclass
+
+import pytest
+
+import psycopg3
+from psycopg3 import rows
+
+
+def test_tuple_row(conn):
+    cur = conn.execute("select 1 as a, 'x' as b, null::int as c")
+    assert cur.row_factory is rows.tuple_row
+    assert cur.fetchone() == (1, "x", None)
+
+
+def test_dict_row(conn):
+    cur = conn.cursor(row_factory=rows.dict_row)
+    cur.execute("select 'bob' as name, 3 as id, null::int as n")
+    assert cur.fetchall() == [{"name": "bob", "id": 3, "n": None}]
+
+    cur.execute("select 'a' as letter; select 1 as number")
+    assert cur.fetchall() == [{"letter": "a"}]
+    assert cur.nextset()
+    assert cur.fetchall() == [{"number": 1}]
+    assert not cur.nextset()
+
+
+def test_namedtuple_row(conn):
+    rows._make_nt.cache_clear()
+    cur = conn.cursor(row_factory=rows.namedtuple_row)
+    cur.execute("select 'bob' as name, 3 as id")
+    (person1,) = cur.fetchall()
+    assert f"{person1.name} {person1.id}" == "bob 3"
+    assert person1 == ("bob", 3)
+    assert isinstance(person1, tuple)
+    assert rows._make_nt.cache_info().hits == 0
+
+    cur.execute("select 'alice' as name, 1 as id")
+    (person2,) = cur.fetchall()
+    assert type(person2) is type(person1)
+    assert rows._make_nt.cache_info().hits == 1
+
+    cur.execute("select 1 as a, 'x' as \"b c\", null::int as c")
+    (r,) = cur.fetchall()
+    assert r.a == 1
+    assert r._1 == "x"
+    assert r.c is None
+    assert r._fields == ("a", "_1", "c")
+
+
+def test_class_row(conn):
+    @dataclass
+    class Person:
+        age: int
+        first_name: str
+        last_name: str
+
+    cur = conn.cursor(row_factory=rows.class_row(Person))
+    cur.execute("select 'John' as first_name, 'Smith' as last_name, 42 as age")
+    (p,) = cur.fetchall()
+    assert p == Person(age=42, first_name="John", last_name="Smith")
+
+
+def test_args_row(conn):
+    cur = conn.cursor(row_factory=rows.args_row(lambda *args: list(args)))
+    cur.execute("select 1, 'a', null")
+    assert cur.fetchone() == [1, "a", None]
+
+
+def test_kwargs_row(conn):
+    cur = conn.cursor(row_factory=rows.kwargs_row(dict))
+    cur.execute("select 1 as a, 'b' as b")
+    assert cur.fetchone() == {"a": 1, "b": "b"}
+
+
+def test_custom_factory(conn):
+    def my_row_factory(cursor):
+        assert cursor.description
+        names = [c.name for c in cursor.description]
+
+        def make_row(values):
+            return [f"{n}-{v}" for n, v in zip(names, values)]
+
+        return make_row
+
+    cur = conn.cursor(row_factory=my_row_factory)
+    cur.execute("select generate_series(1, 2) as a, 'x' as b")
+    assert cur.fetchone() == ["a-1", "b-x"]
+    assert list(cur) == [["a-2", "b-x"]]
+
+
+def test_custom_factory_values_type(conn):
+    values = []
+
+    def my_row_factory(cursor):
+        def make_row(vals):
+            values.append(vals)
+            return vals
+
+        return make_row
+
+    cur = conn.cursor(row_factory=my_row_factory)
+    cur.execute("select generate_series(1, 3) as a")
+    cur.fetchone()
+    cur.fetchmany(1)
+    cur.fetchall()
+    assert values == [(1,), (2,), (3,)]
+    assert all(type(v) is tuple for v in values)
+
+
+def test_factory_called_once_per_result(conn):
+    calls = []
+
+    def my_row_factory(cursor):
+        calls.append(cursor.pgresult)
+        return tuple
+
+    cur = conn.cursor(row_factory=my_row_factory)
+    cur.execute("select generate_series(1, 100)")
+    cur.fetchmany(10)
+    cur.fetchone()
+    cur.fetchall()
+    assert len(calls) == 1
+
+    cur.execute("select 1; select 2")
+    cur.fetchall()
+    assert len(calls) == 2
+    cur.nextset()
+    assert len(calls) == 3
+
+
+def test_connection_row_factory(dsn):
+    conn = psycopg3.connect(dsn, row_factory=rows.dict_row)
+    assert conn.row_factory is rows.dict_row
+    cur = conn.execute("select 1 as a")
+    assert cur.fetchone() == {"a": 1}
+
+    conn.row_factory = rows.namedtuple_row
+    assert conn.cursor().row_factory is rows.namedtuple_row
+    cur = conn.cursor(row_factory=rows.tuple_row)
+    assert cur.execute("select 1 as a").fetchone() == (1,)
+    conn.close()
+
+
+def test_change_row_factory(conn):
+    cur = conn.cursor()
+    cur.execute("select generate_series(1, 3) as a")
+    assert cur.fetchone() == (1,)
+    cur.row_factory = rows.dict_row
+    assert cur.fetchone() == {"a": 2}
+    cur.row_factory = rows.namedtuple_row
+    assert cur.fetchone().a == 3
+
+
+@pytest.mark.parametrize(
+    "factory",
+    [
+        rows.tuple_row,
+        rows.dict_row,
+        rows.namedtuple_row,
+        rows.args_row(lambda *args: args),
+        rows.kwargs_row(lambda **kwargs: tuple(kwargs.values())),
+        lambda cur: tuple,
+    ],
+)
+@pytest.mark.parametrize("fmt", [psycopg3.pq.Format.TEXT, "binary"])
+def test_factories_fetch(conn, factory, fmt):
+    fmt = psycopg3.pq.Format.BINARY if fmt == "binary" else fmt
+    cur = conn.cursor(format=fmt, row_factory=factory)
+    cur.execute(
+        "select i as a, i::text as b, null::int as c"
+        " from generate_series(1, 5) i"
+    )
+    want = [(i, str(i), None) for i in range(1, 6)]
+
+    def values(row):
+        return tuple(row.values()) if isinstance(row, dict) else tuple(row)
+
+    assert values(cur.fetchone()) == want[0]
+    assert list(map(values, cur.fetchmany(2))) == want[1:3]
+    assert list(map(values, cur.fetchall())) == want[3:]
+
+
+def test_make_row_wrong_shape(conn):
+    # A row maker created for a different result must not be trusted
+    cur = conn.cursor()
+    cur.execute("select 1 as a")
+    tx = cur._transformer
+    tx.make_row = rows.NamedTupleRowMaker(namedtuple("Row", "a b"))
+    with pytest.raises(TypeError):
+        tx.load_row(0)
+
+    tx.make_row = rows.DictRowMaker(("a", "b"))
+    assert tx.load_row(0) == {"a": 1}
+    assert tx.load_rows(0, 1) == [{"a": 1}]
+
+
+def test_stream(conn):
+    cur = conn.cursor(row_factory=rows.dict_row)
+    recs = list(cur.stream("select generate_series(1, 3) as a"))
+    assert recs == [{"a": 1}, {"a": 2}, {"a": 3}]
+
+
+def test_named_cursor(conn):
+    with conn.cursor("foo", row_factory=rows.dict_row) as cur:
+        cur.itersize = 2
+        cur.execute("select generate_series(1, 3) as a")
+        assert cur.fetchone() == {"a": 1}
+        assert list(cur) == [{"a": 2}, {"a": 3}]
+
+
+def test_lazy_row(conn):
+    cur = conn.cursor(row_factory=rows.lazy_row)
+    cur.execute("select 1 as a, 'x' as b, null::int as c, 2 as a")
+    r = cur.fetchone()
+    assert isinstance(r, rows.LazyRow)
+    assert r == (1, "x", None, 2)
+    assert r.a == r["a"] == r[0] == 1
+    assert r.b == r[-3] == "x"
+    assert r.c is None
+    assert r[1:3] == ("x", None)
+    assert len(r) == 4
+    assert r._fields == ("a", "b", "c", "a")
+    assert repr(r) == "LazyRow(a=1, b='x', c=None, a=2)"
+
+    with pytest.raises(IndexError):
+        r[4]
+    with pytest.raises(KeyError):
+        r["d"]
+    with pytest.raises(AttributeError):
+        r.d
+    with pytest.raises(TypeError):
+        r[1.0]
+
+
+def test_lazy_row_load_once(conn, monkeypatch):
+    cur = conn.cursor(row_factory=rows.lazy_row)
+    cur.execute("select 10 as a, 20 as b from generate_series(1, 2)")
+    (r1, r2) = cur.fetchall()
+
+    calls = []
+    loaders = r1._maker.loaders
+
+    def make_loader(i):
+        def load(data):
+            calls.append(i)
+            return loaders[i](data)
+
+        return load
+
+    r1._maker.loaders = [make_loader(0), make_loader(1)]
+    assert r1.b == 20
+    assert r1[1] == 20
+    assert calls == [1]
+    assert list(r1) == [10, 20]
+    assert calls == [1, 0]
+    assert r2 == (10, 20)
+    assert calls == [1, 0, 0, 1]
+
+
+@pytest.mark.parametrize("fmt", [psycopg3.pq.Format.TEXT, "binary"])
+def test_lazy_row_cursor_moves(conn, fmt):
+    fmt = psycopg3.pq.Format.BINARY if fmt == "binary" else fmt
+    cur = conn.cursor(format=fmt, row_factory=rows.lazy_row)
+    cur.execute("select generate_series(1, 3) as n, 'x' as s")
+    r = cur.fetchone()
+    recs = cur.fetchmany(2)
+    cur.execute("select 'other' as s")
+    cur.close()
+    assert r.n == 1
+    assert [rec.n for rec in recs] == [2, 3]
+    assert recs[0] == (2, "x")
+
+
+@pytest.mark.parametrize("fmt", [psycopg3.pq.Format.TEXT, "binary"])
+def test_lazy_row_connection_closed(dsn, fmt):
+    fmt = psycopg3.pq.Format.BINARY if fmt == "binary" else fmt
+    conn = psycopg3.connect(dsn)
+    cur = conn.cursor(format=fmt, row_factory=rows.lazy_row)
+    cur.execute("select '{1,2}'::int[] as a, 'x' as s")
+    r = cur.fetchone()
+    conn.close()
+    del cur, conn
+    gc.collect()
+    assert r.a == [1, 2]
+    assert r.s == "x"
+
+
+def test_lazy_row_named_cursor(conn):
+    with conn.cursor("foo", row_factory=rows.lazy_row) as cur:
+        cur.itersize = 2
+        cur.execute("select generate_series(1, 5) as a")
+        recs = list(cur)
+    assert [r.a for r in recs] == [1, 2, 3, 4, 5]
+
+
+def test_lazy_row_pickle(conn):
+    cur = conn.cursor(row_factory=rows.lazy_row)
+    r = cur.execute("select 1 as a, 'x' as b").fetchone()
+    r1 = pickle.loads(pickle.dumps(r))
+    assert r1 == r
+    assert r1.b == "x"
+    assert r1._asdict() == {"a": 1, "b": "x"}
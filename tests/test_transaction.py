@@ -1,6 +1,6 @@
 import pytest
 
-from psycopg3 import Connection, ProgrammingError, Rollback
+from psycopg3 import Connection, ProgrammingError, Rollback, errors
 
 
 @pytest.fixture(autouse=True)
@@ -61,16 +61,32 @@ def commands(conn, monkeypatch):
 def patch_exec(conn, monkeypatch):
     """Helper to implement the commands fixture both sync and async."""
     _orig_exec_command = conn._exec_command
+    _orig_start_query_commands = conn._start_query_commands
     L = ListPopAll()
 
+    # The commands starting a transaction may be sent together with the query
+    # rather than by _exec_command(): record them when they are consumed.
+    started = set()
+
+    def _start_query_commands():
+        commands = _orig_start_query_commands()
+        if commands:
+            commands_str = [c.decode(conn.client_encoding) for c in commands]
+            L.insert(0, "; ".join(commands_str))
+            started.update(commands_str)
+            started.add("; ".join(commands_str))
+        return commands
+
     def _exec_command(command):
         if isinstance(command, bytes):
             command = command.decode(conn.client_encoding)
 
-        L.insert(0, command)
+        if command not in started:
+            L.insert(0, command)
         return _orig_exec_command(command)
 
     monkeypatch.setattr(conn, "_exec_command", _exec_command)
+    monkeypatch.setattr(conn, "_start_query_commands", _start_query_commands)
     return L
 
 
@@ -91,6 +107,7 @@ def test_basic(conn):
     """Basic use of transaction() to BEGIN and COMMIT a transaction."""
     assert not in_transaction(conn)
     with conn.transaction():
+        conn.execute("select 1")
         assert in_transaction(conn)
     assert not in_transaction(conn)
 
@@ -125,6 +142,7 @@ def test_begins_on_enter(conn):
     tx = conn.transaction()
     assert not in_transaction(conn)
     with tx:
+        conn.execute("select 1")
         assert in_transaction(conn)
     assert not in_transaction(conn)
 
@@ -388,6 +406,7 @@ def test_named_savepoints_successful_exit(conn, commands):
     # Using Transaction explicitly becase conn.transaction() enters the contetx
     assert not commands
     with conn.transaction() as tx:
+        conn.execute("select 1")
         assert commands.popall() == ["begin"]
         assert not tx.savepoint_name
     assert commands.popall() == ["commit"]
@@ -396,6 +415,7 @@ def test_named_savepoints_successful_exit(conn, commands):
     conn.cursor().execute("select 1")
     assert commands.popall() == ["begin"]
     with conn.transaction() as tx:
+        conn.execute("select 1")
         assert commands.popall() == ['savepoint "_pg3_1"']
         assert tx.savepoint_name == "_pg3_1"
     assert commands.popall() == ['release "_pg3_1"']
@@ -404,14 +424,17 @@ def test_named_savepoints_successful_exit(conn, commands):
 
     # Case 2
     with conn.transaction(savepoint_name="foo") as tx:
+        conn.execute("select 1")
         assert commands.popall() == ['begin; savepoint "foo"']
         assert tx.savepoint_name == "foo"
     assert commands.popall() == ["commit"]
 
     # Case 3 (with savepoint name provided)
     with conn.transaction():
+        conn.execute("select 1")
         assert commands.popall() == ["begin"]
         with conn.transaction(savepoint_name="bar") as tx:
+            conn.execute("select 1")
             assert commands.popall() == ['savepoint "bar"']
             assert tx.savepoint_name == "bar"
         assert commands.popall() == ['release "bar"']
@@ -419,8 +442,10 @@ def test_named_savepoints_successful_exit(conn, commands):
 
     # Case 3 (with savepoint name auto-generated)
     with conn.transaction():
+        conn.execute("select 1")
         assert commands.popall() == ["begin"]
         with conn.transaction() as tx:
+            conn.execute("select 1")
             assert commands.popall() == ['savepoint "_pg3_2"']
             assert tx.savepoint_name == "_pg3_2"
         assert commands.popall() == ['release "_pg3_2"']
@@ -436,6 +461,7 @@ def test_named_savepoints_exception_exit(conn, commands):
     # Case 1
     with pytest.raises(ExpectedException):
         with conn.transaction() as tx:
+            conn.execute("select 1")
             assert commands.popall() == ["begin"]
             assert not tx.savepoint_name
             raise ExpectedException
@@ -444,6 +470,7 @@ def test_named_savepoints_exception_exit(conn, commands):
     # Case 2
     with pytest.raises(ExpectedException):
         with conn.transaction(savepoint_name="foo") as tx:
+            conn.execute("select 1")
             assert commands.popall() == ['begin; savepoint "foo"']
             assert tx.savepoint_name == "foo"
             raise ExpectedException
@@ -451,9 +478,11 @@ def test_named_savepoints_exception_exit(conn, commands):
 
     # Case 3 (with savepoint name provided)
     with conn.transaction():
+        conn.execute("select 1")
         assert commands.popall() == ["begin"]
         with pytest.raises(ExpectedException):
             with conn.transaction(savepoint_name="bar") as tx:
+                conn.execute("select 1")
                 assert commands.popall() == ['savepoint "bar"']
                 assert tx.savepoint_name == "bar"
                 raise ExpectedException
@@ -462,9 +491,11 @@ def test_named_savepoints_exception_exit(conn, commands):
 
     # Case 3 (with savepoint name auto-generated)
     with conn.transaction():
+        conn.execute("select 1")
         assert commands.popall() == ["begin"]
         with pytest.raises(ExpectedException):
             with conn.transaction() as tx:
+                conn.execute("select 1")
                 assert commands.popall() == ['savepoint "_pg3_2"']
                 assert tx.savepoint_name == "_pg3_2"
                 raise ExpectedException
@@ -472,6 +503,94 @@ def test_named_savepoints_exception_exit(conn, commands):
     assert commands.popall() == ["commit"]
 
 
+def test_begin_with_first_query(conn, commands):
+    """The transaction is started together with the first query."""
+    with conn.transaction():
+        with conn.transaction("foo"):
+            assert not commands
+            assert not in_transaction(conn)
+            cur = conn.execute("select %s", [10])
+            assert commands.popall() == ['begin; savepoint "foo"']
+            assert in_transaction(conn)
+            assert cur.fetchone() == (10,)
+        assert commands.popall() == ['release "foo"']
+    assert commands.popall() == ["commit"]
+
+    conn.execute("select %s", [10])
+    assert commands.popall() == ["begin"]
+    assert in_transaction(conn)
+
+
+def test_begin_with_first_text_query(conn, monkeypatch):
+    """The transaction is started in the same string of a text query."""
+    _orig_exec_command = conn._exec_command
+
+    def _exec_command(command):
+        assert conn._pipeline, f"{command!r} sent in its own round trip"
+        return _orig_exec_command(command)
+
+    with conn.transaction():
+        with conn.transaction("foo"):
+            monkeypatch.setattr(conn, "_exec_command", _exec_command)
+            cur = conn.execute("select 1")
+            assert in_transaction(conn)
+            assert cur.fetchone() == (1,)
+            monkeypatch.undo()
+
+
+def test_first_text_query_syntax_error(conn):
+    """A syntax error in the first query doesn't prevent to start the block."""
+    with pytest.raises(errors.SyntaxError):
+        with conn.transaction():
+            with conn.transaction("foo"):
+                conn.execute("meh")
+    assert not in_transaction(conn)
+
+    with pytest.raises(errors.SyntaxError):
+        conn.execute("meh")
+    assert conn.pgconn.transaction_status == conn.TransactionStatus.INERROR
+
+
+def test_empty_blocks(conn, commands):
+    """No command is sent if no query is executed in the block."""
+    with conn.transaction():
+        with conn.transaction():
+            pass
+        with pytest.raises(ExpectedException):
+            with conn.transaction("foo"):
+                raise ExpectedException
+    assert not commands
+    assert not in_transaction(conn)
+
+    conn.execute("select 1")
+    assert commands.popall() == ["begin"]
+    with conn.transaction():
+        with conn.transaction():
+            pass
+    assert not commands
+    assert in_transaction(conn)
+
+
+def test_begin_error(conn, monkeypatch):
+    """An error starting the transaction is reported by the query."""
+    _orig_exec_command = conn._exec_command
+
+    def _exec_command(command):
+        if command == b"begin":
+            command = b"begin wat"
+        return _orig_exec_command(command)
+
+    monkeypatch.setattr(conn, "_exec_command", _exec_command)
+    with pytest.raises(errors.SyntaxError, match="wat"):
+        conn.execute("select %s", [10])
+    assert not in_transaction(conn)
+
+    monkeypatch.undo()
+    cur = conn.execute("select %s", [10])
+    assert cur.fetchone() == (10,)
+    assert in_transaction(conn)
+
+
 def test_named_savepoints_with_repeated_names_works(conn):
     """
     Using the same savepoint name repeatedly works correctly, but bypasses
@@ -629,10 +748,12 @@ def test_explicit_rollback_of_enclosing_tx_outer_tx_unaffected(conn, svcconn):
 
 def test_str(conn):
     with conn.transaction() as tx:
+        conn.execute("select 1")
         assert "[INTRANS]" in str(tx)
         assert "(active)" in str(tx)
         assert "'" not in str(tx)
         with conn.transaction("wat") as tx2:
+            conn.execute("select 1")
             assert "[INTRANS]" in str(tx2)
             assert "'wat'" in str(tx2)
 
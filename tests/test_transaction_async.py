@@ -1,6 +1,6 @@
 import pytest
 
-from psycopg3 import ProgrammingError, Rollback
+from psycopg3 import ProgrammingError, Rollback, errors
 
 from .test_transaction import in_transaction, insert_row, inserted
 from .test_transaction import ExpectedException, patch_exec
@@ -19,6 +19,7 @@ async def test_basic(aconn):
     """Basic use of transaction() to BEGIN and COMMIT a transaction."""
     assert not in_transaction(aconn)
     async with aconn.transaction():
+        await aconn.execute("select 1")
         assert in_transaction(aconn)
     assert not in_transaction(aconn)
 
@@ -53,6 +54,7 @@ async def test_begins_on_enter(aconn):
     tx = aconn.transaction()
     assert not in_transaction(aconn)
     async with tx:
+        await aconn.execute("select 1")
         assert in_transaction(aconn)
     assert not in_transaction(aconn)
 
@@ -323,6 +325,7 @@ async def test_named_savepoints_successful_exit(aconn, commands):
     # Case 1
     # Using Transaction explicitly becase conn.transaction() enters the contetx
     async with aconn.transaction() as tx:
+        await aconn.execute("select 1")
         assert commands.popall() == ["begin"]
         assert not tx.savepoint_name
     assert commands.popall() == ["commit"]
@@ -331,6 +334,7 @@ async def test_named_savepoints_successful_exit(aconn, commands):
     await (await aconn.cursor()).execute("select 1")
     assert commands.popall() == ["begin"]
     async with aconn.transaction() as tx:
+        await aconn.execute("select 1")
         assert commands.popall() == ['savepoint "_pg3_1"']
         assert tx.savepoint_name == "_pg3_1"
 
@@ -340,14 +344,17 @@ async def test_named_savepoints_successful_exit(aconn, commands):
 
     # Case 2
     async with aconn.transaction(savepoint_name="foo") as tx:
+        await aconn.execute("select 1")
         assert commands.popall() == ['begin; savepoint "foo"']
         assert tx.savepoint_name == "foo"
     assert commands.popall() == ["commit"]
 
     # Case 3 (with savepoint name provided)
     async with aconn.transaction():
+        await aconn.execute("select 1")
         assert commands.popall() == ["begin"]
         async with aconn.transaction(savepoint_name="bar") as tx:
+            await aconn.execute("select 1")
             assert commands.popall() == ['savepoint "bar"']
             assert tx.savepoint_name == "bar"
         assert commands.popall() == ['release "bar"']
@@ -355,8 +362,10 @@ async def test_named_savepoints_successful_exit(aconn, commands):
 
     # Case 3 (with savepoint name auto-generated)
     async with aconn.transaction():
+        await aconn.execute("select 1")
         assert commands.popall() == ["begin"]
         async with aconn.transaction() as tx:
+            await aconn.execute("select 1")
             assert commands.popall() == ['savepoint "_pg3_2"']
             assert tx.savepoint_name == "_pg3_2"
         assert commands.popall() == ['release "_pg3_2"']
@@ -372,6 +381,7 @@ async def test_named_savepoints_exception_exit(aconn, commands):
     # Case 1
     with pytest.raises(ExpectedException):
         async with aconn.transaction() as tx:
+            await aconn.execute("select 1")
             assert commands.popall() == ["begin"]
             assert not tx.savepoint_name
             raise ExpectedException
@@ -380,6 +390,7 @@ async def test_named_savepoints_exception_exit(aconn, commands):
     # Case 2
     with pytest.raises(ExpectedException):
         async with aconn.transaction(savepoint_name="foo") as tx:
+            await aconn.execute("select 1")
             assert commands.popall() == ['begin; savepoint "foo"']
             assert tx.savepoint_name == "foo"
             raise ExpectedException
@@ -387,9 +398,11 @@ async def test_named_savepoints_exception_exit(aconn, commands):
 
     # Case 3 (with savepoint name provided)
     async with aconn.transaction():
+        await aconn.execute("select 1")
         assert commands.popall() == ["begin"]
         with pytest.raises(ExpectedException):
             async with aconn.transaction(savepoint_name="bar") as tx:
+                await aconn.execute("select 1")
                 assert commands.popall() == ['savepoint "bar"']
                 assert tx.savepoint_name == "bar"
                 raise ExpectedException
@@ -398,9 +411,11 @@ async def test_named_savepoints_exception_exit(aconn, commands):
 
     # Case 3 (with savepoint name auto-generated)
     async with aconn.transaction():
+        await aconn.execute("select 1")
         assert commands.popall() == ["begin"]
         with pytest.raises(ExpectedException):
             async with aconn.transaction() as tx:
+                await aconn.execute("select 1")
                 assert commands.popall() == ['savepoint "_pg3_2"']
                 assert tx.savepoint_name == "_pg3_2"
                 raise ExpectedException
@@ -408,6 +423,62 @@ async def test_named_savepoints_exception_exit(aconn, commands):
     assert commands.popall() == ["commit"]
 
 
+async def test_begin_with_first_query(aconn, commands):
+    """The transaction is started together with the first query."""
+    async with aconn.transaction():
+        async with aconn.transaction("foo"):
+            assert not commands
+            assert not in_transaction(aconn)
+            cur = await aconn.execute("select %s", [10])
+            assert commands.popall() == ['begin; savepoint "foo"']
+            assert in_transaction(aconn)
+            assert await cur.fetchone() == (10,)
+        assert commands.popall() == ['release "foo"']
+    assert commands.popall() == ["commit"]
+
+
+async def test_begin_with_first_text_query(aconn, monkeypatch):
+    """The transaction is started in the same string of a text query."""
+    _orig_exec_command = aconn._exec_command
+
+    def _exec_command(command):
+        assert aconn._pipeline, f"{command!r} sent in its own round trip"
+        return _orig_exec_command(command)
+
+    async with aconn.transaction():
+        async with aconn.transaction("foo"):
+            monkeypatch.setattr(aconn, "_exec_command", _exec_command)
+            cur = await aconn.execute("select 1")
+            assert in_transaction(aconn)
+            assert await cur.fetchone() == (1,)
+            monkeypatch.undo()
+
+
+async def test_first_text_query_syntax_error(aconn):
+    """A syntax error in the first query doesn't prevent to start the block."""
+    with pytest.raises(errors.SyntaxError):
+        async with aconn.transaction():
+            async with aconn.transaction("foo"):
+                await aconn.execute("meh")
+    assert not in_transaction(aconn)
+
+    with pytest.raises(errors.SyntaxError):
+        await aconn.execute("meh")
+    assert aconn.pgconn.transaction_status == aconn.TransactionStatus.INERROR
+
+
+async def test_empty_blocks(aconn, commands):
+    """No command is sent if no query is executed in the block."""
+    async with aconn.transaction():
+        async with aconn.transaction():
+            pass
+        with pytest.raises(ExpectedException):
+            async with aconn.transaction("foo"):
+                raise ExpectedException
+    assert not commands
+    assert not in_transaction(aconn)
+
+
 async def test_named_savepoints_with_repeated_names_works(aconn):
     """
     Using the same savepoint name repeatedly works correctly, but bypasses
@@ -567,10 +638,12 @@ async def test_explicit_rollback_of_enclosing_tx_outer_tx_unaffected(
 
 async def test_str(aconn):
     async with aconn.transaction() as tx:
+        await aconn.execute("select 1")
         assert "[INTRANS]" in str(tx)
         assert "(active)" in str(tx)
         assert "'" not in str(tx)
         async with aconn.transaction("wat") as tx2:
+            await aconn.execute("select 1")
             assert "[INTRANS]" in str(tx2)
             assert "'wat'" in str(tx2)
 
@@ -1,7 +1,7 @@
 import pytest
 import psycopg3
 from psycopg3.oids import builtins
-from psycopg3.adapt import Format, Transformer
+from psycopg3.adapt import Format, Transformer, AdaptersMap
 from psycopg3.types import array
 
 
@@ -117,6 +117,55 @@ def test_array_register(conn):
     assert res[1] == ["(foo)"]
 
 
+def test_array_register_optimised(conn):
+    cur = conn.cursor()
+    array.register(
+        builtins["text"].array_oid, builtins["text"].oid, context=cur
+    )
+    for fmt, base in [
+        (Format.TEXT, array.ArrayLoader),
+        (Format.BINARY, array.ArrayBinaryLoader),
+    ]:
+        loader = cur.adapters.get_loader(builtins["text"].array_oid, fmt)
+        assert issubclass(loader, AdaptersMap._get_optimised(base))
+
+
+tests_nested = [
+    [[1, None], [None, 4], [5, 6]],
+    [[[None]], [[2]]],
+    [[[1, 2], [3, 4]], [[5, None], [7, 8]]],
+    [[[[[[None, 1]]]]]],
+]
+
+
+@pytest.mark.parametrize("fmt_in", [Format.TEXT, Format.BINARY])
+@pytest.mark.parametrize("fmt_out", [Format.TEXT, Format.BINARY])
+@pytest.mark.parametrize("obj", tests_nested)
+def test_roundtrip_nested_nulls(conn, obj, fmt_in, fmt_out):
+    cur = conn.cursor(format=fmt_out)
+    ph = "%s" if fmt_in == Format.TEXT else "%b"
+    cur.execute(f"select {ph}::int[], {ph}::text[]", (obj, obj))
+    ints, texts = cur.fetchone()
+    assert ints == obj
+
+    def to_str(L):
+        return [
+            to_str(x) if isinstance(x, list) else x if x is None else str(x)
+            for x in L
+        ]
+
+    assert texts == to_str(obj)
+
+
+def test_dump_empty_list_binary_oid():
+    tx = Transformer()
+    dumper = tx.get_dumper([1], Format.BINARY)
+    dumper.dump([1])
+    assert dumper.oid == builtins["int8"].array_oid
+    dumper.dump([])
+    assert dumper.oid == builtins["text"].array_oid
+
+
 def test_array_of_unknown_builtin(conn):
     # we cannot load this type, but we understand it is an array
     val = "postgres=arwdDxt/postgres"
@@ -1,4 +1,5 @@
 import sys
+import logging
 import datetime as dt
 
 import pytest
@@ -23,10 +24,12 @@ from psycopg3.adapt import Format
         ("max", "9999-12-31"),
     ],
 )
-def test_dump_date(conn, val, expr):
+@pytest.mark.parametrize("fmt_in", [Format.TEXT, Format.BINARY])
+def test_dump_date(conn, val, expr, fmt_in):
     val = as_date(val)
     cur = conn.cursor()
-    cur.execute(f"select '{expr}'::date = %s", (val,))
+    ph = "%s" if fmt_in == Format.TEXT else "%b"
+    cur.execute(f"select '{expr}'::date = {ph}", (val,))
     assert cur.fetchone()[0] is True
 
     cur.execute(
@@ -35,14 +38,6 @@ def test_dump_date(conn, val, expr):
     assert cur.fetchone()[0] is True
 
 
-@pytest.mark.xfail  # TODO: binary dump
-@pytest.mark.parametrize("val, expr", [("2000,1,1", "2000-01-01")])
-def test_dump_date_binary(conn, val, expr):
-    cur = conn.cursor()
-    cur.execute(f"select '{expr}'::date = %b", (as_date(val),))
-    assert cur.fetchone()[0] is True
-
-
 @pytest.mark.parametrize("datestyle_in", ["DMY", "MDY", "YMD"])
 def test_dump_date_datestyle(conn, datestyle_in):
     cur = conn.cursor()
@@ -62,16 +57,9 @@ def test_dump_date_datestyle(conn, datestyle_in):
         ("max", "9999-12-31"),
     ],
 )
-def test_load_date(conn, val, expr):
-    cur = conn.cursor()
-    cur.execute(f"select '{expr}'::date")
-    assert cur.fetchone()[0] == as_date(val)
-
-
-@pytest.mark.xfail  # TODO: binary load
-@pytest.mark.parametrize("val, expr", [("2000,1,1", "2000-01-01")])
-def test_load_date_binary(conn, val, expr):
-    cur = conn.cursor(format=Format.BINARY)
+@pytest.mark.parametrize("fmt_out", [Format.TEXT, Format.BINARY])
+def test_load_date(conn, val, expr, fmt_out):
+    cur = conn.cursor(format=fmt_out)
     cur.execute(f"select '{expr}'::date")
     assert cur.fetchone()[0] == as_date(val)
 
@@ -96,6 +84,24 @@ def test_load_date_overflow(conn, val, datestyle_out):
         cur.fetchone()[0]
 
 
+@pytest.mark.parametrize("val", ["min", "max"])
+def test_load_date_overflow_binary(conn, val):
+    cur = conn.cursor(format=Format.BINARY)
+    cur.execute(
+        "select %s + %s::int", (as_date(val), -1 if val == "min" else 1)
+    )
+    with pytest.raises(DataError):
+        cur.fetchone()[0]
+
+
+@pytest.mark.parametrize("val", ["infinity", "-infinity"])
+def test_load_date_infinity_binary(conn, val):
+    cur = conn.cursor(format=Format.BINARY)
+    cur.execute("select %s::date", (val,))
+    with pytest.raises(DataError, match=val):
+        cur.fetchone()[0]
+
+
 #
 # datetime tests
 #
@@ -112,22 +118,12 @@ def test_load_date_overflow(conn, val, datestyle_out):
         ("max", "9999-12-31 23:59:59.999999"),
     ],
 )
-def test_dump_datetime(conn, val, expr):
+@pytest.mark.parametrize("fmt_in", [Format.TEXT, Format.BINARY])
+def test_dump_datetime(conn, val, expr, fmt_in):
     cur = conn.cursor()
     cur.execute("set timezone to '+02:00'")
-    cur.execute(f"select '{expr}'::timestamp = %s", (as_dt(val),))
-    assert cur.fetchone()[0] is True
-
-
-@pytest.mark.xfail  # TODO: binary dump
-@pytest.mark.parametrize(
-    "val, expr",
-    [("2000,1,1,0,0", "'2000-01-01 00:00'::timestamp")],
-)
-def test_dump_datetime_binary(conn, val, expr):
-    cur = conn.cursor()
-    cur.execute("set timezone to '+02:00'")
-    cur.execute(f"select {expr} = %b", (as_dt(val),))
+    ph = "%s" if fmt_in == Format.TEXT else "%b"
+    cur.execute(f"select '{expr}'::timestamp = {ph}", (as_dt(val),))
     assert cur.fetchone()[0] is True
 
 
@@ -166,6 +162,23 @@ def test_load_datetime(conn, val, expr, datestyle_in, datestyle_out):
     assert cur.fetchone()[0] == as_dt(val)
 
 
+@pytest.mark.parametrize(
+    "val, expr",
+    [
+        ("min", "0001-01-01"),
+        ("1000,1,1", "1000-01-01"),
+        ("1999,12,31,23,59,59,999999", "1999-12-31 23:59:59.999999"),
+        ("2000,1,2,3,4,5,6", "2000-01-02 03:04:05.000006"),
+        ("max", "9999-12-31 23:59:59.999999"),
+    ],
+)
+def test_load_datetime_binary(conn, val, expr):
+    cur = conn.cursor(format=Format.BINARY)
+    cur.execute("set timezone to '+02:00'")
+    cur.execute(f"select '{expr}'::timestamp")
+    assert cur.fetchone()[0] == as_dt(val)
+
+
 @pytest.mark.parametrize("val", ["min", "max"])
 @pytest.mark.parametrize("datestyle_out", ["ISO", "Postgres", "SQL", "German"])
 def test_load_datetime_overflow(conn, val, datestyle_out):
@@ -179,6 +192,27 @@ def test_load_datetime_overflow(conn, val, datestyle_out):
         cur.fetchone()[0]
 
 
+@pytest.mark.parametrize("val", ["min", "max"])
+@pytest.mark.parametrize("pgtype", ["timestamp", "timestamptz"])
+def test_load_datetime_overflow_binary(conn, val, pgtype):
+    cur = conn.cursor(format=Format.BINARY)
+    cur.execute(
+        f"select %s::{pgtype} + %s * '1s'::interval",
+        (as_dt(val), -1 if val == "min" else 1),
+    )
+    with pytest.raises(DataError):
+        cur.fetchone()[0]
+
+
+@pytest.mark.parametrize("val", ["infinity", "-infinity"])
+@pytest.mark.parametrize("pgtype", ["timestamp", "timestamptz"])
+def test_load_datetime_infinity_binary(conn, val, pgtype):
+    cur = conn.cursor(format=Format.BINARY)
+    cur.execute(f"select %s::{pgtype}", (val,))
+    with pytest.raises(DataError, match=val):
+        cur.fetchone()[0]
+
+
 #
 # datetime+tz tests
 #
@@ -201,7 +235,8 @@ def test_load_datetime_overflow(conn, val, datestyle_out):
         ("max~2", "9999-12-31 23:59:59.999999"),
     ],
 )
-def test_dump_datetimetz(conn, val, expr):
+@pytest.mark.parametrize("fmt_in", [Format.TEXT, Format.BINARY])
+def test_dump_datetimetz(conn, val, expr, fmt_in):
     # adjust for Python 3.6 missing seconds in tzinfo
     if val.count(":") > 1:
         expr = expr.rsplit(":", 1)[0]
@@ -210,16 +245,8 @@ def test_dump_datetimetz(conn, val, expr):
 
     cur = conn.cursor()
     cur.execute("set timezone to '-02:00'")
-    cur.execute(f"select '{expr}'::timestamptz = %s", (as_dt(val),))
-    assert cur.fetchone()[0] is True
-
-
-@pytest.mark.xfail  # TODO: binary dump
-@pytest.mark.parametrize("val, expr", [("2000,1,1,0,0~2", "2000-01-01 00:00")])
-def test_dump_datetimetz_binary(conn, val, expr):
-    cur = conn.cursor()
-    cur.execute("set timezone to '-02:00'")
-    cur.execute(f"select '{expr}'::timestamptz = %b", (as_dt(val),))
+    ph = "%s" if fmt_in == Format.TEXT else "%b"
+    cur.execute(f"select '{expr}'::timestamptz = {ph}", (as_dt(val),))
     assert cur.fetchone()[0] is True
 
 
@@ -258,6 +285,74 @@ def test_load_datetimetz(conn, val, expr, timezone, datestyle_out):
     assert cur.fetchone()[0] == as_dt(val)
 
 
+@pytest.mark.parametrize(
+    "val, expr, timezone",
+    [
+        ("2000,1,1~2", "2000-01-01", "-02:00"),
+        ("2000,1,2,3,4,5,678~1", "2000-01-02 03:04:05.000678", "Europe/Rome"),
+        ("2000,1,2,3,0,0,456789~-2", "2000-01-02 03:00:00.456789", "+02:00"),
+        ("1900,1,1~05:21:10", "1900-01-01", "Asia/Calcutta"),
+    ],
+)
+@pytest.mark.parametrize("datestyle_out", ["ISO", "SQL"])
+def test_load_datetimetz_binary(conn, val, expr, timezone, datestyle_out):
+    cur = conn.cursor(format=Format.BINARY)
+    cur.execute(f"set datestyle = {datestyle_out}, DMY")
+    cur.execute(f"set timezone to '{timezone}'")
+    cur.execute(f"select '{expr}'::timestamptz")
+    got = cur.fetchone()[0]
+    assert got == as_dt(val)
+    assert got.utcoffset() == as_dt(val).utcoffset()
+
+
+@pytest.mark.parametrize(
+    "timezone", ["UTC", "-02:00", "+05:30", "Europe/Rome", "EST5EDT"]
+)
+def test_load_datetimetz_binary_session_tz(conn, timezone):
+    conn.execute(f"set timezone to '{timezone}'")
+    query = """
+        select x, x::text from (values
+            ('2000-01-02 03:04:05.678901Z'::timestamptz),
+            ('2021-07-01 12:00Z'), ('1900-01-01Z'), ('0001-01-02Z')
+        ) v (x)
+        """
+    cur = conn.cursor(format=Format.BINARY)
+    for got, text in cur.execute(query):
+        want = conn.execute("select %s::timestamptz", [text]).fetchone()[0]
+        assert got == want
+        assert got.utcoffset() == want.utcoffset()
+
+
+@pytest.mark.parametrize(
+    "timezone", ["UTC", "-02:00", "+05:30", "Europe/Rome", "EST5EDT"]
+)
+def test_load_datetimetz_text_binary_same_tz(conn, timezone):
+    conn.execute(f"set timezone to '{timezone}'")
+    query = """
+        select x from (values
+            ('2000-01-02 03:04:05.678901Z'::timestamptz),
+            ('2021-07-01 12:00Z'), ('2021-10-31 01:30Z'), ('1900-01-01Z')
+        ) v (x)
+        """
+    text = conn.cursor().execute(query).fetchall()
+    binary = conn.cursor(format=Format.BINARY).execute(query).fetchall()
+    for (got_text,), (got_binary,) in zip(text, binary):
+        assert got_text == got_binary
+        assert got_text.tzinfo == got_binary.tzinfo
+        assert got_text.utcoffset() == got_binary.utcoffset()
+
+
+def test_load_datetimetz_binary_unknown_tz(conn, caplog):
+    caplog.set_level(logging.WARNING, logger="psycopg3")
+    conn.execute("set timezone to '<+05>-05'")
+    cur = conn.cursor(format=Format.BINARY)
+    cur.execute("select '2000-01-01 12:00Z'::timestamptz")
+    got = cur.fetchone()[0]
+    assert got == as_dt("2000,1,1,12~0")
+    assert got.utcoffset() == dt.timedelta(0)
+    assert "<+05>-05" in caplog.records[0].message
+
+
 @pytest.mark.xfail  # parse timezone names
 @pytest.mark.parametrize("val, expr", [("2000,1,1~2", "2000-01-01")])
 @pytest.mark.parametrize("datestyle_out", ["SQL", "Postgres", "German"])
@@ -283,17 +378,11 @@ def test_load_datetimetz_tzname(conn, val, expr, datestyle_in, datestyle_out):
         ("max", "23:59:59.999999"),
     ],
 )
-def test_dump_time(conn, val, expr):
-    cur = conn.cursor()
-    cur.execute(f"select '{expr}'::time = %s", (as_time(val),))
-    assert cur.fetchone()[0] is True
-
-
-@pytest.mark.xfail  # TODO: binary dump
-@pytest.mark.parametrize("val, expr", [("0,0", "00:00")])
-def test_dump_time_binary(conn, val, expr):
+@pytest.mark.parametrize("fmt_in", [Format.TEXT, Format.BINARY])
+def test_dump_time(conn, val, expr, fmt_in):
     cur = conn.cursor()
-    cur.execute(f"select '{expr}'::time = %b", (as_time(val),))
+    ph = "%s" if fmt_in == Format.TEXT else "%b"
+    cur.execute(f"select '{expr}'::time = {ph}", (as_time(val),))
     assert cur.fetchone()[0] is True
 
 
@@ -308,22 +397,16 @@ def test_dump_time_binary(conn, val, expr):
         ("max", "23:59:59.999999"),
     ],
 )
-def test_load_time(conn, val, expr):
-    cur = conn.cursor()
-    cur.execute(f"select '{expr}'::time")
-    assert cur.fetchone()[0] == as_time(val)
-
-
-@pytest.mark.xfail  # TODO: binary load
-@pytest.mark.parametrize("val, expr", [("0,0", "00:00")])
-def test_load_time_binary(conn, val, expr):
-    cur = conn.cursor(format=Format.BINARY)
+@pytest.mark.parametrize("fmt_out", [Format.TEXT, Format.BINARY])
+def test_load_time(conn, val, expr, fmt_out):
+    cur = conn.cursor(format=fmt_out)
     cur.execute(f"select '{expr}'::time")
     assert cur.fetchone()[0] == as_time(val)
 
 
-def test_load_time_24(conn):
-    cur = conn.cursor()
+@pytest.mark.parametrize("fmt_out", [Format.TEXT, Format.BINARY])
+def test_load_time_24(conn, fmt_out):
+    cur = conn.cursor(format=fmt_out)
     cur.execute("select '24:00'::time")
     with pytest.raises(DataError):
         cur.fetchone()[0]
@@ -346,18 +429,12 @@ def test_load_time_24(conn):
         ("max~+12", "23:59:59.999999+12:00"),
     ],
 )
-def test_dump_timetz(conn, val, expr):
+@pytest.mark.parametrize("fmt_in", [Format.TEXT, Format.BINARY])
+def test_dump_timetz(conn, val, expr, fmt_in):
     cur = conn.cursor()
     cur.execute("set timezone to '-02:00'")
-    cur.execute(f"select '{expr}'::timetz = %s", (as_time(val),))
-    assert cur.fetchone()[0] is True
-
-
-@pytest.mark.xfail  # TODO: binary dump
-@pytest.mark.parametrize("val, expr", [("0,0~0", "00:00Z")])
-def test_dump_timetz_binary(conn, val, expr):
-    cur = conn.cursor()
-    cur.execute(f"select '{expr}'::time = %b", (as_time(val),))
+    ph = "%s" if fmt_in == Format.TEXT else "%b"
+    cur.execute(f"select '{expr}'::timetz = {ph}", (as_time(val),))
     assert cur.fetchone()[0] is True
 
 
@@ -372,29 +449,33 @@ def test_dump_timetz_binary(conn, val, expr):
         ("3,0,0,456789~-2", "03:00:00.456789", "+02:00"),
     ],
 )
-def test_load_timetz(conn, val, timezone, expr):
-    cur = conn.cursor()
+@pytest.mark.parametrize("fmt_out", [Format.TEXT, Format.BINARY])
+def test_load_timetz(conn, val, timezone, expr, fmt_out):
+    cur = conn.cursor(format=fmt_out)
     cur.execute(f"set timezone to '{timezone}'")
     cur.execute(f"select '{expr}'::timetz")
     assert cur.fetchone()[0] == as_time(val)
 
 
-@pytest.mark.xfail  # TODO: binary load
-@pytest.mark.parametrize("val, expr, timezone", [("0,0~2", "00:00", "-02:00")])
-def test_load_timetz_binary(conn, val, expr, timezone):
-    cur = conn.cursor(format=Format.BINARY)
-    cur.execute(f"set timezone to '{timezone}'")
-    cur.execute(f"select '{expr}'::time")
-    assert cur.fetchone()[0] == as_time(val)
-
-
-def test_load_timetz_24(conn):
-    cur = conn.cursor()
+@pytest.mark.parametrize("fmt_out", [Format.TEXT, Format.BINARY])
+def test_load_timetz_24(conn, fmt_out):
+    cur = conn.cursor(format=fmt_out)
     cur.execute("select '24:00'::timetz")
     with pytest.raises(DataError):
         cur.fetchone()[0]
 
 
+def test_dump_time_list_mixed_binary(conn):
+    tz = dt.timezone(dt.timedelta(hours=1))
+    cur = conn.cursor()
+    cur.execute("select %b", ([dt.time(1, 2), dt.time(3, 4)],))
+    assert cur.fetchone()[0] == [dt.time(1, 2), dt.time(3, 4)]
+    cur.execute("select %b", ([None, dt.time(1, 2, tzinfo=tz)],))
+    assert cur.fetchone()[0] == [None, dt.time(1, 2, tzinfo=tz)]
+    with pytest.raises(DataError, match="time"):
+        cur.execute("select %b", ([dt.time(1, 2), dt.time(3, 4, tzinfo=tz)],))
+
+
 #
 # Interval
 #
@@ -417,18 +498,12 @@ def test_load_timetz_24(conn):
     "intervalstyle",
     ["sql_standard", "postgres", "postgres_verbose", "iso_8601"],
 )
-def test_dump_interval(conn, val, expr, intervalstyle):
+@pytest.mark.parametrize("fmt_in", [Format.TEXT, Format.BINARY])
+def test_dump_interval(conn, val, expr, intervalstyle, fmt_in):
     cur = conn.cursor()
     cur.execute(f"set IntervalStyle to '{intervalstyle}'")
-    cur.execute(f"select '{expr}'::interval = %s", (as_td(val),))
-    assert cur.fetchone()[0] is True
-
-
-@pytest.mark.xfail  # TODO: binary dump
-@pytest.mark.parametrize("val, expr", [("1s", "1s")])
-def test_dump_interval_binary(conn, val, expr):
-    cur = conn.cursor()
-    cur.execute(f"select '{expr}'::interval = %b", (as_td(val),))
+    ph = "%s" if fmt_in == Format.TEXT else "%b"
+    cur.execute(f"select '{expr}'::interval = {ph}", (as_td(val),))
     assert cur.fetchone()[0] is True
 
 
@@ -457,10 +532,17 @@ def test_dump_interval_binary(conn, val, expr):
         ("-30d", "-1 month"),
         ("60d", "2 month"),
         ("-90d", "-3 month"),
+        ("395d", "1 year 1 month"),
+        ("-395d", "-1 year -1 month"),
+        ("330d", "1 year -1 month"),
+        ("-1d,3600s", "-1 day +01:00"),
+        ("1d,-1s", "1 day -00:00:01"),
+        ("3600000s", "1000 hours"),
     ],
 )
-def test_load_interval(conn, val, expr):
-    cur = conn.cursor()
+@pytest.mark.parametrize("fmt_out", [Format.TEXT, Format.BINARY])
+def test_load_interval(conn, val, expr, fmt_out):
+    cur = conn.cursor(format=fmt_out)
     cur.execute(f"select '{expr}'::interval")
     assert cur.fetchone()[0] == as_td(val)
 
@@ -479,8 +561,9 @@ def test_load_interval_intervalstyle(conn, val, expr, intervalstyle):
 
 
 @pytest.mark.parametrize("val", ["min", "max"])
-def test_load_interval_overflow(conn, val):
-    cur = conn.cursor()
+@pytest.mark.parametrize("fmt_out", [Format.TEXT, Format.BINARY])
+def test_load_interval_overflow(conn, val, fmt_out):
+    cur = conn.cursor(format=fmt_out)
     cur.execute(
         "select %s + %s * '1s'::interval",
         (as_td(val), -1 if val == "min" else 1),
@@ -489,6 +572,52 @@ def test_load_interval_overflow(conn, val):
         cur.fetchone()[0]
 
 
+#
+# Binary roundtrip
+#
+
+
+@pytest.mark.parametrize(
+    "val",
+    [
+        dt.date(1, 1, 1),
+        dt.date(1600, 2, 29),
+        dt.date(1900, 3, 1),
+        dt.date(1999, 12, 31),
+        dt.date(2000, 2, 29),
+        dt.date(2100, 3, 1),
+        dt.date(9999, 12, 31),
+        dt.time(0, 0),
+        dt.time(12, 34, 56, 789012),
+        dt.time(23, 59, 59, 999999),
+        dt.time(1, 2, 3, tzinfo=dt.timezone(dt.timedelta(hours=-5))),
+        dt.datetime(1, 1, 1),
+        dt.datetime(1899, 12, 31, 23, 59, 59, 999999),
+        dt.datetime(1999, 12, 31, 23, 59, 59, 1),
+        dt.datetime(2000, 2, 29, 12, 0, 0, 1),
+        dt.datetime(9999, 12, 31, 23, 59, 59, 999999),
+        dt.datetime(1970, 1, 1, tzinfo=dt.timezone.utc),
+        dt.datetime(
+            1999, 12, 31, 22, 0, tzinfo=dt.timezone(dt.timedelta(hours=3))
+        ),
+        dt.timedelta(0),
+        dt.timedelta(days=-1, microseconds=1),
+        dt.timedelta(days=12345, seconds=6789, microseconds=12),
+        dt.timedelta.min,
+        dt.timedelta.max,
+    ],
+)
+def test_roundtrip_binary(conn, val):
+    cur = conn.cursor(format=Format.BINARY)
+    cur.execute("select %b", (val,))
+    got = cur.fetchone()[0]
+    assert got == val
+    assert type(got) is type(val)
+    assert (getattr(got, "tzinfo", None) is None) == (
+        getattr(val, "tzinfo", None) is None
+    )
+
+
 #
 # Support
 #
@@ -7,7 +7,7 @@ import psycopg3
 from psycopg3 import sql
 from psycopg3.oids import builtins
 from psycopg3.adapt import Transformer, Format
-from psycopg3.types.numeric import FloatLoader
+from psycopg3.types.numeric import FloatLoader, NumericFloatBinaryLoader
 
 
 #
@@ -325,20 +325,95 @@ def test_quote_numeric(conn, val, expr):
         assert r == (val, -val)
 
 
-@pytest.mark.xfail
-def test_dump_numeric_binary():
-    # TODO: numeric binary adaptation
-    tx = Transformer()
-    n = Decimal(1)
-    tx.get_dumper(n, Format.BINARY).dump(n)
+@pytest.mark.parametrize(
+    "expr",
+    [
+        "0",
+        "0.0",
+        "0.000",
+        "-0.00",
+        "1",
+        "-1",
+        "10000",
+        "10000.0000",
+        "-10000",
+        "123456789.123456789",
+        "-0.0001",
+        "0.00001230",
+        "1.10",
+        "1" + "0" * 100,
+        "0." + "0" * 100 + "1",
+        "-" + "9" * 1000 + "." + "9" * 1000,
+        "nan",
+        "infinity",
+        "-infinity",
+    ],
+)
+@pytest.mark.parametrize("fmt_in", [Format.TEXT, Format.BINARY])
+def test_dump_numeric(conn, expr, fmt_in):
+    if "inf" in expr and conn.pgconn.server_version < 140000:
+        pytest.skip("infinite numeric not supported before PG 14")
+    val = Decimal(expr)
+    cur = conn.cursor()
+    ph = "%s" if fmt_in == Format.TEXT else "%b"
+    cur.execute(f"select {ph}::text, %s::numeric::text", (val, expr))
+    got, want = cur.fetchone()
+    assert got == want
+
+
+@pytest.mark.parametrize(
+    "expr", ["1E+131071", "-9.999E+131071", "1E-16383", "0E+200000"]
+)
+def test_dump_numeric_binary_limits(conn, expr):
+    val = Decimal(expr)
+    cur = conn.cursor()
+    cur.execute("select %b = %s::numeric", (val, expr))
+    assert cur.fetchone()[0] is True
+
+
+@pytest.mark.parametrize(
+    "expr", ["1E+200000", "-1E+131072", "1E-70000", "1E-16384"]
+)
+def test_dump_numeric_binary_out_of_range(conn, expr):
+    cur = conn.cursor()
+    with pytest.raises(psycopg3.DataError):
+        cur.execute("select %b", (Decimal(expr),))
 
 
-@pytest.mark.xfail
-def test_load_numeric_binary(conn):
-    # TODO: numeric binary casting
-    cur = conn.cursor(format=1)
-    res = cur.execute("select 1::numeric").fetchone()[0]
-    assert res == Decimal(1)
+@pytest.mark.parametrize(
+    "expr",
+    [
+        "0",
+        "0.000",
+        "1",
+        "-1",
+        "10000",
+        "10000.0000",
+        "123456789.123456789",
+        "-0.0001",
+        "0.00001230",
+        "1" + "0" * 100,
+        "0." + "0" * 100 + "1",
+        "-" + "9" * 1000 + "." + "9" * 1000,
+        "nan",
+        "infinity",
+        "-infinity",
+    ],
+)
+@pytest.mark.parametrize("fmt_out", [Format.TEXT, Format.BINARY])
+def test_load_numeric(conn, expr, fmt_out):
+    if "inf" in expr and conn.pgconn.server_version < 140000:
+        pytest.skip("infinite numeric not supported before PG 14")
+    cur = conn.cursor(format=fmt_out)
+    cur.execute(f"select '{expr}'::numeric")
+    result = cur.fetchone()[0]
+    assert isinstance(result, Decimal)
+    want = Decimal(expr)
+    if want.is_nan():
+        assert result.is_nan()
+    else:
+        assert result == want
+        assert result.as_tuple().exponent == want.as_tuple().exponent
 
 
 @pytest.mark.parametrize(
@@ -375,6 +450,31 @@ def test_numeric_as_float(conn, val):
         assert result[0] == pytest.approx(float(val))
 
 
+@pytest.mark.parametrize(
+    "expr, want",
+    [
+        ("0", 0.0),
+        ("-0.0001", -0.0001),
+        ("123456789.123456789", 123456789.123456789),
+        ("0.1", 0.1),
+        ("1" + "0" * 400, float("inf")),
+        ("0." + "0" * 400 + "1", 0.0),
+        ("nan", float("nan")),
+    ],
+)
+def test_numeric_as_float_binary(conn, expr, want):
+    cur = conn.cursor(format=Format.BINARY)
+    NumericFloatBinaryLoader.register(builtins["numeric"].oid, cur)
+    cur.execute("select %s::numeric, array[%s::numeric]", (expr, expr))
+    result, aresult = cur.fetchone()
+    assert isinstance(result, float)
+    assert isinstance(aresult[0], float)
+    if isnan(want):
+        assert isnan(result) and isnan(aresult[0])
+    else:
+        assert result == aresult[0] == want
+
+
 #
 # Mixed tests
 #